@@ -1,16 +1,37 @@
 """历史数据访问对象"""
 import json
+import math
+import mmap
+import os
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from .history_index import HistoryIndexView, SessionHistoryIndex, record_timestamp, record_type_code, to_epoch
+
+# 默认在文件达到4MB时使用mmap读取
+DEFAULT_MMAP_THRESHOLD = 4 * 1024 * 1024
 
 
 class HistoryDAO:
-    """历史数据访问对象"""
+    """历史数据访问对象
+    
+    每个会话的 JSONL 文件都带有偏移量索引（见 history_index），
+    分页和时间范围查询通过索引直接定位记录所在的字节范围。
+    """
     
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, mmap_threshold: Optional[int] = DEFAULT_MMAP_THRESHOLD):
+        """初始化历史数据访问对象
+        
+        Args:
+            base_path: 数据根目录
+            mmap_threshold: 数据或索引文件达到该字节数时使用mmap读取，None表示不使用
+        """
         self.base_path = base_path
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.mmap_threshold = mmap_threshold
+        self._lock = threading.Lock()
     
     def _get_session_file(self, session_id: str) -> Path:
         """获取会话历史文件路径"""
@@ -19,13 +40,30 @@ class HistoryDAO:
         session_dir.mkdir(parents=True, exist_ok=True)
         return session_dir / f"{session_id}.jsonl"
     
+    def _get_index(self, session_file: Path) -> SessionHistoryIndex:
+        """获取会话历史文件的索引"""
+        return SessionHistoryIndex(session_file, self.mmap_threshold)
+    
     def store_record(self, session_id: str, record_data: Dict[str, Any]) -> bool:
         """存储历史记录"""
         try:
             session_file = self._get_session_file(session_id)
-            with open(session_file, 'a', encoding='utf-8') as f:
-                json.dump(record_data, f, ensure_ascii=False)
-                f.write('\n')
+            line = (json.dumps(record_data, ensure_ascii=False) + '\n').encode('utf-8')
+            with self._lock:
+                with open(session_file, 'a+b') as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    if offset:
+                        # 旧文件可能缺少结尾换行，先补上，避免与上一条记录连成一行
+                        f.seek(offset - 1)
+                        if f.read(1) != b'\n':
+                            line = b'\n' + line
+                    f.write(line)
+                
+                try:
+                    self._get_index(session_file).append(offset, len(line), record_data)
+                except Exception:
+                    # 索引会在下次读取时补齐
+                    pass
             return True
         except Exception:
             return False
@@ -44,39 +82,174 @@ class HistoryDAO:
         if not session_file.exists():
             return []
         
+        try:
+            index = self._get_index(session_file)
+            with self._lock:
+                index.sync()
+            with index.open_view() as view:
+                spans = self._select_spans(view, start_time, end_time, record_types, limit, offset)
+            records = self._read_spans(session_file, spans)
+        except Exception:
+            # 索引不可用时退回逐行扫描
+            return self._scan_session_records(session_file, start_time, end_time, record_types, limit, offset)
+        
+        if record_types:
+            # 记录类型按校验码筛选，解码后再确认一次
+            records = [record for record in records if record.get('record_type') in record_types]
+        return records
+    
+    def _select_spans(
+        self,
+        view: HistoryIndexView,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        record_types: Optional[List[str]],
+        limit: int,
+        offset: int
+    ) -> List[Tuple[int, int]]:
+        """根据索引选出目标记录在数据文件中的 (字节偏移, 长度)"""
+        if limit <= 0:
+            return []
+        offset = max(offset, 0)
+        
+        start_ts = to_epoch(start_time) if start_time else None
+        end_ts = to_epoch(end_time) if end_time else None
+        time_filtered = start_ts is not None or end_ts is not None
+        
+        # 时间戳有序时二分查找时间范围
+        low, high = 0, len(view)
+        if time_filtered and view.is_sorted:
+            if start_ts is not None:
+                low = view.bisect_left(start_ts)
+            if end_ts is not None:
+                high = view.bisect_right(end_ts)
+        
+        if not record_types and not (time_filtered and not view.is_sorted):
+            # 无需逐条筛选，直接按位置定位分页
+            first = low + offset
+            last = min(high, first + limit)
+            if first >= last:
+                return []
+            return [(entry[0], entry[1]) for entry in view.entries(first, last)]
+        
+        type_codes = {record_type_code(record_type) for record_type in record_types} if record_types else None
+        check_time = time_filtered and not view.is_sorted
+        spans: List[Tuple[int, int]] = []
+        skipped = 0
+        for line_offset, length, timestamp, type_code in view.entries(low, high):
+            if type_codes is not None and type_code not in type_codes:
+                continue
+            if check_time:
+                # 时间戳缺失（NaN）的记录不满足任何时间条件
+                if math.isnan(timestamp):
+                    continue
+                if start_ts is not None and timestamp < start_ts:
+                    continue
+                if end_ts is not None and timestamp > end_ts:
+                    continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            spans.append((line_offset, length))
+            if len(spans) >= limit:
+                break
+        return spans
+    
+    def _read_spans(self, session_file: Path, spans: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """读取并解码指定字节范围内的记录，相邻的记录合并为一次读取"""
+        if not spans:
+            return []
+        
+        # 合并连续的字节范围
+        runs: List[Tuple[int, int, List[Tuple[int, int]]]] = []
+        for line_offset, length in spans:
+            if runs and runs[-1][1] == line_offset:
+                run_start, _, members = runs[-1]
+                members.append((line_offset, length))
+                runs[-1] = (run_start, line_offset + length, members)
+            else:
+                runs.append((line_offset, line_offset + length, [(line_offset, length)]))
+        
         records = []
+        with open(session_file, 'rb') as f:
+            use_mmap = (
+                self.mmap_threshold is not None
+                and os.fstat(f.fileno()).st_size >= self.mmap_threshold
+            )
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else None
+            try:
+                for run_start, run_end, members in runs:
+                    if mapped is not None:
+                        chunk = mapped[run_start:run_end]
+                    else:
+                        f.seek(run_start)
+                        chunk = f.read(run_end - run_start)
+                    
+                    for line_offset, length in members:
+                        begin = line_offset - run_start
+                        try:
+                            records.append(json.loads(chunk[begin:begin + length]))
+                        except ValueError:
+                            continue
+            finally:
+                if mapped is not None:
+                    mapped.close()
+        
+        return records
+    
+    def _scan_session_records(
+        self,
+        session_file: Path,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        record_types: Optional[List[str]],
+        limit: int,
+        offset: int
+    ) -> List[Dict[str, Any]]:
+        """逐行扫描会话历史文件（不使用索引），过滤和分页规则与索引路径一致"""
+        if limit <= 0:
+            return []
+        offset = max(offset, 0)
+        
+        start_ts = to_epoch(start_time) if start_time else None
+        end_ts = to_epoch(end_time) if end_time else None
+        
+        records: List[Dict[str, Any]] = []
+        skipped = 0
         try:
             with open(session_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f):
-                    if line.strip():
-                        try:
-                            record = json.loads(line)
-                            
-                            # 应用过滤条件
-                            if start_time or end_time:
-                                record_time = datetime.fromisoformat(record.get('timestamp', ''))
-                                if start_time and record_time < start_time:
-                                    continue
-                                if end_time and record_time > end_time:
-                                    continue
-                            
-                            if record_types and record.get('record_type') not in record_types:
-                                continue
-                            
-                            # 应用分页
-                            if len(records) >= offset + limit:
-                                break
-                                
-                            if len(records) >= offset:
-                                records.append(record)
-                                
-                        except json.JSONDecodeError:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    
+                    # 应用过滤条件，时间戳缺失或无法解析的记录不满足任何时间条件
+                    if start_ts is not None or end_ts is not None:
+                        timestamp = record_timestamp(record)
+                        if math.isnan(timestamp):
                             continue
-                            
+                        if start_ts is not None and timestamp < start_ts:
+                            continue
+                        if end_ts is not None and timestamp > end_ts:
+                            continue
+                    
+                    if record_types and record.get('record_type') not in record_types:
+                        continue
+                    
+                    # 先跳过 offset 条匹配的记录，再取 limit 条
+                    if skipped < offset:
+                        skipped += 1
+                        continue
+                    records.append(record)
+                    if len(records) >= limit:
+                        break
         except Exception:
             pass
         
-        return records[offset:offset + limit]
+        return records
     
     def search_session_records(
         self,
@@ -234,13 +407,17 @@ class HistoryDAO:
                         kept_count = len(records_to_keep)
                         
                         if kept_count < original_count:
-                            with open(session_file, 'w', encoding='utf-8') as f:
-                                f.writelines(records_to_keep)
+                            with self._lock:
+                                with open(session_file, 'w', encoding='utf-8') as f:
+                                    f.writelines(records_to_keep)
+                                # 文件被重写，旧索引失效
+                                self._get_index(session_file).remove()
                             cleaned_count += (original_count - kept_count)
                         
                         # 如果文件为空，删除文件
                         if kept_count == 0:
                             session_file.unlink()
+                            self._get_index(session_file).remove()
                             cleaned_count += original_count
                             
                     except Exception:
@@ -0,0 +1,298 @@
+"""会话历史文件的偏移量索引
+
+每个 {session_id}.jsonl 旁边维护一个 {session_id}.idx 二进制索引：
+文件头记录已索引的数据字节数和时间戳是否有序，之后每条记录一个定长条目
+（行字节偏移、行长度、时间戳、记录类型校验码）。分页和时间范围查询据此
+二分查找并直接定位到数据文件中的对应行，无需从头解析。
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+_MAGIC = b"HIDX"
+_VERSION = 1
+_FLAG_SORTED = 0x1
+
+# 文件头：魔数、版本、标志位、已索引的数据字节数
+_HEADER = struct.Struct("<4sHHQ")
+# 索引条目：行字节偏移、行长度、时间戳（秒，无法解析时为NaN）、记录类型校验码
+_ENTRY = struct.Struct("<QIdI")
+_TIMESTAMP = struct.Struct("<d")
+_TIMESTAMP_OFFSET = 12
+
+_EPOCH = datetime(1970, 1, 1)
+
+IndexEntry = Tuple[int, int, float, int]
+
+
+def to_epoch(value: datetime) -> float:
+    """把时间转换为用于比较的秒数（无时区的时间按字面值处理）"""
+    if value.tzinfo is None:
+        return (value - _EPOCH).total_seconds()
+    return value.timestamp()
+
+
+def record_timestamp(record: Dict[str, Any]) -> float:
+    """获取记录的时间戳，缺失或无法解析时返回NaN"""
+    timestamp = record.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            return to_epoch(datetime.fromisoformat(timestamp))
+        except ValueError:
+            pass
+    return math.nan
+
+
+def record_type_code(record_type: Any) -> int:
+    """计算记录类型的校验码"""
+    if record_type is None:
+        return 0
+    return zlib.crc32(str(record_type).encode("utf-8"))
+
+
+class HistoryIndexView:
+    """会话历史索引的只读视图"""
+    
+    def __init__(self, buffer: Union[bytes, mmap.mmap], count: int, is_sorted: bool):
+        self._buffer = buffer
+        self.count = count
+        self.is_sorted = is_sorted  # 时间戳是否按写入顺序非递减（且均可解析）
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def entry(self, position: int) -> IndexEntry:
+        """读取第 position 条索引条目"""
+        return _ENTRY.unpack_from(self._buffer, _HEADER.size + position * _ENTRY.size)
+    
+    def entries(self, start: int, stop: int) -> Iterator[IndexEntry]:
+        """按顺序读取 [start, stop) 范围内的索引条目"""
+        begin = _HEADER.size + start * _ENTRY.size
+        end = _HEADER.size + stop * _ENTRY.size
+        return _ENTRY.iter_unpack(self._buffer[begin:end])
+    
+    def timestamp(self, position: int) -> float:
+        """读取第 position 条记录的时间戳"""
+        return _TIMESTAMP.unpack_from(
+            self._buffer, _HEADER.size + position * _ENTRY.size + _TIMESTAMP_OFFSET
+        )[0]
+    
+    def bisect_left(self, timestamp: float) -> int:
+        """第一条时间戳不小于 timestamp 的记录位置（要求索引有序）"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def bisect_right(self, timestamp: float) -> int:
+        """第一条时间戳大于 timestamp 的记录位置（要求索引有序）"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if timestamp < self.timestamp(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+
+class SessionHistoryIndex:
+    """单个会话历史文件的索引
+    
+    写入方在追加数据后调用 append；读取前调用 sync，
+    把其他写入者追加的、或索引建立之前就存在的记录补充进索引。
+    调用方负责对同一会话的写操作加锁。
+    """
+    
+    def __init__(self, session_file: Path, mmap_threshold: Optional[int] = None):
+        """初始化索引
+        
+        Args:
+            session_file: 会话历史数据文件（.jsonl）
+            mmap_threshold: 索引文件达到该字节数时使用mmap读取，None表示不使用
+        """
+        self.session_file = session_file
+        self.index_file = session_file.with_suffix(".idx")
+        self.mmap_threshold = mmap_threshold
+    
+    def append(self, offset: int, length: int, record: Dict[str, Any]) -> None:
+        """为刚追加到数据文件末尾的一条记录添加索引条目
+        
+        Args:
+            offset: 记录行在数据文件中的字节偏移
+            length: 记录行的字节长度（含换行符）
+            record: 记录内容
+        """
+        header = self._read_header()
+        if header is None or header[1] != offset:
+            # 索引缺失或落后于数据文件，整体补齐（会包含这条记录）
+            self.sync()
+            return
+        
+        flags, _ = header
+        entry = (offset, length, record_timestamp(record), record_type_code(record.get("record_type")))
+        self._append_entries(flags, [entry], offset + length)
+    
+    def sync(self) -> None:
+        """使索引与数据文件保持一致"""
+        data_size = self.session_file.stat().st_size
+        header = self._read_header()
+        
+        index_size = self.index_file.stat().st_size if header is not None else 0
+        entries_size = index_size - _HEADER.size
+        if header is None or header[1] > data_size or entries_size % _ENTRY.size:
+            # 索引不存在、已损坏或数据文件被重写，重建索引
+            self._rebuild()
+            return
+        
+        flags, indexed_bytes = header
+        if indexed_bytes == data_size:
+            return
+        
+        entries, indexed_end = self._scan(indexed_bytes)
+        if entries or indexed_end != indexed_bytes:
+            self._append_entries(flags, entries, indexed_end)
+    
+    def open_view(self) -> "_IndexViewContext":
+        """打开索引的只读视图（需先调用 sync）"""
+        return _IndexViewContext(self.index_file, self.mmap_threshold)
+    
+    def remove(self) -> None:
+        """删除索引文件"""
+        self.index_file.unlink(missing_ok=True)
+    
+    def _read_header(self) -> Optional[Tuple[int, int]]:
+        """读取文件头，返回 (标志位, 已索引字节数)，索引不存在或无效时返回None"""
+        try:
+            with open(self.index_file, "rb") as f:
+                raw = f.read(_HEADER.size)
+        except FileNotFoundError:
+            return None
+        
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, flags, indexed_bytes = _HEADER.unpack(raw)
+        if magic != _MAGIC or version != _VERSION:
+            return None
+        return flags, indexed_bytes
+    
+    def _scan(self, start: int) -> Tuple[List[IndexEntry], int]:
+        """从数据文件的 start 偏移处解析记录，返回索引条目和已处理到的字节位置
+        
+        没有换行符的末行若能解析为完整的记录（如旧文件缺少结尾换行）则计入，
+        否则视为正在写入、暂不处理；空行和无法解析的完整行跳过。
+        """
+        entries: List[IndexEntry] = []
+        position = start
+        with open(self.session_file, "rb") as f:
+            f.seek(start)
+            for line in f:
+                complete = line.endswith(b"\n")
+                if complete and not line.strip():
+                    position += len(line)
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not complete and not isinstance(record, dict):
+                    break
+                line_offset = position
+                position += len(line)
+                if not isinstance(record, dict):
+                    continue
+                entries.append((
+                    line_offset,
+                    len(line),
+                    record_timestamp(record),
+                    record_type_code(record.get("record_type"))
+                ))
+        return entries, position
+    
+    def _rebuild(self) -> None:
+        """从头重建索引（先写临时文件再替换）"""
+        entries, indexed_end = self._scan(0)
+        flags = _FLAG_SORTED if _entries_sorted(entries, None) else 0
+        
+        temp_file = self.index_file.with_name(f"{self.index_file.name}.{os.getpid()}.tmp")
+        with open(temp_file, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, flags, indexed_end))
+            f.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+        os.replace(temp_file, self.index_file)
+    
+    def _append_entries(self, flags: int, entries: List[IndexEntry], indexed_end: int) -> None:
+        """追加索引条目并更新文件头"""
+        with open(self.index_file, "r+b") as f:
+            if entries and flags & _FLAG_SORTED:
+                f.seek(0, os.SEEK_END)
+                last_timestamp = None
+                if f.tell() > _HEADER.size:
+                    f.seek(-_ENTRY.size, os.SEEK_END)
+                    last_timestamp = _ENTRY.unpack(f.read(_ENTRY.size))[2]
+                if not _entries_sorted(entries, last_timestamp):
+                    flags &= ~_FLAG_SORTED
+            
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+            f.seek(0)
+            f.write(_HEADER.pack(_MAGIC, _VERSION, flags, indexed_end))
+
+
+def _entries_sorted(entries: List[IndexEntry], previous: Optional[float]) -> bool:
+    """索引条目的时间戳是否均可解析且非递减"""
+    for _, _, timestamp, _ in entries:
+        if math.isnan(timestamp) or (previous is not None and timestamp < previous):
+            return False
+        previous = timestamp
+    return True
+
+
+class _IndexViewContext:
+    """打开并在退出时关闭索引只读视图"""
+    
+    def __init__(self, index_file: Path, mmap_threshold: Optional[int]):
+        self._index_file = index_file
+        self._mmap_threshold = mmap_threshold
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+    
+    def __enter__(self) -> HistoryIndexView:
+        self._file = open(self._index_file, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            
+            buffer: Union[bytes, mmap.mmap]
+            if self._mmap_threshold is not None and size >= self._mmap_threshold:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                buffer = self._mmap
+            else:
+                buffer = self._file.read()
+            
+            magic, version, flags, _ = _HEADER.unpack_from(buffer, 0)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"无效的历史索引文件: {self._index_file}")
+        except BaseException:
+            # 出错时 with 语句不会调用 __exit__，在这里释放已打开的资源
+            self.__exit__(None, None, None)
+            raise
+        count = (size - _HEADER.size) // _ENTRY.size
+        return HistoryIndexView(buffer, count, bool(flags & _FLAG_SORTED))
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
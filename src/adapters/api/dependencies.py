@@ -191,11 +191,22 @@ async def get_analytics_service(
     """获取分析服务"""
     global _analytics_service
     if _analytics_service is None:
+        # 历史仓库提供预聚合的Token/成本时间桶统计，未注册时趋势接口退回旧实现
+        from ...services.container import get_global_container
+        from ...interfaces.repository.history import IHistoryRepository
+        
+        container = get_global_container()
+        history_repository = (
+            container.get(IHistoryRepository)
+            if container.has_service(IHistoryRepository) else None
+        )
+        
         _analytics_service = AnalyticsService(
             session_dao=session_dao,
             history_dao=history_dao,
             cache=cache,
-            cache_manager=cache_manager
+            cache_manager=cache_manager,
+            history_repository=history_repository
         )
     return _analytics_service
 
@@ -13,6 +13,8 @@ from ..models.responses import (
     ErrorStatisticsResponse
 )
 from ..utils.validation import validate_session_id, validate_time_range
+from ....interfaces.repository.history import IHistoryRepository
+from ....core.history.entities import RollupGranularity, WorkflowTokenStatistics
 
 
 class AnalyticsService:
@@ -23,12 +25,15 @@ class AnalyticsService:
         session_dao: SessionDAO,
         history_dao: HistoryDAO,
         cache: MemoryCache,
-        cache_manager: Optional['CacheManager'] = None
+        cache_manager: Optional['CacheManager'] = None,
+        history_repository: Optional[IHistoryRepository] = None
     ):
         self.session_dao = session_dao
         self.history_dao = history_dao
         self.cache = cache
         self.cache_manager = cache_manager
+        # 提供预聚合时间桶统计的历史仓库，用于Token和成本趋势
+        self.history_repository = history_repository
         
         # 如果提供了缓存管理器，优先使用它
         if cache_manager:
@@ -493,6 +498,24 @@ class AnalyticsService:
         session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """获取Token使用趋势"""
+        if self.history_repository and not session_id:
+            series = await self._get_rollup_series(start_time, end_time)
+            return {
+                "metric": "tokens",
+                "time_range": f"{start_time.isoformat()}/{end_time.isoformat()}",
+                "granularity": series["granularity"],
+                "data": [
+                    {
+                        "timestamp": point["timestamp"],
+                        "total_tokens": point["total_tokens"],
+                        "prompt_tokens": point["prompt_tokens"],
+                        "completion_tokens": point["completion_tokens"],
+                        "requests": point["requests"]
+                    }
+                    for point in series["data"]
+                ]
+            }
+        
         return {
             "metric": "tokens",
             "time_range": f"{start_time.isoformat()}/{end_time.isoformat()}",
@@ -509,6 +532,18 @@ class AnalyticsService:
         session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """获取成本趋势"""
+        if self.history_repository and not session_id:
+            series = await self._get_rollup_series(start_time, end_time)
+            return {
+                "metric": "cost",
+                "time_range": f"{start_time.isoformat()}/{end_time.isoformat()}",
+                "granularity": series["granularity"],
+                "data": [
+                    {"timestamp": point["timestamp"], "total_cost": point["total_cost"]}
+                    for point in series["data"]
+                ]
+            }
+        
         return {
             "metric": "cost",
             "time_range": f"{start_time.isoformat()}/{end_time.isoformat()}",
@@ -532,4 +567,47 @@ class AnalyticsService:
                 {"timestamp": start_time.isoformat(), "error_count": 2},
                 {"timestamp": end_time.isoformat(), "error_count": 1}
             ]
-        }
\ No newline at end of file
+        }
+    
+    async def _get_rollup_series(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[str, Any]:
+        """一次查询获取时间范围内所有工作流的时间桶统计
+        
+        两天以内按小时分桶，否则按天分桶，没有数据的时间桶补零。
+        """
+        if end_time - start_time <= timedelta(days=2):
+            granularity = RollupGranularity.HOUR
+        else:
+            granularity = RollupGranularity.DAY
+        
+        rollups: List[WorkflowTokenStatistics] = []
+        if self.history_repository is not None:
+            rollups = await self.history_repository.get_token_rollups(
+                granularity, start_time=start_time, end_time=end_time
+            )
+        
+        buckets: Dict[datetime, Dict[str, Any]] = {
+            bucket: {
+                "timestamp": bucket.isoformat(),
+                "total_tokens": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_cost": 0.0,
+                "requests": 0
+            }
+            for bucket in granularity.iter_buckets(start_time, end_time)
+        }
+        for rollup in rollups:
+            point = buckets.get(rollup.period_start)
+            if point is None:
+                continue
+            point["total_tokens"] += rollup.total_tokens
+            point["prompt_tokens"] += rollup.total_prompt_tokens
+            point["completion_tokens"] += rollup.total_completion_tokens
+            point["total_cost"] += rollup.total_cost
+            point["requests"] += rollup.request_count
+        
+        return {"granularity": granularity.value, "data": list(buckets.values())}
@@ -32,7 +32,8 @@ from .providers import (
 # 实现层
 from .impl import (
     SessionBackend,
-    ThreadBackend
+    ThreadBackend,
+    SQLiteTableBackend
 )
 
 # TODO: 修复 factory 模块缺失问题
@@ -65,6 +66,7 @@ __all__ = [
     # 实现层
     "SessionBackend",
     "ThreadBackend",
+    "SQLiteTableBackend",
     
     # 工厂层
     # "StorageBackendFactory",
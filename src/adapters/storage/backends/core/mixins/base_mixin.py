@@ -233,6 +233,9 @@ class BaseStorageMixin(ABC):
     async def batch_save(self, data_list: List[Dict[str, Any]]) -> List[str]:
         """批量保存数据
         
+        先验证并准备全部数据，再通过提供者的 bulk_save 整批原子写入；
+        提供者不支持 bulk_save 时使用其 batch_save。
+        
         Args:
             data_list: 数据列表
             
@@ -240,7 +243,7 @@ class BaseStorageMixin(ABC):
             数据ID列表
         """
         try:
-            result_ids = []
+            prepared_list = []
             
             for data in data_list:
                 # 确保有ID字段
@@ -250,11 +253,22 @@ class BaseStorageMixin(ABC):
                 
                 # 验证和准备数据
                 self._validate_data(data)
-                prepared_data = self._prepare_data(data["id"], data)
-                
-                # 保存到存储
-                result_id = await self._provider.save(self._table_name, prepared_data)
-                result_ids.append(result_id)
+                prepared_list.append(self._prepare_data(data["id"], data))
+            
+            if not prepared_list:
+                return []
+            
+            bulk_save = getattr(self._provider, "bulk_save", None)
+            if bulk_save is None:
+                result_ids = await self._provider.batch_save(self._table_name, prepared_list)
+            else:
+                results = await bulk_save(self._table_name, prepared_list, atomic=True)
+                failed = [r for r in results if not r["success"]]
+                if failed:
+                    raise StorageBackendError(
+                        f"{len(failed)} of {len(results)} rows failed, first error: {failed[0]['error']}"
+                    )
+                result_ids = [r["id"] for r in results]
             
             logger.debug(f"Batch saved {len(result_ids)} records to {self._table_name}")
             return result_ids
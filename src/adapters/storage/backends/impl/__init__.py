@@ -6,9 +6,11 @@
 # 功能化后端
 from .session_backend import SessionBackend
 from .thread_backend import ThreadBackend
+from .sqlite_table_backend import SQLiteTableBackend
 
 __all__ = [
     # 功能化后端
     "SessionBackend",
-    "ThreadBackend"
+    "ThreadBackend",
+    "SQLiteTableBackend"
 ]
\ No newline at end of file
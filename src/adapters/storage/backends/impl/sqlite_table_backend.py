@@ -0,0 +1,109 @@
+"""SQLite单表存储后端实现
+
+基于 SQLiteProvider 的单表 IStorageBackend 实现，排序和分页下推到SQL执行。
+"""
+
+import asyncio
+from typing import Dict, Any, Optional, List
+from src.interfaces.dependency_injection import get_logger
+
+from src.interfaces.storage.backend import IStorageBackend
+from ..providers.sqlite_provider import SQLiteProvider
+
+
+logger = get_logger(__name__)
+
+
+class SQLiteTableBackend(IStorageBackend):
+    """SQLite单表存储后端
+
+    将 IStorageBackend 的操作映射到 SQLiteProvider 中的一张表。
+    首次使用时连接提供者并按表结构创建表和索引，
+    query_impl 直接生成 ORDER BY ... LIMIT ... OFFSET 查询。
+    """
+
+    def __init__(self, provider: SQLiteProvider, table: str, schema: Dict[str, Any]) -> None:
+        """初始化后端
+
+        Args:
+            provider: SQLite存储提供者
+            table: 表名
+            schema: 表结构定义（SQLiteProvider.create_table 格式，含索引）
+        """
+        self._provider = provider
+        self._table = table
+        self._schema = schema
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        """连接提供者并创建表和索引"""
+        async with self._connect_lock:
+            if self._connected:
+                return
+            await self._provider.connect()
+            await self._provider.create_table(self._table, self._schema)
+            self._connected = True
+            logger.debug(f"SQLite table backend ready: {self._table}")
+
+    async def disconnect(self) -> None:
+        """断开与提供者的连接"""
+        async with self._connect_lock:
+            if not self._connected:
+                return
+            await self._provider.disconnect()
+            self._connected = False
+
+    async def _ensure_connected(self) -> None:
+        if not self._connected:
+            await self.connect()
+
+    async def save_impl(self, data: Dict[str, Any]) -> str:
+        """保存数据"""
+        await self._ensure_connected()
+        return await self._provider.save(self._table, data)
+
+    async def load_impl(self, id: str) -> Optional[Dict[str, Any]]:
+        """加载数据"""
+        await self._ensure_connected()
+        return await self._provider.load(self._table, id)
+
+    async def list_impl(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """列出数据"""
+        await self._ensure_connected()
+        return await self._provider.list(self._table, filters or {})
+
+    async def delete_impl(self, id: str) -> bool:
+        """删除数据"""
+        await self._ensure_connected()
+        return await self._provider.delete(self._table, id)
+
+    async def exists_impl(self, id: str) -> bool:
+        """检查数据是否存在"""
+        await self._ensure_connected()
+        return await self._provider.exists(self._table, id)
+
+    async def clear_impl(self) -> bool:
+        """清空表中所有数据"""
+        await self._ensure_connected()
+        await self._provider.query(self._table, "DELETE FROM {table}", {})
+        return True
+
+    async def query_impl(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """带排序、数量限制和偏移量的查询，在SQL中执行"""
+        await self._ensure_connected()
+        return await self._provider.list(
+            self._table,
+            filters or {},
+            limit=limit,
+            order_by=order_by,
+            descending=descending,
+            offset=offset
+        )
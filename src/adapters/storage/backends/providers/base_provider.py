@@ -189,6 +189,88 @@ class BaseStorageProvider(IStorageProvider):
             self._record_error("transaction", str(e))
             raise ProviderError(f"Failed to rollback transaction: {e}", operation="rollback_transaction")
     
+    async def bulk_save(
+        self,
+        table: str,
+        data_list: List[Dict[str, Any]],
+        atomic: bool = False
+    ) -> List[Dict[str, Any]]:
+        """批量写入数据并逐行返回结果
+        
+        默认实现逐行调用 save，不支持整批回滚；支持批量写入的提供者应覆盖此方法。
+        
+        Args:
+            table: 表名
+            data_list: 数据列表，缺少id字段的数据会自动生成id
+            atomic: 是否整批原子写入，任一行失败时整批回滚并全部标记为失败
+            
+        Returns:
+            与 data_list 一一对应的结果列表，每项包含 id、success、error
+        """
+        results = []
+        for data in self._ensure_ids(data_list):
+            try:
+                await self.save(table, data)
+                results.append(self._bulk_result(data["id"]))
+            except Exception as e:
+                results.append(self._bulk_result(data["id"], e))
+        
+        self._record_operation("bulk_save", all(r["success"] for r in results))
+        return results
+    
+    @staticmethod
+    def _ensure_ids(data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """确保每条数据都有ID字段
+        
+        Args:
+            data_list: 数据列表
+            
+        Returns:
+            原数据列表
+        """
+        for data in data_list:
+            if "id" not in data:
+                data["id"] = str(time.time()) + str(id(data))
+        return data_list
+    
+    @staticmethod
+    def _bulk_result(record_id: str, error: Optional[BaseException] = None) -> Dict[str, Any]:
+        """构造单行批量写入结果
+        
+        Args:
+            record_id: 数据ID
+            error: 写入失败的异常，None表示成功
+            
+        Returns:
+            单行结果
+        """
+        return {
+            "id": record_id,
+            "success": error is None,
+            "error": str(error) if error is not None else None
+        }
+    
+    @staticmethod
+    def _raise_on_bulk_failure(table: str, results: List[Dict[str, Any]], provider_type: str) -> List[str]:
+        """批量写入存在失败行时抛出异常，否则返回ID列表
+        
+        Args:
+            table: 表名
+            results: bulk_save 的结果
+            provider_type: 提供者类型
+            
+        Returns:
+            数据ID列表
+        """
+        failed = [r for r in results if not r["success"]]
+        if failed:
+            raise ProviderError(
+                f"Failed to batch save data to {table}: {len(failed)} of {len(results)} rows failed, "
+                f"first error: {failed[0]['error']}",
+                provider_type=provider_type
+            )
+        return [r["id"] for r in results]
+    
     def _record_error(self, error_type: str, error_message: str) -> None:
         """记录错误
         
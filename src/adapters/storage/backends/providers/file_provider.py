@@ -6,9 +6,11 @@
 import asyncio
 import json
 import os
+import shutil
 import time
+from contextlib import AsyncExitStack
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from src.interfaces.dependency_injection import get_logger
 
 from .base_provider import BaseStorageProvider
@@ -353,24 +355,154 @@ class FileProvider(BaseStorageProvider):
             数据ID列表
         """
         try:
-            result_ids = []
-            
-            for data in data_list:
-                # 确保有ID字段
-                if "id" not in data:
-                    data["id"] = str(time.time()) + str(id(data))
-                
-                result_id = await self.save(table, data)
-                result_ids.append(result_id)
+            results = await self.bulk_save(table, data_list, atomic=True)
+            result_ids = self._raise_on_bulk_failure(table, results, "file")
             
             self._record_operation("batch_save", True)
             logger.debug(f"Batch saved {len(result_ids)} records to {table}")
             return result_ids
             
+        except ProviderError:
+            self._record_operation("batch_save", False)
+            raise
         except Exception as e:
             self._record_operation("batch_save", False)
             raise ProviderError(f"Failed to batch save data to {table}: {e}", provider_type="file")
     
+    async def bulk_save(
+        self,
+        table: str,
+        data_list: List[Dict[str, Any]],
+        atomic: bool = False
+    ) -> List[Dict[str, Any]]:
+        """批量写入数据并逐行返回结果
+        
+        整批在一次线程池调用中完成：先将所有记录写入临时文件，再统一原子替换为目标文件，
+        读取方不会看到半写的文件。写入期间按路径排序依次持有各目标文件的文件锁，
+        与 save/delete 等单条操作互斥，且不同批次之间不会死锁。
+        
+        原子模式下任一临时文件写入失败则整批放弃；替换阶段失败时，已替换的目标文件
+        恢复为批次开始前的内容（原本不存在的文件被删除），整批不会只生效一部分。
+        
+        Args:
+            table: 表名
+            data_list: 数据列表
+            atomic: 是否整批原子写入
+            
+        Returns:
+            与 data_list 一一对应的结果列表，每项包含 id、success、error
+        """
+        data_list = self._ensure_ids(data_list)
+        if not data_list:
+            return []
+        
+        table_path = self._get_table_path(table)
+        targets = [table_path / f"{data['id']}{self.file_extension}" for data in data_list]
+        suffix = f".{os.getpid()}.{int(time.time() * 1000000)}.tmp"
+        
+        def run() -> List[Optional[BaseException]]:
+            table_path.mkdir(parents=True, exist_ok=True)
+            errors: List[Optional[BaseException]] = [None] * len(data_list)
+            staged: List[Tuple[int, Path, Path]] = []
+            
+            # 第一阶段：写入临时文件
+            for index, (data, target) in enumerate(zip(data_list, targets)):
+                temp = target.with_name(target.name + suffix)
+                try:
+                    with open(temp, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, indent=2, ensure_ascii=False)
+                    staged.append((index, temp, target))
+                except Exception as e:
+                    errors[index] = e
+            
+            if atomic and any(error is not None for error in errors):
+                first_error = next(error for error in errors if error is not None)
+                for _, temp, _ in staged:
+                    temp.unlink(missing_ok=True)
+                return [first_error] * len(data_list)
+            
+            if atomic:
+                return self._replace_all_or_rollback(staged, suffix, len(data_list))
+            
+            # 第二阶段：原子替换
+            for index, temp, target in staged:
+                try:
+                    os.replace(temp, target)
+                except Exception as e:
+                    errors[index] = e
+                    temp.unlink(missing_ok=True)
+            return errors
+        
+        try:
+            async with AsyncExitStack() as stack:
+                # 按路径排序加锁，避免与其他批次交叉等待
+                for key in sorted({str(target) for target in targets}):
+                    await stack.enter_async_context(self._get_file_lock(Path(key)))
+                errors = await asyncio.get_running_loop().run_in_executor(None, run)
+        except Exception as e:
+            self._record_operation("bulk_save", False)
+            return [self._bulk_result(data["id"], e) for data in data_list]
+        
+        results = [self._bulk_result(data["id"], error) for data, error in zip(data_list, errors)]
+        self._record_operation("bulk_save", all(error is None for error in errors))
+        logger.debug(f"Bulk saved {len(results)} records to {table}")
+        return results
+    
+    @staticmethod
+    def _replace_all_or_rollback(
+        staged: List[Tuple[int, Path, Path]],
+        suffix: str,
+        count: int
+    ) -> List[Optional[BaseException]]:
+        """原子模式的替换阶段：全部替换成功，或恢复所有已替换的目标文件
+        
+        替换前为已存在的目标文件保留备份（优先使用硬链接，不支持时复制）。
+        
+        Args:
+            staged: (下标, 临时文件, 目标文件) 列表
+            suffix: 本批临时文件后缀
+            count: 批次记录数
+            
+        Returns:
+            与批次一一对应的错误列表
+        """
+        backups: Dict[Path, Optional[Path]] = {}
+        replaced: List[Path] = []
+        try:
+            for _, temp, target in staged:
+                if target not in backups:
+                    backup: Optional[Path] = None
+                    if target.exists():
+                        backup = target.with_name(target.name + suffix + ".bak")
+                        try:
+                            os.link(target, backup)
+                        except OSError:
+                            shutil.copy2(target, backup)
+                    backups[target] = backup
+                os.replace(temp, target)
+                replaced.append(target)
+        except Exception as e:
+            for target in reversed(replaced):
+                backup = backups[target]
+                try:
+                    if backup is None:
+                        target.unlink(missing_ok=True)
+                    elif backup.exists():
+                        os.replace(backup, target)
+                except OSError as rollback_error:
+                    logger.error(f"Failed to roll back {target}: {rollback_error}")
+            for _, temp, _ in staged:
+                temp.unlink(missing_ok=True)
+            for backup in backups.values():
+                if backup is not None:
+                    backup.unlink(missing_ok=True)
+            return [e] * count
+        
+        for backup in backups.values():
+            if backup is not None:
+                backup.unlink(missing_ok=True)
+        return [None] * count
+    
     async def batch_delete(self, table: str, ids: List[str]) -> int:
         """从指定表批量删除数据
         
@@ -9,6 +9,7 @@ from src.interfaces.dependency_injection import get_logger
 
 from .base_provider import BaseStorageProvider
 from ..core.exceptions import ProviderError
+from ...utils.memory_utils import create_size_estimator
 
 
 logger = get_logger(__name__)
@@ -18,6 +19,9 @@ class MemoryProvider(BaseStorageProvider):
     """内存存储提供者
     
     专注于内存中的底层存储操作。
+    
+    内存占用按记录缓存估算值：写入时只估算新数据（更新时只估算变化的字段），
+    删除时直接扣减缓存值，并按表维护内存用量。
     """
     
     def __init__(self, **config: Any) -> None:
@@ -25,6 +29,9 @@ class MemoryProvider(BaseStorageProvider):
         
         Args:
             **config: 其他配置参数
+                max_memory_usage: 最大内存使用量（字节）
+                size_estimator: 大小估算策略（recursive、pickle）或 DataSizeEstimator 实例
+                size_estimator_options: 估算器参数，如 sample_size、max_depth
         """
         # 内存存储结构: {table: {id: data}}
         self._storage: Dict[str, Dict[str, Dict[str, Any]]] = {}
@@ -38,6 +45,15 @@ class MemoryProvider(BaseStorageProvider):
         # 当前内存使用量
         self._current_memory_usage = 0
         
+        # 大小估算策略
+        self._size_estimator = create_size_estimator(
+            config.get("size_estimator"), **config.get("size_estimator_options", {})
+        )
+        
+        # 每条记录的估算大小: {table: {id: size}}，以及每个表的内存用量
+        self._record_sizes: Dict[str, Dict[str, int]] = {}
+        self._table_memory_usage: Dict[str, int] = {}
+        
         super().__init__(**config)
     
     async def _connect_impl(self) -> None:
@@ -50,9 +66,18 @@ class MemoryProvider(BaseStorageProvider):
         # 清空内存数据
         self._storage.clear()
         self._table_schemas.clear()
+        self._record_sizes.clear()
+        self._table_memory_usage.clear()
         self._current_memory_usage = 0
         logger.debug("Memory provider disconnected")
     
+    async def _health_check_impl(self) -> Dict[str, Any]:
+        """实际健康检查实现"""
+        return {
+            "status": "healthy" if self._connected else "disconnected",
+            "memory": self.get_memory_stats()
+        }
+    
     def _estimate_data_size(self, data: Dict[str, Any]) -> int:
         """估算数据大小
         
@@ -62,12 +87,90 @@ class MemoryProvider(BaseStorageProvider):
         Returns:
             数据大小（字节）
         """
-        try:
-            import pickle
-            return len(pickle.dumps(data))
-        except Exception:
-            # 粗略估算
-            return len(str(data)) * 2  # 假设每个字符2字节
+        return self._size_estimator.estimate(data)
+    
+    def _get_record_size(self, table: str, id: str) -> int:
+        """获取记录的缓存估算大小
+        
+        Args:
+            table: 表名
+            id: 数据ID
+            
+        Returns:
+            估算大小（字节），记录不存在时返回0
+        """
+        return self._record_sizes.get(table, {}).get(id, 0)
+    
+    def _apply_size_change(self, table: str, id: str, new_size: Optional[int]) -> None:
+        """更新记录的估算大小，并同步表和总内存用量
+        
+        Args:
+            table: 表名
+            id: 数据ID
+            new_size: 新的估算大小，None表示记录已删除
+        """
+        table_sizes = self._record_sizes.setdefault(table, {})
+        old_size = table_sizes.pop(id, 0)
+        if new_size is not None:
+            table_sizes[id] = new_size
+        elif not table_sizes:
+            del self._record_sizes[table]
+        
+        delta = (new_size or 0) - old_size
+        self._current_memory_usage += delta
+        table_usage = self._table_memory_usage.get(table, 0) + delta
+        if table in self._record_sizes:
+            self._table_memory_usage[table] = table_usage
+        else:
+            self._table_memory_usage.pop(table, None)
+    
+    def _estimate_update_delta(
+        self,
+        existing_data: Dict[str, Any],
+        updated_data: Dict[str, Any],
+        changed_keys: List[str]
+    ) -> int:
+        """只根据变化的字段估算更新前后的大小差
+        
+        Args:
+            existing_data: 更新前的数据
+            updated_data: 更新后的数据
+            changed_keys: 变化的字段
+            
+        Returns:
+            大小差（字节）
+        """
+        delta = 0
+        for key in changed_keys:
+            delta += self._size_estimator.estimate(updated_data[key])
+            if key in existing_data:
+                delta -= self._size_estimator.estimate(existing_data[key])
+            else:
+                delta += self._size_estimator.estimate(key)
+        return delta
+    
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """获取内存用量统计
+        
+        Returns:
+            总用量、上限以及每个表的记录数和用量
+        """
+        return {
+            "current_memory_usage": self._current_memory_usage,
+            "max_memory_usage": self._max_memory_usage,
+            "usage_ratio": (
+                self._current_memory_usage / self._max_memory_usage
+                if self._max_memory_usage else 0.0
+            ),
+            "size_estimator": type(self._size_estimator).__name__,
+            "tables": {
+                table: {
+                    "records": len(self._record_sizes.get(table, {})),
+                    "memory_usage": usage
+                }
+                for table, usage in self._table_memory_usage.items()
+            }
+        }
     
     def _check_memory_limit(self, additional_size: int = 0) -> None:
         """检查内存限制
@@ -109,17 +212,12 @@ class MemoryProvider(BaseStorageProvider):
             new_size = self._estimate_data_size(data)
             
             # 检查内存限制
-            old_size = 0
-            if record_id in self._storage[table]:
-                old_size = self._estimate_data_size(self._storage[table][record_id])
-            
+            old_size = self._get_record_size(table, record_id)
             self._check_memory_limit(new_size - old_size)
             
-            # 更新内存使用量
-            self._current_memory_usage += (new_size - old_size)
-            
-            # 保存数据
+            # 保存数据并更新内存使用量
             self._storage[table][record_id] = data.copy()
+            self._apply_size_change(table, record_id, new_size)
             
             self._record_operation("save", True)
             logger.debug(f"Data saved to {table}: {record_id}")
@@ -174,25 +272,22 @@ class MemoryProvider(BaseStorageProvider):
             # 获取现有数据
             existing_data = self._storage[table][id]
             
-            # 估算更新前后的数据大小差异
-            old_size = self._estimate_data_size(existing_data)
-            
             # 创建更新后的数据副本
             updated_data = existing_data.copy()
             updated_data.update(updates)
             updated_data["updated_at"] = time.time()
             
-            # 估算新数据大小
-            new_size = self._estimate_data_size(updated_data)
+            # 只估算变化字段带来的大小差异
+            delta = self._estimate_update_delta(
+                existing_data, updated_data, [*updates.keys(), "updated_at"]
+            )
             
             # 检查内存限制
-            self._check_memory_limit(new_size - old_size)
+            self._check_memory_limit(delta)
             
-            # 更新内存使用量
-            self._current_memory_usage += (new_size - old_size)
-            
-            # 保存更新后的数据
+            # 保存更新后的数据并更新内存使用量
             self._storage[table][id] = updated_data
+            self._apply_size_change(table, id, self._get_record_size(table, id) + delta)
             
             self._record_operation("update", True)
             logger.debug(f"Data updated in {table}: {id}")
@@ -216,14 +311,9 @@ class MemoryProvider(BaseStorageProvider):
             if table not in self._storage or id not in self._storage[table]:
                 return False
             
-            # 估算数据大小
-            data_size = self._estimate_data_size(self._storage[table][id])
-            
-            # 删除数据
+            # 删除数据并更新内存使用量
             del self._storage[table][id]
-            
-            # 更新内存使用量
-            self._current_memory_usage -= data_size
+            self._apply_size_change(table, id, None)
             
             # 如果表为空，删除表
             if not self._storage[table]:
@@ -365,24 +455,85 @@ class MemoryProvider(BaseStorageProvider):
             数据ID列表
         """
         try:
-            result_ids = []
-            
-            for data in data_list:
-                # 确保有ID字段
-                if "id" not in data:
-                    data["id"] = str(time.time()) + str(id(data))
-                
-                result_id = await self.save(table, data)
-                result_ids.append(result_id)
+            results = await self.bulk_save(table, data_list, atomic=True)
+            result_ids = self._raise_on_bulk_failure(table, results, "memory")
             
             self._record_operation("batch_save", True)
             logger.debug(f"Batch saved {len(result_ids)} records to {table}")
             return result_ids
             
+        except ProviderError:
+            self._record_operation("batch_save", False)
+            raise
         except Exception as e:
             self._record_operation("batch_save", False)
             raise ProviderError(f"Failed to batch save data to {table}: {e}", provider_type="memory")
     
+    async def bulk_save(
+        self,
+        table: str,
+        data_list: List[Dict[str, Any]],
+        atomic: bool = False
+    ) -> List[Dict[str, Any]]:
+        """批量写入数据并逐行返回结果
+        
+        先计算整批的内存变化，再一次性写入表中。原子模式下按整批检查内存限制，
+        超出时整批不写入；非原子模式下逐行检查，超出限制的行被标记为失败。
+        
+        Args:
+            table: 表名
+            data_list: 数据列表
+            atomic: 是否整批原子写入
+            
+        Returns:
+            与 data_list 一一对应的结果列表，每项包含 id、success、error
+        """
+        data_list = self._ensure_ids(data_list)
+        table_data = self._storage.setdefault(table, {})
+        
+        # 同一批中重复的ID以最后一次为准，内存变化按最终结果计算
+        pending: Dict[str, Dict[str, Any]] = {}
+        pending_sizes: Dict[str, int] = {}
+        errors: List[Optional[BaseException]] = [None] * len(data_list)
+        total_delta = 0
+        
+        for index, data in enumerate(data_list):
+            record_id = data["id"]
+            try:
+                new_size = self._estimate_data_size(data)
+                if record_id in pending_sizes:
+                    old_size = pending_sizes[record_id]
+                else:
+                    old_size = self._get_record_size(table, record_id)
+                
+                if not atomic:
+                    self._check_memory_limit(total_delta + new_size - old_size)
+                
+                total_delta += new_size - old_size
+                pending[record_id] = data.copy()
+                pending_sizes[record_id] = new_size
+            except Exception as e:
+                errors[index] = e
+        
+        if atomic:
+            try:
+                if any(error is not None for error in errors):
+                    raise next(error for error in errors if error is not None)
+                self._check_memory_limit(total_delta)
+            except Exception as e:
+                self._record_operation("bulk_save", False)
+                return [self._bulk_result(data["id"], e) for data in data_list]
+        
+        # 批量写入
+        table_data.update(pending)
+        for record_id, size in pending_sizes.items():
+            self._apply_size_change(table, record_id, size)
+        
+        results = [self._bulk_result(data["id"], error) for data, error in zip(data_list, errors)]
+        self._record_operation("bulk_save", all(error is None for error in errors))
+        logger.debug(f"Bulk saved {len(pending)} records to {table}")
+        return results
+    
     async def batch_delete(self, table: str, ids: List[str]) -> int:
         """从指定表批量删除数据
         
@@ -436,17 +587,12 @@ class MemoryProvider(BaseStorageProvider):
         """
         try:
             if table in self._storage:
-                # 估算表的大小
-                table_size = sum(
-                    self._estimate_data_size(data)
-                    for data in self._storage[table].values()
-                )
-                
                 # 删除表
                 del self._storage[table]
                 
                 # 更新内存使用量
-                self._current_memory_usage -= table_size
+                self._current_memory_usage -= self._table_memory_usage.pop(table, 0)
+                self._record_sizes.pop(table, None)
                 
                 # 删除表结构信息
                 if table in self._table_schemas:
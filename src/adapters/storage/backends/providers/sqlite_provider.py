@@ -4,11 +4,14 @@
 """
 
 import asyncio
+import queue
 import sqlite3
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple, TypeVar
 from src.interfaces.dependency_injection import get_logger
 
 from .base_provider import BaseStorageProvider
@@ -17,11 +20,195 @@ from ..core.exceptions import ProviderError
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+
+class SQLiteConnectionPool:
+    """SQLite连接池
+    
+    一个写连接加N个只读连接，全部运行在专用线程池中，不阻塞事件循环：
+    - 写操作提交到单线程执行器，天然串行化，与SQLite单写者模型一致；
+    - 读操作提交到读线程池，每个线程从队列中独占取用一个读连接；
+    - 使用WAL日志模式，读操作不会被写操作阻塞；
+    - 每个连接启用sqlite3内置的预编译语句缓存，相同SQL文本复用预编译语句。
+    
+    内存数据库（:memory:）无法在连接间共享，此时所有操作都走写连接。
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        read_pool_size: int = 4,
+        timeout: float = 30.0,
+        statement_cache_size: int = 256,
+        pragmas: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """初始化连接池
+        
+        Args:
+            db_path: 数据库文件路径
+            read_pool_size: 只读连接数量
+            timeout: 锁等待超时时间（秒）
+            statement_cache_size: 每个连接的预编译语句缓存大小
+            pragmas: 额外的PRAGMA设置
+        """
+        self.db_path = db_path
+        self.in_memory = db_path == ":memory:"
+        self.read_pool_size = 0 if self.in_memory else max(0, read_pool_size)
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self.pragmas = {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "foreign_keys": "ON",
+            **(pragmas or {})
+        }
+        
+        self._writer: Optional[sqlite3.Connection] = None
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._write_executor: Optional[ThreadPoolExecutor] = None
+        self._read_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        
+        self._stats = {
+            "reads": 0,
+            "writes": 0,
+        }
+    
+    @property
+    def is_open(self) -> bool:
+        """连接池是否已打开"""
+        return self._writer is not None
+    
+    def open(self) -> None:
+        """打开连接池（幂等）"""
+        with self._lock:
+            if self._writer is not None:
+                return
+            
+            self._write_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="sqlite-writer"
+            )
+            # 写连接先创建，确保WAL模式在读连接打开前生效
+            self._writer = self._write_executor.submit(self._create_connection, False).result()
+            
+            if self.read_pool_size:
+                self._read_executor = ThreadPoolExecutor(
+                    max_workers=self.read_pool_size, thread_name_prefix="sqlite-reader"
+                )
+                for _ in range(self.read_pool_size):
+                    conn = self._create_connection(True)
+                    self._reader_connections.append(conn)
+                    self._readers.put(conn)
+    
+    def close(self) -> None:
+        """关闭连接池和所有连接"""
+        with self._lock:
+            if self._read_executor is not None:
+                self._read_executor.shutdown(wait=True)
+                self._read_executor = None
+            for conn in self._reader_connections:
+                self._close_connection(conn)
+            self._reader_connections.clear()
+            self._readers = queue.Queue()
+            
+            if self._write_executor is not None:
+                writer = self._writer
+                if writer is not None:
+                    self._write_executor.submit(self._close_connection, writer).result()
+                self._write_executor.shutdown(wait=True)
+                self._write_executor = None
+            self._writer = None
+    
+    async def write(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """在写连接上执行操作
+        
+        Args:
+            func: 接收连接并执行操作的函数
+        
+        Returns:
+            函数结果
+        """
+        if self._writer is None:
+            self.open()
+        loop = asyncio.get_running_loop()
+        self._stats["writes"] += 1
+        return await loop.run_in_executor(self._write_executor, self._run_write, func)
+    
+    async def read(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """在只读连接上执行操作
+        
+        Args:
+            func: 接收连接并执行查询的函数
+        
+        Returns:
+            函数结果
+        """
+        if self._writer is None:
+            self.open()
+        if self._read_executor is None:
+            # 内存数据库：读写共用写连接
+            return await self.write(func)
+        loop = asyncio.get_running_loop()
+        self._stats["reads"] += 1
+        return await loop.run_in_executor(self._read_executor, self._run_read, func)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        return {
+            "db_path": self.db_path,
+            "open": self.is_open,
+            "writer_connections": 1 if self._writer is not None else 0,
+            "reader_connections": len(self._reader_connections),
+            "idle_readers": self._readers.qsize(),
+            "statement_cache_size": self.statement_cache_size,
+            "journal_mode": self.pragmas.get("journal_mode"),
+            **self._stats
+        }
+    
+    def _run_write(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        assert self._writer is not None
+        return func(self._writer)
+    
+    def _run_read(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        conn = self._readers.get()
+        try:
+            return func(conn)
+        finally:
+            self._readers.put(conn)
+    
+    def _create_connection(self, read_only: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None,  # 自动提交模式，事务显式控制
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        for name, value in self.pragmas.items():
+            if read_only and name == "journal_mode":
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    @staticmethod
+    def _close_connection(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Failed to close connection: {e}")
+
 
 class SQLiteProvider(BaseStorageProvider):
     """SQLite存储提供者
     
-    专注于SQLite数据库的底层存储操作。
+    专注于SQLite数据库的底层存储操作。阻塞的sqlite3调用全部在
+    SQLiteConnectionPool的专用线程中执行。
     """
     
     def __init__(self, db_path: str = "./data/storage.db", **config: Any) -> None:
@@ -30,51 +217,62 @@ class SQLiteProvider(BaseStorageProvider):
         Args:
             db_path: 数据库文件路径
             **config: 其他配置参数
+                read_pool_size / max_connections: 只读连接数量
+                timeout: 锁等待超时时间（秒）
+                statement_cache_size: 预编译语句缓存大小
+                pragmas: 额外的PRAGMA设置
         """
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(db_path) if db_path != ":memory:" else db_path
+        if isinstance(self.db_path, Path):
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 连接池：一个写连接 + N个读连接
+        read_pool_size = config.get("read_pool_size", config.get("max_connections", 4))
+        self._pool = SQLiteConnectionPool(
+            str(self.db_path),
+            read_pool_size=read_pool_size,
+            timeout=config.get("timeout", 30.0),
+            statement_cache_size=config.get("statement_cache_size", 256),
+            pragmas=config.get("pragmas")
+        )
         
-        # 连接池
-        self._connections = {}
-        self._max_connections = config.get("max_connections", 10)
+        # SQL文本缓存，保证相同操作生成相同SQL以命中预编译语句缓存
+        self._sql_cache: Dict[Tuple[Any, ...], str] = {}
         
-        super().__init__(db_path=db_path, **config)
+        super().__init__(db_path=str(db_path), **config)
     
     async def _connect_impl(self) -> None:
         """实际连接实现"""
-        # SQLite不需要显式连接，按需创建连接
+        await asyncio.get_running_loop().run_in_executor(None, self._pool.open)
         logger.debug(f"SQLite provider ready for database: {self.db_path}")
     
     async def _disconnect_impl(self) -> None:
         """实际断开连接实现"""
-        # 关闭所有连接
-        for conn in self._connections.values():
-            try:
-                conn.close()
-            except Exception as e:
-                logger.warning(f"Failed to close connection: {e}")
-        
-        self._connections.clear()
+        await asyncio.get_running_loop().run_in_executor(None, self._pool.close)
+        self._sql_cache.clear()
         logger.debug("SQLite provider connections closed")
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """获取数据库连接
-        
-        Returns:
-            数据库连接
-        """
-        thread_id = id(asyncio.current_task())
-        
-        if thread_id not in self._connections:
-            conn = sqlite3.connect(
-                self.db_path,
-                timeout=self._config.get("timeout", 30.0),
-                isolation_level=None  # 自动提交模式
+    async def _health_check_impl(self) -> Dict[str, Any]:
+        """实际健康检查实现"""
+        return {
+            "status": "healthy" if self._connected else "disconnected",
+            "pool": self._pool.get_stats()
+        }
+    
+    def _insert_sql(self, table: str, columns: Tuple[str, ...]) -> str:
+        """获取（缓存的）INSERT OR REPLACE语句"""
+        key = ("insert", table, columns)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            sql = (
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})"
             )
-            conn.row_factory = sqlite3.Row
-            self._connections[thread_id] = conn
-        
-        return self._connections[thread_id]
+            self._sql_cache[key] = sql
+        return sql
+    
+    def _rows_to_dicts(self, rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        return [self._deserialize_data(dict(row)) for row in rows]
     
     async def save(self, table: str, data: Dict[str, Any]) -> str:
         """保存数据到指定表
@@ -82,33 +280,26 @@ class SQLiteProvider(BaseStorageProvider):
         Args:
             table: 表名
             data: 数据字典
-            
+        
         Returns:
             数据ID
         """
         try:
-            conn = self._get_connection()
-            
             # 确保有ID字段
             if "id" not in data:
                 data["id"] = str(time.time()) + str(id(data))
             
             # 构建SQL
-            columns = list(data.keys())
-            placeholders = ["?"] * len(columns)
+            columns = tuple(data.keys())
             values = [self._serialize_value(data[col]) for col in columns]
+            sql = self._insert_sql(table, columns)
             
-            sql = f"""
-                INSERT OR REPLACE INTO {table} ({', '.join(columns)})
-                VALUES ({', '.join(placeholders)})
-            """
-            
-            conn.execute(sql, values)
+            await self._pool.write(lambda conn: conn.execute(sql, values))
             
             self._record_operation("save", True)
             logger.debug(f"Data saved to {table}: {data['id']}")
             return data["id"]
-            
+        
         except Exception as e:
             self._record_operation("save", False)
             raise ProviderError(f"Failed to save data to {table}: {e}", provider_type="sqlite")
@@ -119,18 +310,14 @@ class SQLiteProvider(BaseStorageProvider):
         Args:
             table: 表名
             id: 数据ID
-            
+        
         Returns:
             数据字典，不存在返回None
         """
         try:
-            conn = self._get_connection()
-            
-            cursor = conn.execute(
-                f"SELECT * FROM {table} WHERE id = ?",
-                (id,)
+            row = await self._pool.read(
+                lambda conn: conn.execute(f"SELECT * FROM {table} WHERE id = ?", (id,)).fetchone()
             )
-            row = cursor.fetchone()
             
             if not row:
                 return None
@@ -142,7 +329,7 @@ class SQLiteProvider(BaseStorageProvider):
             self._record_operation("load", True)
             logger.debug(f"Data loaded from {table}: {id}")
             return data
-            
+        
         except Exception as e:
             self._record_operation("load", False)
             raise ProviderError(f"Failed to load data from {table}: {e}", provider_type="sqlite")
@@ -154,13 +341,11 @@ class SQLiteProvider(BaseStorageProvider):
             table: 表名
             id: 数据ID
             updates: 更新内容
-            
+        
         Returns:
             是否更新成功
         """
         try:
-            conn = self._get_connection()
-            
             if not updates:
                 return True
             
@@ -174,22 +359,18 @@ class SQLiteProvider(BaseStorageProvider):
             
             values.append(id)
             
-            sql = f"""
-                UPDATE {table}
-                SET {', '.join(set_clauses)}
-                WHERE id = ?
-            """
+            sql = f"UPDATE {table} SET {', '.join(set_clauses)} WHERE id = ?"
             
-            cursor = conn.execute(sql, values)
+            rowcount = await self._pool.write(lambda conn: conn.execute(sql, values).rowcount)
             
-            success = cursor.rowcount > 0
+            success = rowcount > 0
             self._record_operation("update", success)
             
             if success:
                 logger.debug(f"Data updated in {table}: {id}")
             
             return success
-            
+        
         except Exception as e:
             self._record_operation("update", False)
             raise ProviderError(f"Failed to update data in {table}: {e}", provider_type="sqlite")
@@ -200,26 +381,23 @@ class SQLiteProvider(BaseStorageProvider):
         Args:
             table: 表名
             id: 数据ID
-            
+        
         Returns:
             是否删除成功
         """
         try:
-            conn = self._get_connection()
-            
-            cursor = conn.execute(
-                f"DELETE FROM {table} WHERE id = ?",
-                (id,)
+            rowcount = await self._pool.write(
+                lambda conn: conn.execute(f"DELETE FROM {table} WHERE id = ?", (id,)).rowcount
             )
             
-            success = cursor.rowcount > 0
+            success = rowcount > 0
             self._record_operation("delete", success)
             
             if success:
                 logger.debug(f"Data deleted from {table}: {id}")
             
             return success
-            
+        
         except Exception as e:
             self._record_operation("delete", False)
             raise ProviderError(f"Failed to delete data from {table}: {e}", provider_type="sqlite")
@@ -230,130 +408,155 @@ class SQLiteProvider(BaseStorageProvider):
         Args:
             table: 表名
             id: 数据ID
-            
+        
         Returns:
             是否存在
         """
         try:
-            conn = self._get_connection()
-            
-            cursor = conn.execute(
-                f"SELECT 1 FROM {table} WHERE id = ? LIMIT 1",
-                (id,)
+            row = await self._pool.read(
+                lambda conn: conn.execute(
+                    f"SELECT 1 FROM {table} WHERE id = ? LIMIT 1", (id,)
+                ).fetchone()
             )
             
-            exists = cursor.fetchone() is not None
+            exists = row is not None
             self._record_operation("exists", True)
             
             return exists
-            
+        
         except Exception as e:
             self._record_operation("exists", False)
             raise ProviderError(f"Failed to check existence in {table}: {e}", provider_type="sqlite")
     
-    async def list(self, table: str, filters: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def list(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        limit: Optional[int] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        offset: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """列出指定表中的数据
         
+        排序、数量限制和偏移量直接下推为 ORDER BY ... LIMIT ... OFFSET，
+        配合对应的索引时无需读取整张表。
+        
         Args:
             table: 表名
             filters: 过滤条件
             limit: 结果限制
-            
+            order_by: 排序字段，None表示不排序；排序字段为NULL的记录排在最后
+            descending: 是否降序
+            offset: 跳过的记录数
+        
         Returns:
             数据列表
         """
         try:
-            conn = self._get_connection()
-            
-            # 构建WHERE子句
-            where_clauses = []
-            values = []
-            
-            for key, value in filters.items():
-                if isinstance(value, dict) and "op" in value:
-                    # 支持操作符
-                    op = value["op"]
-                    val = value["value"]
-                    
-                    if op == "like":
-                        where_clauses.append(f"{key} LIKE ?")
-                        values.append(f"%{val}%")
-                    elif op == ">":
-                        where_clauses.append(f"{key} > ?")
-                        values.append(val)
-                    elif op == "<":
-                        where_clauses.append(f"{key} < ?")
-                        values.append(val)
-                    elif op == ">=":
-                        where_clauses.append(f"{key} >= ?")
-                        values.append(val)
-                    elif op == "<=":
-                        where_clauses.append(f"{key} <= ?")
-                        values.append(val)
-                    else:
-                        where_clauses.append(f"{key} = ?")
-                        values.append(val)
-                else:
-                    where_clauses.append(f"{key} = ?")
-                    values.append(value)
+            where_sql, values = self._where_clause(filters)
             
             # 构建SQL
-            sql = f"SELECT * FROM {table}"
-            if where_clauses:
-                sql += f" WHERE {' AND '.join(where_clauses)}"
+            sql = f"SELECT * FROM {table}{where_sql}"
+            
+            if order_by is not None:
+                if not order_by.isidentifier():
+                    raise ValueError(f"Invalid order_by column: {order_by}")
+                direction = "DESC" if descending else "ASC"
+                sql += f" ORDER BY {order_by} {direction} NULLS LAST"
             
-            if limit:
-                sql += f" LIMIT {limit}"
+            if limit or offset:
+                # SQLite中OFFSET必须跟在LIMIT之后，-1表示不限制
+                sql += " LIMIT ?"
+                values.append(int(limit) if limit else -1)
+                if offset:
+                    sql += " OFFSET ?"
+                    values.append(int(offset))
             
-            cursor = conn.execute(sql, values)
-            rows = cursor.fetchall()
+            rows = await self._pool.read(lambda conn: conn.execute(sql, values).fetchall())
             
             # 转换数据
-            results = []
-            for row in rows:
-                data = dict(row)
-                data = self._deserialize_data(data)
-                results.append(data)
+            results = self._rows_to_dicts(rows)
             
             self._record_operation("list", True)
             logger.debug(f"Listed {len(results)} records from {table}")
             return results
-            
+        
         except Exception as e:
             self._record_operation("list", False)
             raise ProviderError(f"Failed to list data from {table}: {e}", provider_type="sqlite")
     
+    @staticmethod
+    def _where_clause(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """构建WHERE子句
+        
+        过滤值可以是普通值（等值匹配），也可以是 {"op": ..., "value": ...} 形式的条件。
+        
+        Args:
+            filters: 过滤条件
+        
+        Returns:
+            (WHERE子句（含前导空格，无条件时为空字符串）, 参数列表)
+        """
+        where_clauses = []
+        values: List[Any] = []
+        
+        for key, value in filters.items():
+            if isinstance(value, dict) and "op" in value:
+                # 支持操作符
+                op = value["op"]
+                val = value["value"]
+                
+                if op == "like":
+                    where_clauses.append(f"{key} LIKE ?")
+                    values.append(f"%{val}%")
+                elif op in (">", "<", ">=", "<="):
+                    where_clauses.append(f"{key} {op} ?")
+                    values.append(val)
+                else:
+                    where_clauses.append(f"{key} = ?")
+                    values.append(val)
+            else:
+                where_clauses.append(f"{key} = ?")
+                values.append(value)
+        
+        if not where_clauses:
+            return "", values
+        return f" WHERE {' AND '.join(where_clauses)}", values
+    
     async def query(self, table: str, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """在指定表中执行查询
         
+        SELECT/WITH查询在只读连接上执行，其他语句在写连接上执行。
+        
         Args:
             table: 表名
             query: 查询语句
             params: 查询参数
-            
+        
         Returns:
             查询结果
         """
         try:
-            conn = self._get_connection()
-            
             # 替换表名占位符
             query = query.replace("{table}", table)
             
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+            def run(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+                return conn.execute(query, params).fetchall()
+            
+            keyword = query.lstrip()[:6].upper()
+            if keyword.startswith(("SELECT", "WITH")):
+                rows = await self._pool.read(run)
+            else:
+                rows = await self._pool.write(run)
             
             # 转换数据
-            results = []
-            for row in rows:
-                data = dict(row)
-                data = self._deserialize_data(data)
-                results.append(data)
+            results = self._rows_to_dicts(rows)
             
             self._record_operation("query", True)
             logger.debug(f"Query executed on {table}, returned {len(results)} results")
             return results
-            
+        
         except Exception as e:
             self._record_operation("query", False)
             raise ProviderError(f"Failed to query {table}: {e}", provider_type="sqlite")
@@ -364,13 +567,11 @@ class SQLiteProvider(BaseStorageProvider):
         Args:
             table: 表名
             filters: 过滤条件
-            
+        
         Returns:
             符合条件的数据数量
         """
         try:
-            conn = self._get_connection()
-            
             # 构建WHERE子句
             where_clauses = []
             values = []
@@ -384,14 +585,13 @@ class SQLiteProvider(BaseStorageProvider):
             if where_clauses:
                 sql += f" WHERE {' AND '.join(where_clauses)}"
             
-            cursor = conn.execute(sql, values)
-            row = cursor.fetchone()
+            row = await self._pool.read(lambda conn: conn.execute(sql, values).fetchone())
             count = row["count"] if row else 0
             
             self._record_operation("count", True)
             logger.debug(f"Counted {count} records in {table}")
             return count
-            
+        
         except Exception as e:
             self._record_operation("count", False)
             raise ProviderError(f"Failed to count data in {table}: {e}", provider_type="sqlite")
@@ -399,6 +599,8 @@ class SQLiteProvider(BaseStorageProvider):
     async def batch_save(self, table: str, data_list: List[Dict[str, Any]]) -> List[str]:
         """批量保存数据到指定表
         
+        在单个事务中写入，任一行失败时整批回滚。
+        
         Args:
             table: 表名
             data_list: 数据列表
@@ -407,49 +609,100 @@ class SQLiteProvider(BaseStorageProvider):
             数据ID列表
         """
         try:
-            conn = self._get_connection()
-            
-            result_ids = []
-            
-            for data in data_list:
-                # 确保有ID字段
-                if "id" not in data:
-                    data["id"] = str(time.time()) + str(id(data))
-                
-                # 构建SQL
-                columns = list(data.keys())
-                placeholders = ["?"] * len(columns)
-                values = [self._serialize_value(data[col]) for col in columns]
-                
-                sql = f"""
-                    INSERT OR REPLACE INTO {table} ({', '.join(columns)})
-                    VALUES ({', '.join(placeholders)})
-                """
-                
-                conn.execute(sql, values)
-                result_ids.append(data["id"])
+            results = await self.bulk_save(table, data_list, atomic=True)
+            result_ids = self._raise_on_bulk_failure(table, results, "sqlite")
             
             self._record_operation("batch_save", True)
             logger.debug(f"Batch saved {len(result_ids)} records to {table}")
             return result_ids
             
+        except ProviderError:
+            self._record_operation("batch_save", False)
+            raise
         except Exception as e:
             self._record_operation("batch_save", False)
             raise ProviderError(f"Failed to batch save data to {table}: {e}", provider_type="sqlite")
     
+    async def bulk_save(
+        self,
+        table: str,
+        data_list: List[Dict[str, Any]],
+        atomic: bool = False
+    ) -> List[Dict[str, Any]]:
+        """批量写入数据并逐行返回结果
+        
+        按列集合分组，每组一次 executemany，全部在一个事务中提交（一次fsync）。
+        非原子模式下某组失败时，回滚到该组的保存点并逐行重试，只有出错的行被标记为失败。
+        
+        Args:
+            table: 表名
+            data_list: 数据列表
+            atomic: 是否整批原子写入
+            
+        Returns:
+            与 data_list 一一对应的结果列表，每项包含 id、success、error
+        """
+        data_list = self._ensure_ids(data_list)
+        if not data_list:
+            return []
+        
+        # 按列集合分组，同组共用一条预编译语句
+        groups: Dict[str, List[Tuple[int, List[Any]]]] = {}
+        for index, data in enumerate(data_list):
+            columns = tuple(data.keys())
+            values = [self._serialize_value(data[col]) for col in columns]
+            groups.setdefault(self._insert_sql(table, columns), []).append((index, values))
+        
+        def run(conn: sqlite3.Connection) -> List[Optional[BaseException]]:
+            errors: List[Optional[BaseException]] = [None] * len(data_list)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, rows in groups.items():
+                    conn.execute("SAVEPOINT bulk_group")
+                    try:
+                        conn.executemany(sql, [values for _, values in rows])
+                    except sqlite3.Error:
+                        conn.execute("ROLLBACK TO bulk_group")
+                        conn.execute("RELEASE bulk_group")
+                        if atomic:
+                            raise
+                        # 逐行重试，失败语句只回滚自身
+                        for index, values in rows:
+                            try:
+                                conn.execute(sql, values)
+                            except sqlite3.Error as row_error:
+                                errors[index] = row_error
+                    else:
+                        conn.execute("RELEASE bulk_group")
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            return errors
+        
+        try:
+            errors = await self._pool.write(run)
+        except Exception as e:
+            self._record_operation("bulk_save", False)
+            return [self._bulk_result(data["id"], e) for data in data_list]
+        
+        results = [self._bulk_result(data["id"], error) for data, error in zip(data_list, errors)]
+        self._record_operation("bulk_save", all(error is None for error in errors))
+        logger.debug(f"Bulk saved {len(results)} records to {table} in {len(groups)} statement group(s)")
+        return results
+    
     async def batch_delete(self, table: str, ids: List[str]) -> int:
         """从指定表批量删除数据
         
         Args:
             table: 表名
             ids: 数据ID列表
-            
+        
         Returns:
             删除的数量
         """
         try:
-            conn = self._get_connection()
-            
             if not ids:
                 return 0
             
@@ -457,13 +710,12 @@ class SQLiteProvider(BaseStorageProvider):
             placeholders = ["?"] * len(ids)
             sql = f"DELETE FROM {table} WHERE id IN ({', '.join(placeholders)})"
             
-            cursor = conn.execute(sql, ids)
-            count = cursor.rowcount
+            count = await self._pool.write(lambda conn: conn.execute(sql, ids).rowcount)
             
             self._record_operation("batch_delete", True)
             logger.debug(f"Batch deleted {count} records from {table}")
             return count
-            
+        
         except Exception as e:
             self._record_operation("batch_delete", False)
             raise ProviderError(f"Failed to batch delete data from {table}: {e}", provider_type="sqlite")
@@ -476,8 +728,6 @@ class SQLiteProvider(BaseStorageProvider):
             schema: 表结构定义
         """
         try:
-            conn = self._get_connection()
-            
             # 构建列定义
             columns = []
             for col_name, col_def in schema.get("columns", {}).items():
@@ -486,21 +736,28 @@ class SQLiteProvider(BaseStorageProvider):
                 columns.append(f"{col_name} {col_type} {constraints}".strip())
             
             # 构建SQL
-            sql = f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})"
-            
-            conn.execute(sql)
+            statements = [f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})"]
             
             # 创建索引
             for index in schema.get("indexes", []):
-                index_name = index.get("name", f"idx_{table}_{index['column']}")
-                column = index["column"]
+                # 支持单列（column）和复合索引（columns）
+                index_columns = index.get("columns") or [index["column"]]
+                index_name = index.get("name", f"idx_{table}_{'_'.join(index_columns)}")
                 unique = "UNIQUE" if index.get("unique", False) else ""
                 
-                index_sql = f"CREATE {unique} INDEX IF NOT EXISTS {index_name} ON {table} ({column})"
-                conn.execute(index_sql)
+                statements.append(
+                    f"CREATE {unique} INDEX IF NOT EXISTS {index_name} "
+                    f"ON {table} ({', '.join(index_columns)})"
+                )
             
-            logger.debug(f"Table created: {table}")
+            def run(conn: sqlite3.Connection) -> None:
+                for sql in statements:
+                    conn.execute(sql)
+            
+            await self._pool.write(run)
             
+            logger.debug(f"Table created: {table}")
+        
         except Exception as e:
             raise ProviderError(f"Failed to create table {table}: {e}", provider_type="sqlite")
     
@@ -511,10 +768,9 @@ class SQLiteProvider(BaseStorageProvider):
             table: 表名
         """
         try:
-            conn = self._get_connection()
-            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            await self._pool.write(lambda conn: conn.execute(f"DROP TABLE IF EXISTS {table}"))
             logger.debug(f"Table dropped: {table}")
-            
+        
         except Exception as e:
             raise ProviderError(f"Failed to drop table {table}: {e}", provider_type="sqlite")
     
@@ -523,21 +779,21 @@ class SQLiteProvider(BaseStorageProvider):
         
         Args:
             table: 表名
-            
+        
         Returns:
             是否存在
         """
         try:
-            conn = self._get_connection()
-            
-            cursor = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-                (table,)
+            row = await self._pool.read(
+                lambda conn: conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                    (table,)
+                ).fetchone()
             )
             
-            exists = cursor.fetchone() is not None
+            exists = row is not None
             return exists
-            
+        
         except Exception as e:
             raise ProviderError(f"Failed to check table existence {table}: {e}", provider_type="sqlite")
     
@@ -548,15 +804,15 @@ class SQLiteProvider(BaseStorageProvider):
             表名列表
         """
         try:
-            conn = self._get_connection()
-            
-            cursor = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+            rows = await self._pool.read(
+                lambda conn: conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+                ).fetchall()
             )
             
-            tables = [row["name"] for row in cursor.fetchall()]
+            tables = [row["name"] for row in rows]
             return tables
-            
+        
         except Exception as e:
             raise ProviderError(f"Failed to list tables: {e}", provider_type="sqlite")
     
@@ -565,7 +821,7 @@ class SQLiteProvider(BaseStorageProvider):
         
         Args:
             value: 要序列化的值
-            
+        
         Returns:
             序列化后的值
         """
@@ -578,7 +834,7 @@ class SQLiteProvider(BaseStorageProvider):
         
         Args:
             data: 要反序列化的数据
-            
+        
         Returns:
             反序列化后的数据
         """
@@ -598,4 +854,4 @@ class SQLiteProvider(BaseStorageProvider):
             else:
                 result[key] = value
         
-        return result
\ No newline at end of file
+        return result
@@ -5,11 +5,130 @@
 
 import os
 import pickle
+import sys
 import time
+from abc import ABC, abstractmethod
+from itertools import islice
 from typing import Dict, Any, Optional, List, Union
 
 from src.interfaces.storage.exceptions import StorageError
 
+
+class DataSizeEstimator(ABC):
+    """数据大小估算策略
+    
+    用于内存存储的容量控制，估算值只需与真实占用同量级且稳定。
+    """
+    
+    @abstractmethod
+    def estimate(self, value: Any) -> int:
+        """估算值占用的内存大小
+        
+        Args:
+            value: 要估算的值
+            
+        Returns:
+            估算大小（字节）
+        """
+        pass
+
+
+class RecursiveSizeEstimator(DataSizeEstimator):
+    """基于 sys.getsizeof 的递归估算
+    
+    不做序列化，也不分配临时缓冲区。超过 sample_size 的容器只测量前
+    sample_size 个元素并按元素数量外推，超过 max_depth 的嵌套只计算自身大小，
+    使大型状态字典的估算成本有上界。
+    """
+    
+    def __init__(self, sample_size: int = 64, max_depth: int = 8):
+        """初始化递归估算器
+        
+        Args:
+            sample_size: 容器采样的元素数量
+            max_depth: 最大递归深度
+        """
+        self.sample_size = max(1, sample_size)
+        self.max_depth = max_depth
+    
+    def estimate(self, value: Any) -> int:
+        """估算值占用的内存大小"""
+        return self._estimate(value, 0)
+    
+    def _estimate(self, value: Any, depth: int) -> int:
+        size = sys.getsizeof(value)
+        if depth >= self.max_depth or isinstance(value, (str, bytes, bytearray, int, float, bool)):
+            return size
+        
+        if isinstance(value, dict):
+            count = len(value)
+            if not count:
+                return size
+            sampled = islice(value.items(), self.sample_size)
+            children = sum(
+                self._estimate(k, depth + 1) + self._estimate(v, depth + 1)
+                for k, v in sampled
+            )
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            count = len(value)
+            if not count:
+                return size
+            children = sum(
+                self._estimate(item, depth + 1)
+                for item in islice(value, self.sample_size)
+            )
+        elif hasattr(value, "__dict__"):
+            return size + self._estimate(vars(value), depth + 1)
+        else:
+            return size
+        
+        if count > self.sample_size:
+            children = children * count // self.sample_size
+        return size + children
+
+
+class PickleSizeEstimator(DataSizeEstimator):
+    """基于pickle序列化长度的估算
+    
+    结果即序列化后的字节数，但每次估算都需要完整序列化，仅在需要与
+    持久化大小严格对应时使用。
+    """
+    
+    def estimate(self, value: Any) -> int:
+        """估算值占用的内存大小"""
+        try:
+            return len(pickle.dumps(value))
+        except Exception:
+            # 粗略估算
+            return len(str(value)) * 2  # 假设每个字符2字节
+
+
+_SIZE_ESTIMATORS = {
+    "recursive": RecursiveSizeEstimator,
+    "pickle": PickleSizeEstimator,
+}
+
+
+def create_size_estimator(strategy: Union[str, DataSizeEstimator, None] = None, **options: Any) -> DataSizeEstimator:
+    """创建数据大小估算器
+    
+    Args:
+        strategy: 策略名称（recursive、pickle）或估算器实例，None表示recursive
+        **options: 估算器参数
+        
+    Returns:
+        数据大小估算器
+        
+    Raises:
+        StorageError: 未知的策略名称
+    """
+    if isinstance(strategy, DataSizeEstimator):
+        return strategy
+    name = strategy or "recursive"
+    if name not in _SIZE_ESTIMATORS:
+        raise StorageError(f"Unknown size estimation strategy: {name}")
+    return _SIZE_ESTIMATORS[name](**options)
+
 class MemoryStorageItem:
     """内存存储项
     
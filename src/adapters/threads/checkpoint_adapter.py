@@ -60,7 +60,7 @@ class ThreadCheckpointAdapter:
                 "thread_id": checkpoint.thread_id,
                 "created_at": checkpoint.created_at.isoformat(),
                 "expires_at": checkpoint.expires_at.isoformat() if checkpoint.expires_at else None,
-                "size_bytes": checkpoint.size_bytes
+                "size_bytes": checkpoint.get_size_bytes()
             }
             
         except Exception as e:
@@ -107,7 +107,7 @@ class ThreadCheckpointAdapter:
                 "description": checkpoint.metadata.get("description"),
                 "tags": checkpoint.metadata.get("tags", []),
                 "created_at": checkpoint.created_at.isoformat(),
-                "size_bytes": checkpoint.size_bytes
+                "size_bytes": checkpoint.get_size_bytes()
             }
             
         except Exception as e:
@@ -58,6 +58,8 @@ class ToolConfig(BaseConfig):
     # 高级配置
     timeout: Optional[int] = Field(None, description="超时时间（秒）")
     retry_config: Dict[str, Any] = Field(default_factory=dict, description="重试配置")
+    cacheable: bool = Field(default=False, description="是否缓存执行结果（仅适用于幂等工具）")
+    cache_ttl: Optional[float] = Field(None, description="结果缓存有效期（秒）")
     
     # 元数据
     metadata: Dict[str, Any] = Field(default_factory=dict, description="元数据")
@@ -125,6 +127,9 @@ class ToolConfig(BaseConfig):
         if self.timeout is not None and self.timeout <= 0:
             errors.append("超时时间必须大于0")
         
+        if self.cache_ttl is not None and self.cache_ttl <= 0:
+            errors.append("缓存有效期必须大于0")
+        
         return errors
     
     def is_valid(self) -> bool:
@@ -155,6 +160,8 @@ class ToolConfig(BaseConfig):
             "group": self.group,
             "timeout": self.timeout,
             "retry_config": self.retry_config,
+            "cacheable": self.cacheable,
+            "cache_ttl": self.cache_ttl,
             "metadata": self.metadata
         }
         
@@ -10,7 +10,8 @@ from .entities import (
     TokenUsageRecord,
     CostRecord,
     WorkflowTokenStatistics,
-    RecordType
+    RecordType,
+    RollupGranularity
 )
 
 from .interfaces import (
@@ -27,6 +28,7 @@ __all__ = [
     "CostRecord",
     "WorkflowTokenStatistics",
     "RecordType",
+    "RollupGranularity",
     
     # 接口
     "IHistoryStorage",
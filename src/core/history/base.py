@@ -195,6 +195,21 @@ class BaseHistoryManager(ABC):
             self._logger.error(f"获取历史记录失败: {e}")
             raise HistoryError(f"获取历史记录失败: {e}") from e
     
+    async def _update_token_rollups(self, record: BaseHistoryRecord) -> None:
+        """
+        将Token使用记录或成本记录累加到时间桶统计
+        
+        Args:
+            record: Token使用记录或成本记录
+        """
+        delta = WorkflowTokenStatistics.from_record(record)
+        if delta is None:
+            return
+        
+        # 时间桶统计失败不影响记录本身的保存
+        if not await self._storage.update_token_rollups(delta) and self._logger:
+            self._logger.warning(f"更新时间桶统计失败: {record.record_id}")
+    
     def _validate_record(self, record: BaseHistoryRecord) -> None:
         """
         验证历史记录
@@ -554,6 +569,11 @@ class BaseTokenTracker(ITokenTracker):
             # 保存更新后的统计
             await self._storage.update_workflow_token_stats(stats)
             
+            # 增量更新小时/天时间桶统计
+            delta = WorkflowTokenStatistics.from_record(token_record)
+            if delta is not None:
+                await self._storage.update_token_rollups(delta)
+            
         except Exception as e:
             # 使用统一错误处理
             error_context = {
@@ -5,8 +5,8 @@
 
 from src.interfaces.dependency_injection import get_logger
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, Any, Optional, List
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Iterator
 from enum import Enum
 
 from src.interfaces.history.exceptions import (
@@ -37,6 +37,30 @@ class TokenSource(Enum):
     HYBRID = "hybrid"     # 混合来源
 
 
+class RollupGranularity(Enum):
+    """统计时间桶粒度枚举"""
+    HOUR = "hour"
+    DAY = "day"
+    
+    @property
+    def bucket_size(self) -> timedelta:
+        """时间桶长度"""
+        return timedelta(hours=1) if self is RollupGranularity.HOUR else timedelta(days=1)
+    
+    def bucket_start(self, timestamp: datetime) -> datetime:
+        """获取时间戳所在时间桶的起始时间"""
+        if self is RollupGranularity.HOUR:
+            return timestamp.replace(minute=0, second=0, microsecond=0)
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    def iter_buckets(self, start_time: datetime, end_time: datetime) -> Iterator[datetime]:
+        """按顺序生成覆盖时间范围的所有时间桶起始时间"""
+        current = self.bucket_start(start_time)
+        while current <= end_time:
+            yield current
+            current += self.bucket_size
+
+
 class BaseHistoryRecord(IBaseHistoryRecord):
     """历史记录基类
     
@@ -609,6 +633,89 @@ class WorkflowTokenStatistics:
         
         self.total_cost += record.total_cost
         self.last_updated = record.timestamp
+        
+        # 更新时间范围
+        if self.period_start is None or record.timestamp < self.period_start:
+            self.period_start = record.timestamp
+        if self.period_end is None or record.timestamp > self.period_end:
+            self.period_end = record.timestamp
+    
+    @classmethod
+    def from_record(cls, record: BaseHistoryRecord) -> Optional['WorkflowTokenStatistics']:
+        """从单条Token使用记录或成本记录创建增量统计
+        
+        Token使用记录计入token数量和请求数，成本记录只计入成本，
+        避免同一次调用的token被重复累加。
+        
+        Args:
+            record: 历史记录
+            
+        Returns:
+            Optional[WorkflowTokenStatistics]: 增量统计，记录类型不支持或缺少工作流ID、模型时返回None
+        """
+        workflow_id = getattr(record, "workflow_id", None)
+        model = getattr(record, "model", None)
+        if not workflow_id or not model:
+            return None
+        
+        delta = cls(workflow_id=workflow_id, model=model, last_updated=record.timestamp)
+        if isinstance(record, TokenUsageRecord):
+            delta.update_from_record(record)
+        elif isinstance(record, CostRecord):
+            delta.update_from_cost_record(record)
+        else:
+            return None
+        return delta
+    
+    @classmethod
+    def from_record_data(cls, data: Dict[str, Any]) -> Optional['WorkflowTokenStatistics']:
+        """从已保存的Token使用记录或成本记录数据创建增量统计
+        
+        与 from_record 的计入规则相同，用于从存储中的记录重建统计。
+        to_dict 按属性名序列化，字段名可能带下划线前缀。
+        
+        Args:
+            data: 记录的字典数据
+            
+        Returns:
+            Optional[WorkflowTokenStatistics]: 增量统计，period_start 为记录时间，
+                记录类型不支持或缺少工作流ID、模型时返回None
+            
+        Raises:
+            ValueError: 时间戳或数值无法解析
+        """
+        def value(name: str) -> Any:
+            return data.get(name, data.get(f"_{name}"))
+        
+        record_type = value("record_type")
+        workflow_id = value("workflow_id")
+        model = value("model")
+        if record_type not in (RecordType.TOKEN_USAGE.value, RecordType.COST.value):
+            return None
+        if not workflow_id or not model:
+            return None
+        
+        timestamp = value("timestamp")
+        try:
+            occurred_at = timestamp if isinstance(timestamp, datetime) else datetime.fromisoformat(timestamp)
+        except TypeError as e:
+            raise ValueError(f"无效的时间戳: {timestamp!r}") from e
+        
+        delta = cls(
+            workflow_id=workflow_id,
+            model=model,
+            last_updated=occurred_at,
+            period_start=occurred_at,
+            period_end=occurred_at
+        )
+        if record_type == RecordType.TOKEN_USAGE.value:
+            delta.total_prompt_tokens = int(value("prompt_tokens") or 0)
+            delta.total_completion_tokens = int(value("completion_tokens") or 0)
+            delta.total_tokens = int(value("total_tokens") or 0)
+            delta.request_count = 1
+        else:
+            delta.total_cost = float(value("total_cost") or 0)
+        return delta
     
     @property
     def avg_tokens_per_request(self) -> float:
@@ -658,6 +765,33 @@ class WorkflowTokenSummary:
         if stats.period_end and stats.period_end > self.period_end:
             self.period_end = stats.period_end
     
+    @classmethod
+    def group_by_period(
+        cls,
+        workflow_id: str,
+        rollups: List[WorkflowTokenStatistics]
+    ) -> Dict[datetime, 'WorkflowTokenSummary']:
+        """将时间桶统计按桶起始时间汇总
+        
+        Args:
+            workflow_id: 工作流ID
+            rollups: 时间桶统计列表，period_start 为桶起始时间
+            
+        Returns:
+            Dict[datetime, WorkflowTokenSummary]: 桶起始时间到汇总统计的映射
+        """
+        summaries: Dict[datetime, WorkflowTokenSummary] = {}
+        for stats in rollups:
+            bucket = stats.period_start or stats.last_updated
+            if bucket not in summaries:
+                summaries[bucket] = cls(
+                    workflow_id=workflow_id,
+                    period_start=bucket,
+                    period_end=stats.period_end or bucket
+                )
+            summaries[bucket].add_model_stats(stats)
+        return summaries
+    
     @property
     def models_used(self) -> List[str]:
         """获取使用的模型列表"""
@@ -260,7 +260,7 @@ class ThreadCheckpointRepositoryAdapter:
                 stats.archived_checkpoints += 1
         
         # 大小统计
-        sizes = [cp.size_bytes for cp in checkpoints]
+        sizes = [cp.get_size_bytes() for cp in checkpoints]
         stats.total_size_bytes = sum(sizes)
         stats.average_size_bytes = stats.total_size_bytes / len(sizes)
         stats.largest_checkpoint_bytes = max(sizes)
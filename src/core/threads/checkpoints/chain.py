@@ -0,0 +1,204 @@
+"""Thread检查点链式编码
+
+将检查点状态编码为"周期性全量基准快照 + 增量"的链式格式，并使用zlib压缩。
+增量基于 StateDiff 计算，恢复时从最近的基准快照开始依次重放增量。
+"""
+
+import base64
+import json
+import zlib
+from typing import Any, Dict, List, Optional
+
+from src.core.state.entities import StateDiff
+
+
+class CheckpointChainCodec:
+    """检查点链式编解码器
+
+    每个编码后的记录（信封）包含编码方式、父检查点ID、距基准快照的深度
+    以及压缩后的负载。链深度达到 base_interval 时强制写入新的基准快照，
+    从而限制恢复时需要重放的增量数量。
+    """
+
+    ENVELOPE_MARKER = "__checkpoint_chain__"
+    FORMAT_VERSION = 1
+    ENCODING_BASE = "base"
+    ENCODING_DELTA = "delta"
+
+    def __init__(self, base_interval: int = 10, compression_level: int = 6):
+        """初始化编解码器
+
+        Args:
+            base_interval: 基准快照间隔，即两个基准之间最多的增量数量+1
+            compression_level: zlib压缩级别
+        """
+        if base_interval < 1:
+            raise ValueError("Base interval must be positive")
+        self.base_interval = base_interval
+        self.compression_level = compression_level
+
+    def encode(
+        self,
+        state_data: Dict[str, Any],
+        parent_id: Optional[str] = None,
+        parent_state: Optional[Dict[str, Any]] = None,
+        parent_depth: int = 0
+    ) -> Dict[str, Any]:
+        """编码检查点状态
+
+        Args:
+            state_data: 检查点状态
+            parent_id: 链上前一个检查点ID，None表示写入基准快照
+            parent_state: 前一个检查点的完整状态
+            parent_depth: 前一个检查点距其基准快照的深度
+
+        Returns:
+            编码后的信封
+        """
+        depth = parent_depth + 1
+        if parent_id is None or parent_state is None or depth >= self.base_interval:
+            return self._make_envelope(self.ENCODING_BASE, state_data, None, 0)
+
+        delta = self.compute_delta(parent_state, state_data)
+        return self._make_envelope(self.ENCODING_DELTA, delta, parent_id, depth)
+
+    def decode(
+        self,
+        envelope: Dict[str, Any],
+        parent_state: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """解码单个信封
+
+        Args:
+            envelope: 编码后的信封
+            parent_state: 增量记录的父检查点完整状态
+
+        Returns:
+            检查点完整状态
+
+        Raises:
+            ValueError: 增量记录缺少父状态
+        """
+        payload = self._unpack(envelope["payload"])
+        if envelope["encoding"] == self.ENCODING_BASE:
+            return payload
+
+        if parent_state is None:
+            raise ValueError(
+                f"Delta checkpoint requires parent state: {envelope.get('parent_id')}"
+            )
+        return self.apply_delta(parent_state, payload)
+
+    def decode_chain(self, envelopes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """从基准快照开始重放增量链
+
+        Args:
+            envelopes: 按从基准到目标顺序排列的信封列表，第一个必须是基准快照
+
+        Returns:
+            链末端检查点的完整状态
+        """
+        if not envelopes or envelopes[0]["encoding"] != self.ENCODING_BASE:
+            raise ValueError("Checkpoint chain must start with a base snapshot")
+
+        state = self.decode(envelopes[0])
+        for envelope in envelopes[1:]:
+            state = self.decode(envelope, state)
+        return state
+
+    @classmethod
+    def is_envelope(cls, data: Any) -> bool:
+        """判断数据是否为链式编码信封
+
+        Args:
+            data: 待判断的数据
+
+        Returns:
+            是否为信封
+        """
+        return isinstance(data, dict) and data.get(cls.ENVELOPE_MARKER) == cls.FORMAT_VERSION
+
+    @staticmethod
+    def payload_size(envelope: Dict[str, Any]) -> int:
+        """获取信封负载的存储大小（字节）"""
+        return len(envelope["payload"])
+
+    @staticmethod
+    def compute_delta(old_state: Dict[str, Any], new_state: Dict[str, Any]) -> Dict[str, Any]:
+        """计算增量
+
+        基于 StateDiff 计算差异，只保留重放所需的新值；
+        对仅在末尾追加元素的列表（如消息列表）只记录追加部分。
+
+        Args:
+            old_state: 旧状态
+            new_state: 新状态
+
+        Returns:
+            增量
+        """
+        diff = StateDiff.calculate(old_state, new_state)
+
+        modified: Dict[str, Any] = {}
+        extended: Dict[str, List[Any]] = {}
+        for key, change in diff.modified.items():
+            old_value, new_value = change["old"], change["new"]
+            if (
+                isinstance(old_value, list) and isinstance(new_value, list)
+                and len(new_value) > len(old_value)
+                and new_value[:len(old_value)] == old_value
+            ):
+                extended[key] = new_value[len(old_value):]
+            else:
+                modified[key] = {"new": new_value}
+
+        return {
+            "added": diff.added,
+            "removed": list(diff.removed),
+            "modified": modified,
+            "extended": extended,
+        }
+
+    @staticmethod
+    def apply_delta(base_state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        """将增量应用到状态
+
+        Args:
+            base_state: 父检查点完整状态
+            delta: 增量
+
+        Returns:
+            新状态
+        """
+        diff = StateDiff(
+            added=delta.get("added", {}),
+            removed={key: None for key in delta.get("removed", [])},
+            modified=delta.get("modified", {}),
+        )
+        state = diff.apply_to_state(base_state)
+        for key, tail in delta.get("extended", {}).items():
+            state[key] = list(state.get(key, [])) + tail
+        return state
+
+    def _make_envelope(
+        self,
+        encoding: str,
+        data: Dict[str, Any],
+        parent_id: Optional[str],
+        depth: int
+    ) -> Dict[str, Any]:
+        return {
+            self.ENVELOPE_MARKER: self.FORMAT_VERSION,
+            "encoding": encoding,
+            "parent_id": parent_id,
+            "depth": depth,
+            "payload": self._pack(data),
+        }
+
+    def _pack(self, data: Dict[str, Any]) -> str:
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return base64.b64encode(zlib.compress(raw, self.compression_level)).decode("ascii")
+
+    @staticmethod
+    def _unpack(payload: str) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(base64.b64decode(payload)).decode("utf-8"))
@@ -222,10 +222,10 @@ class ThreadCheckpointDomainService:
         archived_checkpoints = sum(1 for cp in checkpoints if cp.status == CheckpointStatus.ARCHIVED)
         
         # 大小统计
-        total_size_bytes = sum(cp.size_bytes for cp in checkpoints)
+        total_size_bytes = sum(cp.get_size_bytes() for cp in checkpoints)
         average_size_bytes = total_size_bytes / total_checkpoints if total_checkpoints > 0 else 0
-        largest_checkpoint_bytes = max(cp.size_bytes for cp in checkpoints) if checkpoints else 0
-        smallest_checkpoint_bytes = min(cp.size_bytes for cp in checkpoints) if checkpoints else 0
+        largest_checkpoint_bytes = max(cp.get_size_bytes() for cp in checkpoints) if checkpoints else 0
+        smallest_checkpoint_bytes = min(cp.get_size_bytes() for cp in checkpoints) if checkpoints else 0
         
         # 恢复统计
         total_restores = sum(cp.restore_count for cp in checkpoints)
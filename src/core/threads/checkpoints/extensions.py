@@ -262,7 +262,7 @@ class CheckpointAnalysisHelper:
         if not checkpoints:
             return {"distribution": "none"}
         
-        sizes = [cp.size_bytes for cp in checkpoints]
+        sizes = [cp.get_size_bytes() for cp in checkpoints]
         
         # 计算统计信息
         total_size = sum(sizes)
@@ -527,7 +527,7 @@ class ThreadCheckpointExtension:
             "status": checkpoint.status.value,
             "type": checkpoint.checkpoint_type.value,
             "created_at": checkpoint.created_at.isoformat(),
-            "size_bytes": checkpoint.size_bytes,
+            "size_bytes": checkpoint.get_size_bytes(),
             "restore_count": checkpoint.restore_count,
             "is_expired": checkpoint.is_expired(),
             "can_restore": checkpoint.can_restore(),
@@ -195,7 +195,7 @@ class ThreadCheckpointManager:
                     "type": checkpoint.checkpoint_type.value,
                     "status": checkpoint.status.value,
                     "created_at": checkpoint.created_at.isoformat(),
-                    "size_bytes": checkpoint.size_bytes,
+                    "size_bytes": checkpoint.get_size_bytes(),
                     "restore_count": checkpoint.restore_count,
                     "metadata": checkpoint.metadata
                 }
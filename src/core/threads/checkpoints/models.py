@@ -60,10 +60,6 @@ class ThreadCheckpoint:
         
         if not self.state_data:
             raise ValueError("State data cannot be empty")
-        
-        # 计算数据大小
-        import json
-        self.size_bytes = len(json.dumps(self.state_data))
     
     # 领域方法
     def is_valid(self) -> bool:
@@ -112,6 +108,20 @@ class ThreadCheckpoint:
         """
         return self.get_age() / 3600.0
     
+    def get_size_bytes(self) -> int:
+        """获取检查点数据大小（字节）
+        
+        持久化时由链式编码写入压缩后的实际存储大小，
+        尚未持久化的检查点在首次查询时计算并缓存。
+        
+        Returns:
+            数据大小（字节）
+        """
+        if not self.size_bytes:
+            import json
+            self.size_bytes = len(json.dumps(self.state_data))
+        return self.size_bytes
+    
     def mark_restored(self) -> None:
         """标记为已恢复"""
         self.restore_count += 1
@@ -145,9 +155,8 @@ class ThreadCheckpoint:
         self.state_data = new_state_data
         self.updated_at = datetime.now()
         
-        # 重新计算大小
-        import json
-        self.size_bytes = len(json.dumps(self.state_data))
+        # 大小在下次持久化或查询时重新计算
+        self.size_bytes = 0
     
     def set_expiration(self, hours: int) -> None:
         """设置过期时间
@@ -14,7 +14,9 @@ from .models import (
 from .repository import (
     IThreadCheckpointRepository,
     ThreadCheckpointRepository,
-    RepositoryError
+    RepositoryError,
+    THREAD_CHECKPOINT_TABLE,
+    THREAD_CHECKPOINT_TABLE_SCHEMA
 )
 
 from .service import (
@@ -56,6 +58,8 @@ __all__ = [
     "IThreadCheckpointRepository",
     "ThreadCheckpointRepository",
     "RepositoryError",
+    "THREAD_CHECKPOINT_TABLE",
+    "THREAD_CHECKPOINT_TABLE_SCHEMA",
     
     # 服务类
     "ThreadCheckpointDomainService",
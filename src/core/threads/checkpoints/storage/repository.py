@@ -13,6 +13,34 @@ if TYPE_CHECKING:
 from .models import ThreadCheckpoint, CheckpointStatistics, CheckpointStatus, CheckpointType
 
 
+# 检查点表结构（SQLiteProvider.create_table 格式）
+# (thread_id, created_at) 复合索引支撑按线程的最新/最旧查询和有序列表，
+# expires_at 索引支撑过期检查点的范围查询。
+THREAD_CHECKPOINT_TABLE = "thread_checkpoints"
+THREAD_CHECKPOINT_TABLE_SCHEMA: Dict[str, Any] = {
+    "columns": {
+        "id": {"type": "TEXT", "constraints": "PRIMARY KEY"},
+        "type": {"type": "TEXT"},
+        "thread_id": {"type": "TEXT", "constraints": "NOT NULL"},
+        "state_data": {"type": "TEXT"},
+        "metadata": {"type": "TEXT"},
+        "status": {"type": "TEXT"},
+        "checkpoint_type": {"type": "TEXT"},
+        "created_at": {"type": "TEXT", "constraints": "NOT NULL"},
+        "updated_at": {"type": "TEXT"},
+        "expires_at": {"type": "TEXT"},
+        "size_bytes": {"type": "INTEGER"},
+        "restore_count": {"type": "INTEGER"},
+        "last_restored_at": {"type": "TEXT"},
+    },
+    "indexes": [
+        {"name": "idx_thread_checkpoints_thread_created", "columns": ["thread_id", "created_at"]},
+        {"name": "idx_thread_checkpoints_expires_at", "column": "expires_at"},
+        {"name": "idx_thread_checkpoints_status", "column": "status"},
+    ],
+}
+
+
 # 延迟初始化logger以避免循环导入
 logger = None
 
@@ -346,22 +374,13 @@ class ThreadCheckpointRepository(IThreadCheckpointRepository):
     async def find_by_thread(self, thread_id: str) -> List[ThreadCheckpoint]:
         """查找Thread的所有检查点"""
         try:
-            # 查询Thread的所有检查点
+            # 查询Thread的所有检查点，按创建时间排序（最新的在前）
             filters = {"type": "thread_checkpoint", "thread_id": thread_id}
-            results = await self._backend.list_impl(filters)
-            
-            # 转换为领域对象
-            checkpoints = []
-            for data in results:
-                try:
-                    checkpoint = ThreadCheckpoint.from_dict(data)
-                    checkpoints.append(checkpoint)
-                except Exception as e:
-                    _get_logger().warning(f"Failed to convert checkpoint data: {e}")
-                    continue
+            results = await self._backend.query_impl(
+                filters, order_by="created_at", descending=True
+            )
             
-            # 按创建时间排序（最新的在前）
-            checkpoints.sort(key=lambda x: x.created_at, reverse=True)
+            checkpoints = self._to_checkpoints(results)
             
             _get_logger().info(f"Found {len(checkpoints)} checkpoints for thread {thread_id}")
             return checkpoints
@@ -440,24 +459,19 @@ class ThreadCheckpointRepository(IThreadCheckpointRepository):
     async def find_expired(self, before_time: Optional[datetime] = None) -> List[ThreadCheckpoint]:
         """查找过期的检查点"""
         try:
-            # 确定过期时间点
-            if before_time is None:
-                before_time = datetime.now()
+            # 确定过期时间点：已过期（早于当前时间）或早于指定时间点
+            now = datetime.now()
+            if before_time is None or before_time < now:
+                before_time = now
             
-            # 查询所有检查点
-            filters = {"type": "thread_checkpoint"}
-            results = await self._backend.list_impl(filters)
+            # 按 expires_at 范围查询
+            filters = {
+                "type": "thread_checkpoint",
+                "expires_at": {"op": "<", "value": before_time.isoformat()},
+            }
+            results = await self._backend.query_impl(filters, order_by="expires_at")
             
-            # 过滤过期检查点
-            expired_checkpoints = []
-            for data in results:
-                try:
-                    checkpoint = ThreadCheckpoint.from_dict(data)
-                    if checkpoint.is_expired() or checkpoint.expires_at and checkpoint.expires_at < before_time:
-                        expired_checkpoints.append(checkpoint)
-                except Exception as e:
-                    _get_logger().warning(f"Failed to convert checkpoint data: {e}")
-                    continue
+            expired_checkpoints = self._to_checkpoints(results)
             
             _get_logger().info(f"Found {len(expired_checkpoints)} expired checkpoints")
             return expired_checkpoints
@@ -642,8 +656,7 @@ class ThreadCheckpointRepository(IThreadCheckpointRepository):
     async def find_latest_by_thread(self, thread_id: str) -> Optional[ThreadCheckpoint]:
         """查找Thread的最新检查点"""
         try:
-            checkpoints = await self.find_by_thread(thread_id)
-            return checkpoints[0] if checkpoints else None
+            return await self._find_edge_by_thread(thread_id, descending=True)
             
         except Exception as e:
             _get_logger().error(f"Failed to find latest checkpoint for thread {thread_id}: {e}")
@@ -652,12 +665,41 @@ class ThreadCheckpointRepository(IThreadCheckpointRepository):
     async def find_oldest_by_thread(self, thread_id: str) -> Optional[ThreadCheckpoint]:
         """查找Thread的最旧检查点"""
         try:
-            checkpoints = await self.find_by_thread(thread_id)
-            return checkpoints[-1] if checkpoints else None
+            return await self._find_edge_by_thread(thread_id, descending=False)
             
         except Exception as e:
             _get_logger().error(f"Failed to find oldest checkpoint for thread {thread_id}: {e}")
             raise RepositoryError(f"Failed to find oldest checkpoint: {e}") from e
+    
+    async def _find_edge_by_thread(self, thread_id: str, descending: bool) -> Optional[ThreadCheckpoint]:
+        """按创建时间查找Thread的第一个检查点
+        
+        排序和限制下推到后端（ORDER BY created_at LIMIT 1），只反序列化一条记录。
+        
+        Args:
+            thread_id: 线程ID
+            descending: True查找最新检查点，False查找最旧检查点
+            
+        Returns:
+            检查点，不存在返回None
+        """
+        filters = {"type": "thread_checkpoint", "thread_id": thread_id}
+        results = await self._backend.query_impl(
+            filters, order_by="created_at", descending=descending, limit=1
+        )
+        checkpoints = self._to_checkpoints(results)
+        return checkpoints[0] if checkpoints else None
+    
+    def _to_checkpoints(self, results: List[Dict[str, Any]]) -> List[ThreadCheckpoint]:
+        """将后端数据转换为领域对象，跳过无法转换的记录"""
+        checkpoints = []
+        for data in results:
+            try:
+                checkpoints.append(ThreadCheckpoint.from_dict(data))
+            except Exception as e:
+                _get_logger().warning(f"Failed to convert checkpoint data: {e}")
+                continue
+        return checkpoints
 
 
 class RepositoryError(Exception):
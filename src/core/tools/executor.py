@@ -3,9 +3,14 @@
 """
 
 import asyncio
+import inspect
+import json
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Callable, Tuple
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Awaitable, Dict, List, Callable, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import partial
 from src.interfaces.dependency_injection import get_logger
@@ -125,6 +130,138 @@ class AsyncBatchProcessor:
         return batch_results
 
 
+class ToolResultCache:
+    """工具结果缓存
+    
+    缓存幂等工具的成功结果，键为工具名加规范化（键排序）后的参数。
+    容量有限，按LRU淘汰，每条记录带有独立的TTL；同一事件循环中并发的相同调用
+    只执行一次（single-flight），其余调用等待并共享结果。
+    """
+    
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, ToolResult]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Optional[ToolResult]]"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+    
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """生成缓存键，参数无法规范化时返回None（不缓存）"""
+        try:
+            canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        return f"{tool_name}:{canonical}"
+    
+    def get(self, key: str) -> Optional[ToolResult]:
+        """获取未过期的缓存结果"""
+        result = self._lookup(key)
+        if result is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return result
+    
+    def _lookup(self, key: str) -> Optional[ToolResult]:
+        """查找未过期的缓存结果（不计入统计）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+    
+    def put(self, key: str, result: ToolResult, ttl: float) -> None:
+        """缓存结果"""
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    async def get_or_execute(
+        self,
+        key: str,
+        ttl: float,
+        execute: Callable[[], Awaitable[ToolResult]]
+    ) -> ToolResult:
+        """从缓存获取结果，未命中时执行并缓存成功结果
+        
+        Args:
+            key: 缓存键
+            ttl: 缓存有效期（秒）
+            execute: 实际执行工具调用的协程函数
+            
+        Returns:
+            ToolResult: 执行结果，metadata 中记录 cache_hit / cache_shared
+        """
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return self._annotate(cached, hit=True)
+        
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop:
+            result = await asyncio.shield(inflight)
+            if result is not None:
+                self.shared += 1
+                return self._annotate(result, hit=True, shared=True)
+            # 领头调用被取消或异常退出，自行执行
+            return await self.get_or_execute(key, ttl, execute)
+        
+        self.misses += 1
+        future: "asyncio.Future[Optional[ToolResult]]" = loop.create_future()
+        self._inflight[key] = future
+        result: Optional[ToolResult] = None
+        try:
+            result = self._annotate(await execute(), hit=False)
+            if result.success:
+                self.put(key, result, ttl)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_result(result)
+    
+    @staticmethod
+    def _annotate(result: ToolResult, hit: bool, shared: bool = False) -> ToolResult:
+        """复制结果并写入缓存命中信息"""
+        metadata = dict(result.metadata or {})
+        metadata["cache_hit"] = hit
+        metadata["cache_shared"] = shared
+        return replace(result, metadata=metadata)
+    
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.shared + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "hit_rate": (self.hits + self.shared) / total if total else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+
 class AsyncToolExecutor(IToolExecutor, AsyncContextManager):
     """改进的异步工具执行器
     
@@ -139,6 +276,8 @@ class AsyncToolExecutor(IToolExecutor, AsyncContextManager):
         max_workers: int = 4,
         max_concurrent: int = 10,
         batch_size: int = 10,
+        result_cache_size: int = 1000,
+        default_cache_ttl: float = 300.0,
     ):
         """初始化改进的工具执行器
         
@@ -149,6 +288,8 @@ class AsyncToolExecutor(IToolExecutor, AsyncContextManager):
             max_workers: 最大并行工作线程数（仅用于同步工具）
             max_concurrent: 最大并发数
             batch_size: 批处理大小
+            result_cache_size: 结果缓存最大条目数
+            default_cache_ttl: 工具配置未指定 cache_ttl 时的默认缓存有效期（秒）
         """
         self.tool_manager = tool_manager
         self.logger = logger
@@ -159,6 +300,10 @@ class AsyncToolExecutor(IToolExecutor, AsyncContextManager):
         self.concurrency_limiter = ConcurrencyLimiter(max_concurrent)
         self.batch_processor = AsyncBatchProcessor(batch_size)
         
+        # 幂等工具结果缓存
+        self.result_cache = ToolResultCache(result_cache_size)
+        self.default_cache_ttl = default_cache_ttl
+        
         # 线程池（仅用于同步工具）
         self._thread_pool: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers)
         self._lock = AsyncLock()
@@ -468,6 +613,56 @@ class AsyncToolExecutor(IToolExecutor, AsyncContextManager):
     async def execute_async(self, tool_call: ToolCall) -> ToolResult:
         """异步执行工具调用
         
+        工具配置声明 cacheable 时，先查询结果缓存，并对并发的相同调用去重。
+        
+        Args:
+            tool_call: 工具调用请求
+            
+        Returns:
+            ToolResult: 执行结果
+        """
+        ttl = await self._get_cache_ttl(tool_call.name)
+        key = self.result_cache.make_key(tool_call.name, tool_call.arguments) if ttl else None
+        if key is None:
+            return await self._execute_async_uncached(tool_call)
+        
+        return await self.result_cache.get_or_execute(
+            key, ttl, lambda: self._execute_async_uncached(tool_call)
+        )
+    
+    async def _get_cache_ttl(self, tool_name: str) -> Optional[float]:
+        """获取工具的缓存有效期，工具不可缓存时返回None
+        
+        读取工具配置中的 cacheable 和 cache_ttl 字段。
+        """
+        try:
+            tool = self.tool_manager.get_tool(tool_name)
+            if inspect.isawaitable(tool):
+                tool = await tool
+        except Exception:
+            return None
+        
+        config = getattr(tool, "config", None)
+        if config is None:
+            return None
+        if isinstance(config, dict):
+            cacheable = config.get("cacheable", False)
+            cache_ttl = config.get("cache_ttl")
+        else:
+            cacheable = getattr(config, "cacheable", False)
+            cache_ttl = getattr(config, "cache_ttl", None)
+        
+        if cacheable is not True:
+            return None
+        return float(cache_ttl) if cache_ttl is not None else self.default_cache_ttl
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取结果缓存统计信息"""
+        return self.result_cache.get_stats()
+    
+    async def _execute_async_uncached(self, tool_call: ToolCall) -> ToolResult:
+        """异步执行工具调用（不经过结果缓存）
+        
         策略：
         - 优先调用工具的 execute_async() 方法
         - 对于纯同步工具，在线程池中执行
@@ -726,6 +921,7 @@ class AsyncToolExecutor(IToolExecutor, AsyncContextManager):
     
     async def cleanup(self) -> None:
         """清理资源"""
+        self.result_cache.clear()
         if self._thread_pool:
             self._thread_pool.shutdown(wait=True)
             self.logger.info("线程池已关闭")
\ No newline at end of file
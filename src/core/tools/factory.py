@@ -128,6 +128,8 @@ class OptimizedToolFactory(IToolFactory):
                     self.name = config_dict.get('name')
                     self.description = config_dict.get('description')
                     self.parameters_schema = config_dict.get('parameters_schema', {})
+                    self.cacheable = config_dict.get('cacheable', False)
+                    self.cache_ttl = config_dict.get('cache_ttl')
             
             config_obj = SimpleConfig(config)
             return BuiltinTool(func, config_obj)
@@ -206,6 +208,8 @@ class OptimizedToolFactory(IToolFactory):
                     self.auth_method = config_dict.get('auth_method')
                     self.api_key = config_dict.get('api_key')
                     self.timeout = config_dict.get('timeout', 30)
+                    self.cacheable = config_dict.get('cacheable', False)
+                    self.cache_ttl = config_dict.get('cache_ttl')
             
             config_obj = SimpleConfig(config)
             return RestTool(config_obj, self.state_manager)
@@ -0,0 +1,309 @@
+"""工具HTTP连接池
+
+为REST工具、fetch 和 DuckDuckGo 搜索等网络类工具提供进程级共享的 aiohttp 会话：
+按主机限制连接数、缓存DNS解析结果、复用keep-alive连接，并以流式方式读取响应体，
+超过大小上限时立即中止读取。
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Coroutine, Dict, Optional, TypeVar, Union
+
+import aiohttp
+
+from src.interfaces.dependency_injection import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_RESPONSE_SIZE = 5 * 1024 * 1024  # 5MB
+
+
+class ResponseTooLargeError(ValueError):
+    """响应体超过大小上限"""
+    
+    def __init__(self, max_size: int):
+        super().__init__(f"Response too large (exceeds {max_size} bytes limit)")
+        self.max_size = max_size
+
+
+@dataclass
+class ToolHTTPPoolConfig:
+    """工具HTTP连接池配置"""
+    
+    limit: int = 100  # 总连接数上限
+    limit_per_host: int = 10  # 单个主机的连接数上限
+    dns_cache_ttl: int = 300  # DNS缓存有效期（秒）
+    keepalive_timeout: float = 30.0  # 空闲连接保持时间（秒）
+    max_response_size: int = DEFAULT_MAX_RESPONSE_SIZE  # 默认响应体大小上限（字节）
+    read_chunk_size: int = 64 * 1024  # 流式读取的分块大小（字节）
+
+
+class ToolHTTPSessionPool:
+    """工具HTTP会话池
+    
+    aiohttp 会话与事件循环绑定，因此每个事件循环持有一个共享会话及其连接器。
+    同步工具（在线程池中执行）通过 run_sync 把协程提交到连接池自有的后台事件循环，
+    使得跨调用、跨线程的请求也能复用同一组keep-alive连接。
+    """
+    
+    def __init__(self, config: Optional[ToolHTTPPoolConfig] = None):
+        """初始化会话池
+        
+        Args:
+            config: 连接池配置
+        """
+        self.config = config or ToolHTTPPoolConfig()
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._lock = threading.Lock()
+        
+        # 供同步调用者使用的后台事件循环
+        self._background_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._background_thread: Optional[threading.Thread] = None
+        
+        self._stats: Dict[str, Any] = {
+            "total_requests": 0,
+            "failed_requests": 0,
+            "active_requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+            "bytes_received": 0,
+            "oversized_responses": 0,
+            "sessions_created": 0,
+            "requests_by_host": {},
+        }
+    
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        """创建用于统计连接复用和DNS缓存命中的跟踪配置"""
+        stats = self._stats
+        
+        def counter(key: str) -> Any:
+            async def on_event(session: Any, context: Any, params: Any) -> None:
+                stats[key] += 1
+            return on_event
+        
+        async def on_request_start(session: Any, context: Any, params: Any) -> None:
+            host = params.url.host or ""
+            requests_by_host = stats["requests_by_host"]
+            requests_by_host[host] = requests_by_host.get(host, 0) + 1
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(counter("connections_created"))
+        trace_config.on_connection_reuseconn.append(counter("connections_reused"))
+        trace_config.on_dns_cache_hit.append(counter("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(counter("dns_cache_misses"))
+        return trace_config
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环的共享会话
+        
+        Returns:
+            aiohttp.ClientSession: 共享会话
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is not None and not session.closed:
+                return session
+            
+            # 清理已关闭事件循环遗留的会话
+            for stale_loop in [item for item in self._sessions if item.is_closed()]:
+                del self._sessions[stale_loop]
+            
+            connector = aiohttp.TCPConnector(
+                limit=self.config.limit,
+                limit_per_host=self.config.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.config.dns_cache_ttl,
+                keepalive_timeout=self.config.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self._create_trace_config()],
+            )
+            self._sessions[loop] = session
+            self._stats["sessions_created"] += 1
+            return session
+    
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[Union[float, aiohttp.ClientTimeout]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """使用共享会话发送请求
+        
+        响应体不会被预先读取，调用者应使用 read_body / read_text / iter_body 读取。
+        
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            timeout: 总超时时间（秒）或 aiohttp.ClientTimeout
+            **kwargs: 传递给 aiohttp 的其他请求参数
+        
+        Yields:
+            aiohttp.ClientResponse: 响应对象
+        """
+        session = await self.get_session()
+        if timeout is not None and not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        
+        self._stats["total_requests"] += 1
+        self._stats["active_requests"] += 1
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                yield response
+        except Exception:
+            self._stats["failed_requests"] += 1
+            raise
+        finally:
+            self._stats["active_requests"] -= 1
+    
+    async def iter_body(
+        self,
+        response: aiohttp.ClientResponse,
+        max_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """流式读取响应体
+        
+        Args:
+            response: 响应对象
+            max_size: 响应体大小上限，None表示使用配置的默认值
+        
+        Yields:
+            bytes: 响应体分块
+        
+        Raises:
+            ResponseTooLargeError: 响应体超过大小上限
+        """
+        limit = self.config.max_response_size if max_size is None else max_size
+        if response.content_length is not None and response.content_length > limit:
+            self._stats["oversized_responses"] += 1
+            raise ResponseTooLargeError(limit)
+        
+        received = 0
+        async for chunk in response.content.iter_chunked(self.config.read_chunk_size):
+            received += len(chunk)
+            self._stats["bytes_received"] += len(chunk)
+            if received > limit:
+                self._stats["oversized_responses"] += 1
+                # 不再读取剩余内容，连接随之关闭而不是放回池中
+                response.close()
+                raise ResponseTooLargeError(limit)
+            yield chunk
+    
+    async def read_body(self, response: aiohttp.ClientResponse, max_size: Optional[int] = None) -> bytes:
+        """读取完整响应体（受大小上限约束）"""
+        body = bytearray()
+        async for chunk in self.iter_body(response, max_size):
+            body += chunk
+        return bytes(body)
+    
+    async def read_text(self, response: aiohttp.ClientResponse, max_size: Optional[int] = None) -> str:
+        """读取响应体并按响应声明的字符集解码（受大小上限约束）"""
+        body = await self.read_body(response, max_size)
+        return body.decode(response.charset or "utf-8", errors="replace")
+    
+    def run_sync(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """在连接池的后台事件循环中运行协程并等待结果
+        
+        供同步工具函数使用，替代每次调用都新建事件循环（导致无法复用连接）的做法。
+        
+        Args:
+            coro: 协程
+            timeout: 等待结果的超时时间（秒）
+        
+        Returns:
+            协程的返回值
+        """
+        loop = self._ensure_background_loop()
+        if threading.current_thread() is self._background_thread:
+            coro.close()
+            raise RuntimeError("run_sync cannot be called from the pool's own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+    
+    def _ensure_background_loop(self) -> asyncio.AbstractEventLoop:
+        """启动（或返回已启动的）后台事件循环"""
+        with self._lock:
+            if self._background_loop is not None and not self._background_loop.is_closed():
+                return self._background_loop
+            
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="tool-http-pool",
+                daemon=True
+            )
+            thread.start()
+            self._background_loop = loop
+            self._background_thread = thread
+            logger.debug("工具HTTP连接池后台事件循环已启动")
+            return loop
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        with self._lock:
+            open_sessions = sum(1 for session in self._sessions.values() if not session.closed)
+        stats = dict(self._stats)
+        stats["requests_by_host"] = dict(self._stats["requests_by_host"])
+        stats["open_sessions"] = open_sessions
+        stats["limit"] = self.config.limit
+        stats["limit_per_host"] = self.config.limit_per_host
+        reusable = stats["connections_created"] + stats["connections_reused"]
+        stats["connection_reuse_rate"] = stats["connections_reused"] / reusable if reusable else 0.0
+        stats["timestamp"] = time.time()
+        return stats
+    
+    async def close(self) -> None:
+        """关闭当前事件循环的共享会话"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+    
+    def shutdown(self) -> None:
+        """关闭后台事件循环及其会话"""
+        with self._lock:
+            loop = self._background_loop
+            thread = self._background_thread
+            self._background_loop = None
+            self._background_thread = None
+        if loop is None or loop.is_closed():
+            return
+        
+        asyncio.run_coroutine_threadsafe(self.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
+
+
+_global_pool: Optional[ToolHTTPSessionPool] = None
+_global_pool_lock = threading.Lock()
+
+
+def get_tool_http_pool() -> ToolHTTPSessionPool:
+    """
+    获取全局工具HTTP会话池实例
+    
+    Returns:
+        ToolHTTPSessionPool: 会话池实例
+    """
+    global _global_pool
+    if _global_pool is None:
+        with _global_pool_lock:
+            if _global_pool is None:
+                _global_pool = ToolHTTPSessionPool()
+    return _global_pool
@@ -4,7 +4,7 @@ DuckDuckGo搜索工具实现
 提供使用DuckDuckGo搜索引擎进行网络搜索和获取网页内容的功能。
 """
 
-import httpx
+import aiohttp
 from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 from dataclasses import dataclass
@@ -88,6 +88,7 @@ class RateLimiter:
 
 # 从fetch.py导入浏览器头部管理功能
 from .fetch import get_browser_headers
+from src.core.tools.http_pool import get_tool_http_pool
 
 
 def _load_duckduckgo_config():
@@ -187,16 +188,17 @@ class DuckDuckGoSearcher:
         timeout = self.config.get("timeout", 30.0)
         retry_delay = self.config.get("retry_delay", 1.0)
 
+        pool = get_tool_http_pool()
         for attempt in range(max_retries):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        self.BASE_URL, data=data, headers=headers, timeout=timeout
-                    )
+                async with pool.request(
+                    "POST", self.BASE_URL, timeout=timeout, data=data, headers=headers
+                ) as response:
                     response.raise_for_status()
+                    page = await pool.read_text(response)
 
                 # 解析HTML响应
-                soup = BeautifulSoup(response.text, "html.parser")
+                soup = BeautifulSoup(page, "html.parser")
                 if not soup:
                     return []
 
@@ -242,20 +244,20 @@ class DuckDuckGoSearcher:
 
                 return results
 
-            except httpx.TimeoutException:
+            except asyncio.TimeoutError:
                 if attempt < max_retries - 1:  # 不是最后一次尝试
                     await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
                     continue
                 return []
-            except httpx.HTTPStatusError as e:
+            except aiohttp.ClientResponseError as e:
                 # 对于特定的HTTP状态码，我们可能想要立即返回而不是重试
-                if e.response.status_code in [403, 404, 429]:
+                if e.status in [403, 404, 429]:
                     return []  # 直接返回空结果
                 if attempt < max_retries - 1:  # 不是最后一次尝试
                     await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
                     continue
                 return []
-            except httpx.HTTPError:
+            except aiohttp.ClientError:
                 if attempt < max_retries - 1:  # 不是最后一次尝试
                     await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
                     continue
@@ -295,19 +297,21 @@ class WebContentFetcher:
         web_timeout = self.config.get("web_timeout", self.config.get("timeout", 30.0))
         web_retry_delay = self.config.get("web_retry_delay", self.config.get("retry_delay", 1.0))
 
+        pool = get_tool_http_pool()
         for attempt in range(web_max_retries):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        url,
-                        headers=headers,
-                        follow_redirects=True,
-                        timeout=web_timeout,
-                    )
+                async with pool.request(
+                    "GET",
+                    url,
+                    timeout=web_timeout,
+                    headers=headers,
+                    allow_redirects=True,
+                ) as response:
                     response.raise_for_status()
+                    page = await pool.read_text(response)
 
                 # 解析HTML
-                soup = BeautifulSoup(response.text, "html.parser")
+                soup = BeautifulSoup(page, "html.parser")
 
                 # 移除脚本和样式元素
                 for element in soup(["script", "style", "nav", "header", "footer"]):
@@ -331,20 +335,20 @@ class WebContentFetcher:
 
                 return text
 
-            except (httpx.TimeoutException, asyncio.TimeoutError):
+            except asyncio.TimeoutError:
                 if attempt < web_max_retries - 1:  # 不是最后一次尝试
                     await asyncio.sleep(web_retry_delay * (2 ** attempt))  # 指数退避
                     continue
                 return "Error: The request timed out while trying to fetch the webpage."
-            except httpx.HTTPStatusError as e:
+            except aiohttp.ClientResponseError as e:
                 # 对于特定的HTTP状态码，我们可能想要立即返回而不是重试
-                if e.response.status_code in [403, 404, 429]:
-                    return f"Error: Could not access the webpage (Status code: {e.response.status_code})"
+                if e.status in [403, 404, 429]:
+                    return f"Error: Could not access the webpage (Status code: {e.status})"
                 if attempt < web_max_retries - 1:  # 不是最后一次尝试
                     await asyncio.sleep(web_retry_delay * (2 ** attempt))  # 指数退避
                     continue
-                return f"Error: Could not access the webpage (Status code: {e.response.status_code})"
-            except httpx.HTTPError as e:
+                return f"Error: Could not access the webpage (Status code: {e.status})"
+            except aiohttp.ClientError as e:
                 if attempt < web_max_retries - 1:  # 不是最后一次尝试
                     await asyncio.sleep(web_retry_delay * (2 ** attempt))  # 指数退避
                     continue
@@ -384,11 +388,8 @@ def duckduckgo_search(query: str, max_results: int = 10) -> Dict[str, Any]:
         raise ValueError("Max results must be between 1 and 50")
     
     try:
-        # 运行异步搜索
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        results = loop.run_until_complete(searcher.search(query, max_results))
-        loop.close()
+        # 在共享连接池的事件循环中运行异步搜索
+        results = get_tool_http_pool().run_sync(searcher.search(query, max_results))
         
         # 格式化结果
         formatted_results = searcher.format_results_for_llm(results)
@@ -432,11 +433,8 @@ def fetch_web_content(url: str) -> Dict[str, Any]:
         raise ValueError("URL must start with http:// or https://")
     
     try:
-        # 运行异步获取
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        content = loop.run_until_complete(fetcher.fetch_and_parse(url))
-        loop.close()
+        # 在共享连接池的事件循环中运行异步获取
+        content = get_tool_http_pool().run_sync(fetcher.fetch_and_parse(url))
         
         content_truncate_limit = fetcher.config.get("content_truncate_limit", 8000)
         return {
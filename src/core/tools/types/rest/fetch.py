@@ -4,16 +4,16 @@
 提供从URL获取网页内容并将其转换为多种格式的功能。
 """
 
-import asyncio
 import re
 import random
 from typing import Dict, Any, Tuple, Optional, List
 from urllib.parse import urlparse, urlunparse
 
-import httpx
 import markdownify
 import readabilipy
 
+from src.core.tools.http_pool import ResponseTooLargeError, get_tool_http_pool
+
 # 导入BeautifulSoup用于文本提取(需要移除时将BS4_AVAILABLE设置为False即可)
 from bs4 import BeautifulSoup
 BS4_AVAILABLE = True
@@ -294,6 +294,32 @@ def clean_markdown_content(markdown: str) -> str:
     return markdown
 
 
+async def _get_page(
+    url: str,
+    headers: dict,
+    timeout: int,
+    proxy_url: Optional[str] = None,
+) -> Tuple[int, str, str]:
+    """通过共享连接池获取页面，响应体流式读取并受 MAX_RESPONSE_SIZE 限制
+    
+    Returns:
+        (状态码, Content-Type, 页面文本)，状态码>=400时不读取响应体
+    """
+    pool = get_tool_http_pool()
+    async with pool.request(
+        "GET",
+        url,
+        timeout=timeout,
+        headers=headers,
+        proxy=proxy_url,
+        allow_redirects=True,
+    ) as response:
+        if response.status >= 400:
+            return response.status, "", ""
+        page_raw = await pool.read_text(response, MAX_RESPONSE_SIZE)
+        return response.status, response.headers.get("content-type", ""), page_raw
+
+
 async def fetch_url_content(
     url: str,
     user_agent: Optional[str] = None,
@@ -330,56 +356,42 @@ async def fetch_url_content(
     timeout = min((timeout or DEFAULT_TIMEOUT), MAX_TIMEOUT)
     
     # 如果是HTTP URL，尝试HTTPS版本
-    original_url = url
-    response = None
-    
-    if is_http_url(url):
-        https_url = convert_http_to_https(url)
-        # 首先尝试HTTPS版本
-        try:
-            async with httpx.AsyncClient(proxy=proxy_url) as client:
-                response = await client.get(
-                    https_url,
-                    follow_redirects=True,
-                    headers=headers,
-                    timeout=timeout,
-                )
-                if response.status_code < 400:
+    page = None
+    
+    try:
+        if is_http_url(url):
+            https_url = convert_http_to_https(url)
+            # 首先尝试HTTPS版本
+            try:
+                page = await _get_page(https_url, headers, timeout, proxy_url)
+                if page[0] < 400:
                     url = https_url  # 使用HTTPS URL
                 else:
                     # 如果HTTPS失败，回退到HTTP
-                    url = original_url
-        except Exception:
-            # 如果HTTPS连接失败，回退到HTTP
-            url = original_url
-    
-    # 如果还没有成功获取响应，执行HTTP请求
-    if response is None:
-        async with httpx.AsyncClient(proxy=proxy_url) as client:
+                    page = None
+            except ResponseTooLargeError:
+                raise
+            except Exception:
+                # 如果HTTPS连接失败，回退到HTTP
+                page = None
+        
+        # 如果还没有成功获取响应，执行HTTP请求
+        if page is None:
             try:
-                response = await client.get(
-                    url,
-                    follow_redirects=True,
-                    headers=headers,
-                    timeout=timeout,
-                )
+                page = await _get_page(url, headers, timeout, proxy_url)
+            except ResponseTooLargeError:
+                raise
             except Exception as e:
                 return f"<error>Failed to fetch {url}: {str(e)}</error>", ""
-    
-    # 检查状态码
-    if response.status_code >= 400:
-        return f"<error>Failed to fetch {url} - Status code {response.status_code}</error>", ""
-    
-    # 检查内容长度
-    content_length = response.headers.get("content-length")
-    if content_length and int(content_length) > MAX_RESPONSE_SIZE:
+    except ResponseTooLargeError:
         return f"<error>Response too large (exceeds {MAX_RESPONSE_SIZE} bytes limit)</error>", ""
     
-    page_raw = response.text
-    if len(page_raw.encode('utf-8')) > MAX_RESPONSE_SIZE:
-        return f"<error>Response too large (exceeds {MAX_RESPONSE_SIZE} bytes limit)</error>", ""
+    status_code, content_type, page_raw = page
+    
+    # 检查状态码
+    if status_code >= 400:
+        return f"<error>Failed to fetch {url} - Status code {status_code}</error>", ""
 
-    content_type = response.headers.get("content-type", "")
     is_page_html = (
         "<html" in page_raw[:100].lower() or "text/html" in content_type.lower() or not content_type
     )
@@ -438,9 +450,9 @@ def fetch_url(
     if timeout is not None and (timeout <= 0 or timeout > MAX_TIMEOUT):
         raise ValueError(f"timeout必须在1到{MAX_TIMEOUT}秒之间")
     
-    # 异步获取URL内容
+    # 在共享连接池的事件循环中获取URL内容，跨调用复用keep-alive连接
     try:
-        content, prefix = asyncio.run(fetch_url_content(
+        content, prefix = get_tool_http_pool().run_sync(fetch_url_content(
             url=url,
             user_agent=user_agent,
             force_raw=raw,
@@ -14,6 +14,7 @@ import aiohttp
 from pydantic import BaseModel
 
 from ..base_stateful import StatefulBaseTool
+from ..http_pool import ToolHTTPSessionPool, get_tool_http_pool
 
 
 class HTTPAuth(BaseModel):
@@ -32,12 +33,13 @@ class RestTool(StatefulBaseTool):
     但业务逻辑上是无状态的，每次调用不依赖于之前的调用结果。
     """
 
-    def __init__(self, config: Any, state_manager):
+    def __init__(self, config: Any, state_manager, http_pool: Optional[ToolHTTPSessionPool] = None):
         """初始化REST工具
         
         Args:
             config: REST工具配置
             state_manager: 状态管理器
+            http_pool: HTTP会话池，默认使用进程级共享的会话池
         """
         super().__init__(
             name=config.name,
@@ -46,27 +48,23 @@ class RestTool(StatefulBaseTool):
             state_manager=state_manager,
             config=config
         )
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._http_pool = http_pool or get_tool_http_pool()
 
-    async def _get_persistent_session(self) -> aiohttp.ClientSession:
-        """获取持久化HTTP会话"""
-        # 检查连接状态
+    def _mark_session_active(self) -> None:
+        """记录共享会话的使用状态"""
         conn_state = self.get_connection_state()
+        if conn_state and conn_state.get("session_active"):
+            return
         
-        if conn_state and conn_state.get("session_active") and self._session:
-            if not self._session.closed:
-                return self._session
-        
-        # 创建新会话并维护状态
-        timeout = aiohttp.ClientTimeout(total=self.config.timeout)
-        self._session = aiohttp.ClientSession(timeout=timeout)
         self.update_connection_state({
             "session_active": True,
             "created_at": time.time(),
             "last_used": time.time()
         })
-        
-        return self._session
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """获取共享HTTP连接池统计信息"""
+        return self._http_pool.get_stats()
 
     def _build_headers(self, parameters: Dict[str, Any]) -> Dict[str, str]:
         """构建HTTP请求头
@@ -185,8 +183,8 @@ class RestTool(StatefulBaseTool):
             Any: 执行结果
         """
         try:
-            # 获取HTTP会话
-            session = await self._get_persistent_session()
+            # 使用共享会话池，复用到同一主机的keep-alive连接
+            self._mark_session_active()
 
             # 构建请求
             headers = self._build_headers(kwargs)
@@ -194,19 +192,21 @@ class RestTool(StatefulBaseTool):
             data = self._build_request_data(kwargs)
 
             # 发送请求
-            async with session.request(
-                method=self.config.method,
-                url=url,
+            async with self._http_pool.request(
+                self.config.method,
+                url,
+                timeout=self.config.timeout,
                 headers=headers,
                 json=data if isinstance(data, dict) else None,
                 data=data if not isinstance(data, dict) else None,
             ) as response:
-                # 读取响应数据
+                # 读取响应数据（受响应体大小上限约束）
+                max_size = getattr(self.config, "max_response_size", None)
                 content_type = response.headers.get("Content-Type", "")
                 if "application/json" in content_type:
-                    response_data = await response.json()
+                    response_data = json.loads(await self._http_pool.read_body(response, max_size))
                 else:
-                    response_data = await response.text()
+                    response_data = await self._http_pool.read_text(response, max_size)
 
                 # 解析并返回结果
                 result = self._parse_response(response, response_data)
@@ -227,7 +227,7 @@ class RestTool(StatefulBaseTool):
         except Exception as e:
             raise ValueError(f"工具执行错误: {str(e)}")
         finally:
-            # 不关闭会话，保持持久化
+            # 会话由共享会话池持有，不在此关闭
             pass
 
     async def __aenter__(self) -> "RestTool":
@@ -236,5 +236,4 @@ class RestTool(StatefulBaseTool):
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """异步上下文管理器出口"""
-        if self._session and not self._session.closed:
-            await self._session.close()
\ No newline at end of file
+        # 会话由共享会话池持有，其他工具实例可能仍在使用，不在此关闭
\ No newline at end of file
@@ -221,7 +221,7 @@ class MemoryCheckpointBackend(BaseCheckpointBackend):
             type_counts[cp_type] = type_counts.get(cp_type, 0) + 1
             
             # 大小和恢复统计
-            total_size += checkpoint.size_bytes
+            total_size += checkpoint.get_size_bytes()
             total_restores += checkpoint.restore_count
             
             # 年龄统计
@@ -95,7 +95,10 @@ class CacheStats:
 class CacheManager:
     """增强的缓存管理器，整合了基础设施层的高级功能
     
-    修复了双重缓存存储问题，现在使用统一的缓存存储机制
+    修复了双重缓存存储问题，现在使用统一的缓存存储机制。
+    
+    缓存操作都是加锁的内存操作，核心逻辑以同步方法（*_sync）实现，
+    同步调用方直接使用，异步方法仅委托给同步核心，不涉及事件循环切换。
     """
     
     def __init__(self,
@@ -160,8 +163,8 @@ class CacheManager:
                 self._cache_entries[name] = OrderedDict()
             return self._cache_entries[name]
 
-    async def get(self, key: str, cache_name: str = 'default') -> Optional[Any]:
-        """获取缓存值
+    def get_sync(self, key: str, cache_name: str = 'default') -> Optional[Any]:
+        """获取缓存值（同步核心）
         Args:
             key: 缓存键
             cache_name: 缓存名称，默认为'default'
@@ -191,7 +194,7 @@ class CacheManager:
                 self._record_miss()
                 return None
 
-    async def set(
+    def set_sync(
         self,
         key: str,
         value: Any,
@@ -199,7 +202,7 @@ class CacheManager:
         cache_name: str = 'default',
         metadata: Optional[Dict[str, Any]] = None
     ) -> None:
-        """设置缓存值
+        """设置缓存值（同步核心）
         Args:
             key: 缓存键
             value: 缓存值
@@ -237,8 +240,8 @@ class CacheManager:
             cache_dict[key] = entry
             cache_dict.move_to_end(key)
 
-    async def delete(self, key: str, cache_name: str = 'default') -> bool:
-        """删除缓存项
+    def delete_sync(self, key: str, cache_name: str = 'default') -> bool:
+        """删除缓存项（同步核心）
         Args:
             key: 缓存键
             cache_name: 缓存名称，默认为'default'
@@ -252,8 +255,8 @@ class CacheManager:
                 return True
             return False
 
-    async def clear(self, cache_name: Optional[str] = None) -> None:
-        """清空缓存
+    def clear_sync(self, cache_name: Optional[str] = None) -> None:
+        """清空缓存（同步核心）
         Args:
             cache_name: 缓存名称，如果为None则清空所有缓存
         """
@@ -265,8 +268,8 @@ class CacheManager:
                 for cache_dict in self._cache_entries.values():
                     cache_dict.clear()
 
-    async def exists(self, key: str, cache_name: str = 'default') -> bool:
-        """检查缓存项是否存在且未过期
+    def exists_sync(self, key: str, cache_name: str = 'default') -> bool:
+        """检查缓存项是否存在且未过期（同步核心）
         Args:
             key: 缓存键
             cache_name: 缓存名称，默认为'default'
@@ -283,6 +286,80 @@ class CacheManager:
                 return True
             return False
 
+    def cleanup_expired_sync(self, cache_name: str = 'default') -> int:
+        """清理过期缓存项（同步核心）
+        Args:
+            cache_name: 缓存名称，默认为'default'
+        Returns:
+            清理的项数
+        """
+        with self._cache_lock:
+            if cache_name not in self._cache_entries:
+                return 0
+                
+            cache_dict = self._cache_entries[cache_name]
+            expired_keys = [key for key, entry in cache_dict.items() if entry.is_expired()]
+            
+            for key in expired_keys:
+                del cache_dict[key]
+            
+            return len(expired_keys)
+
+    async def get(self, key: str, cache_name: str = 'default') -> Optional[Any]:
+        """获取缓存值
+        Args:
+            key: 缓存键
+            cache_name: 缓存名称，默认为'default'
+        Returns:
+            缓存值，如果不存在或过期则返回None
+        """
+        return self.get_sync(key, cache_name)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        cache_name: str = 'default',
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """设置缓存值
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: TTL（秒），如果为None则使用默认值
+            cache_name: 缓存名称，默认为'default'
+            metadata: 元数据（暂未使用，为未来扩展保留）
+        """
+        self.set_sync(key, value, ttl, cache_name, metadata)
+
+    async def delete(self, key: str, cache_name: str = 'default') -> bool:
+        """删除缓存项
+        Args:
+            key: 缓存键
+            cache_name: 缓存名称，默认为'default'
+        Returns:
+            是否删除成功
+        """
+        return self.delete_sync(key, cache_name)
+
+    async def clear(self, cache_name: Optional[str] = None) -> None:
+        """清空缓存
+        Args:
+            cache_name: 缓存名称，如果为None则清空所有缓存
+        """
+        self.clear_sync(cache_name)
+
+    async def exists(self, key: str, cache_name: str = 'default') -> bool:
+        """检查缓存项是否存在且未过期
+        Args:
+            key: 缓存键
+            cache_name: 缓存名称，默认为'default'
+        Returns:
+            是否存在
+        """
+        return self.exists_sync(key, cache_name)
+
     def _record_hit(self) -> None:
         """记录缓存命中（线程安全）"""
         with self._stats_lock:
@@ -330,22 +407,7 @@ class CacheManager:
         Returns:
             清理的项数
         """
-        with self._cache_lock:
-            if cache_name not in self._cache_entries:
-                return 0
-                
-            expired_keys = []
-            current_time = time.time()
-            cache_dict = self._cache_entries[cache_name]
-            
-            for key, entry in cache_dict.items():
-                if entry.is_expired():
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                del cache_dict[key]
-            
-            return len(expired_keys)
+        return self.cleanup_expired_sync(cache_name)
 
     async def get_all_keys(self, cache_name: str = 'default') -> List[str]:
         """获取所有缓存键（不包含过期项）
@@ -354,10 +416,9 @@ class CacheManager:
         Returns:
             缓存键列表
         """
-        # 先清理过期项
-        await self.cleanup_expired(cache_name)
-        
         with self._cache_lock:
+            # 先清理过期项
+            self.cleanup_expired_sync(cache_name)
             return list(self._cache_entries.get(cache_name, {}).keys())
 
     async def get_many(self, keys: List[str], cache_name: str = 'default') -> Dict[str, Any]:
@@ -370,7 +431,7 @@ class CacheManager:
         """
         result = {}
         for key in keys:
-            value = await self.get(key, cache_name)
+            value = self.get_sync(key, cache_name)
             if value is not None:
                 result[key] = value
         return result
@@ -383,15 +444,11 @@ class CacheManager:
             cache_name: 缓存名称，默认为'default'
         """
         for key, value in items.items():
-            await self.set(key, value, ttl, cache_name)
+            self.set_sync(key, value, ttl, cache_name)
 
     def clear_cache(self, name: Optional[str] = None) -> None:
         """清除缓存（兼容原有接口）"""
-        import asyncio
-        if name:
-            asyncio.create_task(self.clear(name))
-        else:
-            asyncio.create_task(self.clear())
+        self.clear_sync(name)
 
     def get_cache_info(self, name: str) -> Dict[str, Any]:
         """获取缓存信息（兼容原有接口）"""
@@ -442,7 +499,7 @@ class CacheManager:
             try:
                 # 清理所有缓存的过期项
                 for cache_name in list(self._cache_entries.keys()):
-                    cleaned_count = await self.cleanup_expired(cache_name)
+                    cleaned_count = self.cleanup_expired_sync(cache_name)
                     if cleaned_count > 0:
                         logger.debug(f"缓存 '{cache_name}' 清理了 {cleaned_count} 个过期项")
                 
@@ -489,8 +546,8 @@ def clear_cache(name: Optional[str] = None) -> None:
 class BaseCache:
     """基础缓存类
     
-    提供同步接口，内部基于CacheManager的同步操作。
-    所有缓存操作都是同步的，因为缓存存储是内存操作，不涉及I/O阻塞。
+    提供同步接口，直接调用CacheManager的同步核心（*_sync）。
+    缓存存储是加锁的内存操作，不涉及I/O阻塞，因此无需经过事件循环。
     """
     
     def __init__(self, cache_name: str, default_ttl: int) -> None:
@@ -504,23 +561,6 @@ class BaseCache:
         self._cache_name = cache_name
         self._default_ttl = default_ttl
     
-    def _run_async(self, coro: Any) -> Any:
-        """同步运行异步协程的通用方法
-        
-        Args:
-            coro: 要运行的异步协程
-            
-        Returns:
-            协程的返回值
-        """
-        try:
-            return asyncio.run(coro)
-        except RuntimeError:
-            # 如果当前已有事件循环，则创建新线程来运行
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                return executor.submit(asyncio.run, coro).result()
-    
     def get(self, key: str) -> Optional[Any]:
         """同步获取缓存值
         
@@ -530,7 +570,7 @@ class BaseCache:
         Returns:
             缓存值，如果不存在或过期则返回None
         """
-        return self._run_async(self._manager.get(key, self._cache_name))
+        return self._manager.get_sync(key, self._cache_name)
     
     def put(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """同步设置缓存值
@@ -540,7 +580,7 @@ class BaseCache:
             value: 缓存值
             ttl: TTL（秒），如果为None则使用默认值
         """
-        self._run_async(self._manager.set(key, value, ttl or self._default_ttl, self._cache_name))
+        self._manager.set_sync(key, value, ttl or self._default_ttl, self._cache_name)
     
     def remove(self, key: str) -> bool:
         """同步删除指定的缓存键
@@ -551,12 +591,11 @@ class BaseCache:
         Returns:
             是否删除成功
         """
-        result = self._run_async(self._manager.delete(key, self._cache_name))
-        return bool(result)
+        return bool(self._manager.delete_sync(key, self._cache_name))
     
     def clear(self) -> None:
         """同步清空缓存"""
-        self._run_async(self._manager.clear(self._cache_name))
+        self._manager.clear_sync(self._cache_name)
 
 
 class ConfigCache(BaseCache):
@@ -5,14 +5,118 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Type, TYPE_CHECKING
+import inspect
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type, TYPE_CHECKING, Union
 
 from ..types import START, END
 
 if TYPE_CHECKING:
     from .state_graph import StateGraphEngine
 
-__all__ = ("GraphCompiler", "CompiledGraph")
+__all__ = ("GraphCompiler", "CompiledGraph", "ConditionalRouter", "build_adjacency")
+
+
+class ConditionalRouter:
+    """已解析的条件边路由器。
+    
+    调用路径函数得到路由键，再通过路径映射解析为目标节点。
+    未提供路径映射时，路由键即为目标节点名称；路径映射为节点名列表时，
+    视为每个节点名映射到自身。路由在执行引擎中同步求值，路径函数必须是同步函数。
+    """
+    
+    __slots__ = ("source", "path", "path_map")
+    
+    def __init__(
+        self,
+        source: str,
+        path: Callable[..., Any],
+        path_map: Optional[Union[Dict[Any, str], Sequence[str]]] = None
+    ):
+        """初始化路由器。
+        
+        Raises:
+            TypeError: 路径函数是异步函数，或路径映射类型不受支持
+        """
+        if inspect.iscoroutinefunction(path) or inspect.iscoroutinefunction(
+            getattr(path, "__call__", None)
+        ):
+            raise TypeError(f"条件边 '{source}' 的路径函数不能是异步函数")
+        if path_map is not None and not isinstance(path_map, dict):
+            if isinstance(path_map, (str, bytes)) or not isinstance(path_map, Sequence):
+                raise TypeError(
+                    f"条件边 '{source}' 的路径映射必须是字典或节点名列表，"
+                    f"实际为 {type(path_map).__name__}"
+                )
+            path_map = {name: name for name in path_map}
+        self.source = source
+        self.path = path
+        self.path_map = path_map
+    
+    def route(self, state: Any) -> List[str]:
+        """根据状态计算目标节点。
+        
+        Args:
+            state: 当前状态
+            
+        Returns:
+            目标节点列表
+            
+        Raises:
+            ValueError: 路由键不在路径映射中
+            TypeError: 路径函数返回了可等待对象
+        """
+        result = self.path(state)
+        if inspect.isawaitable(result):
+            if inspect.iscoroutine(result):
+                result.close()
+            raise TypeError(f"条件边 '{self.source}' 的路径函数不能返回可等待对象")
+        if result is None:
+            return []
+        keys = result if isinstance(result, (list, tuple)) else [result]
+        if self.path_map is None:
+            return [str(key) for key in keys]
+        
+        targets = []
+        for key in keys:
+            if key not in self.path_map:
+                raise ValueError(
+                    f"条件边 '{self.source}' 的路由结果 '{key}' 不在路径映射中"
+                )
+            targets.append(self.path_map[key])
+        return targets
+
+
+class NodeAdjacency:
+    """单个节点的出边索引。"""
+    
+    __slots__ = ("simple", "routers")
+    
+    def __init__(self) -> None:
+        self.simple: List[str] = []
+        self.routers: List[ConditionalRouter] = []
+
+
+def build_adjacency(edges: List[Dict[str, Any]]) -> Dict[str, NodeAdjacency]:
+    """根据编译后的边构建按源节点索引的后继表。
+    
+    Args:
+        edges: 编译后的边列表
+        
+    Returns:
+        源节点到出边索引的映射
+    """
+    adjacency: Dict[str, NodeAdjacency] = {}
+    for edge in edges:
+        entry = adjacency.get(edge["start"])
+        if entry is None:
+            entry = adjacency[edge["start"]] = NodeAdjacency()
+        if edge["type"] == "simple":
+            entry.simple.append(edge["end"])
+        elif edge["type"] == "conditional":
+            entry.routers.append(
+                ConditionalRouter(edge["start"], edge["path"], edge.get("path_map"))
+            )
+    return adjacency
 
 
 class CompiledGraph:
@@ -25,7 +129,8 @@ class CompiledGraph:
         edges: List[Dict[str, Any]],
         entry_point: str,
         state_schema: Type,
-        checkpointer: Optional[Any] = None
+        checkpointer: Optional[Any] = None,
+        adjacency: Optional[Dict[str, NodeAdjacency]] = None
     ):
         self.graph_id = graph_id
         self.nodes = nodes
@@ -34,28 +139,28 @@ class CompiledGraph:
         self.state_schema = state_schema
         self.checkpointer = checkpointer
         self.compiled_at = None  # 可以添加编译时间戳
+        self.adjacency = adjacency if adjacency is not None else build_adjacency(edges)
     
     def get_node(self, name: str) -> Optional[Any]:
         """获取节点。"""
         return self.nodes.get(name)
     
     def get_next_nodes(self, current_node: str, state: Any) -> List[str]:
-        """获取下一个节点列表。"""
-        next_nodes = []
+        """获取下一个节点列表。
         
-        # 查找简单边
-        for edge in self.edges:
-            if edge["start"] == current_node and edge["type"] == "simple":
-                next_nodes.append(edge["end"])
+        通过编译期构建的后继表查找，开销与节点出度成正比；
+        条件边会根据当前状态调用路径函数求值。
+        """
+        entry = self.adjacency.get(current_node)
+        if entry is None:
+            return []
         
-        # 查找条件边（简化实现）
-        for edge in self.edges:
-            if edge["start"] == current_node and edge["type"] == "conditional":
-                # 这里应该根据状态和条件函数确定下一个节点
-                # 简化实现，直接返回映射中的第一个节点
-                if edge.get("path_map"):
-                    next_nodes.extend(edge["path_map"].values())
+        if not entry.routers:
+            return list(entry.simple)
         
+        next_nodes = list(entry.simple)
+        for router in entry.routers:
+            next_nodes.extend(router.route(state))
         return next_nodes
 
 
@@ -82,7 +187,8 @@ class GraphCompiler:
             compiled_nodes[name] = {
                 "name": name,
                 "func": func,
-                "type": "node"
+                "type": "node",
+                "executor": graph.get_node_policy(name)
             }
         
         # 编译边
@@ -112,7 +218,8 @@ class GraphCompiler:
             edges=compiled_edges,
             entry_point=graph.entry_point or START,
             state_schema=graph.state_schema,
-            checkpointer=checkpointer
+            checkpointer=checkpointer,
+            adjacency=build_adjacency(compiled_edges)
         )
         
         return compiled_graph
\ No newline at end of file
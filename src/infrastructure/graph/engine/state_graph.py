@@ -10,6 +10,7 @@ from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, Union, As
 from src.interfaces.workflow.graph_engine import IGraphEngine
 from ..hooks import HookPoint, HookSystem, HookContext
 from ..types import START, END  # These are string constants from sys.intern()
+from ..execution.node_executor import ExecutorPolicy
 from .compiler import GraphCompiler
 from .node_builder import NodeBuilder
 from .edge_builder import EdgeBuilder
@@ -33,6 +34,7 @@ class StateGraphEngine(IGraphEngine):
         """
         self.state_schema = state_schema
         self.nodes: Dict[str, Callable] = {}
+        self.node_policies: Dict[str, str] = {}
         self.edges: List[Dict[str, Any]] = []
         self.conditional_edges: List[Dict[str, Any]] = []
         self.entry_point: Optional[str] = None
@@ -51,12 +53,15 @@ class StateGraphEngine(IGraphEngine):
         Args:
             name: 节点名称
             func: 节点函数
-            **kwargs: 额外参数
+            **kwargs: 额外参数，支持 executor 指定同步节点的执行策略
+                （"inline" / "thread" / "process"）
             
         Returns:
             自身实例，支持链式调用
         """
         self.nodes[name] = func
+        if kwargs.get("executor") is not None:
+            self.node_policies[name] = ExecutorPolicy(kwargs["executor"]).value
         return self
     
     def add_edge(self, start: str, end: str) -> StateGraphEngine:
@@ -80,14 +85,14 @@ class StateGraphEngine(IGraphEngine):
         self,
         source: str,
         path: Callable,
-        path_map: Optional[Dict] = None
+        path_map: Optional[Union[Dict, List[str]]] = None
     ) -> StateGraphEngine:
         """添加条件边。
         
         Args:
             source: 源节点
-            path: 路径函数
-            path_map: 路径映射
+            path: 路径函数，必须是同步函数
+            path_map: 路径映射，字典或节点名列表
             
         Returns:
             自身实例，支持链式调用
@@ -324,6 +329,17 @@ class StateGraphEngine(IGraphEngine):
         """
         return self.nodes.copy()
     
+    def get_node_policy(self, name: str) -> Optional[str]:
+        """获取节点的执行策略。
+        
+        Args:
+            name: 节点名称
+            
+        Returns:
+            执行策略，未指定时返回None
+        """
+        return self.node_policies.get(name)
+    
     def get_edges(self) -> List[Dict[str, Any]]:
         """获取所有边。
         
@@ -370,6 +386,7 @@ class StateGraphEngine(IGraphEngine):
         
         # 清理资源
         self.nodes.clear()
+        self.node_policies.clear()
         self.edges.clear()
         self.conditional_edges.clear()
         self.compiled_graph = None
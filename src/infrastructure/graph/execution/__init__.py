@@ -4,12 +4,16 @@
 """
 
 from .engine import ExecutionEngine
+from .node_executor import ExecutorPolicy, NodeExecutor, NodeExecutorConfig
 from .scheduler import TaskScheduler
 from .state_manager import StateManager
 from .stream_processor import StreamProcessor
 
 __all__ = [
     "ExecutionEngine",
+    "ExecutorPolicy",
+    "NodeExecutor",
+    "NodeExecutorConfig",
     "TaskScheduler",
     "StateManager",
     "StreamProcessor",
@@ -11,7 +11,8 @@ from typing import Any, Dict, List, Optional, TypeVar, Union
 
 from ..engine.compiler import CompiledGraph
 from ..hooks import HookPoint, HookSystem, HookContext
-from ..types import END, START
+from ..types import END, START, GraphRecursionError
+from .node_executor import NodeExecutor, NodeExecutorConfig
 from .scheduler import TaskScheduler
 from .state_manager import StateManager
 from .stream_processor import StreamProcessor
@@ -20,6 +21,13 @@ StateT = TypeVar("StateT")
 
 __all__ = ("ExecutionEngine",)
 
+# 执行模式
+SEQUENTIAL_MODE = "sequential"
+SUPERSTEP_MODE = "superstep"
+
+# 超步模式下的默认最大步数
+DEFAULT_RECURSION_LIMIT = 25
+
 
 class ExecutionEngine:
     """执行引擎，替代LangGraph的Pregel。
@@ -27,21 +35,33 @@ class ExecutionEngine:
     提供图工作流执行引擎，集成优化调度和消息传递。
     """
     
-    def __init__(self, graph: 'CompiledGraph') -> None:
+    def __init__(
+        self,
+        graph: 'CompiledGraph',
+        execution_mode: str = SEQUENTIAL_MODE,
+        executor_config: Optional[NodeExecutorConfig] = None
+    ) -> None:
         """初始化执行引擎。
         
         Args:
             graph: 编译后的图
+            execution_mode: 执行模式，"sequential"逐节点执行，
+                "superstep"按Pregel超步并发执行所有就绪节点
+            executor_config: 同步节点执行器配置（默认策略和池大小）
         """
         self.graph = graph
         self.hook_system: Optional[HookSystem] = None
+        self.execution_mode = self._validate_mode(execution_mode)
+        self.executor_config = executor_config
         
         # 初始化组件
         self._initialize_components()
     
     def _initialize_components(self) -> None:
         """初始化组件。"""
-        self.task_scheduler: TaskScheduler = TaskScheduler()
+        self.node_executor: NodeExecutor = NodeExecutor(self.executor_config)
+        self._owns_node_executor = True
+        self.task_scheduler: TaskScheduler = TaskScheduler(self.node_executor)
         self.state_manager: StateManager = StateManager(self.graph.state_schema)
         self.stream_processor: StreamProcessor = StreamProcessor()
     
@@ -56,11 +76,56 @@ class ExecutionEngine:
     def set_task_scheduler(self, scheduler: TaskScheduler) -> None:
         """设置任务调度器。
         
+        调度器改用引擎的节点执行器，使执行策略和统计信息保持一致。
+        
         Args:
             scheduler: 任务调度器实例
         """
+        scheduler.node_executor = self.node_executor
         self.task_scheduler = scheduler
     
+    def set_node_executor(self, node_executor: NodeExecutor) -> None:
+        """设置节点执行器。
+        
+        执行器同时传递给任务调度器。外部传入的执行器由调用方负责关闭，
+        引擎此前自行创建的执行器会被关闭。
+        
+        Args:
+            node_executor: 节点执行器实例
+        """
+        if node_executor is self.node_executor:
+            return
+        if self._owns_node_executor:
+            self.node_executor.shutdown(wait=False)
+        self.node_executor = node_executor
+        self._owns_node_executor = False
+        self.task_scheduler.node_executor = node_executor
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭引擎自行创建的节点执行器及其线程池/进程池。
+        
+        Args:
+            wait: 是否等待正在执行的节点完成
+        """
+        if self._owns_node_executor:
+            self.node_executor.shutdown(wait=wait)
+    
+    def get_executor_metrics(self) -> Dict[str, Any]:
+        """获取节点执行器统计信息。
+        
+        Returns:
+            按执行策略分组的调用次数和排队等待时间
+        """
+        return self.node_executor.get_metrics()
+    
+    def set_execution_mode(self, execution_mode: str) -> None:
+        """设置执行模式。
+        
+        Args:
+            execution_mode: "sequential" 或 "superstep"
+        """
+        self.execution_mode = self._validate_mode(execution_mode)
+    
     async def invoke(
         self,
         input_data: Dict[str, Any],
@@ -141,69 +206,74 @@ class ExecutionEngine:
             current_node = self.graph.entry_point
             
             # 执行图
-            step = 0
-            while current_node and current_node != END:
-                # 执行节点
-                try:
-                    # 执行节点前Hook
-                    if self.hook_system:
-                        context = HookContext(
-                            hook_point=HookPoint.BEFORE_EXECUTE,
-                            graph_id=self.graph.graph_id,
-                            state=current_state,
-                            config=config or {},
-                            metadata={"node": current_node, "step": step}
-                        )
-                        await self.hook_system.execute_hooks(HookPoint.BEFORE_EXECUTE, context)
-                    
-                    # 获取节点函数
-                    node_config = self.graph.get_node(current_node)
-                    if not node_config:
-                        raise ValueError(f"节点 '{current_node}' 不存在")
-                    
-                    node_func = node_config["func"]
-                    
+            if self._resolve_mode(config) == SUPERSTEP_MODE:
+                current_state = await self._run_supersteps(current_state, config)
+            else:
+                step = 0
+                while current_node and current_node != END:
                     # 执行节点
-                    node_result = await self._execute_node(node_func, current_state, config)
-                    
-                    # 更新状态
-                    current_state = await self.state_manager.update_state(current_state, node_result)
-                    
-                    # 执行节点后Hook
-                    if self.hook_system:
-                        context = HookContext(
-                            hook_point=HookPoint.AFTER_EXECUTE,
-                            graph_id=self.graph.graph_id,
-                            state=current_state,
-                            config=config or {},
-                            metadata={"node": current_node, "step": step}
-                        )
-                        await self.hook_system.execute_hooks(HookPoint.AFTER_EXECUTE, context)
-                    
-                    # 获取下一个节点
-                    next_nodes = self.graph.get_next_nodes(current_node, current_state)
-                    if not next_nodes:
-                        current_node = END
-                    else:
-                        # 简化实现：选择第一个下一个节点
-                        current_node = next_nodes[0]
-                    
-                    step += 1
-                    
-                except Exception as e:
-                    # 执行节点错误Hook
-                    if self.hook_system:
-                        context = HookContext(
-                            hook_point=HookPoint.ON_ERROR,
-                            graph_id=self.graph.graph_id,
-                            state=current_state,
-                            config=config or {},
-                            error=e,
-                            metadata={"node": current_node, "step": step}
+                    try:
+                        # 执行节点前Hook
+                        if self.hook_system:
+                            context = HookContext(
+                                hook_point=HookPoint.BEFORE_EXECUTE,
+                                graph_id=self.graph.graph_id,
+                                state=current_state,
+                                config=config or {},
+                                metadata={"node": current_node, "step": step}
+                            )
+                            await self.hook_system.execute_hooks(HookPoint.BEFORE_EXECUTE, context)
+                        
+                        # 获取节点函数
+                        node_config = self.graph.get_node(current_node)
+                        if not node_config:
+                            raise ValueError(f"节点 '{current_node}' 不存在")
+                        
+                        node_func = node_config["func"]
+                        
+                        # 执行节点
+                        node_result = await self._execute_node(
+                            node_func, current_state, config, node_config.get("executor")
                         )
-                        await self.hook_system.execute_hooks(HookPoint.ON_ERROR, context)
-                    raise
-            
+                        
+                        # 更新状态
+                        current_state = await self.state_manager.update_state(current_state, node_result)
+                        
+                        # 执行节点后Hook
+                        if self.hook_system:
+                            context = HookContext(
+                                hook_point=HookPoint.AFTER_EXECUTE,
+                                graph_id=self.graph.graph_id,
+                                state=current_state,
+                                config=config or {},
+                                metadata={"node": current_node, "step": step}
+                            )
+                            await self.hook_system.execute_hooks(HookPoint.AFTER_EXECUTE, context)
+                        
+                        # 获取下一个节点
+                        next_nodes = self.graph.get_next_nodes(current_node, current_state)
+                        if not next_nodes:
+                            current_node = END
+                        else:
+                            # 简化实现：选择第一个下一个节点
+                            current_node = next_nodes[0]
+                        
+                        step += 1
+                        
+                    except Exception as e:
+                        # 执行节点错误Hook
+                        if self.hook_system:
+                            context = HookContext(
+                                hook_point=HookPoint.ON_ERROR,
+                                graph_id=self.graph.graph_id,
+                                state=current_state,
+                                config=config or {},
+                                error=e,
+                                metadata={"node": current_node, "step": step}
+                            )
+                            await self.hook_system.execute_hooks(HookPoint.ON_ERROR, context)
+                        raise
+                
             # 执行后Hook
             if self.hook_system:
                 context = HookContext(
@@ -257,37 +327,44 @@ class ExecutionEngine:
             current_node = self.graph.entry_point
             
             # 执行图并流式输出
-            step = 0
-            while current_node and current_node != END:
-                # 执行节点
-                node_config = self.graph.get_node(current_node)
-                if not node_config:
-                    raise ValueError(f"节点 '{current_node}' 不存在")
-                
-                node_func = node_config["func"]
-                
-                # 流式执行节点
-                async for node_result in self._execute_node_stream(node_func, current_state, config):
-                    # 更新状态
-                    current_state = await self.state_manager.update_state(current_state, node_result)
+            if self._resolve_mode(config) == SUPERSTEP_MODE:
+                async for event in self._stream_supersteps(current_state, config):
+                    current_state = event["state"]
+                    yield event
+            else:
+                step = 0
+                while current_node and current_node != END:
+                    # 执行节点
+                    node_config = self.graph.get_node(current_node)
+                    if not node_config:
+                        raise ValueError(f"节点 '{current_node}' 不存在")
                     
-                    # 流式输出
-                    yield {
-                        "node": current_node,
-                        "step": step,
-                        "state": current_state,
-                        "result": node_result
-                    }
-                
-                # 获取下一个节点
-                next_nodes = self.graph.get_next_nodes(current_node, current_state)
-                if not next_nodes:
-                    current_node = END
-                else:
-                    current_node = next_nodes[0]
+                    node_func = node_config["func"]
+                    
+                    # 流式执行节点
+                    async for node_result in self._execute_node_stream(
+                        node_func, current_state, config, node_config.get("executor")
+                    ):
+                        # 更新状态
+                        current_state = await self.state_manager.update_state(current_state, node_result)
+                        
+                        # 流式输出
+                        yield {
+                            "node": current_node,
+                            "step": step,
+                            "state": current_state,
+                            "result": node_result
+                        }
+                    
+                    # 获取下一个节点
+                    next_nodes = self.graph.get_next_nodes(current_node, current_state)
+                    if not next_nodes:
+                        current_node = END
+                    else:
+                        current_node = next_nodes[0]
+                    
+                    step += 1
                 
-                step += 1
-            
             # 执行后Hook
             if self.hook_system:
                 context = HookContext(
@@ -310,33 +387,238 @@ class ExecutionEngine:
                 await self.hook_system.execute_hooks(HookPoint.ON_ERROR, context)
             raise
     
+    async def _run_supersteps(
+        self,
+        state: Dict[str, Any],
+        config: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """以超步方式执行图，直到没有就绪节点。
+        
+        Args:
+            state: 初始状态
+            config: 配置信息
+            
+        Returns:
+            最终状态
+        """
+        async for event in self._stream_supersteps(state, config):
+            state = event["state"]
+        return state
+    
+    async def _stream_supersteps(
+        self,
+        state: Dict[str, Any],
+        config: Optional[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Pregel风格的超步执行。
+        
+        每一步并发执行当前前沿中的所有节点，各节点读取同一份步前状态，
+        其更新通过状态通道合并后再计算下一步前沿。
+        
+        Args:
+            state: 初始状态
+            config: 配置信息
+            
+        Yields:
+            每个节点在其所在超步合并完成后的输出
+        """
+        recursion_limit = (config or {}).get("recursion_limit", DEFAULT_RECURSION_LIMIT)
+        frontier = self._initial_frontier(state)
+        step = 0
+        
+        while frontier:
+            if step >= recursion_limit:
+                raise GraphRecursionError(
+                    f"超步数达到上限 {recursion_limit}，仍有待执行节点: {frontier}"
+                )
+            
+            # 所有就绪节点并发执行（fan-out）
+            tasks = [
+                asyncio.ensure_future(self._execute_superstep_node(node, state, config, step))
+                for node in frontier
+            ]
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+            
+            # 通过通道合并更新（fan-in）
+            state = await self.state_manager.apply_writes(state, results)
+            
+            for node, result in zip(frontier, results):
+                yield {
+                    "node": node,
+                    "step": step,
+                    "state": state,
+                    "result": result
+                }
+            
+            frontier = self._next_frontier(frontier, state)
+            step += 1
+    
+    async def _execute_superstep_node(
+        self,
+        node_name: str,
+        state: Dict[str, Any],
+        config: Optional[Dict[str, Any]],
+        step: int
+    ) -> Any:
+        """在超步中执行单个节点，包含节点级Hook。
+        
+        Args:
+            node_name: 节点名称
+            state: 步前状态
+            config: 配置信息
+            step: 当前步数
+            
+        Returns:
+            节点执行结果
+        """
+        metadata = {"node": node_name, "step": step}
+        try:
+            if self.hook_system:
+                context = HookContext(
+                    hook_point=HookPoint.BEFORE_EXECUTE,
+                    graph_id=self.graph.graph_id,
+                    state=state,
+                    config=config or {},
+                    metadata=metadata
+                )
+                await self.hook_system.execute_hooks(HookPoint.BEFORE_EXECUTE, context)
+            
+            node_config = self.graph.get_node(node_name)
+            if not node_config:
+                raise ValueError(f"节点 '{node_name}' 不存在")
+            
+            # 每个节点获得独立的浅拷贝，避免并发节点原地修改共享状态
+            result = await self._execute_node(
+                node_config["func"], dict(state), config, node_config.get("executor")
+            )
+            
+            if self.hook_system:
+                context = HookContext(
+                    hook_point=HookPoint.AFTER_EXECUTE,
+                    graph_id=self.graph.graph_id,
+                    state=state,
+                    config=config or {},
+                    metadata=metadata
+                )
+                await self.hook_system.execute_hooks(HookPoint.AFTER_EXECUTE, context)
+            
+            return result
+            
+        except Exception as e:
+            if self.hook_system:
+                context = HookContext(
+                    hook_point=HookPoint.ON_ERROR,
+                    graph_id=self.graph.graph_id,
+                    state=state,
+                    config=config or {},
+                    error=e,
+                    metadata=metadata
+                )
+                await self.hook_system.execute_hooks(HookPoint.ON_ERROR, context)
+            raise
+    
+    def _initial_frontier(self, state: Dict[str, Any]) -> List[str]:
+        """计算第一个超步的就绪节点。
+        
+        Args:
+            state: 初始状态
+            
+        Returns:
+            就绪节点列表
+        """
+        entry_point = self.graph.entry_point
+        if entry_point == START:
+            return self._next_frontier([START], state)
+        if not entry_point or entry_point == END:
+            return []
+        return [entry_point]
+    
+    def _next_frontier(self, frontier: List[str], state: Dict[str, Any]) -> List[str]:
+        """根据合并后的状态计算下一步的就绪节点。
+        
+        多个前驱指向同一节点时只调度一次，顺序按前驱在前沿中的顺序确定。
+        
+        Args:
+            frontier: 当前步执行的节点
+            state: 合并后的状态
+            
+        Returns:
+            去重后的就绪节点列表
+        """
+        next_frontier: List[str] = []
+        seen = set()
+        for node in frontier:
+            for next_node in self.graph.get_next_nodes(node, state):
+                if next_node == END or next_node in seen:
+                    continue
+                seen.add(next_node)
+                next_frontier.append(next_node)
+        return next_frontier
+    
+    def _resolve_mode(self, config: Optional[Dict[str, Any]]) -> str:
+        """解析本次运行的执行模式，运行配置优先于引擎默认值。
+        
+        Args:
+            config: 配置信息
+            
+        Returns:
+            执行模式
+        """
+        if config and "execution_mode" in config:
+            return self._validate_mode(config["execution_mode"])
+        return self.execution_mode
+    
+    @staticmethod
+    def _validate_mode(execution_mode: str) -> str:
+        """校验执行模式。
+        
+        Args:
+            execution_mode: 执行模式
+            
+        Returns:
+            执行模式
+            
+        Raises:
+            ValueError: 执行模式不受支持
+        """
+        if execution_mode not in (SEQUENTIAL_MODE, SUPERSTEP_MODE):
+            raise ValueError(f"不支持的执行模式: {execution_mode}")
+        return execution_mode
+    
     async def _execute_node(
         self,
         node_func: Any,
         state: Dict[str, Any],
-        config: Optional[Dict[str, Any]]
+        config: Optional[Dict[str, Any]],
+        policy: Optional[str] = None
     ) -> Any:
         """执行节点。
         
+        异步节点直接在事件循环中等待，同步节点按执行策略
+        内联执行或提交到执行器的线程池/进程池。
+        
         Args:
             node_func: 节点函数
             state: 当前状态
             config: 配置信息
+            policy: 节点执行策略，None时使用执行器默认策略
             
         Returns:
             节点执行结果
         """
-        # 简化实现
-        if asyncio.iscoroutinefunction(node_func):
-            return await node_func(state, config or {})
-        else:
-            return node_func(state, config or {})
+        return await self.node_executor.run(node_func, state, config or {}, policy=policy)
     
     async def _execute_node_stream(
         self,
         node_func: Any,
         state: Dict[str, Any],
-        config: Optional[Dict[str, Any]]
+        config: Optional[Dict[str, Any]],
+        policy: Optional[str] = None
     ) -> AsyncIterator[Any]:
         """流式执行节点。
         
@@ -344,10 +626,11 @@ class ExecutionEngine:
             node_func: 节点函数
             state: 当前状态
             config: 配置信息
+            policy: 节点执行策略
             
         Yields:
             节点执行结果
         """
         # 简化实现：直接执行并yield结果
-        result = await self._execute_node(node_func, state, config)
+        result = await self._execute_node(node_func, state, config, policy)
         yield result
\ No newline at end of file
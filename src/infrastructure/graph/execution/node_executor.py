@@ -0,0 +1,226 @@
+"""节点执行器实现
+
+为同步节点函数提供可配置的执行策略（内联、线程池、进程池），
+避免阻塞型或CPU密集型节点占用事件循环。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+__all__ = ("ExecutorPolicy", "NodeExecutorConfig", "NodeExecutor")
+
+
+class ExecutorPolicy(str, Enum):
+    """同步节点的执行策略。"""
+
+    INLINE = "inline"
+    """直接在事件循环线程中调用，适用于极轻量的节点。"""
+
+    THREAD = "thread"
+    """提交到有界线程池，适用于阻塞I/O或释放GIL的计算。"""
+
+    PROCESS = "process"
+    """提交到进程池，适用于纯Python的CPU密集型计算。
+    节点函数、状态和配置必须可以被pickle序列化。"""
+
+
+class NodeExecutorConfig:
+    """节点执行器配置。"""
+
+    def __init__(
+        self,
+        default_policy: Union[ExecutorPolicy, str] = ExecutorPolicy.INLINE,
+        thread_pool_size: Optional[int] = None,
+        process_pool_size: Optional[int] = None
+    ):
+        """初始化节点执行器配置。
+
+        Args:
+            default_policy: 未单独指定策略的同步节点使用的默认策略，
+                默认内联执行以保持既有节点的语义，需要卸载的节点单独指定策略
+            thread_pool_size: 线程池大小，默认为 min(32, CPU数 + 4)
+            process_pool_size: 进程池大小，默认为CPU数
+        """
+        cpu_count = os.cpu_count() or 1
+        self.default_policy = ExecutorPolicy(default_policy)
+        self.thread_pool_size = thread_pool_size or min(32, cpu_count + 4)
+        self.process_pool_size = process_pool_size or cpu_count
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "NodeExecutorConfig":
+        """从配置字典创建。
+
+        Args:
+            config: 配置字典
+
+        Returns:
+            节点执行器配置
+        """
+        return cls(
+            default_policy=config.get("default_policy", ExecutorPolicy.INLINE),
+            thread_pool_size=config.get("thread_pool_size"),
+            process_pool_size=config.get("process_pool_size")
+        )
+
+
+def _timed_call(
+    submitted_at: float,
+    func: Callable[..., Any],
+    *args: Any
+) -> Tuple[float, float, Any]:
+    """在工作线程/进程中执行函数并记录排队等待时间。
+
+    time.monotonic在同一主机的进程间共享时钟源，因此进程池中也可用。
+
+    Returns:
+        (排队等待秒数, 执行秒数, 函数结果)
+    """
+    started_at = time.monotonic()
+    result = func(*args)
+    return started_at - submitted_at, time.monotonic() - started_at, result
+
+
+class _PolicyMetrics:
+    """单个执行策略的统计信息。"""
+
+    __slots__ = ("calls", "total_wait", "max_wait", "total_run")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def record(self, wait: float, run: float) -> None:
+        self.calls += 1
+        self.total_wait += wait
+        self.total_run += run
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "avg_queue_wait_ms": (self.total_wait / self.calls * 1000) if self.calls else 0.0,
+            "max_queue_wait_ms": self.max_wait * 1000,
+            "avg_run_ms": (self.total_run / self.calls * 1000) if self.calls else 0.0,
+        }
+
+
+class NodeExecutor:
+    """节点执行器，按策略调度节点函数的执行。
+
+    异步节点函数始终直接在事件循环中等待；同步节点函数按策略
+    内联执行或提交到有界线程池/进程池，池在首次使用时懒创建。
+    执行器不再使用时应调用 shutdown() 释放池中的线程和进程。
+    """
+
+    def __init__(self, config: Optional[NodeExecutorConfig] = None):
+        """初始化节点执行器。
+
+        Args:
+            config: 执行器配置
+        """
+        self.config = config or NodeExecutorConfig()
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._metrics: Dict[ExecutorPolicy, _PolicyMetrics] = {
+            policy: _PolicyMetrics() for policy in ExecutorPolicy
+        }
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        policy: Optional[Union[ExecutorPolicy, str]] = None
+    ) -> Any:
+        """执行节点函数。
+
+        Args:
+            func: 节点函数
+            *args: 调用参数
+            policy: 执行策略，None时使用默认策略
+
+        Returns:
+            节点函数结果
+        """
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+
+        resolved = ExecutorPolicy(policy) if policy is not None else self.config.default_policy
+
+        if resolved is ExecutorPolicy.INLINE:
+            started_at = time.monotonic()
+            result = func(*args)
+            self._metrics[resolved].record(0.0, time.monotonic() - started_at)
+            return result
+
+        executor = self._get_pool(resolved)
+        loop = asyncio.get_running_loop()
+        wait, run, result = await loop.run_in_executor(
+            executor, _timed_call, time.monotonic(), func, *args
+        )
+        self._metrics[resolved].record(wait, run)
+        return result
+
+    def _get_pool(self, policy: ExecutorPolicy) -> Executor:
+        """获取（必要时创建）策略对应的执行池。
+
+        Args:
+            policy: 执行策略
+
+        Returns:
+            执行池
+        """
+        with self._pool_lock:
+            if policy is ExecutorPolicy.PROCESS:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.config.process_pool_size
+                    )
+                return self._process_pool
+
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.config.thread_pool_size,
+                    thread_name_prefix="graph-node"
+                )
+            return self._thread_pool
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取执行统计信息。
+
+        Returns:
+            按策略分组的调用次数、排队等待时间和执行时间
+        """
+        return {
+            "default_policy": self.config.default_policy.value,
+            "thread_pool_size": self.config.thread_pool_size,
+            "process_pool_size": self.config.process_pool_size,
+            "policies": {
+                policy.value: metrics.to_dict()
+                for policy, metrics in self._metrics.items()
+            }
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭执行池。
+
+        Args:
+            wait: 是否等待正在执行的任务完成
+        """
+        with self._pool_lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=wait)
+                self._thread_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=wait)
+                self._process_pool = None
@@ -0,0 +1,275 @@
+"""持久化映射实现
+
+基于哈希数组映射前缀树（HAMT）的不可变映射。每次修改只复制从根到
+被修改叶子的路径，其余子树在新旧版本间共享，因此单次更新的内存开销
+与更新规模（乘以树深度）成正比，而不是与映射大小成正比。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any, Optional, Tuple, Union
+
+__all__ = ("PersistentMap",)
+
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = (1 << 64) - 1
+
+_MISSING = object()
+
+
+class _Leaf:
+    """叶子条目。"""
+
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, hash_: int, key: Any, value: Any) -> None:
+        self.hash = hash_
+        self.key = key
+        self.value = value
+
+    def matches(self, hash_: int, key: Any) -> bool:
+        return self.key is key or (self.hash == hash_ and self.key == key)
+
+
+class _CollisionNode:
+    """哈希完全相同的多个叶子。"""
+
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, hash_: int, leaves: Tuple[_Leaf, ...]) -> None:
+        self.hash = hash_
+        self.leaves = leaves
+
+
+class _BitmapNode:
+    """位图压缩的内部节点，entries只保存存在的槽位。"""
+
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: Tuple[Any, ...]) -> None:
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+_Entry = Union[_Leaf, _CollisionNode, _BitmapNode]
+
+_EMPTY_ROOT = _BitmapNode(0, ())
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _merge_leaves(a: _Leaf, b: _Leaf, shift: int) -> _Entry:
+    """将两个落在同一槽位的叶子下沉为子节点。"""
+    if a.hash == b.hash:
+        return _CollisionNode(a.hash, (a, b))
+    index_a = (a.hash >> shift) & _MASK
+    index_b = (b.hash >> shift) & _MASK
+    if index_a == index_b:
+        return _BitmapNode(1 << index_a, (_merge_leaves(a, b, shift + _BITS),))
+    entries = (a, b) if index_a < index_b else (b, a)
+    return _BitmapNode((1 << index_a) | (1 << index_b), entries)
+
+
+def _assoc(node: _Entry, shift: int, leaf: _Leaf) -> Tuple[_Entry, bool]:
+    """返回插入/替换叶子后的新节点，以及是否新增了键。"""
+    if isinstance(node, _CollisionNode):
+        if leaf.hash == node.hash:
+            for i, existing in enumerate(node.leaves):
+                if existing.matches(leaf.hash, leaf.key):
+                    if existing.value is leaf.value:
+                        return node, False
+                    leaves = node.leaves[:i] + (leaf,) + node.leaves[i + 1:]
+                    return _CollisionNode(node.hash, leaves), False
+            return _CollisionNode(node.hash, node.leaves + (leaf,)), True
+        wrapper = _BitmapNode(1 << ((node.hash >> shift) & _MASK), (node,))
+        return _assoc(wrapper, shift, leaf)
+
+    assert isinstance(node, _BitmapNode)
+    bit = 1 << ((leaf.hash >> shift) & _MASK)
+    index = (node.bitmap & (bit - 1)).bit_count()
+    entries = node.entries
+
+    if not node.bitmap & bit:
+        return _BitmapNode(node.bitmap | bit, entries[:index] + (leaf,) + entries[index:]), True
+
+    entry = entries[index]
+    if isinstance(entry, _Leaf):
+        if entry.matches(leaf.hash, leaf.key):
+            if entry.value is leaf.value:
+                return node, False
+            new_entry: _Entry = leaf
+            added = False
+        else:
+            new_entry = _merge_leaves(entry, leaf, shift + _BITS)
+            added = True
+    else:
+        new_entry, added = _assoc(entry, shift + _BITS, leaf)
+        if new_entry is entry:
+            return node, False
+
+    return _BitmapNode(node.bitmap, entries[:index] + (new_entry,) + entries[index + 1:]), added
+
+
+def _dissoc(node: _Entry, shift: int, hash_: int, key: Any) -> Optional[_Entry]:
+    """返回删除键后的新节点；节点变空时返回None，未找到时返回原节点。"""
+    if isinstance(node, _CollisionNode):
+        leaves = tuple(leaf for leaf in node.leaves if not leaf.matches(hash_, key))
+        if len(leaves) == len(node.leaves):
+            return node
+        if len(leaves) == 1:
+            return leaves[0]
+        return _CollisionNode(node.hash, leaves)
+
+    assert isinstance(node, _BitmapNode)
+    bit = 1 << ((hash_ >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    index = (node.bitmap & (bit - 1)).bit_count()
+    entries = node.entries
+    entry = entries[index]
+
+    if isinstance(entry, _Leaf):
+        if not entry.matches(hash_, key):
+            return node
+        new_entry: Optional[_Entry] = None
+    else:
+        new_entry = _dissoc(entry, shift + _BITS, hash_, key)
+        if new_entry is entry:
+            return node
+
+    if new_entry is not None:
+        return _BitmapNode(node.bitmap, entries[:index] + (new_entry,) + entries[index + 1:])
+
+    bitmap = node.bitmap & ~bit
+    if not bitmap:
+        return None
+    remaining = entries[:index] + entries[index + 1:]
+    # 非根节点只剩一个叶子时上提，保持树的紧凑
+    if shift > 0 and len(remaining) == 1 and isinstance(remaining[0], _Leaf):
+        return remaining[0]
+    return _BitmapNode(bitmap, remaining)
+
+
+def _iter_leaves(node: _Entry) -> Iterator[_Leaf]:
+    if isinstance(node, _Leaf):
+        yield node
+    elif isinstance(node, _CollisionNode):
+        yield from node.leaves
+    else:
+        for entry in node.entries:
+            yield from _iter_leaves(entry)
+
+
+class PersistentMap(Mapping[Any, Any]):
+    """不可变映射，修改操作返回共享未修改部分的新版本。"""
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, initial: Optional[Mapping[Any, Any]] = None) -> None:
+        self._root: _BitmapNode = _EMPTY_ROOT
+        self._size = 0
+        if initial:
+            updated = self.update(initial)
+            self._root = updated._root
+            self._size = updated._size
+
+    @classmethod
+    def _create(cls, root: _BitmapNode, size: int) -> "PersistentMap":
+        instance = cls.__new__(cls)
+        instance._root = root
+        instance._size = size
+        return instance
+
+    def __getitem__(self, key: Any) -> Any:
+        hash_ = _hash(key)
+        node: _Entry = self._root
+        shift = 0
+        while True:
+            if isinstance(node, _BitmapNode):
+                bit = 1 << ((hash_ >> shift) & _MASK)
+                if not node.bitmap & bit:
+                    raise KeyError(key)
+                node = node.entries[(node.bitmap & (bit - 1)).bit_count()]
+                shift += _BITS
+            elif isinstance(node, _Leaf):
+                if node.matches(hash_, key):
+                    return node.value
+                raise KeyError(key)
+            else:
+                for leaf in node.leaves:
+                    if leaf.matches(hash_, key):
+                        return leaf.value
+                raise KeyError(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        for leaf in _iter_leaves(self._root):
+            yield leaf.key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self.items())!r})"
+
+    def set(self, key: Any, value: Any) -> "PersistentMap":
+        """返回设置了键值的新版本。
+
+        Args:
+            key: 键
+            value: 值
+
+        Returns:
+            新版本映射；值未变化时返回自身
+        """
+        root, added = _assoc(self._root, 0, _Leaf(_hash(key), key, value))
+        if root is self._root:
+            return self
+        assert isinstance(root, _BitmapNode)
+        return self._create(root, self._size + (1 if added else 0))
+
+    def delete(self, key: Any) -> "PersistentMap":
+        """返回删除了键的新版本。
+
+        Args:
+            key: 键
+
+        Returns:
+            新版本映射；键不存在时返回自身
+        """
+        root = _dissoc(self._root, 0, _hash(key), key)
+        if root is self._root:
+            return self
+        if root is None:
+            return self._create(_EMPTY_ROOT, 0)
+        assert isinstance(root, _BitmapNode)
+        return self._create(root, self._size - 1)
+
+    def update(self, updates: Mapping[Any, Any]) -> "PersistentMap":
+        """返回批量设置键值后的新版本。
+
+        Args:
+            updates: 更新的键值
+
+        Returns:
+            新版本映射
+        """
+        root: _Entry = self._root
+        size = self._size
+        for key, value in updates.items():
+            root, added = _assoc(root, 0, _Leaf(_hash(key), key, value))
+            if added:
+                size += 1
+        if root is self._root:
+            return self
+        assert isinstance(root, _BitmapNode)
+        return self._create(root, size)
+
+    def to_dict(self) -> dict:
+        """转换为普通字典。"""
+        return {leaf.key: leaf.value for leaf in _iter_leaves(self._root)}
@@ -4,9 +4,11 @@
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional, Set
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
 
 from ..types import ExecutableTask
+from .node_executor import ExecutorPolicy, NodeExecutor
 
 __all__ = ("TaskScheduler",)
 
@@ -14,13 +16,19 @@ __all__ = ("TaskScheduler",)
 class TaskScheduler:
     """任务调度器，提供智能任务调度和并发执行功能。"""
     
-    def __init__(self):
-        """初始化任务调度器。"""
+    def __init__(self, node_executor: Optional[NodeExecutor] = None):
+        """初始化任务调度器。
+        
+        Args:
+            node_executor: 同步任务使用的节点执行器，默认创建独立实例
+        """
         self.task_queue: List[ExecutableTask] = []
         self.running_tasks: Set[str] = set()
         self.completed_tasks: Set[str] = set()
         self.max_concurrent_tasks = 10
         self.task_dependencies: Dict[str, List[str]] = {}
+        self.task_policies: Dict[str, ExecutorPolicy] = {}
+        self.node_executor = node_executor or NodeExecutor()
     
     def set_max_concurrent_tasks(self, max_tasks: int) -> None:
         """设置最大并发任务数。
@@ -55,72 +63,152 @@ class TaskScheduler:
         """
         self.task_dependencies[task_id] = dependencies
     
+    def set_task_policy(self, task_id: str, policy: str) -> None:
+        """设置任务的执行策略。
+        
+        Args:
+            task_id: 任务ID
+            policy: 执行策略（inline / thread / process）
+        """
+        self.task_policies[task_id] = ExecutorPolicy(policy)
+    
     async def schedule_tasks(self) -> List[Any]:
         """调度并执行任务。
         
+        基于依赖计数的事件驱动调度：每个任务维护未完成依赖数，
+        任务完成时立即递减其后继的计数，计数归零的任务进入就绪队列，
+        并在并发上限内立即启动。整个调度过程无轮询等待，
+        时间复杂度与任务数和依赖边数成线性关系。
+        
+        依赖任务失败时，其所有后继任务不会执行，结果状态标记为"skipped"。
+        
         Returns:
-            任务执行结果列表
+            任务执行结果列表，按完成顺序排列
+            
+        Raises:
+            ValueError: 任务依赖了不在队列中且尚未完成的任务，或依赖关系存在环
         """
-        results = []
+        pending: Dict[str, ExecutableTask] = {}
+        for task in self.task_queue:
+            if task.id not in self.completed_tasks:
+                pending[task.id] = task
+        
+        # 构建入度计数和后继表
+        in_degree: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {}
+        ready: Deque[ExecutableTask] = deque()
+        for task_id, task in pending.items():
+            count = 0
+            for dep_id in self.task_dependencies.get(task_id, []):
+                if dep_id in self.completed_tasks:
+                    continue
+                if dep_id not in pending:
+                    raise ValueError(f"任务 '{task_id}' 依赖的任务 '{dep_id}' 不存在")
+                dependents.setdefault(dep_id, []).append(task_id)
+                count += 1
+            in_degree[task_id] = count
+            if count == 0:
+                ready.append(task)
+        
+        self._check_dependency_cycles(pending, in_degree, dependents)
+        self.task_queue.clear()
+        
+        results: List[Any] = []
+        if not pending:
+            return results
         
-        while self.task_queue or self.running_tasks:
-            # 获取可执行的任务
-            ready_tasks = self._get_ready_tasks()
+        outstanding = len(pending)
+        all_done = asyncio.Event()
+        running: Set[asyncio.Future] = set()
+        
+        def dispatch() -> None:
+            # 在并发上限内启动就绪任务
+            while ready and len(running) < max(1, self.max_concurrent_tasks):
+                task = ready.popleft()
+                self.running_tasks.add(task.id)
+                future = asyncio.ensure_future(self._execute_task(task))
+                running.add(future)
+                future.add_done_callback(
+                    lambda f, task_id=task.id: on_task_done(task_id, f)
+                )
+        
+        def on_task_done(task_id: str, future: asyncio.Future) -> None:
+            nonlocal outstanding
+            running.discard(future)
+            if future.cancelled():
+                return
             
-            # 执行任务
-            if ready_tasks:
-                # 限制并发数
-                tasks_to_run = ready_tasks[:self.max_concurrent_tasks - len(self.running_tasks)]
+            # 用显式栈处理失败级联，避免长依赖链导致递归过深
+            stack = [(task_id, future.result())]
+            while stack:
+                finished_id, result = stack.pop()
+                results.append(result)
+                outstanding -= 1
+                succeeded = result.get("status") == "completed"
                 
-                # 并发执行任务
-                if tasks_to_run:
-                    coroutines = [self._execute_task(task) for task in tasks_to_run]
-                    task_results = await asyncio.gather(*coroutines, return_exceptions=True)
-                    
-                    for result in task_results:
-                        if isinstance(result, Exception):
-                            # 处理异常
-                            results.append({"error": str(result)})
-                        else:
-                            results.append(result)
+                for dependent_id in dependents.pop(finished_id, ()):
+                    if in_degree[dependent_id] < 0:
+                        # 已因其他依赖失败而跳过
+                        continue
+                    if succeeded:
+                        in_degree[dependent_id] -= 1
+                        if in_degree[dependent_id] == 0:
+                            ready.append(pending[dependent_id])
+                    else:
+                        in_degree[dependent_id] = -1
+                        stack.append((dependent_id, {
+                            "task_id": dependent_id,
+                            "error": f"依赖任务 '{finished_id}' 未成功完成",
+                            "status": "skipped"
+                        }))
             
-            # 短暂等待，避免忙循环
-            await asyncio.sleep(0.01)
+            if outstanding == 0:
+                all_done.set()
+            else:
+                dispatch()
+        
+        dispatch()
+        try:
+            await all_done.wait()
+        finally:
+            for future in list(running):
+                future.cancel()
         
         return results
     
-    def _get_ready_tasks(self) -> List[ExecutableTask]:
-        """获取准备执行的任务。
-        
-        Returns:
-            准备执行的任务列表
-        """
-        ready_tasks = []
+    @staticmethod
+    def _check_dependency_cycles(
+        pending: Dict[str, ExecutableTask],
+        in_degree: Dict[str, int],
+        dependents: Dict[str, List[str]]
+    ) -> None:
+        """检查依赖关系中是否存在环。
         
-        for task in self.task_queue:
-            if (task.id not in self.running_tasks and 
-                task.id not in self.completed_tasks and
-                self._are_dependencies_completed(task.id)):
-                ready_tasks.append(task)
-        
-        # 从队列中移除准备执行的任务
-        for task in ready_tasks:
-            self.task_queue.remove(task)
-            self.running_tasks.add(task.id)
-        
-        return ready_tasks
-    
-    def _are_dependencies_completed(self, task_id: str) -> bool:
-        """检查任务依赖是否已完成。
+        对入度计数做一次拓扑排序演练，无法归零的任务即处于环上或依赖环，
+        若不提前检出，调度时这些任务永远不会就绪，调度将无限等待。
         
         Args:
-            task_id: 任务ID
+            pending: 待执行任务
+            in_degree: 任务未完成依赖数
+            dependents: 任务的后继表
             
-        Returns:
-            依赖是否已完成
+        Raises:
+            ValueError: 依赖关系存在环
         """
-        dependencies = self.task_dependencies.get(task_id, [])
-        return all(dep_id in self.completed_tasks for dep_id in dependencies)
+        remaining = dict(in_degree)
+        stack = [task_id for task_id, count in remaining.items() if count == 0]
+        visited = 0
+        while stack:
+            task_id = stack.pop()
+            visited += 1
+            for dependent_id in dependents.get(task_id, ()):
+                remaining[dependent_id] -= 1
+                if remaining[dependent_id] == 0:
+                    stack.append(dependent_id)
+        
+        if visited < len(pending):
+            blocked = sorted(task_id for task_id, count in remaining.items() if count > 0)
+            raise ValueError(f"任务依赖关系存在环，无法调度的任务: {blocked}")
     
     async def _execute_task(self, task: ExecutableTask) -> Any:
         """执行单个任务。
@@ -132,11 +220,11 @@ class TaskScheduler:
             任务执行结果
         """
         try:
-            # 执行任务
-            if asyncio.iscoroutinefunction(task.proc):
-                result = await task.proc(task.input, task.config)
-            else:
-                result = task.proc(task.input, task.config)
+            # 执行任务，同步任务按策略交给节点执行器
+            result = await self.node_executor.run(
+                task.proc, task.input, task.config,
+                policy=self.task_policies.get(task.id)
+            )
             
             # 标记任务完成
             self.running_tasks.discard(task.id)
@@ -169,7 +257,8 @@ class TaskScheduler:
             "running_tasks": len(self.running_tasks),
             "completed_tasks": len(self.completed_tasks),
             "max_concurrent_tasks": self.max_concurrent_tasks,
-            "total_dependencies": len(self.task_dependencies)
+            "total_dependencies": len(self.task_dependencies),
+            "executor": self.node_executor.get_metrics()
         }
     
     def reset(self) -> None:
@@ -177,4 +266,5 @@ class TaskScheduler:
         self.task_queue.clear()
         self.running_tasks.clear()
         self.completed_tasks.clear()
-        self.task_dependencies.clear()
\ No newline at end of file
+        self.task_dependencies.clear()
+        self.task_policies.clear()
\ No newline at end of file
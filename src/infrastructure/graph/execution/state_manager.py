@@ -1,13 +1,45 @@
 """状态管理器实现
 
 提供执行状态的管理和更新功能。
+
+状态历史保存为持久化映射（结构共享）的版本，每个版本只复制被修改的路径，
+保留的内存与更新规模成正比，回滚时可直接定位到目标版本。``PersistentMap``
+只在内部使用，返回给调用方的状态是普通字典，节点可以像以前一样原地修改，
+这些修改会在下一次更新时并入新版本。
 """
 
-from typing import Any, Dict, List, Optional, Type
+from collections import deque
+from collections.abc import Sequence
+from typing import (
+    Annotated, Any, Deque, Dict, List, Mapping, NamedTuple, Optional, Type,
+    get_args, get_origin, get_type_hints,
+)
+
+from ..channels import BaseChannel, BinaryOperatorAggregate, LastValue
+from .persistent_map import PersistentMap
 
 __all__ = ("StateManager",)
 
 
+_MISSING = object()
+
+
+def _detach(value: Any) -> Any:
+    """浅复制可变容器，其余值原样返回。"""
+    if isinstance(value, (list, dict, set)):
+        return value.copy()
+    return value
+
+
+class _HistoryEntry(NamedTuple):
+    """状态历史条目。"""
+    
+    version: PersistentMap
+    """该步之后的完整状态版本，与相邻版本共享未修改部分。"""
+    delta: Dict[str, Any]
+    """该步写入的键值。"""
+
+
 class StateManager:
     """状态管理器，提供执行状态的管理和更新功能。"""
     
@@ -19,8 +51,10 @@ class StateManager:
         """
         self.state_schema = state_schema
         self.current_state: Optional[Dict[str, Any]] = None
-        self.state_history: List[Dict[str, Any]] = []
         self.max_history_size = 100
+        self.state_history: Deque[_HistoryEntry] = deque(maxlen=self.max_history_size)
+        self._current_version: PersistentMap = PersistentMap()
+        self._channel_specs: Optional[Dict[str, BaseChannel]] = None
     
     async def initialize_state(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """初始化状态。
@@ -32,32 +66,33 @@ class StateManager:
             初始化后的状态
         """
         # 创建初始状态
+        initial_state = input_data
         if self.state_schema:
             try:
                 # 如果状态模式是类，尝试实例化
                 if hasattr(self.state_schema, '__dict__'):
-                    self.current_state = self.state_schema(**input_data).__dict__
-                else:
-                    self.current_state = input_data
+                    initial_state = self.state_schema(**input_data).__dict__
             except Exception:
                 # 如果实例化失败，直接使用输入数据
-                self.current_state = input_data
-        else:
-            self.current_state = input_data
+                initial_state = input_data
         
-        # 添加到历史记录
-        if self.current_state is not None:
-            self._add_to_history(self.current_state)
+        # 添加到历史记录，初始条目以完整状态作为增量
+        self._current_version = PersistentMap(initial_state)
+        self.current_state = dict(initial_state) if initial_state is not None else {}
+        if initial_state is not None:
+            self.state_history.append(_HistoryEntry(self._current_version, dict(initial_state)))
         
-        return self.current_state if self.current_state is not None else {}
+        return self.current_state
     
     async def update_state(
         self,
-        current_state: Dict[str, Any],
+        current_state: Mapping[str, Any],
         updates: Any
     ) -> Dict[str, Any]:
         """更新状态。
         
+        增量写入当前版本的持久化映射，未修改的键与上一版本共享。
+        
         Args:
             current_state: 当前状态
             updates: 更新数据
@@ -68,19 +103,53 @@ class StateManager:
         # 更新当前状态
         if isinstance(updates, dict):
             # 合并字典更新
-            self.current_state = {**current_state, **updates}
-        else:
+            delta = dict(updates)
+        elif hasattr(updates, '__dict__'):
             # 如果更新不是字典，尝试将其转换为字典
-            if hasattr(updates, '__dict__'):
-                self.current_state = {**current_state, **updates.__dict__}
+            delta = dict(updates.__dict__)
+        else:
+            # 其他情况，保持原状态
+            delta = {}
+        
+        # 生成新版本并添加到历史记录
+        return self._add_to_history(current_state, delta)
+    
+    async def apply_writes(
+        self,
+        current_state: Mapping[str, Any],
+        writes: Sequence[Any]
+    ) -> Dict[str, Any]:
+        """按通道语义合并同一超步内多个节点的更新。
+        
+        每个状态键对应一个通道：带归约函数的``Annotated``键使用
+        ``BinaryOperatorAggregate``，显式声明通道实例的键使用该通道，
+        其余键使用``LastValue``（同一步内多次写入会引发``InvalidUpdateError``）。
+        
+        Args:
+            current_state: 当前状态
+            writes: 本步各节点的更新，按节点顺序排列
+            
+        Returns:
+            合并后的状态
+        """
+        grouped: Dict[str, List[Any]] = {}
+        for update in writes:
+            if isinstance(update, dict):
+                items = update.items()
+            elif update is not None and hasattr(update, '__dict__'):
+                items = update.__dict__.items()
             else:
-                # 其他情况，保持原状态
-                self.current_state = current_state
+                continue
+            for key, value in items:
+                grouped.setdefault(key, []).append(value)
         
-        # 添加到历史记录
-        self._add_to_history(self.current_state)
+        delta: Dict[str, Any] = {}
+        for key, values in grouped.items():
+            channel = self._channel_for_key(key, current_state)
+            if channel.update(values) and channel.is_available():
+                delta[key] = channel.get()
         
-        return self.current_state
+        return self._add_to_history(current_state, delta)
     
     def get_current_state(self) -> Optional[Dict[str, Any]]:
         """获取当前状态。
@@ -96,11 +165,26 @@ class StateManager:
         Returns:
             状态历史列表
         """
-        return self.state_history.copy()
+        return [entry.version.to_dict() for entry in self.state_history]
+    
+    def get_state_delta(self, index: int) -> Dict[str, Any]:
+        """获取指定历史步骤写入的增量。
+        
+        Args:
+            index: 状态索引
+            
+        Returns:
+            该步写入的键值
+        """
+        if not 0 <= index < len(self.state_history):
+            raise ValueError(f"无效的状态索引: {index}")
+        return dict(self.state_history[index].delta)
     
     def rollback_to_state(self, index: int) -> Dict[str, Any]:
         """回滚到指定状态。
         
+        历史条目直接保存完整版本，回滚无需重放增量。
+        
         Args:
             index: 状态索引
             
@@ -108,10 +192,12 @@ class StateManager:
             回滚后的状态
         """
         if 0 <= index < len(self.state_history):
-            self.current_state = self.state_history[index].copy()
             # 截断历史记录到回滚点
-            self.state_history = self.state_history[:index + 1]
-            return self.current_state if self.current_state is not None else {}
+            while len(self.state_history) > index + 1:
+                self.state_history.pop()
+            self._current_version = self.state_history[-1].version
+            self.current_state = self._current_version.to_dict()
+            return self.current_state
         else:
             raise ValueError(f"无效的状态索引: {index}")
     
@@ -119,7 +205,9 @@ class StateManager:
         """清除状态历史。"""
         self.state_history.clear()
         if self.current_state:
-            self.state_history.append(self.current_state.copy())
+            self.state_history.append(
+                _HistoryEntry(self._current_version, self._current_version.to_dict())
+            )
     
     def set_max_history_size(self, max_size: int) -> None:
         """设置最大历史记录大小。
@@ -128,27 +216,106 @@ class StateManager:
             max_size: 最大历史记录大小
         """
         self.max_history_size = max_size
-        # 如果当前历史记录超过限制，截断
-        if len(self.state_history) > max_size:
-            self.state_history = self.state_history[-max_size:]
+        # 重建环形缓冲区，超出限制时保留最新的记录
+        self.state_history = deque(self.state_history, maxlen=max_size)
     
-    def _add_to_history(self, state: Dict[str, Any]) -> None:
-        """添加状态到历史记录。
+    def _add_to_history(self, base_state: Mapping[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        """添加状态到历史记录，返回交给调用方的新状态字典。
+        
+        新版本在当前版本的基础上写入增量，与其共享未修改的部分；
+        环形缓冲区满时自动丢弃最旧的记录。调用方传入的状态与当前版本
+        不一致时（节点原地修改了状态字典，或传入了其他状态），差异按身份比较
+        找出后并入本步增量。
         
         Args:
-            state: 要添加的状态
+            base_state: 本次更新所基于的状态
+            delta: 本次更新写入的键值
+            
+        Returns:
+            更新后的状态字典
+        """
+        version = self._current_version
+        if base_state is not version:
+            changed = {
+                key: value for key, value in base_state.items()
+                if version.get(key, _MISSING) is not value
+            }
+            removed = [key for key in version if key not in base_state]
+            for key in removed:
+                version = version.delete(key)
+            delta = {**changed, **delta}
+        
+        self._current_version = version.update(delta)
+        self.state_history.append(_HistoryEntry(self._current_version, delta))
+        
+        if delta or not isinstance(base_state, dict):
+            # 与基础状态同规模的字典复制，和原先返回字典的实现开销相同
+            new_state = dict(base_state)
+            new_state.update(delta)
+        else:
+            new_state = base_state
+        self.current_state = new_state
+        return new_state
+    
+    def _channel_for_key(self, key: str, current_state: Mapping[str, Any]) -> BaseChannel:
+        """获取以当前值初始化的状态键通道。
+        
+        Args:
+            key: 状态键
+            current_state: 当前状态
+            
+        Returns:
+            通道实例
         """
-        if state is not None:
-            self.state_history.append(state.copy())
+        if self._channel_specs is None:
+            self._channel_specs = self._build_channel_specs()
         
-        # 检查历史记录大小限制
-        if len(self.state_history) > self.max_history_size:
-            # 移除最旧的记录
-            self.state_history.pop(0)
+        spec = self._channel_specs.get(key)
+        if spec is None:
+            spec = LastValue(Any, key)
+        
+        if key in current_state:
+            # 通道的update会原地修改检查点（如Topic追加列表），
+            # 先复制容器，避免改动已写入历史版本的值
+            return spec.from_checkpoint(_detach(current_state[key]))
+        return spec.copy()
+    
+    def _build_channel_specs(self) -> Dict[str, BaseChannel]:
+        """根据状态模式的类型注解构建通道模板。
+        
+        Returns:
+            状态键到通道模板的映射
+        """
+        specs: Dict[str, BaseChannel] = {}
+        if not self.state_schema:
+            return specs
+        
+        try:
+            hints = get_type_hints(self.state_schema, include_extras=True)
+        except Exception:
+            return specs
+        
+        for key, annotation in hints.items():
+            channel: BaseChannel = LastValue(annotation, key)
+            if get_origin(annotation) is Annotated:
+                base_type, *metadata = get_args(annotation)
+                for meta in metadata:
+                    if isinstance(meta, BaseChannel):
+                        channel = meta.copy()
+                        break
+                    if callable(meta):
+                        channel = BinaryOperatorAggregate(base_type, meta)
+                        break
+            channel.key = key
+            specs[key] = channel
+        
+        return specs
     
     def get_state_diff(self, from_index: int, to_index: int) -> Dict[str, Any]:
         """获取状态差异。
         
+        只比较两个索引之间各步增量涉及的键，其余键在两个版本间必然相同。
+        
         Args:
             from_index: 起始索引
             to_index: 结束索引
@@ -160,15 +327,17 @@ class StateManager:
                 0 <= to_index < len(self.state_history)):
             raise ValueError("无效的索引范围")
         
-        from_state = self.state_history[from_index]
-        to_state = self.state_history[to_index]
-        
-        diff = {}
+        from_state = self.state_history[from_index].version
+        to_state = self.state_history[to_index].version
         
         # 找出变化的键
-        all_keys = set(from_state.keys()) | set(to_state.keys())
+        changed_keys = set()
+        for index in range(min(from_index, to_index) + 1, max(from_index, to_index) + 1):
+            changed_keys.update(self.state_history[index].delta)
+        
+        diff = {}
         
-        for key in all_keys:
+        for key in changed_keys:
             from_value = from_state.get(key)
             to_value = to_state.get(key)
             
@@ -189,6 +358,7 @@ class StateManager:
         return {
             "current_state_keys": len(self.current_state) if self.current_state else 0,
             "history_size": len(self.state_history),
+            "history_delta_keys": sum(len(entry.delta) for entry in self.state_history),
             "max_history_size": self.max_history_size,
             "state_schema": self.state_schema.__name__ if self.state_schema else None
         }
\ No newline at end of file
@@ -5,6 +5,7 @@ HTTP 客户端模块
 """
 
 from .base_http_client import BaseHttpClient
+from .sse_decoder import SSEDecoder, SSEEvent, aiter_sse_events
 from .openai_http_client import OpenAIHttpClient
 from .gemini_http_client import GeminiHttpClient
 from .anthropic_http_client import AnthropicHttpClient
@@ -12,6 +13,9 @@ from .http_client_factory import HttpClientFactory, get_http_client_factory, cre
 
 __all__ = [
     "BaseHttpClient",
+    "SSEDecoder",
+    "SSEEvent",
+    "aiter_sse_events",
     "OpenAIHttpClient",
     "GeminiHttpClient",
     "AnthropicHttpClient",
@@ -136,24 +136,23 @@ class AnthropicHttpClient(BaseHttpClient, ILLMHttpClient):
             str: 流式响应数据片段
         """
         try:
-            async for chunk in self.stream_post("messages", request_data):
-                # Anthropic流式响应格式
-                if chunk.startswith("data: "):
-                    data_str = chunk[6:]  # 移除 "data: " 前缀
-                    
-                    # 跳过事件标记
-                    if data_str.startswith("event: "):
-                        continue
-                    
-                    try:
-                        data = json.loads(data_str)
-                        # 提取内容
-                        content = self._extract_content_from_anthropic_stream(data)
-                        if content:
-                            yield content
-                    except json.JSONDecodeError as e:
-                        self.logger.warning(f"解析Anthropic流式数据失败: {e}, 数据: {data_str}")
-                        continue
+            async for event in self.stream_sse("messages", request_data):
+                # Anthropic流式响应以 message_stop 事件结束，ping 事件仅用于保活
+                if event.event == "message_stop":
+                    break
+                if event.event == "ping":
+                    continue
+                
+                try:
+                    data = json.loads(event.data)
+                except json.JSONDecodeError as e:
+                    self.logger.warning(f"解析Anthropic流式数据失败: {e}, 数据: {event.data}")
+                    continue
+                
+                # 提取内容
+                content = self._extract_content_from_anthropic_stream(data)
+                if content:
+                    yield content
                         
         except Exception as e:
             self.logger.error(f"处理Anthropic流式响应失败: {e}")
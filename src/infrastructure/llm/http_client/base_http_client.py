@@ -5,12 +5,14 @@
 
 import asyncio
 import httpx
-from typing import Dict, Any, Optional, AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncGenerator, AsyncIterator
 from datetime import datetime
 
 from src.interfaces.llm.http_client import IHttpClient
 from src.interfaces.dependency_injection import get_logger
 from src.infrastructure.llm.utils.header_validator import HeaderProcessor
+from src.infrastructure.llm.http_client.sse_decoder import SSEEvent, aiter_sse_events
 
 
 class BaseHttpClient(IHttpClient):
@@ -171,14 +173,15 @@ class BaseHttpClient(IHttpClient):
         else:
             raise RuntimeError("请求失败，未知错误")
     
-    async def stream_post(
+    @asynccontextmanager
+    async def _open_stream(
         self,
         endpoint: str,
         data: Dict[str, Any],
         headers: Optional[Dict[str, str]] = None,
         timeout: Optional[float] = None
-    ) -> AsyncGenerator[str, None]:
-        """发送流式POST请求
+    ) -> AsyncIterator[httpx.Response]:
+        """打开流式POST请求
         
         Args:
             endpoint: API端点
@@ -187,7 +190,7 @@ class BaseHttpClient(IHttpClient):
             timeout: 超时时间
             
         Yields:
-            str: 流式响应数据片段
+            httpx.Response: 已校验状态码的流式响应
             
         Raises:
             Exception: 请求失败时抛出异常
@@ -232,14 +235,7 @@ class BaseHttpClient(IHttpClient):
                 )
                 
                 response.raise_for_status()
-                
-                chunk_count = 0
-                async for chunk in response.aiter_text():
-                    chunk_count += 1
-                    if chunk.strip():  # 只返回非空块
-                        yield chunk
-                
-                self.logger.debug(f"流式响应完成，共 {chunk_count} 个数据块")
+                yield response
                         
         except httpx.HTTPStatusError as e:
             self.logger.error(f"流式请求HTTP错误: {e}")
@@ -251,6 +247,68 @@ class BaseHttpClient(IHttpClient):
             self.logger.error(f"流式请求未知错误: {e}")
             raise
     
+    async def stream_post(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncGenerator[str, None]:
+        """发送流式POST请求
+        
+        Args:
+            endpoint: API端点
+            data: 请求数据
+            headers: 请求头
+            timeout: 超时时间
+            
+        Yields:
+            str: 流式响应数据片段
+            
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        async with self._open_stream(endpoint, data, headers, timeout) as response:
+            chunk_count = 0
+            async for chunk in response.aiter_text():
+                chunk_count += 1
+                if chunk.strip():  # 只返回非空块
+                    yield chunk
+            
+            self.logger.debug(f"流式响应完成，共 {chunk_count} 个数据块")
+    
+    async def stream_sse(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncGenerator[SSEEvent, None]:
+        """发送流式POST请求并按SSE协议解析响应
+        
+        直接读取原始字节流，由 SSEDecoder 按行组装事件，
+        不依赖网络分块与事件边界对齐。
+        
+        Args:
+            endpoint: API端点
+            data: 请求数据
+            headers: 请求头
+            timeout: 超时时间
+            
+        Yields:
+            SSEEvent: SSE事件
+            
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        async with self._open_stream(endpoint, data, headers, timeout) as response:
+            event_count = 0
+            async for event in aiter_sse_events(response.aiter_bytes()):
+                event_count += 1
+                yield event
+            
+            self.logger.debug(f"SSE流式响应完成，共 {event_count} 个事件")
+    
     def set_auth_header(self, token: str) -> None:
         """设置认证头部
         
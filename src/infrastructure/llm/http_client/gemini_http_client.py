@@ -98,8 +98,11 @@ class GeminiHttpClient(BaseHttpClient, ILLMHttpClient):
             # 转换请求格式
             request_data = self.format_utils.convert_request(messages, request_params)
             
-            # 构建端点URL
-            endpoint = f"models/{model}:generateContent"
+            # 构建端点URL，流式请求使用SSE格式的streamGenerateContent
+            if stream:
+                endpoint = f"models/{model}:streamGenerateContent?alt=sse"
+            else:
+                endpoint = f"models/{model}:generateContent"
             
             self.logger.debug(
                 f"调用Gemini API",
@@ -134,18 +137,17 @@ class GeminiHttpClient(BaseHttpClient, ILLMHttpClient):
             str: 流式响应数据片段
         """
         try:
-            async for chunk in self.stream_post(endpoint, request_data):
-                # Gemini流式响应格式
-                if chunk.strip():
-                    try:
-                        data = json.loads(chunk)
-                        # 提取内容
-                        content = self._extract_content_from_gemini_stream(data)
-                        if content:
-                            yield content
-                    except json.JSONDecodeError as e:
-                        self.logger.warning(f"解析Gemini流式数据失败: {e}, 数据: {chunk}")
-                        continue
+            async for event in self.stream_sse(endpoint, request_data):
+                try:
+                    data = json.loads(event.data)
+                except json.JSONDecodeError as e:
+                    self.logger.warning(f"解析Gemini流式数据失败: {e}, 数据: {event.data}")
+                    continue
+                
+                # 提取内容
+                content = self._extract_content_from_gemini_stream(data)
+                if content:
+                    yield content
                         
         except Exception as e:
             self.logger.error(f"处理Gemini流式响应失败: {e}")
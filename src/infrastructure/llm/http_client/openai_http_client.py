@@ -226,24 +226,21 @@ class OpenAIHttpClient(BaseHttpClient, ILLMHttpClient):
             str: 流式响应数据片段
         """
         try:
-            async for chunk in self.stream_post("chat/completions", request_data):
-                # 解析SSE格式的数据
-                if chunk.startswith("data: "):
-                    data_str = chunk[6:]  # 移除 "data: " 前缀
-                    
-                    # 跳过结束标记
-                    if data_str.strip() == "[DONE]":
-                        break
-                    
-                    try:
-                        data = json.loads(data_str)
-                        # 提取内容
-                        content = self._extract_content_from_stream_chunk(data)
-                        if content:
-                            yield content
-                    except json.JSONDecodeError as e:
-                        self.logger.warning(f"解析流式数据失败: {e}, 数据: {data_str}")
-                        continue
+            async for event in self.stream_sse("chat/completions", request_data):
+                # 结束标记
+                if event.data == "[DONE]":
+                    break
+                
+                try:
+                    data = json.loads(event.data)
+                except json.JSONDecodeError as e:
+                    self.logger.warning(f"解析流式数据失败: {e}, 数据: {event.data}")
+                    continue
+                
+                # 提取内容
+                content = self._extract_content_from_stream_chunk(data)
+                if content:
+                    yield content
                         
         except Exception as e:
             self.logger.error(f"处理Chat Completions流式响应失败: {e}")
@@ -261,24 +258,21 @@ class OpenAIHttpClient(BaseHttpClient, ILLMHttpClient):
             str: 流式响应数据片段
         """
         try:
-            async for chunk in self.stream_post("responses", request_data):
-                # 解析SSE格式的数据
-                if chunk.startswith("data: "):
-                    data_str = chunk[6:]  # 移除 "data: " 前缀
-                    
-                    # 跳过结束标记
-                    if data_str.strip() == "[DONE]":
-                        break
-                    
-                    try:
-                        data = json.loads(data_str)
-                        # 提取内容
-                        content = self._extract_content_from_responses_chunk(data)
-                        if content:
-                            yield content
-                    except json.JSONDecodeError as e:
-                        self.logger.warning(f"解析Responses流式数据失败: {e}, 数据: {data_str}")
-                        continue
+            async for event in self.stream_sse("responses", request_data):
+                # 结束标记
+                if event.data == "[DONE]":
+                    break
+                
+                try:
+                    data = json.loads(event.data)
+                except json.JSONDecodeError as e:
+                    self.logger.warning(f"解析Responses流式数据失败: {e}, 数据: {event.data}")
+                    continue
+                
+                # 提取内容
+                content = self._extract_content_from_responses_chunk(data)
+                if content:
+                    yield content
                         
         except Exception as e:
             self.logger.error(f"处理Responses流式响应失败: {e}")
@@ -0,0 +1,152 @@
+"""SSE（Server-Sent Events）增量解码器
+
+按行切分字节流并组装事件，供各提供商 HTTP 客户端解析流式响应。
+网络分块与事件边界无关：一个分块可以包含多个事件，一个事件也可以跨越多个分块。
+"""
+
+from typing import AsyncIterable, AsyncGenerator, List, Optional
+
+
+class SSEEvent:
+    """SSE事件"""
+    
+    __slots__ = ("event", "data", "id", "retry")
+    
+    def __init__(
+        self,
+        data: str,
+        event: str = "message",
+        id: Optional[str] = None,
+        retry: Optional[int] = None
+    ):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+    
+    def __repr__(self) -> str:
+        return f"SSEEvent(event={self.event!r}, data={self.data!r}, id={self.id!r})"
+
+
+class SSEDecoder:
+    """SSE增量解码器
+    
+    维护一个可复用的字节缓冲区，每次 feed 只处理缓冲区中已完整的行，
+    未完成的行保留到下一个分块。支持 LF、CRLF 和 CR 三种行结束符；
+    事件数据在分发时才解码为字符串。
+    """
+    
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._data_lines: List[bytes] = []
+        self._event_type: Optional[str] = None
+        self._last_event_id: Optional[str] = None
+        self._retry: Optional[int] = None
+    
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """输入一个字节分块
+        
+        Args:
+            chunk: 字节分块
+        
+        Returns:
+            List[SSEEvent]: 本次分块中完成的事件
+        """
+        buffer = self._buffer
+        buffer += chunk
+        
+        # 末尾的CR可能是被拆开的CRLF，留到下一个分块再处理
+        search_end = len(buffer) - 1 if buffer.endswith(b"\r") else len(buffer)
+        end = max(buffer.rfind(b"\n", 0, search_end), buffer.rfind(b"\r", 0, search_end))
+        if end < 0:
+            return []
+        
+        complete = bytes(buffer[:end + 1])
+        del buffer[:end + 1]
+        
+        events: List[SSEEvent] = []
+        for line in complete.splitlines():
+            event = self._process_line(line)
+            if event is not None:
+                events.append(event)
+        return events
+    
+    def flush(self) -> List[SSEEvent]:
+        """结束输入，分发缓冲区中剩余的事件
+        
+        Returns:
+            List[SSEEvent]: 剩余的事件
+        """
+        events: List[SSEEvent] = []
+        if self._buffer:
+            remaining = bytes(self._buffer)
+            self._buffer.clear()
+            for line in remaining.splitlines():
+                event = self._process_line(line)
+                if event is not None:
+                    events.append(event)
+        
+        event = self._dispatch()
+        if event is not None:
+            events.append(event)
+        return events
+    
+    def _process_line(self, line: bytes) -> Optional[SSEEvent]:
+        """处理一行，空行表示事件结束"""
+        if not line:
+            return self._dispatch()
+        
+        # 冒号开头的行是注释（常用作心跳）
+        if line[0] == 0x3A:
+            return None
+        
+        field, _, value = line.partition(b":")
+        if value[:1] == b" ":
+            value = value[1:]
+        
+        if field == b"data":
+            self._data_lines.append(value)
+        elif field == b"event":
+            self._event_type = value.decode("utf-8", "replace")
+        elif field == b"id":
+            if b"\x00" not in value:
+                self._last_event_id = value.decode("utf-8", "replace")
+        elif field == b"retry":
+            if value.isdigit():
+                self._retry = int(value)
+        return None
+    
+    def _dispatch(self) -> Optional[SSEEvent]:
+        """分发当前事件并重置事件状态"""
+        data_lines = self._data_lines
+        event_type = self._event_type
+        self._event_type = None
+        
+        if not data_lines:
+            return None
+        
+        self._data_lines = []
+        data = data_lines[0] if len(data_lines) == 1 else b"\n".join(data_lines)
+        return SSEEvent(
+            data=data.decode("utf-8", "replace"),
+            event=event_type or "message",
+            id=self._last_event_id,
+            retry=self._retry
+        )
+
+
+async def aiter_sse_events(byte_stream: AsyncIterable[bytes]) -> AsyncGenerator[SSEEvent, None]:
+    """将字节流解码为SSE事件流
+    
+    Args:
+        byte_stream: 字节分块异步迭代器（如 httpx 的 response.aiter_bytes()）
+    
+    Yields:
+        SSEEvent: SSE事件
+    """
+    decoder = SSEDecoder()
+    async for chunk in byte_stream:
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
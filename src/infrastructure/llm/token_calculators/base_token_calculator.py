@@ -4,6 +4,7 @@
 定义统一的Token计算接口，提供通用功能的默认实现。
 """
 
+import time
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, Sequence, List, Union
 from datetime import datetime
@@ -210,6 +211,10 @@ class ITokenCalculator(ABC):
 class BaseTokenCalculator(ITokenCalculator):
     """Token计算器基础实现类"""
     
+    # 批量编码配置：待编码文本数达到阈值时使用编码器的多线程批量编码
+    batch_encode_threads: int = 8
+    batch_encode_min_size: int = 16
+    
     def __init__(self, provider_name: str, model_name: str):
         """
         初始化基础Token计算器
@@ -231,6 +236,82 @@ class BaseTokenCalculator(ITokenCalculator):
         """加载编码器（子类实现）"""
         pass
     
+    def _encode_token_counts(self, texts: List[str]) -> List[int]:
+        """
+        计算一组文本的token数量
+        
+        文本数达到 batch_encode_min_size 时使用tiktoken的 encode_batch，
+        由原生线程池并行编码（编码期间释放GIL），否则逐个编码。
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            List[int]: token数量列表
+        """
+        if len(texts) >= self.batch_encode_min_size and hasattr(self._encoding, "encode_batch"):
+            encoded = self._encoding.encode_batch(texts, num_threads=self.batch_encode_threads)
+            return [len(tokens) for tokens in encoded]
+        return [len(self._encoding.encode(text)) for text in texts]
+    
+    def _count_tokens_batch_with_encoding(self, texts: List[str]) -> List[Optional[int]]:
+        """
+        使用编码器批量计算token数量，先批量查询缓存，只编码未命中且去重后的文本
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            List[Optional[int]]: token数量列表，计算失败的位置为None
+        """
+        cache = getattr(self, "cache", None)
+        results: List[Optional[int]] = [None] * len(texts)
+        
+        if cache is not None:
+            cached_results = cache.get_batch([(text, self.model_name, None) for text in texts])
+        else:
+            cached_results = [None] * len(texts)
+        
+        # 收集未缓存的文本，相同文本只编码一次
+        uncached_indices: Dict[str, List[int]] = {}
+        for i, (text, cached_result) in enumerate(zip(texts, cached_results)):
+            if cached_result is not None:
+                results[i] = cached_result
+            elif not text:
+                results[i] = 0
+            else:
+                uncached_indices.setdefault(text, []).append(i)
+        
+        if not uncached_indices:
+            return results
+        
+        if not self._encoding:
+            logger.warning("tiktoken编码器不可用，无法批量计算token")
+            self._update_stats_on_failure()
+            return results
+        
+        start_time = time.time()
+        uncached_texts = list(uncached_indices)
+        try:
+            token_counts = self._encode_token_counts(uncached_texts)
+        except Exception as e:
+            logger.error(f"批量计算token失败: {e}")
+            self._update_stats_on_failure()
+            return results
+        
+        for text, token_count in zip(uncached_texts, token_counts):
+            for index in uncached_indices[text]:
+                results[index] = token_count
+        
+        if cache is not None:
+            cache.put_batch([
+                (text, self.model_name, token_count, None, None)
+                for text, token_count in zip(uncached_texts, token_counts)
+            ])
+        
+        self._update_stats_on_success(sum(token_counts), time.time() - start_time)
+        return results
+    
     def _update_stats_on_success(self, token_count: int, calculation_time: float) -> None:
         """更新成功统计"""
         self._stats.total_calculations += 1
@@ -4,11 +4,10 @@ Gemini Token计算器
 基于API响应进行token统计，以tiktoken作为回退方案。
 """
 
-from typing import Dict, Any, Optional, Sequence, List
+from typing import Dict, Any, Optional, List
 from src.interfaces.dependency_injection import get_logger
 from .local_token_calculator import LocalTokenCalculator, TiktokenConfig
 from ..models import TokenUsage
-from src.interfaces.messages import IBaseMessage
 
 logger = get_logger(__name__)
 
@@ -19,6 +18,11 @@ class GeminiTokenCalculator(LocalTokenCalculator):
     专门针对Gemini API的token计算器，优先使用API响应统计。
     """
     
+    # Gemini消息格式开销可能与OpenAI不同，使用相同的估算方法，不计回复token
+    tokens_per_message = 4
+    tokens_per_name = 2
+    reply_tokens = 0
+    
     def __init__(self, model_name: str = "gemini-pro", enable_cache: bool = True):
         """
         初始化Gemini Token计算器
@@ -114,37 +118,3 @@ class GeminiTokenCalculator(LocalTokenCalculator):
             # 检查是否有Gemini特有的响应结构
             "candidates" in response
         )
-    
-    def _count_messages_tokens_with_encoding(self, messages: Sequence[IBaseMessage]) -> int:
-        """
-        使用编码器计算Gemini消息格式的token数量
-        
-        Args:
-            messages: 消息列表
-            
-        Returns:
-            int: token数量
-        """
-        if not self._encoding:
-            return 0
-        
-        total_tokens = 0
-        
-        # Gemini消息格式开销可能与OpenAI不同，但使用相同的估算方法
-        tokens_per_message = 4  # Gemini可能有不同的消息开销
-        tokens_per_name = 2
-        
-        for message in messages:
-            # 计算消息内容的token
-            total_tokens += tokens_per_message
-            content = self._extract_message_content(message)
-            total_tokens += len(self._encoding.encode(content))
-            
-            # 如果有名称，添加名称的token
-            if message.name:
-                total_tokens += tokens_per_name + len(self._encoding.encode(message.name))
-        
-        # Gemini可能不需要额外的回复token
-        # total_tokens += 3
-        
-        return total_tokens
\ No newline at end of file
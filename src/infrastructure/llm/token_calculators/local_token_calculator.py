@@ -4,7 +4,10 @@
 基于API响应进行token统计，以tiktoken作为回退方案。
 """
 
+import hashlib
+import threading
 import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Sequence, List, Tuple
 from dataclasses import dataclass
 
@@ -27,14 +30,25 @@ class TiktokenConfig:
     cache_enabled: bool = True
     cache_max_size: int = 1000
     cache_ttl: Optional[float] = 3600  # 1小时
+    message_cache_max_size: int = 10000  # 单条消息token计数缓存容量
+    batch_num_threads: int = 8  # 批量编码线程数
+    batch_min_size: int = 16  # 达到该文本数才使用批量编码
 
 
 class LocalTokenCalculator(BaseTokenCalculator):
     """通用Token计算器
     
     基于API响应进行token统计，以tiktoken作为回退方案。
+    
+    消息token按条缓存（键为编码器名称+消息内容哈希），对话历史每轮只需
+    编码新追加的消息。
     """
     
+    # 消息格式开销（OpenAI格式作为通用标准），子类可覆盖
+    tokens_per_message: int = 3
+    tokens_per_name: int = 1
+    reply_tokens: int = 3
+    
     def __init__(
         self,
         provider_name: str = "universal",
@@ -54,10 +68,16 @@ class LocalTokenCalculator(BaseTokenCalculator):
         super().__init__(provider_name, model_name)
         
         self.tiktoken_config = tiktoken_config or TiktokenConfig()
+        self.batch_encode_threads = self.tiktoken_config.batch_num_threads
+        self.batch_encode_min_size = self.tiktoken_config.batch_min_size
         self.enable_cache = enable_cache
         self.cache = TokenCache() if enable_cache else None
         self.response_parser = get_token_response_parser()
         
+        # 单条消息token计数缓存（LRU），值不含消息格式开销
+        self._message_tokens: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._message_tokens_lock = threading.Lock()
+        
         # 初始化tiktoken编码器
         self._encoding = None
         self._load_tiktoken_encoding()
@@ -98,7 +118,7 @@ class LocalTokenCalculator(BaseTokenCalculator):
         start_time = time.time()
         
         # 检查缓存
-        if self.cache:
+        if self.cache is not None:
             cached_result = self.cache.get(text, self.model_name)
             if cached_result is not None:
                 self._update_cache_stats(True)
@@ -111,7 +131,7 @@ class LocalTokenCalculator(BaseTokenCalculator):
                 token_count = len(self._encoding.encode(text))
                 
                 # 存储到缓存
-                if self.cache:
+                if self.cache is not None:
                     self.cache.put(text, self.model_name, token_count)
                 
                 # 更新统计
@@ -174,30 +194,110 @@ class LocalTokenCalculator(BaseTokenCalculator):
         Returns:
             int: token数量
         """
-        total_tokens = 0
-        
         # 检查编码器是否可用
         if not self._encoding:
             return 0
         
-        # 每条消息的开销（OpenAI格式作为通用标准）
-        tokens_per_message = 3
-        tokens_per_name = 1
+        total_tokens = sum(self._count_message_tokens_cached(message) for message in messages)
+        
+        # 添加回复的token
+        return total_tokens + self.reply_tokens
+    
+    def _count_message_tokens_cached(self, message: IBaseMessage) -> int:
+        """
+        计算单条消息的token数量（含消息格式开销），命中缓存时不重新编码，禁用缓存时每次都编码
         
-        for message in messages:
-            # 计算消息内容的token
-            total_tokens += tokens_per_message
-            content = self._extract_message_content(message)
-            total_tokens += len(self._encoding.encode(content))
+        Args:
+            message: 消息
             
-            # 如果有名称，添加名称的token
-            if message.name:
-                total_tokens += tokens_per_name + len(self._encoding.encode(message.name))
+        Returns:
+            int: token数量
+        """
+        content = self._extract_message_content(message)
+        name = message.name or ""
+        if not self.enable_cache:
+            return self.tokens_per_message + self._count_message_body_tokens(content, name)
+        
+        digest = hashlib.blake2b(
+            f"{name}\x00{content}".encode("utf-8", "surrogatepass"), digest_size=16
+        ).hexdigest()
+        key = (self._encoding.name, digest)
+        
+        with self._message_tokens_lock:
+            body_tokens = self._message_tokens.get(key)
+            if body_tokens is not None:
+                self._message_tokens.move_to_end(key)
+        
+        self._update_cache_stats(body_tokens is not None)
+        if body_tokens is None:
+            body_tokens = self._count_message_body_tokens(content, name)
+            
+            with self._message_tokens_lock:
+                self._message_tokens[key] = body_tokens
+                while len(self._message_tokens) > self.tiktoken_config.message_cache_max_size:
+                    self._message_tokens.popitem(last=False)
         
-        # 添加回复的token
-        total_tokens += 3
+        return self.tokens_per_message + body_tokens
+    
+    def _count_message_body_tokens(self, content: str, name: str) -> int:
+        """
+        编码计算单条消息内容和名称的token数量（不含消息格式开销）
         
-        return total_tokens
+        Args:
+            content: 消息内容
+            name: 消息名称
+            
+        Returns:
+            int: token数量
+        """
+        body_tokens = len(self._encoding.encode(content))
+        if name:
+            body_tokens += self.tokens_per_name + len(self._encoding.encode(name))
+        return body_tokens
+    
+    def count_appended_messages_tokens(
+        self,
+        previous_total: int,
+        appended_messages: Sequence[IBaseMessage]
+    ) -> Optional[int]:
+        """
+        增量计算追加消息后的token总数
+        
+        只编码新追加的消息，前缀的token数直接复用上一次的结果。
+        
+        Args:
+            previous_total: 前缀消息列表的token总数（count_messages_tokens的返回值）
+            appended_messages: 追加到前缀之后的消息
+            
+        Returns:
+            Optional[int]: 追加后完整消息列表的token数量
+        """
+        if not appended_messages:
+            return previous_total
+        
+        start_time = time.time()
+        
+        if not self._encoding:
+            logger.warning("tiktoken编码器不可用，无法计算消息token")
+            self._update_stats_on_failure()
+            return None
+        
+        try:
+            # 空前缀没有回复开销，需要补上
+            base_total = previous_total if previous_total > 0 else self.reply_tokens
+            token_count = base_total + sum(
+                self._count_message_tokens_cached(message) for message in appended_messages
+            )
+            
+            calculation_time = time.time() - start_time
+            self._update_stats_on_success(token_count, calculation_time)
+            
+            return token_count
+            
+        except Exception as e:
+            logger.error(f"增量计算消息token失败: {e}")
+            self._update_stats_on_failure()
+            return None
     
     def parse_api_response(self, response: Dict[str, Any]) -> Optional[TokenUsage]:
         """
@@ -274,49 +374,7 @@ class LocalTokenCalculator(BaseTokenCalculator):
         Returns:
             List[Optional[int]]: token数量列表
         """
-        if not self.cache:
-            # 如果没有缓存，逐个计算
-            return [self.count_tokens(text) for text in texts]
-        
-        # 批量检查缓存
-        cache_items: List[Tuple[str, str, Optional[Dict[str, Any]]]] = [(text, self.model_name, None) for text in texts]
-        cached_results = self.cache.get_batch(cache_items)
-        
-        # 计算未缓存的文本
-        results = []
-        uncached_texts = []
-        uncached_indices = []
-        
-        for i, (text, cached_result) in enumerate(zip(texts, cached_results)):
-            if cached_result is not None:
-                results.append(cached_result)
-            else:
-                results.append(None)
-                uncached_texts.append(text)
-                uncached_indices.append(i)
-        
-        # 批量计算未缓存的文本
-        if uncached_texts and self._encoding:
-            try:
-                # 使用tiktoken的批量编码
-                uncached_tokens = [len(self._encoding.encode(text)) for text in uncached_texts]
-                
-                # 更新结果和缓存
-                cache_put_items = []
-                for text, token_count, original_index in zip(uncached_texts, uncached_tokens, uncached_indices):
-                    results[original_index] = token_count
-                    cache_put_items.append((text, self.model_name, token_count, None, None))
-                
-                # 批量存储到缓存
-                self.cache.put_batch(cache_put_items)
-                
-            except Exception as e:
-                logger.error(f"批量计算token失败: {e}")
-                # 设置失败的结果为None
-                for original_index in uncached_indices:
-                    results[original_index] = None
-        
-        return results
+        return self._count_tokens_batch_with_encoding(texts)
     
     def is_supported_response(self, response: Dict[str, Any]) -> bool:
         """
@@ -341,14 +399,18 @@ class LocalTokenCalculator(BaseTokenCalculator):
     
     def clear_cache(self) -> None:
         """清空缓存"""
-        if self.cache:
+        if self.cache is not None:
             self.cache.clear()
+        with self._message_tokens_lock:
+            self._message_tokens.clear()
     
     def get_cache_stats(self) -> Optional[Dict[str, Any]]:
         """获取缓存统计信息"""
-        if not self.cache:
+        if self.cache is None:
             return None
-        return self.cache.get_cache_info()
+        cache_info = self.cache.get_cache_info()
+        cache_info["message_cache_size"] = len(self._message_tokens)
+        return cache_info
     
     def _update_cache_stats(self, hit: bool) -> None:
         """更新缓存统计"""
@@ -384,6 +446,8 @@ class LocalTokenCalculator(BaseTokenCalculator):
             config: 新的配置
         """
         self.tiktoken_config = config
+        self.batch_encode_threads = config.batch_num_threads
+        self.batch_encode_min_size = config.batch_min_size
         self._load_tiktoken_encoding()
         logger.info("tiktoken配置已更新")
     
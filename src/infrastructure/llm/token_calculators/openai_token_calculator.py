@@ -77,7 +77,7 @@ class OpenAITokenCalculator(BaseTokenCalculator):
         start_time = time.time()
         
         # 检查缓存
-        if self.cache:
+        if self.cache is not None:
             cached_result = self.cache.get(text, self.model_name)
             if cached_result is not None:
                 self._update_cache_stats(True)
@@ -93,7 +93,7 @@ class OpenAITokenCalculator(BaseTokenCalculator):
             token_count = len(self._encoding.encode(text))
             
             # 存储到缓存
-            if self.cache:
+            if self.cache is not None:
                 self.cache.put(text, self.model_name, token_count)
             
             # 更新统计
@@ -322,49 +322,7 @@ class OpenAITokenCalculator(BaseTokenCalculator):
         Returns:
             List[Optional[int]]: token数量列表
         """
-        if not self.cache:
-            # 如果没有缓存，逐个计算
-            return [self.count_tokens(text) for text in texts]
-        
-        # 批量检查缓存
-        cache_items: List[Tuple[str, str, Optional[Dict[str, Any]]]] = [(text, self.model_name, None) for text in texts]
-        cached_results = self.cache.get_batch(cache_items)
-        
-        # 计算未缓存的文本
-        results = []
-        uncached_texts = []
-        uncached_indices = []
-        
-        for i, (text, cached_result) in enumerate(zip(texts, cached_results)):
-            if cached_result is not None:
-                results.append(cached_result)
-            else:
-                results.append(None)
-                uncached_texts.append(text)
-                uncached_indices.append(i)
-        
-        # 批量计算未缓存的文本
-        if uncached_texts and self._encoding:
-            try:
-                # 使用tiktoken的批量编码
-                uncached_tokens = [len(self._encoding.encode(text)) for text in uncached_texts]
-                
-                # 更新结果和缓存
-                cache_put_items = []
-                for text, token_count, original_index in zip(uncached_texts, uncached_tokens, uncached_indices):
-                    results[original_index] = token_count
-                    cache_put_items.append((text, self.model_name, token_count, None, None))
-                
-                # 批量存储到缓存
-                self.cache.put_batch(cache_put_items)
-                
-            except Exception as e:
-                logger.error(f"批量计算OpenAI token失败: {e}")
-                # 设置失败的结果为None
-                for original_index in uncached_indices:
-                    results[original_index] = None
-        
-        return results
+        return self._count_tokens_batch_with_encoding(texts)
     
     def is_model_supported(self, model_name: str) -> bool:
         """
@@ -381,7 +339,7 @@ class OpenAITokenCalculator(BaseTokenCalculator):
     
     def clear_cache(self) -> None:
         """清空缓存"""
-        if self.cache:
+        if self.cache is not None:
             self.cache.clear()
     
     def _update_cache_stats(self, hit: bool) -> None:
@@ -393,6 +351,6 @@ class OpenAITokenCalculator(BaseTokenCalculator):
     
     def get_cache_stats(self) -> Optional[Dict[str, Any]]:
         """获取缓存统计信息"""
-        if not self.cache:
+        if self.cache is None:
             return None
         return self.cache.get_cache_info()
\ No newline at end of file
@@ -131,35 +131,41 @@ class TokenCache:
         key = self._generate_key(text, model_name, extra_params)
         
         with self._lock:
+            value = self._get_locked(key)
+        
+        if value is not None:
+            logger.debug(f"缓存命中: {key[:8]}... = {value}")
+        return value
+    
+    def _get_locked(self, key: str) -> Optional[int]:
+        """按键获取缓存值，调用方需持有锁"""
+        if self.enable_stats:
+            self._stats.total_requests += 1
+        
+        entry = self._cache.get(key)
+        if entry is None:
             if self.enable_stats:
-                self._stats.total_requests += 1
-            
-            if key not in self._cache:
-                if self.enable_stats:
-                    self._stats.misses += 1
-                return None
-            
-            entry = self._cache[key]
-            
-            # 检查是否过期
-            if entry.is_expired():
-                # 移除过期条目
-                del self._cache[key]
-                if self.enable_stats:
-                    self._stats.misses += 1
-                    self._stats.current_size -= 1
-                logger.debug(f"缓存条目过期: {key[:8]}...")
-                return None
-            
-            # 更新访问信息（LRU）
-            entry.touch()
-            self._cache.move_to_end(key)
-            
+                self._stats.misses += 1
+            return None
+        
+        # 检查是否过期
+        if entry.is_expired():
+            # 移除过期条目
+            del self._cache[key]
             if self.enable_stats:
-                self._stats.hits += 1
-            
-            logger.debug(f"缓存命中: {key[:8]}... = {entry.value}")
-            return entry.value
+                self._stats.misses += 1
+                self._stats.current_size -= 1
+            logger.debug(f"缓存条目过期: {key[:8]}...")
+            return None
+        
+        # 更新访问信息（LRU）
+        entry.touch()
+        self._cache.move_to_end(key)
+        
+        if self.enable_stats:
+            self._stats.hits += 1
+        
+        return entry.value
     
     def put(
         self,
@@ -182,31 +188,33 @@ class TokenCache:
         key = self._generate_key(text, model_name, extra_params)
         
         with self._lock:
-            # 如果键已存在，更新值
-            if key in self._cache:
-                self._cache[key].value = token_count
-                self._cache[key].touch()
-                self._cache.move_to_end(key)
-                return
-            
-            # 检查缓存容量
-            if len(self._cache) >= self.max_size:
-                self._evict_lru()
-            
-            # 创建新条目
-            entry = CacheEntry(
-                value=token_count,
-                timestamp=time.time(),
-                ttl=ttl or self.default_ttl
-            )
-            
-            self._cache[key] = entry
+            self._put_locked(key, token_count, ttl)
+        
+        logger.debug(f"缓存存储: {key[:8]}... = {token_count}")
+    
+    def _put_locked(self, key: str, token_count: int, ttl: Optional[float]) -> None:
+        """按键存储缓存值，调用方需持有锁"""
+        # 如果键已存在，更新值
+        entry = self._cache.get(key)
+        if entry is not None:
+            entry.value = token_count
+            entry.touch()
             self._cache.move_to_end(key)
-            
-            if self.enable_stats:
-                self._stats.current_size += 1
-            
-            logger.debug(f"缓存存储: {key[:8]}... = {token_count}")
+            return
+        
+        # 检查缓存容量
+        if len(self._cache) >= self.max_size:
+            self._evict_lru()
+        
+        # 创建新条目
+        self._cache[key] = CacheEntry(
+            value=token_count,
+            timestamp=time.time(),
+            ttl=ttl or self.default_ttl
+        )
+        
+        if self.enable_stats:
+            self._stats.current_size += 1
     
     def get_batch(self, items: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> List[Optional[int]]:
         """
@@ -218,11 +226,11 @@ class TokenCache:
         Returns:
             List[Optional[int]]: 对应的token数量列表
         """
-        results = []
-        for text, model_name, extra_params in items:
-            result = self.get(text, model_name, extra_params)
-            results.append(result)
-        return results
+        # 在锁外计算键，整批只加锁一次
+        keys = [self._generate_key(text, model_name, extra_params) for text, model_name, extra_params in items]
+        
+        with self._lock:
+            return [self._get_locked(key) for key in keys]
     
     def put_batch(
         self,
@@ -234,8 +242,15 @@ class TokenCache:
         Args:
             items: (text, model_name, token_count, extra_params, ttl) 元组列表
         """
-        for text, model_name, token_count, extra_params, ttl in items:
-            self.put(text, model_name, token_count, extra_params, ttl)
+        # 在锁外计算键，整批只加锁一次
+        entries = [
+            (self._generate_key(text, model_name, extra_params), token_count, ttl)
+            for text, model_name, token_count, extra_params, ttl in items
+        ]
+        
+        with self._lock:
+            for key, token_count, ttl in entries:
+                self._put_locked(key, token_count, ttl)
     
     def _evict_lru(self) -> None:
         """移除最少使用的条目"""
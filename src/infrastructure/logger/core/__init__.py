@@ -1,10 +1,13 @@
 """基础设施层日志核心组件"""
 
+from .async_file_writer import AsyncLogFileWriter, OverflowPolicy
 from .log_level import LogLevel
 from .redactor import LogRedactor, CustomLogRedactor
 from .structured_file_logger import StructuredFileLogger
 
 __all__ = [
+    "AsyncLogFileWriter",
+    "OverflowPolicy",
     "LogLevel",
     "LogRedactor",
     "CustomLogRedactor", 
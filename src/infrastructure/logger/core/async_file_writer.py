@@ -0,0 +1,332 @@
+"""异步批量日志文件写入器
+
+日志记录在调用线程中只做入队，由后台写线程保持文件打开并批量写入，
+按条数或时间间隔统一刷新到磁盘，日志轮转也在写线程中完成。
+"""
+
+import atexit
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional, TextIO, Union
+
+
+class OverflowPolicy(Enum):
+    """队列满时的处理策略"""
+    
+    BLOCK = "block"  # 阻塞调用方直到队列有空位（可设置超时，超时后丢弃）
+    DROP_NEW = "drop_new"  # 丢弃新记录
+    DROP_OLDEST = "drop_oldest"  # 丢弃最早入队的记录
+
+
+_active_writers: "weakref.WeakSet[AsyncLogFileWriter]" = weakref.WeakSet()
+
+
+def _close_active_writers() -> None:
+    """进程退出时写出所有未落盘的日志"""
+    for writer in list(_active_writers):
+        writer.close()
+
+
+atexit.register(_close_active_writers)
+
+
+class AsyncLogFileWriter:
+    """异步批量日志文件写入器"""
+    
+    def __init__(
+        self,
+        filename: str,
+        encoding: str = "utf-8",
+        mode: str = "a",
+        max_bytes: Optional[int] = None,
+        backup_count: int = 0,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.BLOCK,
+        block_timeout: Optional[float] = None,
+    ):
+        """初始化写入器
+        
+        Args:
+            filename: 日志文件名
+            encoding: 文件编码
+            mode: 首次打开文件的模式
+            max_bytes: 最大文件字节数，用于日志轮转
+            backup_count: 备份文件数量
+            queue_size: 队列容量（记录条数）
+            batch_size: 累积到该条数时立即写入并刷新
+            flush_interval: 最长刷新间隔（秒）
+            overflow_policy: 队列满时的处理策略
+            block_timeout: BLOCK 策略下的最长等待时间（秒），None表示一直等待
+        """
+        self.filename = filename
+        self.encoding = encoding
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.block_timeout = block_timeout
+        
+        self._records: Deque[str] = deque()
+        self._condition = threading.Condition()
+        self._flush_waiters: List[threading.Event] = []
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        
+        # 以下状态仅由写线程访问
+        self._file: Optional[TextIO] = None
+        self._file_size = 0
+        self._opened = False
+        
+        self._stats: Dict[str, int] = {
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "flushes": 0,
+            "rotations": 0,
+            "errors": 0,
+        }
+        
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def write(self, line: str) -> bool:
+        """将一行日志放入写队列
+        
+        Args:
+            line: 日志行（不含换行符）
+        
+        Returns:
+            是否入队成功（关闭后或按溢出策略丢弃时返回False）
+        """
+        with self._condition:
+            if self._closing:
+                return False
+            
+            if len(self._records) >= self.queue_size:
+                if self.overflow_policy is OverflowPolicy.DROP_NEW:
+                    self._stats["dropped"] += 1
+                    return False
+                if self.overflow_policy is OverflowPolicy.DROP_OLDEST:
+                    self._records.popleft()
+                    self._stats["dropped"] += 1
+                else:
+                    self._condition.notify_all()
+                    has_space = self._condition.wait_for(
+                        lambda: len(self._records) < self.queue_size or self._closing,
+                        timeout=self.block_timeout
+                    )
+                    if not has_space or self._closing:
+                        self._stats["dropped"] += 1
+                        return False
+            
+            self._records.append(line)
+            if self._thread is None:
+                self._start()
+            if len(self._records) >= self.batch_size:
+                self._condition.notify_all()
+            return True
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待队列中已有的日志全部写入并刷新到磁盘
+        
+        Args:
+            timeout: 最长等待时间（秒）
+        
+        Returns:
+            是否在超时前完成
+        """
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                return True
+            event = threading.Event()
+            self._flush_waiters.append(event)
+            self._condition.notify_all()
+        return event.wait(timeout)
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """写出剩余日志并停止写线程
+        
+        Args:
+            timeout: 等待写线程退出的最长时间（秒）
+        """
+        with self._condition:
+            if self._closing:
+                thread = self._thread
+            else:
+                self._closing = True
+                thread = self._thread
+                self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        _active_writers.discard(self)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取写入器统计信息"""
+        with self._condition:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["queued"] = len(self._records)
+        stats["overflow_policy"] = self.overflow_policy.value
+        return stats
+    
+    def _start(self) -> None:
+        """启动写线程（调用方需持有条件变量）"""
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"log-writer:{os.path.basename(self.filename)}",
+            daemon=True
+        )
+        self._thread.start()
+        _active_writers.add(self)
+    
+    def _run(self) -> None:
+        """写线程主循环"""
+        last_flush = time.monotonic()
+        unflushed = 0
+        
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (
+                        len(self._records) >= self.batch_size
+                        or self._flush_waiters
+                        or self._closing
+                    ),
+                    timeout=self.flush_interval
+                )
+                batch = list(self._records)
+                self._records.clear()
+                flush_waiters = self._flush_waiters
+                self._flush_waiters = []
+                closing = self._closing
+                # 唤醒因队列满而阻塞的调用方
+                self._condition.notify_all()
+            
+            if batch:
+                self._write_batch(batch)
+                unflushed += len(batch)
+            
+            now = time.monotonic()
+            if unflushed and (
+                unflushed >= self.batch_size
+                or now - last_flush >= self.flush_interval
+                or flush_waiters
+                or closing
+            ):
+                self._flush_file()
+                unflushed = 0
+                last_flush = now
+            
+            for event in flush_waiters:
+                event.set()
+            
+            if closing:
+                with self._condition:
+                    if self._records:
+                        continue
+                self._close_file()
+                return
+    
+    def _write_batch(self, batch: List[str]) -> None:
+        """写入一批日志行（写入文件缓冲区，由调用方统一刷新）"""
+        try:
+            if self.max_bytes is None:
+                if self._file is None:
+                    self._open_file()
+                if self._file is None:
+                    self._stats["errors"] += 1
+                    return
+                self._file.write("\n".join(batch) + "\n")
+            else:
+                # 需要轮转时逐行检查文件大小
+                for line in batch:
+                    if self._file_size >= self.max_bytes:
+                        self._rotate()
+                    if self._file is None:
+                        self._open_file()
+                    if self._file is None:
+                        self._stats["errors"] += 1
+                        return
+                    data = line + "\n"
+                    self._file.write(data)
+                    self._file_size += len(data.encode(self.encoding, errors="replace"))
+        except Exception as e:
+            print(f"写入日志文件失败: {e}")
+            self._stats["errors"] += 1
+            # 下一批重新打开文件
+            self._close_file()
+            return
+        
+        self._stats["written"] += len(batch)
+        self._stats["batches"] += 1
+    
+    def _open_file(self) -> None:
+        """打开日志文件（首次使用配置的模式，之后追加）"""
+        mode = self.mode if not self._opened else "a"
+        try:
+            self._file = open(self.filename, mode, encoding=self.encoding)
+            self._opened = True
+            self._file_size = os.path.getsize(self.filename) if self.max_bytes is not None else 0
+        except Exception as e:
+            print(f"无法打开日志文件 {self.filename}: {e}")
+            self._file = None
+    
+    def _flush_file(self) -> None:
+        """刷新文件缓冲区"""
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            self._stats["flushes"] += 1
+        except Exception:
+            self._stats["errors"] += 1
+    
+    def _close_file(self) -> None:
+        """关闭日志文件"""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except Exception:
+            pass
+        finally:
+            self._file = None
+    
+    def _rotate(self) -> None:
+        """轮转日志文件"""
+        self._close_file()
+        
+        try:
+            if self.backup_count > 0:
+                # 删除最老的备份文件
+                oldest_backup = f"{self.filename}.{self.backup_count}"
+                if os.path.exists(oldest_backup):
+                    os.remove(oldest_backup)
+                
+                # 重命名现有备份文件
+                for i in range(self.backup_count - 1, 0, -1):
+                    old_backup = f"{self.filename}.{i}"
+                    new_backup = f"{self.filename}.{i + 1}"
+                    if os.path.exists(old_backup):
+                        os.rename(old_backup, new_backup)
+                
+                # 重命名当前文件为第一个备份
+                if os.path.exists(self.filename):
+                    os.rename(self.filename, f"{self.filename}.1")
+            else:
+                # 没有备份，直接清空文件
+                if os.path.exists(self.filename):
+                    open(self.filename, 'w').close()
+            self._stats["rotations"] += 1
+        except Exception as e:
+            print(f"日志文件轮转失败: {e}")
+        self._file_size = 0
@@ -2,15 +2,21 @@
 
 import re
 import hashlib
-from typing import List, Optional, Pattern, Dict, Any, TYPE_CHECKING
+from typing import List, Optional, Pattern, Dict, Any, Tuple, TYPE_CHECKING
 
 from .log_level import LogLevel
 
 from ....interfaces.logger import ILogRedactor
+from ...security.redactor.redactor import PatternCategory, Redactor, RedactorPattern
 
 
 class LogRedactor(ILogRedactor):
-    """日志脱敏器"""
+    """日志脱敏器
+    
+    脱敏委托给安全模块的 Redactor：先排除文本中不可能命中的模式，再把剩余模式
+    按顺序合并为一个正则，每条日志只扫描一遍。需要对 "***" 替换做哈希处理时，
+    回退为逐个模式替换。
+    """
 
     # 默认敏感信息模式
     DEFAULT_PATTERNS = [
@@ -64,6 +70,9 @@ class LogRedactor(ILogRedactor):
         self.patterns = patterns or self._compile_default_patterns()
         self.hash_sensitive = hash_sensitive
         self._cache: Dict[str, str] = {}
+        # 合并扫描使用的 Redactor，模式列表或哈希设置变化后重建
+        self._scanner: Optional[Redactor] = None
+        self._scanner_key: Optional[Tuple[Any, ...]] = None
 
     def _compile_default_patterns(self) -> List[tuple[Pattern, str]]:
         """编译默认模式
@@ -99,6 +108,26 @@ class LogRedactor(ILogRedactor):
         if cache_key in self._cache:
             return self._cache[cache_key]
 
+        scanner = self._get_scanner()
+        if scanner is not None:
+            # 所有模式合并为一次扫描
+            redacted_text = scanner.redact(text)
+        else:
+            redacted_text = self._redact_sequential(text)
+
+        # 缓存结果
+        self._cache[cache_key] = redacted_text
+        return redacted_text
+
+    def _redact_sequential(self, text: str) -> str:
+        """逐个模式依次替换（无法合并扫描时的回退路径）
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            脱敏后的文本
+        """
         redacted_text = text
 
         # 应用所有模式
@@ -110,10 +139,47 @@ class LogRedactor(ILogRedactor):
                 # 使用固定替换
                 redacted_text = pattern.sub(replacement, redacted_text)
 
-        # 缓存结果
-        self._cache[cache_key] = redacted_text
         return redacted_text
 
+    def _get_scanner(self) -> Optional[Redactor]:
+        """获取与当前模式列表对应的合并扫描器
+
+        Returns:
+            合并扫描器；没有模式、需要哈希替换或存在空替换时返回None
+        """
+        key = (self.hash_sensitive, tuple(self.patterns))
+        if key == self._scanner_key:
+            return self._scanner
+
+        scanner: Optional[Redactor] = None
+        needs_hash = self.hash_sensitive and any(
+            replacement == "***" for _, replacement in self.patterns
+        )
+        # Redactor 把空替换视为使用默认替换，这类模式只能逐个替换
+        if self.patterns and not needs_hash and all(replacement for _, replacement in self.patterns):
+            count = len(self.patterns)
+            scanner = Redactor(
+                patterns=[
+                    RedactorPattern(
+                        name=f"log_pattern_{index}",
+                        pattern=pattern.pattern,
+                        category=PatternCategory.TECHNICAL,
+                        description="日志脱敏模式",
+                        # 优先级按列表顺序递减，保持原有的模式先后顺序
+                        priority=count - index,
+                        flags=pattern.flags,
+                        replacement=replacement,
+                    )
+                    for index, (pattern, replacement) in enumerate(self.patterns)
+                ],
+                # 结果由本类的缓存负责
+                cache_size=0,
+            )
+
+        self._scanner = scanner
+        self._scanner_key = key
+        return scanner
+
     def _hash_replace(self, match: re.Match) -> str:
         """使用哈希替换匹配的文本
 
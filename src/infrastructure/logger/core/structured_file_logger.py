@@ -4,8 +4,9 @@ import json
 import os
 import threading
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
+from .async_file_writer import AsyncLogFileWriter, OverflowPolicy
 from .log_level import LogLevel
 from .redactor import LogRedactor
 from typing import TYPE_CHECKING, Optional
@@ -23,6 +24,13 @@ class StructuredFileLogger:
         level: LogLevel = LogLevel.INFO,
         redactor: Optional['ILogRedactor'] = None,
         encoding: str = "utf-8",
+        async_write: bool = True,
+        max_bytes: Optional[int] = None,
+        backup_count: int = 0,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.BLOCK,
     ):
         """初始化结构化文件日志记录器
 
@@ -31,6 +39,13 @@ class StructuredFileLogger:
             level: 日志级别
             redactor: 脱敏器
             encoding: 文件编码
+            async_write: 是否由后台写线程批量写入（否则每条记录单独打开文件写入）
+            max_bytes: 最大文件字节数，用于日志轮转（仅异步模式）
+            backup_count: 备份文件数量（仅异步模式）
+            queue_size: 异步写入队列容量
+            batch_size: 异步写入的批量刷新条数
+            flush_interval: 异步写入的最长刷新间隔（秒）
+            overflow_policy: 异步写入队列满时的处理策略
         """
         self.filename: str = filename
         self.level: LogLevel = level
@@ -43,6 +58,19 @@ class StructuredFileLogger:
         if directory:
             os.makedirs(directory, exist_ok=True)
 
+        self._writer: Optional[AsyncLogFileWriter] = None
+        if async_write:
+            self._writer = AsyncLogFileWriter(
+                filename,
+                encoding=encoding,
+                max_bytes=max_bytes,
+                backup_count=backup_count,
+                queue_size=queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                overflow_policy=overflow_policy,
+            )
+
     def log(self, level: LogLevel, message: str, **kwargs: Any) -> None:
         """记录结构化日志
 
@@ -95,10 +123,24 @@ class StructuredFileLogger:
         """
         json_str = json.dumps(record, ensure_ascii=False, default=str)
 
+        if self._writer is not None:
+            self._writer.write(json_str)
+            return
+
         with self._lock:
             with open(self.filename, "a", encoding=self.encoding) as f:
                 f.write(json_str + "\n")
 
+    def flush(self) -> None:
+        """等待已记录的日志写入磁盘"""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        """写出剩余日志并关闭写入器"""
+        if self._writer is not None:
+            self._writer.close()
+
     def debug(self, message: str, **kwargs: Any) -> None:
         """记录调试日志"""
         self.log(LogLevel.DEBUG, message, **kwargs)
@@ -2,9 +2,10 @@
 
 import os
 import threading
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from ....interfaces.logger import LogLevel
+from ..core.async_file_writer import AsyncLogFileWriter, OverflowPolicy
 from ..formatters.text_formatter import TextFormatter
 from .base_handler import BaseHandler
 
@@ -21,6 +22,11 @@ class FileHandler(BaseHandler):
         mode: str = "a",
         max_bytes: Optional[int] = None,
         backup_count: int = 0,
+        async_write: bool = True,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.BLOCK,
     ):
         """初始化文件处理器
 
@@ -32,6 +38,11 @@ class FileHandler(BaseHandler):
             mode: 文件打开模式
             max_bytes: 最大文件字节数，用于日志轮转
             backup_count: 备份文件数量
+            async_write: 是否由后台写线程批量写入（否则在调用线程中逐条写入并刷新）
+            queue_size: 异步写入队列容量
+            batch_size: 异步写入的批量刷新条数
+            flush_interval: 异步写入的最长刷新间隔（秒）
+            overflow_policy: 异步写入队列满时的处理策略
         """
         super().__init__(level, formatter or TextFormatter())
         
@@ -47,6 +58,21 @@ class FileHandler(BaseHandler):
         # 文件句柄
         self._file = None
         self._should_close_file = True
+        
+        # 异步批量写入器（持有自己的文件句柄并负责轮转）
+        self._writer: Optional[AsyncLogFileWriter] = None
+        if async_write:
+            self._writer = AsyncLogFileWriter(
+                filename,
+                encoding=encoding,
+                mode=mode,
+                max_bytes=max_bytes,
+                backup_count=backup_count,
+                queue_size=queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                overflow_policy=overflow_policy,
+            )
 
     def _ensure_directory_exists(self) -> None:
         """确保日志文件目录存在"""
@@ -130,22 +156,35 @@ class FileHandler(BaseHandler):
             return
 
         try:
-            # 检查是否需要轮转
-            if self._should_rotate():
-                self._rotate_file()
-            
-            # 确保文件已打开
-            if self._file is None:
-                self._open_file()
-            
-            if self._file:
-                formatted_message = self.format_record(record)
-                self._write_to_file(formatted_message)
+            self._emit(self.format_record(record))
         except Exception as e:
             # 处理失败时的fallback
             error_message = f"FileHandler error: {e}. Original record: {record}"
             print(error_message)
 
+    def _emit(self, message: str) -> None:
+        """输出格式化后的消息
+
+        异步模式下只入队，由写线程写入；否则在当前线程中轮转、写入并刷新。
+
+        Args:
+            message: 格式化后的消息
+        """
+        if self._writer is not None:
+            self._writer.write(message)
+            return
+        
+        # 检查是否需要轮转
+        if self._should_rotate():
+            self._rotate_file()
+        
+        # 确保文件已打开
+        if self._file is None:
+            self._open_file()
+        
+        if self._file:
+            self._write_to_file(message)
+
     def _write_to_file(self, message: str) -> None:
         """写入消息到文件
 
@@ -165,6 +204,9 @@ class FileHandler(BaseHandler):
 
     def flush(self) -> None:
         """刷新缓冲区"""
+        if self._writer is not None:
+            self._writer.flush()
+            return
         with self._lock:
             try:
                 if self._file:
@@ -174,8 +216,18 @@ class FileHandler(BaseHandler):
 
     def close(self) -> None:
         """关闭处理器"""
+        if self._writer is not None:
+            self._writer.close()
         self._close_file()
 
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """获取异步写入器统计信息（同步模式下为空）
+
+        Returns:
+            统计信息字典
+        """
+        return self._writer.get_stats() if self._writer is not None else {}
+
     def get_file_size(self) -> int:
         """获取当前文件大小
 
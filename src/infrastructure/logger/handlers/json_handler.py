@@ -2,9 +2,10 @@
 
 import os
 import threading
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from ....interfaces.logger import LogLevel
+from ..core.async_file_writer import OverflowPolicy
 from ..formatters.json_formatter import JsonFormatter
 from .file_handler import FileHandler
 
@@ -24,6 +25,11 @@ class JsonHandler(FileHandler):
         ensure_ascii: bool = False,
         indent: Optional[int] = None,
         sort_keys: bool = False,
+        async_write: bool = True,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.BLOCK,
     ):
         """初始化JSON处理器
 
@@ -38,6 +44,11 @@ class JsonHandler(FileHandler):
             ensure_ascii: 是否确保ASCII编码
             indent: 缩进空格数
             sort_keys: 是否排序键
+            async_write: 是否由后台写线程批量写入
+            queue_size: 异步写入队列容量
+            batch_size: 异步写入的批量刷新条数
+            flush_interval: 异步写入的最长刷新间隔（秒）
+            overflow_policy: 异步写入队列满时的处理策略
         """
         # 如果没有指定格式化器，创建JSON格式化器
         if formatter is None:
@@ -55,6 +66,11 @@ class JsonHandler(FileHandler):
             mode=mode,
             max_bytes=max_bytes,
             backup_count=backup_count,
+            async_write=async_write,
+            queue_size=queue_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            overflow_policy=overflow_policy,
         )
 
     def handle(self, record: Dict[str, Any]) -> None:
@@ -67,18 +83,9 @@ class JsonHandler(FileHandler):
             return
 
         try:
-            # 检查是否需要轮转
-            if self._should_rotate():
-                self._rotate_file()
-            
-            # 确保文件已打开
-            if self._file is None:
-                self._open_file()
-            
-            if self._file:
-                # JSON格式化器已经处理了格式化
-                formatted_message = self.formatter.format(record)
-                self._write_to_file(formatted_message)
+            # JSON格式化器已经处理了格式化
+            formatted_message = self.formatter.format(record)
+            self._emit(formatted_message)
         except Exception as e:
             # 处理失败时的fallback
             error_record = {
@@ -91,7 +98,7 @@ class JsonHandler(FileHandler):
             
             try:
                 formatted_error = self.formatter.format(error_record)
-                self._write_to_file(formatted_error)
+                self._emit(formatted_error)
             except Exception:
                 # 连错误记录都无法格式化时的最后fallback
                 print(f"JSONHandler完全失败: {e}. Original: {record}")
@@ -9,6 +9,7 @@ from typing import Dict, Any, List, Optional
 
 from src.interfaces.repository import ICheckpointRepository
 from src.interfaces.dependency_injection import get_logger
+from ..utils import SQLiteUtils
 
 
 logger = get_logger(__name__)
@@ -21,12 +22,15 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
         """初始化SQLite检查点Repository"""
         self.db_path = Path(config.get("db_path", "./checkpoints.db"))
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connections = SQLiteUtils.get_connection_manager(
+            str(self.db_path), **config.get("connection_pool", {})
+        )
         self._init_db()
     
     def _init_db(self) -> None:
         """初始化数据库表"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            def _init(conn: sqlite3.Connection) -> None:
                 # 创建检查点表
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS checkpoints (
@@ -44,9 +48,9 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_thread_id ON checkpoints(thread_id)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_workflow_id ON checkpoints(workflow_id)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_created_at ON checkpoints(created_at)")
-                
-                conn.commit()
-                logger.debug("SQLite checkpoint repository initialized")
+            
+            self._connections.write(_init)
+            logger.debug("SQLite checkpoint repository initialized")
         except Exception as e:
             logger.error(f"Failed to initialize SQLite checkpoint repository: {e}")
             raise
@@ -60,7 +64,7 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
             
             current_time = time.time()
             
-            with sqlite3.connect(self.db_path) as conn:
+            def _save(conn: sqlite3.Connection) -> None:
                 conn.execute("""
                     INSERT OR REPLACE INTO checkpoints (
                         checkpoint_id, thread_id, workflow_id, checkpoint_data,
@@ -75,7 +79,8 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
                     current_time,
                     current_time
                 ))
-                conn.commit()
+            
+            self._connections.write(_save)
             
             logger.debug(f"SQLite checkpoint saved: {checkpoint_id}")
             return checkpoint_id
@@ -87,25 +92,13 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
     async def load_checkpoint(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
         """加载checkpoint数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT checkpoint_id, thread_id, workflow_id, checkpoint_data,
-                           metadata, created_at, updated_at
-                    FROM checkpoints WHERE checkpoint_id = ?
-                """, (checkpoint_id,))
-                
-                row = cursor.fetchone()
-                if row:
-                    return {
-                        "checkpoint_id": row[0],
-                        "thread_id": row[1],
-                        "workflow_id": row[2],
-                        "checkpoint_data": json.loads(row[3]),
-                        "metadata": json.loads(row[4]),
-                        "created_at": row[5],
-                        "updated_at": row[6]
-                    }
-                return None
+            row = self._connections.read(lambda conn: conn.execute("""
+                SELECT checkpoint_id, thread_id, workflow_id, checkpoint_data,
+                       metadata, created_at, updated_at
+                FROM checkpoints WHERE checkpoint_id = ?
+            """, (checkpoint_id,)).fetchone())
+            
+            return self._row_to_checkpoint(row) if row else None
             
         except Exception as e:
             logger.error(f"Failed to load SQLite checkpoint {checkpoint_id}: {e}")
@@ -118,7 +111,7 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
     ) -> List[Dict[str, Any]]:
         """列出指定thread的所有checkpoint"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            def _list(conn: sqlite3.Connection) -> List[tuple]:
                 if limit is not None:
                     query = """
                         SELECT checkpoint_id, thread_id, workflow_id, checkpoint_data,
@@ -138,21 +131,11 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
                         ORDER BY created_at DESC
                     """
                     cursor = conn.execute(query, (thread_id,))
-                
-                checkpoints = []
-                for row in cursor.fetchall():
-                    checkpoints.append({
-                        "checkpoint_id": row[0],
-                        "thread_id": row[1],
-                        "workflow_id": row[2],
-                        "checkpoint_data": json.loads(row[3]),
-                        "metadata": json.loads(row[4]),
-                        "created_at": row[5],
-                        "updated_at": row[6]
-                    })
-                
-                logger.debug(f"Listed SQLite checkpoints for {thread_id}: {len(checkpoints)} items")
-                return checkpoints
+                return cursor.fetchall()
+            
+            checkpoints = [self._row_to_checkpoint(row) for row in self._connections.read(_list)]
+            logger.debug(f"Listed SQLite checkpoints for {thread_id}: {len(checkpoints)} items")
+            return checkpoints
             
         except Exception as e:
             logger.error(f"Failed to list SQLite checkpoints for {thread_id}: {e}")
@@ -161,13 +144,14 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
     async def delete_checkpoint(self, checkpoint_id: str) -> bool:
         """删除指定的checkpoint"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("DELETE FROM checkpoints WHERE checkpoint_id = ?", (checkpoint_id,))
-                conn.commit()
-                deleted = cursor.rowcount > 0
-                if deleted:
-                    logger.debug(f"SQLite checkpoint deleted: {checkpoint_id}")
-                return deleted
+            deleted = self._connections.write(
+                lambda conn: conn.execute(
+                    "DELETE FROM checkpoints WHERE checkpoint_id = ?", (checkpoint_id,)
+                ).rowcount > 0
+            )
+            if deleted:
+                logger.debug(f"SQLite checkpoint deleted: {checkpoint_id}")
+            return deleted
             
         except Exception as e:
             logger.error(f"Failed to delete SQLite checkpoint {checkpoint_id}: {e}")
@@ -176,28 +160,16 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
     async def get_latest_checkpoint(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """获取thread的最新checkpoint"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT checkpoint_id, thread_id, workflow_id, checkpoint_data,
-                           metadata, created_at, updated_at
-                    FROM checkpoints
-                    WHERE thread_id = ?
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                """, (thread_id,))
-                
-                row = cursor.fetchone()
-                if row:
-                    return {
-                        "checkpoint_id": row[0],
-                        "thread_id": row[1],
-                        "workflow_id": row[2],
-                        "checkpoint_data": json.loads(row[3]),
-                        "metadata": json.loads(row[4]),
-                        "created_at": row[5],
-                        "updated_at": row[6]
-                    }
-                return None
+            row = self._connections.read(lambda conn: conn.execute("""
+                SELECT checkpoint_id, thread_id, workflow_id, checkpoint_data,
+                       metadata, created_at, updated_at
+                FROM checkpoints
+                WHERE thread_id = ?
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, (thread_id,)).fetchone())
+            
+            return self._row_to_checkpoint(row) if row else None
             
         except Exception as e:
             logger.error(f"Failed to get latest SQLite checkpoint for {thread_id}: {e}")
@@ -206,29 +178,17 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
     async def get_checkpoints_by_workflow(self, thread_id: str, workflow_id: str) -> List[Dict[str, Any]]:
         """获取指定工作流的所有checkpoint"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT checkpoint_id, thread_id, workflow_id, checkpoint_data,
-                           metadata, created_at, updated_at
-                    FROM checkpoints
-                    WHERE thread_id = ? AND workflow_id = ?
-                    ORDER BY created_at DESC
-                """, (thread_id, workflow_id))
-                
-                checkpoints = []
-                for row in cursor.fetchall():
-                    checkpoints.append({
-                        "checkpoint_id": row[0],
-                        "thread_id": row[1],
-                        "workflow_id": row[2],
-                        "checkpoint_data": json.loads(row[3]),
-                        "metadata": json.loads(row[4]),
-                        "created_at": row[5],
-                        "updated_at": row[6]
-                    })
-                
-                logger.debug(f"Got workflow SQLite checkpoints for {thread_id}/{workflow_id}: {len(checkpoints)} items")
-                return checkpoints
+            rows = self._connections.read(lambda conn: conn.execute("""
+                SELECT checkpoint_id, thread_id, workflow_id, checkpoint_data,
+                       metadata, created_at, updated_at
+                FROM checkpoints
+                WHERE thread_id = ? AND workflow_id = ?
+                ORDER BY created_at DESC
+            """, (thread_id, workflow_id)).fetchall())
+            
+            checkpoints = [self._row_to_checkpoint(row) for row in rows]
+            logger.debug(f"Got workflow SQLite checkpoints for {thread_id}/{workflow_id}: {len(checkpoints)} items")
+            return checkpoints
             
         except Exception as e:
             logger.error(f"Failed to get workflow SQLite checkpoints for {thread_id}/{workflow_id}: {e}")
@@ -237,7 +197,7 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
     async def cleanup_old_checkpoints(self, thread_id: str, max_count: int) -> int:
         """清理旧的checkpoint，保留最新的max_count个"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            def _cleanup(conn: sqlite3.Connection) -> int:
                 # 获取所有checkpoint ID，按创建时间排序
                 cursor = conn.execute("""
                     SELECT checkpoint_id FROM checkpoints
@@ -259,11 +219,25 @@ class SQLiteCheckpointRepository(ICheckpointRepository):
                     cursor = conn.execute("DELETE FROM checkpoints WHERE checkpoint_id = ?", (checkpoint_id,))
                     if cursor.rowcount > 0:
                         deleted_count += 1
-                
-                conn.commit()
-                logger.debug(f"Cleaned up old SQLite checkpoints for {thread_id}: deleted {deleted_count} items")
                 return deleted_count
             
+            deleted_count = self._connections.write(_cleanup)
+            logger.debug(f"Cleaned up old SQLite checkpoints for {thread_id}: deleted {deleted_count} items")
+            return deleted_count
+            
         except Exception as e:
             logger.error(f"Failed to cleanup old SQLite checkpoints for {thread_id}: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    @staticmethod
+    def _row_to_checkpoint(row: tuple) -> Dict[str, Any]:
+        """将查询结果行转换为checkpoint字典"""
+        return {
+            "checkpoint_id": row[0],
+            "thread_id": row[1],
+            "workflow_id": row[2],
+            "checkpoint_data": json.loads(row[3]),
+            "metadata": json.loads(row[4]),
+            "created_at": row[5],
+            "updated_at": row[6]
+        }
@@ -8,12 +8,13 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import threading
 from collections import defaultdict
+from dataclasses import replace
 
 from src.interfaces.repository.history import IHistoryRepository
 from src.core.history.entities import (
     BaseHistoryRecord, LLMRequestRecord, LLMResponseRecord,
     TokenUsageRecord, CostRecord, WorkflowTokenStatistics,
-    RecordType, HistoryQuery
+    RecordType, HistoryQuery, RollupGranularity
 )
 from ..memory_base import MemoryBaseRepository
 from ..utils import TimeUtils, IdUtils
@@ -37,6 +38,10 @@ class MemoryHistoryRepository(MemoryBaseRepository, IHistoryRepository):
         super().__init__(config)
         self.max_records = config.get("max_records", 10000)
         self._workflow_stats: Dict[str, WorkflowTokenStatistics] = {}
+        # 时间桶统计: {粒度: {(桶起始时间, 工作流ID, 模型): 统计}}
+        self._token_rollups: Dict[RollupGranularity, Dict[tuple, WorkflowTokenStatistics]] = {
+            granularity: {} for granularity in RollupGranularity
+        }
         self._lock = threading.RLock()
         
         self.logger.info(f"内存History Repository初始化完成，最大记录数: {self.max_records}")
@@ -73,12 +78,65 @@ class MemoryHistoryRepository(MemoryBaseRepository, IHistoryRepository):
             return False
     
     async def save_records(self, records: List[BaseHistoryRecord]) -> List[bool]:
-        """批量保存历史记录"""
-        results = []
-        for record in records:
-            result = await self.save_record(record)
-            results.append(result)
-        return results
+        """批量保存历史记录
+        
+        在一次线程切换、一次加锁内写入所有记录，索引和工作流统计按批更新。
+        与 save_record 一样在写入每条记录前检查容量限制，需要清理时先提交
+        已写入记录的索引和统计，保证清理看到的状态与逐条保存时一致。
+        """
+        if not records:
+            return []
+        
+        try:
+            def _save_all() -> List[bool]:
+                with self._lock:
+                    results = []
+                    pending: List[BaseHistoryRecord] = []
+                    saved_count = 0
+                    
+                    def _flush() -> None:
+                        # 按索引键分组后批量更新索引
+                        index_updates: Dict[tuple, List[str]] = defaultdict(list)
+                        for saved in pending:
+                            for index_key in self._index_keys(saved):
+                                index_updates[index_key].append(saved.record_id)
+                        for (index_name, key), record_ids in index_updates.items():
+                            self._add_many_to_index(index_name, key, record_ids)
+                        
+                        # 更新工作流统计
+                        for saved in pending:
+                            if isinstance(saved, TokenUsageRecord):
+                                self._update_workflow_stats(saved)
+                        pending.clear()
+                    
+                    for record in records:
+                        try:
+                            record_data = record.to_dict()
+                        except Exception as e:
+                            self.logger.warning(f"保存历史记录失败: {getattr(record, 'record_id', None)}, 错误: {e}")
+                            results.append(False)
+                            continue
+                        
+                        # 检查容量限制
+                        if len(self._storage) >= self.max_records:
+                            _flush()
+                            self._cleanup_old_records()
+                        
+                        self._storage[record.record_id] = record_data
+                        pending.append(record)
+                        saved_count += 1
+                        results.append(True)
+                    
+                    _flush()
+                    
+                    self._log_operation("批量保存历史记录", True, f"保存了 {saved_count} 条记录")
+                    return results
+            
+            return await asyncio.get_event_loop().run_in_executor(None, _save_all)
+            
+        except Exception as e:
+            self._handle_exception("批量保存历史记录", e)
+            return [False] * len(records)
     
     async def get_records(
         self,
@@ -316,6 +374,73 @@ class MemoryHistoryRepository(MemoryBaseRepository, IHistoryRepository):
             self._handle_exception("更新工作流Token统计", e)
             return False
     
+    async def update_token_rollups(
+        self,
+        delta: WorkflowTokenStatistics
+    ) -> bool:
+        """将Token使用增量累加到小时和天两级时间桶统计"""
+        try:
+            with self._lock:
+                self._add_to_token_rollups(delta)
+            return True
+            
+        except Exception as e:
+            self._handle_exception("更新时间桶统计", e)
+            return False
+    
+    async def rebuild_token_rollups(self) -> int:
+        """按现存的Token使用和成本记录重建时间桶统计"""
+        try:
+            with self._lock:
+                deltas = []
+                for record_id, record_data in self._storage.items():
+                    try:
+                        delta = WorkflowTokenStatistics.from_record_data(record_data)
+                    except ValueError as e:
+                        self.logger.warning(f"跳过无法计入时间桶的历史记录: {record_id}, 错误: {e}")
+                        continue
+                    if delta is not None:
+                        deltas.append(delta)
+                
+                self._token_rollups = {granularity: {} for granularity in RollupGranularity}
+                for delta in deltas:
+                    self._add_to_token_rollups(delta)
+            
+            self._log_operation("重建时间桶统计", True, f"计入了 {len(deltas)} 条记录")
+            return len(deltas)
+            
+        except Exception as e:
+            self._handle_exception("重建时间桶统计", e)
+            return 0
+    
+    async def get_token_rollups(
+        self,
+        granularity: RollupGranularity,
+        workflow_id: Optional[str] = None,
+        model: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List[WorkflowTokenStatistics]:
+        """获取时间范围内的时间桶统计"""
+        try:
+            first_bucket = granularity.bucket_start(start_time) if start_time else None
+            with self._lock:
+                rollups = [
+                    replace(rollup)
+                    for (bucket_start, rollup_workflow_id, rollup_model), rollup
+                    in self._token_rollups[granularity].items()
+                    if (not workflow_id or rollup_workflow_id == workflow_id)
+                    and (not model or rollup_model == model)
+                    and (first_bucket is None or bucket_start >= first_bucket)
+                    and (end_time is None or bucket_start <= end_time)
+                ]
+            rollups.sort(key=lambda r: (r.period_start, r.workflow_id, r.model))
+            return rollups
+            
+        except Exception as e:
+            self._handle_exception("获取时间桶统计", e)
+            return []
+    
     async def get_storage_statistics(self) -> Dict[str, Any]:
         """获取存储统计信息"""
         try:
@@ -433,26 +558,32 @@ class MemoryHistoryRepository(MemoryBaseRepository, IHistoryRepository):
     
     def _update_indexes(self, record: BaseHistoryRecord) -> None:
         """更新索引"""
-        record_data = record.to_dict()
-        record_id = record.record_id
+        for index_name, key in self._index_keys(record):
+            self._add_to_index(index_name, key, record.record_id)
+    
+    def _index_keys(self, record: BaseHistoryRecord) -> List[tuple]:
+        """获取记录需要写入的索引键 (索引名, 键)"""
+        keys = []
         
         # 会话ID索引
         if record.session_id:
-            self._add_to_index("session_id", record.session_id, record_id)
+            keys.append(("session_id", record.session_id))
         
         # 工作流ID索引
         if record.workflow_id:
-            self._add_to_index("workflow_id", record.workflow_id, record_id)
+            keys.append(("workflow_id", record.workflow_id))
         
         # 记录类型索引
         if hasattr(record, 'record_type'):
-            self._add_to_index("record_type", record.record_type.value, record_id)
+            record_type = record.record_type
+            keys.append(("record_type", getattr(record_type, 'value', record_type)))
         
         # 模型索引
-        if hasattr(record, 'model'):
-            model = getattr(record, 'model', None)
-            if model:
-                self._add_to_index("model", model, record_id)
+        model = getattr(record, 'model', None)
+        if model:
+            keys.append(("model", model))
+        
+        return keys
     
     def _remove_from_indexes(self, record_data: Dict[str, Any]) -> None:
         """从索引中移除记录"""
@@ -476,6 +607,28 @@ class MemoryHistoryRepository(MemoryBaseRepository, IHistoryRepository):
         if record_data.get("model"):
             self._remove_from_index("model", record_data["model"], record_id)
     
+    def _add_to_token_rollups(self, delta: WorkflowTokenStatistics) -> None:
+        """将增量累加到小时和天两级时间桶，调用方需持有锁"""
+        occurred_at = delta.period_start or delta.last_updated
+        for granularity, buckets in self._token_rollups.items():
+            bucket_start = granularity.bucket_start(occurred_at)
+            key = (bucket_start, delta.workflow_id, delta.model)
+            rollup = buckets.get(key)
+            if rollup is None:
+                rollup = buckets[key] = WorkflowTokenStatistics(
+                    workflow_id=delta.workflow_id,
+                    model=delta.model,
+                    last_updated=occurred_at,
+                    period_start=bucket_start,
+                    period_end=bucket_start + granularity.bucket_size
+                )
+            rollup.total_prompt_tokens += delta.total_prompt_tokens
+            rollup.total_completion_tokens += delta.total_completion_tokens
+            rollup.total_tokens += delta.total_tokens
+            rollup.total_cost += delta.total_cost
+            rollup.request_count += delta.request_count
+            rollup.last_updated = max(rollup.last_updated, occurred_at)
+    
     def _update_workflow_stats(self, record: TokenUsageRecord) -> None:
         """更新工作流统计"""
         if not record.workflow_id:
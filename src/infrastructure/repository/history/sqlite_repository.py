@@ -14,7 +14,7 @@ from src.interfaces.repository.history import IHistoryRepository
 from src.core.history.entities import (
     BaseHistoryRecord, LLMRequestRecord, LLMResponseRecord,
     TokenUsageRecord, CostRecord, WorkflowTokenStatistics,
-    RecordType, HistoryQuery
+    RecordType, HistoryQuery, RollupGranularity
 )
 from ..sqlite_base import SQLiteBaseRepository
 from ..utils import TimeUtils, IdUtils
@@ -81,11 +81,34 @@ class SQLiteHistoryRepository(SQLiteBaseRepository, IHistoryRepository):
             "CREATE INDEX IF NOT EXISTS idx_workflow_stats_last_updated ON workflow_stats(last_updated)"
         ]
         
+        # 时间桶统计表：按小时和天预聚合，主键前缀支撑单工作流的范围查询
+        token_rollups_table_sql = """
+            CREATE TABLE IF NOT EXISTS token_rollups (
+                granularity TEXT NOT NULL,
+                workflow_id TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                total_tokens INTEGER DEFAULT 0,
+                total_cost REAL DEFAULT 0.0,
+                request_count INTEGER DEFAULT 0,
+                last_updated TEXT NOT NULL,
+                PRIMARY KEY (granularity, workflow_id, bucket_start, model)
+            )
+        """
+        
+        token_rollups_indexes_sql = [
+            "CREATE INDEX IF NOT EXISTS idx_token_rollups_bucket ON token_rollups(granularity, bucket_start)"
+        ]
+        
         # 初始化主表
         super().__init__(config, "history_records", table_sql, indexes_sql)
         
         # 初始化工作流统计表
         self._init_workflow_stats_table(workflow_stats_table_sql, workflow_stats_indexes_sql)
+        self._init_workflow_stats_table(token_rollups_table_sql, token_rollups_indexes_sql)
+        self._backfill_token_rollups()
         
         self.logger.info(f"SQLite History Repository初始化完成: {self.db_path}")
     
@@ -98,24 +121,105 @@ class SQLiteHistoryRepository(SQLiteBaseRepository, IHistoryRepository):
         except Exception as e:
             self._handle_exception("工作流统计表初始化", e)
     
+    def _backfill_token_rollups(self) -> None:
+        """从已有的Token使用和成本记录回填时间桶统计
+        
+        仅在时间桶统计表为空时执行，使引入时间桶之前写入的历史数据也能出现在趋势中。
+        """
+        try:
+            def _backfill(conn: Any) -> int:
+                if conn.execute("SELECT 1 FROM token_rollups LIMIT 1").fetchone():
+                    return 0
+                deltas = self._load_rollup_deltas(conn)
+                self._upsert_token_rollups(conn, deltas)
+                return len(deltas)
+            
+            backfilled = self._connections.write(_backfill)
+            if backfilled:
+                self._log_operation("回填时间桶统计", True, f"回填了 {backfilled} 条记录")
+                
+        except Exception as e:
+            self._handle_exception("回填时间桶统计", e)
+    
+    def _load_rollup_deltas(self, conn: Any) -> List[WorkflowTokenStatistics]:
+        """在给定连接上读取所有Token使用和成本记录并转换为时间桶增量"""
+        rows = conn.execute("""
+            SELECT record_type, workflow_id, model, timestamp, data FROM history_records
+            WHERE record_type IN (?, ?) AND workflow_id IS NOT NULL AND model IS NOT NULL AND model != ''
+        """, (RecordType.TOKEN_USAGE.value, RecordType.COST.value)).fetchall()
+        
+        deltas = []
+        for row in rows:
+            delta = self._rollup_delta_from_row(*row)
+            if delta is not None:
+                deltas.append(delta)
+        return deltas
+    
+    def _rollup_delta_from_row(
+        self,
+        record_type: str,
+        workflow_id: str,
+        model: str,
+        timestamp: str,
+        data: str
+    ) -> Optional[WorkflowTokenStatistics]:
+        """将历史记录表中的一行转换为时间桶增量，无法解析时返回None"""
+        try:
+            payload = json.loads(data)
+            # 以表中的列为准，记录数据只提供token数量和成本
+            return WorkflowTokenStatistics.from_record_data({
+                **payload,
+                "record_type": record_type,
+                "workflow_id": workflow_id,
+                "model": model,
+                "timestamp": timestamp
+            })
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"跳过无法回填的历史记录: {workflow_id}/{model}@{timestamp}, 错误: {e}")
+            return None
+    
+    @staticmethod
+    def _upsert_token_rollups(conn: Any, deltas: List[WorkflowTokenStatistics]) -> None:
+        """在给定连接上将增量累加到小时和天两级时间桶"""
+        params = []
+        for delta in deltas:
+            occurred_at = delta.period_start or delta.last_updated
+            for granularity in RollupGranularity:
+                params.append((
+                    granularity.value,
+                    delta.workflow_id,
+                    granularity.bucket_start(occurred_at).isoformat(),
+                    delta.model,
+                    delta.total_prompt_tokens,
+                    delta.total_completion_tokens,
+                    delta.total_tokens,
+                    delta.total_cost,
+                    delta.request_count,
+                    occurred_at.isoformat()
+                ))
+        
+        conn.executemany("""
+            INSERT INTO token_rollups (
+                granularity, workflow_id, bucket_start, model,
+                prompt_tokens, completion_tokens, total_tokens,
+                total_cost, request_count, last_updated
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (granularity, workflow_id, bucket_start, model) DO UPDATE SET
+                prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                completion_tokens = completion_tokens + excluded.completion_tokens,
+                total_tokens = total_tokens + excluded.total_tokens,
+                total_cost = total_cost + excluded.total_cost,
+                request_count = request_count + excluded.request_count,
+                last_updated = MAX(last_updated, excluded.last_updated)
+        """, params)
+    
     # === 基础CRUD操作 ===
     
     async def save_record(self, record: BaseHistoryRecord) -> bool:
         """保存历史记录"""
         try:
             def _save():
-                data = {
-                    "record_id": record.record_id,
-                    "session_id": getattr(record, 'session_id', None),
-                    "workflow_id": getattr(record, 'workflow_id', None),
-                    "record_type": record.record_type.value if hasattr(record, 'record_type') else 'unknown',
-                    "timestamp": record.timestamp.isoformat(),
-                    "model": getattr(record, 'model', None),
-                    "provider": getattr(record, 'provider', None),
-                    "data": record.to_dict()
-                }
-                
-                self._insert_or_replace(data)
+                self._insert_or_replace(self._record_to_row(record))
                 self._log_operation("保存历史记录", True, record.record_id)
                 return True
             
@@ -127,12 +231,35 @@ class SQLiteHistoryRepository(SQLiteBaseRepository, IHistoryRepository):
             return False
     
     async def save_records(self, records: List[BaseHistoryRecord]) -> List[bool]:
-        """批量保存历史记录"""
-        results = []
-        for record in records:
-            result = await self.save_record(record)
-            results.append(result)
-        return results
+        """批量保存历史记录
+        
+        所有记录在一次线程切换、一个事务中通过 executemany 写入。
+        无法序列化的记录单独标记为失败，写入失败时整批回滚。
+        """
+        if not records:
+            return []
+        
+        try:
+            def _save_all() -> List[bool]:
+                rows = []
+                results = []
+                for record in records:
+                    try:
+                        rows.append(self._record_to_row(record))
+                        results.append(True)
+                    except Exception as e:
+                        self.logger.warning(f"序列化历史记录失败: {getattr(record, 'record_id', None)}, 错误: {e}")
+                        results.append(False)
+                
+                self._insert_or_replace_many(rows)
+                self._log_operation("批量保存历史记录", True, f"保存了 {len(rows)} 条记录")
+                return results
+            
+            return await asyncio.get_event_loop().run_in_executor(None, _save_all)
+            
+        except Exception as e:
+            self._handle_exception("批量保存历史记录", e)
+            return [False] * len(records)
     
     async def get_records(
         self,
@@ -391,6 +518,106 @@ class SQLiteHistoryRepository(SQLiteBaseRepository, IHistoryRepository):
             self._handle_exception("更新工作流Token统计", e)
             return False
     
+    async def update_token_rollups(
+        self,
+        delta: WorkflowTokenStatistics
+    ) -> bool:
+        """将Token使用增量累加到小时和天两级时间桶统计"""
+        try:
+            def _update():
+                self._connections.write(lambda conn: self._upsert_token_rollups(conn, [delta]))
+                return True
+            
+            return await asyncio.get_event_loop().run_in_executor(None, _update)
+            
+        except Exception as e:
+            self._handle_exception("更新时间桶统计", e)
+            return False
+    
+    async def rebuild_token_rollups(self) -> int:
+        """按现存的Token使用和成本记录重建时间桶统计
+        
+        清空和重新写入在同一个事务中完成，读到的统计要么是重建前的，要么是重建后的。
+        """
+        try:
+            def _rebuild() -> int:
+                def _replace(conn: Any) -> int:
+                    deltas = self._load_rollup_deltas(conn)
+                    conn.execute("DELETE FROM token_rollups")
+                    self._upsert_token_rollups(conn, deltas)
+                    return len(deltas)
+                
+                rebuilt = self._connections.write(_replace)
+                self._log_operation("重建时间桶统计", True, f"计入了 {rebuilt} 条记录")
+                return rebuilt
+            
+            return await asyncio.get_event_loop().run_in_executor(None, _rebuild)
+            
+        except Exception as e:
+            self._handle_exception("重建时间桶统计", e)
+            return 0
+    
+    async def get_token_rollups(
+        self,
+        granularity: RollupGranularity,
+        workflow_id: Optional[str] = None,
+        model: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List[WorkflowTokenStatistics]:
+        """一次查询获取时间范围内的时间桶统计"""
+        try:
+            def _get():
+                from ..utils import SQLiteUtils
+                
+                query = """
+                    SELECT workflow_id, model, bucket_start, prompt_tokens, completion_tokens,
+                           total_tokens, total_cost, request_count, last_updated
+                    FROM token_rollups WHERE granularity = ?
+                """
+                params: List[Any] = [granularity.value]
+                
+                if workflow_id:
+                    query += " AND workflow_id = ?"
+                    params.append(workflow_id)
+                
+                if model:
+                    query += " AND model = ?"
+                    params.append(model)
+                
+                if start_time:
+                    query += " AND bucket_start >= ?"
+                    params.append(granularity.bucket_start(start_time).isoformat())
+                
+                if end_time:
+                    query += " AND bucket_start <= ?"
+                    params.append(end_time.isoformat())
+                
+                query += " ORDER BY bucket_start, workflow_id, model"
+                
+                rollups = []
+                for row in SQLiteUtils.execute_query(self.db_path, query, tuple(params)):
+                    bucket_start = datetime.fromisoformat(row[2])
+                    rollups.append(WorkflowTokenStatistics(
+                        workflow_id=row[0],
+                        model=row[1],
+                        total_prompt_tokens=row[3],
+                        total_completion_tokens=row[4],
+                        total_tokens=row[5],
+                        total_cost=row[6],
+                        request_count=row[7],
+                        last_updated=datetime.fromisoformat(row[8]),
+                        period_start=bucket_start,
+                        period_end=bucket_start + granularity.bucket_size
+                    ))
+                return rollups
+            
+            return await asyncio.get_event_loop().run_in_executor(None, _get)
+            
+        except Exception as e:
+            self._handle_exception("获取时间桶统计", e)
+            return []
+    
     async def get_storage_statistics(self) -> Dict[str, Any]:
         """获取存储统计信息"""
         try:
@@ -493,6 +720,20 @@ class SQLiteHistoryRepository(SQLiteBaseRepository, IHistoryRepository):
     
     # === 私有辅助方法 ===
     
+    def _record_to_row(self, record: BaseHistoryRecord) -> Dict[str, Any]:
+        """将记录对象转换为表行"""
+        record_type = getattr(record, 'record_type', 'unknown')
+        return {
+            "record_id": record.record_id,
+            "session_id": getattr(record, 'session_id', None),
+            "workflow_id": getattr(record, 'workflow_id', None),
+            "record_type": getattr(record_type, 'value', record_type),
+            "timestamp": record.timestamp.isoformat(),
+            "model": getattr(record, 'model', None),
+            "provider": getattr(record, 'provider', None),
+            "data": json.dumps(record.to_dict(), ensure_ascii=False, default=str)
+        }
+    
     def _create_record_from_data(self, data: Dict[str, Any]) -> Optional[BaseHistoryRecord]:
         """从数据字典创建记录对象"""
         try:
@@ -28,6 +28,15 @@ class MemoryBaseRepository(BaseRepository):
         if item_id not in self._indexes[index_name][key]:
             self._indexes[index_name][key].append(item_id)
     
+    def _add_many_to_index(self, index_name: str, key: str, item_ids: List[str]) -> None:
+        """批量添加到索引"""
+        ids = self._indexes.setdefault(index_name, {}).setdefault(key, [])
+        existing = set(ids)
+        for item_id in item_ids:
+            if item_id not in existing:
+                existing.add(item_id)
+                ids.append(item_id)
+    
     def _remove_from_index(self, index_name: str, key: str, item_id: str) -> None:
         """从索引中移除"""
         if (index_name in self._indexes and 
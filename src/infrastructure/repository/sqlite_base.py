@@ -17,7 +17,8 @@ class SQLiteBaseRepository(BaseRepository):
         """初始化SQLite基类
         
         Args:
-            config: 配置参数
+            config: 配置参数，connection_pool 项可指定连接池参数
+                （read_pool_size、timeout、statement_cache_size、pragmas）
             table_name: 表名
             table_sql: 创建表的SQL
             indexes_sql: 创建索引的SQL列表
@@ -25,6 +26,10 @@ class SQLiteBaseRepository(BaseRepository):
         super().__init__(config)
         self.table_name = table_name
         self.db_path = config.get("db_path", f"data/{table_name}.db")
+        # 同一数据库的所有Repository共享长连接，连接池参数仅在首次创建时生效
+        self._connections = SQLiteUtils.get_connection_manager(
+            self.db_path, **config.get("connection_pool", {})
+        )
         self._init_database(table_sql, indexes_sql or [])
     
     def _init_database(self, table_sql: str, indexes_sql: List[str]) -> None:
@@ -42,6 +47,14 @@ class SQLiteBaseRepository(BaseRepository):
         except Exception as e:
             self._handle_exception("插入或替换数据", e)
     
+    def _insert_or_replace_many(self, rows: List[Dict[str, Any]]) -> int:
+        """在单个事务中批量插入或替换数据"""
+        try:
+            return SQLiteUtils.insert_or_replace_many(self.db_path, self.table_name, rows)
+        except Exception as e:
+            self._handle_exception("批量插入或替换数据", e)
+            return 0
+    
     def _delete_by_id(self, id_field: str, id_value: str) -> bool:
         """根据ID删除记录"""
         try:
@@ -1,21 +1,251 @@
 """SQLite处理工具类
 
 提供Repository中SQLite操作的通用方法。
+
+连接按数据库路径复用：每个数据库持有一个串行化的写连接和一个读连接池，
+启用WAL模式并缓存预编译语句，避免每次操作都重新建立连接、加载schema和预热页缓存。
 """
 
+import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from src.interfaces.dependency_injection import get_logger
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, TypeVar
 
 from .json_utils import JsonUtils
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# 默认PRAGMA设置
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,
+    "mmap_size": 268435456,
+}
+
+
+class SQLiteConnectionManager:
+    """单个数据库的长连接管理器
+    
+    写操作通过一个写连接串行执行；读操作从读连接池中借用连接，
+    在WAL模式下读写互不阻塞。内存数据库的每个连接都是独立的库，
+    因此读写都使用写连接。
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        read_pool_size: int = 4,
+        timeout: float = 30.0,
+        statement_cache_size: int = 256,
+        pragmas: Optional[Dict[str, Any]] = None
+    ):
+        """初始化连接管理器
+        
+        Args:
+            db_path: 数据库文件路径
+            read_pool_size: 读连接池大小
+            timeout: 获取数据库锁的超时时间（秒）
+            statement_cache_size: 每个连接缓存的预编译语句数量
+            pragmas: 覆盖默认值的PRAGMA设置
+        """
+        self.db_path = db_path
+        self.read_pool_size = max(1, read_pool_size)
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self._in_memory = db_path == ":memory:"
+        
+        self._write_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._reader_lock = threading.Lock()
+        self._closed = False
+        
+        self._stats = {"reads": 0, "writes": 0, "write_wait_seconds": 0.0}
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """创建并配置一个连接"""
+        if not self._in_memory:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        for name, value in self.pragmas.items():
+            if self._in_memory and name in ("journal_mode", "mmap_size"):
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError(f"连接管理器已关闭: {self.db_path}")
+        if self._writer is None:
+            self._writer = self._connect()
+        return self._writer
+    
+    @contextmanager
+    def _borrow_reader(self) -> Iterator[sqlite3.Connection]:
+        """借用一个读连接，池未满时按需创建，已满时等待归还"""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._reader_lock:
+                if self._closed:
+                    raise sqlite3.ProgrammingError(f"连接管理器已关闭: {self.db_path}")
+                conn = None
+                if len(self._all_readers) < self.read_pool_size:
+                    conn = self._connect(read_only=True)
+                    self._all_readers.append(conn)
+            if conn is None:
+                conn = self._readers.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    def write(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """在写连接上执行操作并提交，失败时回滚
+        
+        Args:
+            func: 接收连接的操作函数
+            
+        Returns:
+            操作函数的返回值
+        """
+        started = time.perf_counter()
+        with self._write_lock:
+            self._stats["write_wait_seconds"] += time.perf_counter() - started
+            self._stats["writes"] += 1
+            conn = self._get_writer()
+            try:
+                result = func(conn)
+                conn.commit()
+                return result
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+    
+    def read(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """在读连接上执行只读操作
+        
+        Args:
+            func: 接收连接的操作函数
+            
+        Returns:
+            操作函数的返回值
+        """
+        self._stats["reads"] += 1
+        if self._in_memory:
+            with self._write_lock:
+                return func(self._get_writer())
+        
+        with self._borrow_reader() as conn:
+            return func(conn)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接使用统计"""
+        return {
+            "db_path": self.db_path,
+            "read_pool_size": self.read_pool_size,
+            "open_readers": len(self._all_readers),
+            "idle_readers": self._readers.qsize(),
+            "writer_open": self._writer is not None,
+            **self._stats
+        }
+    
+    def close(self) -> None:
+        """关闭所有连接"""
+        with self._write_lock, self._reader_lock:
+            self._closed = True
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+            while not self._readers.empty():
+                self._readers.get_nowait()
+
+
+_managers: Dict[str, SQLiteConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def _manager_key(db_path: str) -> str:
+    return db_path if db_path == ":memory:" else os.path.abspath(db_path)
+
+
+@lru_cache(maxsize=256)
+def _insert_or_replace_sql(table: str, columns: Tuple[str, ...]) -> str:
+    """生成（并缓存）插入或替换语句，相同的SQL文本可以命中连接的语句缓存"""
+    return (
+        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))})"
+    )
+
+
+def _is_read_query(query: str) -> bool:
+    head = query.lstrip()[:6].upper()
+    return head.startswith("SELECT") or head.startswith("WITH")
+
 
 class SQLiteUtils:
     """SQLite处理工具类"""
     
+    @staticmethod
+    def get_connection_manager(db_path: str, **options: Any) -> SQLiteConnectionManager:
+        """获取数据库对应的连接管理器，不存在时创建
+        
+        Args:
+            db_path: 数据库文件路径
+            **options: 连接管理器参数，仅在首次创建时生效
+            
+        Returns:
+            连接管理器
+        """
+        key = _manager_key(db_path)
+        manager = _managers.get(key)
+        if manager is None:
+            with _managers_lock:
+                manager = _managers.get(key)
+                if manager is None:
+                    manager = SQLiteConnectionManager(db_path, **options)
+                    _managers[key] = manager
+        return manager
+    
+    @staticmethod
+    def close_connections(db_path: Optional[str] = None) -> None:
+        """关闭连接
+        
+        Args:
+            db_path: 数据库文件路径，None表示关闭所有数据库的连接
+        """
+        with _managers_lock:
+            keys = list(_managers) if db_path is None else [_manager_key(db_path)]
+            for key in keys:
+                manager = _managers.pop(key, None)
+                if manager is not None:
+                    manager.close()
+    
     @staticmethod
     def init_database(db_path: str, table_sql: str, indexes_sql: Optional[List[str]] = None) -> None:
         """初始化数据库表
@@ -26,17 +256,13 @@ class SQLiteUtils:
             indexes_sql: 创建索引的SQL语句列表
         """
         try:
-            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            with sqlite3.connect(db_path) as conn:
+            def _init(conn: sqlite3.Connection) -> None:
                 conn.execute(table_sql)
-                
-                if indexes_sql:
-                    for index_sql in indexes_sql:
-                        conn.execute(index_sql)
-                
-                conn.commit()
-                logger.info(f"SQLite数据库初始化完成: {db_path}")
+                for index_sql in indexes_sql or []:
+                    conn.execute(index_sql)
+            
+            SQLiteUtils.get_connection_manager(db_path).write(_init)
+            logger.info(f"SQLite数据库初始化完成: {db_path}")
         except Exception as e:
             logger.error(f"初始化SQLite数据库失败: {e}")
             raise
@@ -54,9 +280,9 @@ class SQLiteUtils:
             查询结果列表
         """
         try:
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.execute(query, params or ())
-                return cursor.fetchall()
+            manager = SQLiteUtils.get_connection_manager(db_path)
+            run = manager.read if _is_read_query(query) else manager.write
+            return run(lambda conn: conn.execute(query, params or ()).fetchall())
         except Exception as e:
             logger.error(f"执行查询失败: {e}")
             raise
@@ -74,10 +300,9 @@ class SQLiteUtils:
             影响的行数
         """
         try:
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.execute(query, params or ())
-                conn.commit()
-                return cursor.rowcount
+            return SQLiteUtils.get_connection_manager(db_path).write(
+                lambda conn: conn.execute(query, params or ()).rowcount
+            )
         except Exception as e:
             logger.error(f"执行更新失败: {e}")
             raise
@@ -92,18 +317,42 @@ class SQLiteUtils:
             data: 要插入的数据
         """
         try:
-            columns = list(data.keys())
-            placeholders = ["?"] * len(columns)
-            values = list(data.values())
+            query = _insert_or_replace_sql(table, tuple(data.keys()))
+            SQLiteUtils.execute_update(db_path, query, tuple(data.values()))
+        except Exception as e:
+            logger.error(f"插入或替换数据失败: {e}")
+            raise
+    
+    @staticmethod
+    def insert_or_replace_many(db_path: str, table: str, rows: List[Dict[str, Any]]) -> int:
+        """在单个事务中批量插入或替换数据
+        
+        列相同的行使用同一条语句通过 executemany 写入，任一行失败时整批回滚。
+        
+        Args:
+            db_path: 数据库文件路径
+            table: 表名
+            rows: 要插入的数据列表
             
-            query = f"""
-                INSERT OR REPLACE INTO {table} ({', '.join(columns)})
-                VALUES ({', '.join(placeholders)})
-            """
+        Returns:
+            写入的行数
+        """
+        if not rows:
+            return 0
+        
+        try:
+            groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+            for row in rows:
+                groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
             
-            SQLiteUtils.execute_update(db_path, query, tuple(values))
+            def _insert(conn: sqlite3.Connection) -> int:
+                for columns, values in groups.items():
+                    conn.executemany(_insert_or_replace_sql(table, columns), values)
+                return len(rows)
+            
+            return SQLiteUtils.get_connection_manager(db_path).write(_insert)
         except Exception as e:
-            logger.error(f"插入或替换数据失败: {e}")
+            logger.error(f"批量插入或替换数据失败: {e}")
             raise
     
     @staticmethod
@@ -46,6 +46,8 @@ class PatternConfig:
     replacement: Optional[str] = None
     enabled: bool = True
     tags: Optional[List[str]] = None
+    literals: Optional[List[str]] = None
+    needs_digit: bool = False
     
     def __post_init__(self):
         if self.tags is None:
@@ -64,7 +66,9 @@ class PatternConfig:
             description=self.description,
             priority=self.priority,
             flags=self.flags,
-            replacement=self.replacement
+            replacement=self.replacement,
+            literals=tuple(self.literals or ()),
+            needs_digit=self.needs_digit
         )
 
 
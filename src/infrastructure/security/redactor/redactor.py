@@ -1,7 +1,8 @@
 """改进的敏感信息脱敏处理器 - 支持Unicode和中文字符"""
 
 import re
-from typing import List, Pattern, Dict, Any, Optional, Union, Tuple
+from functools import lru_cache
+from typing import List, Pattern, Dict, Any, Optional, Union, Tuple, FrozenSet, NamedTuple
 from enum import Enum
 from dataclasses import dataclass
 from ...text.boundary_matcher import boundary_matcher, BoundaryType, UnicodeCategory
@@ -36,21 +37,89 @@ class RedactorPattern:
     priority: int = 0
     flags: int = re.IGNORECASE
     replacement: Optional[str] = None
+    # 预过滤声明：每个匹配必然包含其中至少一个字面子串（为空表示不按字面量过滤），
+    # 以及是否必然包含数字。文本不满足时跳过该模式
+    literals: Tuple[str, ...] = ()
+    needs_digit: bool = False
 
 
-class Redactor:
-    """支持Unicode和中文字符的敏感信息脱敏处理器"""
+# 模式开头的全局内联标志，如 (?i)
+_LEADING_INLINE_FLAGS = re.compile(r"^\(\?[aiLmsux]+\)")
+
+# 合并后会失效的组引用：数字反向引用、命名反向引用和条件分组
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"), (re.ASCII, "a"))
+
+_DIGIT = re.compile(r"\d")
+_ASCII_DIGITS = frozenset("0123456789")
+
+# 合并正则缓存的最大条目数（按可能命中的模式组合缓存）
+_MAX_COMBINED_CACHE = 256
+
+# 合并模式：(合并后的正则, 分组名 -> 模式下标)；正则为None表示没有可用模式
+_CombinedPattern = Tuple[Optional[Pattern], Dict[str, int]]
+
+# 尚未为某个模式查找过下一个匹配
+_UNSEARCHED = object()
+
+
+class _Requirement(NamedTuple):
+    """模式声明的预过滤条件：文本不满足时模式不可能命中"""
+    
+    literals: Tuple[str, ...]  # 匹配必然包含其中之一的字面子串，为空表示不过滤
+    folded: bool  # 是否忽略大小写比较（此时literals已转为小写）
+    needs_digit: bool  # 是否必然包含数字
 
-    def __init__(self, patterns: Optional[List[RedactorPattern]] = None, replacement: str = "***"):
+
+def _build_requirement(compiled_pattern: Pattern, redactor_pattern: RedactorPattern) -> _Requirement:
+    """根据模式声明的字面子串和数字要求构建预过滤条件"""
+    literals = tuple(redactor_pattern.literals)
+    folded = bool(compiled_pattern.flags & re.IGNORECASE) and any(
+        literal.lower() != literal.upper() for literal in literals
+    )
+    if folded:
+        literals = tuple(literal.lower() for literal in literals)
+    return _Requirement(literals, folded, redactor_pattern.needs_digit)
+
+
+class Redactor:
+    """支持Unicode和中文字符的敏感信息脱敏处理器
+    
+    先按每个模式声明的字面子串和数字要求排除不可能命中的模式，再把剩余模式按优先级
+    合并为一个带命名分组的多选正则，每个字符串只扫描一遍，
+    根据命中的分组决定替换内容。在同一位置上优先级高的模式先尝试，
+    不同位置上则取最靠左的匹配；若某个匹配吞掉了更高优先级模式匹配的开头、
+    使其剩余部分留在替换范围之外，则该文本改为按优先级逐个模式替换，
+    避免敏感内容泄露。模式中含有反向引用等无法合并的情况时，
+    同样回退为逐个模式替换。
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[List[RedactorPattern]] = None,
+        replacement: str = "***",
+        cache_size: int = 1024,
+        cache_max_length: int = 256,
+    ):
         """初始化脱敏处理器
 
         Args:
             patterns: 自定义脱敏模式列表
             replacement: 默认替换字符串
+            cache_size: 短字符串脱敏结果的LRU缓存容量，0表示不缓存
+            cache_max_length: 参与缓存的字符串最大长度
         """
         self.replacement = replacement
+        self.cache_max_length = cache_max_length
         self._patterns: List[Tuple[Pattern, RedactorPattern]] = []
+        self._default_patterns: List[Tuple[Pattern, RedactorPattern]] = []
         self._custom_patterns: Dict[str, Tuple[Pattern, RedactorPattern]] = {}
+        self._scoped_sources: List[Optional[str]] = []
+        self._requirements: List[_Requirement] = []
+        self._mergeable = True
+        self._combined: Dict[Tuple[int, ...], Optional[_CombinedPattern]] = {}
+        self._cached_redact = lru_cache(maxsize=cache_size)(self._redact_text)
         
         # 初始化默认模式
         default_patterns = self._get_default_patterns()
@@ -62,6 +131,7 @@ class Redactor:
         # 编译正则表达式
         for redactor_pattern in patterns_to_use:
             self._compile_pattern(redactor_pattern)
+        self._reorder_patterns()
 
     def _get_default_patterns(self) -> List[RedactorPattern]:
         """获取默认脱敏模式"""
@@ -72,28 +142,33 @@ class Redactor:
                 pattern=r"sk-[a-zA-Z0-9]{20,}",
                 category=PatternCategory.CREDENTIALS,
                 description="OpenAI API密钥",
-                priority=100
+                priority=100,
+                literals=("sk-",)
             ),
             RedactorPattern(
                 name="anthropic_api_key",
                 pattern=r"sk-ant-api03-[a-zA-Z0-9_-]{95}",
                 category=PatternCategory.CREDENTIALS,
                 description="Anthropic API密钥",
-                priority=100
+                priority=100,
+                literals=("sk-ant-api03-",)
             ),
             RedactorPattern(
                 name="google_api_key",
                 pattern=r"AIza[a-zA-Z0-9_-]{35}",
                 category=PatternCategory.CREDENTIALS,
                 description="Google API密钥",
-                priority=100
+                priority=100,
+                literals=("AIza",)
             ),
             RedactorPattern(
                 name="slack_token",
                 pattern=r"xox[baprs]-[0-9]{10}-[0-9]{10}-[a-zA-Z0-9]{24}",
                 category=PatternCategory.CREDENTIALS,
                 description="Slack令牌",
-                priority=100
+                priority=100,
+                literals=("xox",),
+                needs_digit=True
             ),
             
             # 联系方式模式 - 改进的Unicode支持
@@ -102,21 +177,24 @@ class Redactor:
                 pattern=r"(?<![a-zA-Z0-9._%+-\u4e00-\u9fff])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(?![a-zA-Z0-9.-\u4e00-\u9fff])",
                 category=PatternCategory.CONTACT,
                 description="邮箱地址（Unicode边界）",
-                priority=90
+                priority=90,
+                literals=("@",)
             ),
             RedactorPattern(
                 name="phone_china",
                 pattern=r"(?<!\d)1[3-9]\d{9}(?!\d)",
                 category=PatternCategory.CONTACT,
                 description="中国手机号",
-                priority=90
+                priority=90,
+                needs_digit=True
             ),
             RedactorPattern(
                 name="phone_international",
                 pattern=r"(?<!\d)(\+\d{1,3}[-.\s]?)?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}(?!\d)",
                 category=PatternCategory.CONTACT,
                 description="国际电话号码",
-                priority=85
+                priority=85,
+                needs_digit=True
             ),
             
             # 身份标识模式
@@ -125,14 +203,16 @@ class Redactor:
                 pattern=r"(?<!\d)[1-9]\d{5}(19|20)\d{2}(0[1-9]|1[0-2])(0[1-9]|[12]\d|3[01])\d{3}[\dXx](?!\d)",
                 category=PatternCategory.IDENTITY,
                 description="中国身份证号",
-                priority=95
+                priority=95,
+                needs_digit=True
             ),
             RedactorPattern(
                 name="ssn_us",
                 pattern=r"(?<!\d)\d{3}[-.\s]?\d{2}[-.\s]?\d{4}(?!\d)",
                 category=PatternCategory.IDENTITY,
                 description="美国社会保障号",
-                priority=90
+                priority=90,
+                needs_digit=True
             ),
             
             # 金融信息模式
@@ -141,14 +221,16 @@ class Redactor:
                 pattern=r"(?<!\d)(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3[0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})(?!\d)",
                 category=PatternCategory.FINANCIAL,
                 description="信用卡号",
-                priority=95
+                priority=95,
+                needs_digit=True
             ),
             RedactorPattern(
                 name="bank_card_china",
                 pattern=r"(?<!\d)[0-9]{16,19}(?!\d)",
                 category=PatternCategory.FINANCIAL,
                 description="中国银行卡号",
-                priority=90
+                priority=90,
+                needs_digit=True
             ),
             
             # 技术信息模式
@@ -158,42 +240,49 @@ class Redactor:
                 category=PatternCategory.TECHNICAL,
                 description="密码字段",
                 priority=100,
-                replacement="***"  # 完全替换密码字段
+                replacement="***",  # 完全替换密码字段
+                literals=("password", "passwd", "pwd")
             ),
             RedactorPattern(
                 name="bearer_token",
                 pattern=r"(?i)Bearer\s+[a-zA-Z0-9._-]+",
                 category=PatternCategory.TECHNICAL,
                 description="Bearer令牌",
-                priority=95
+                priority=95,
+                literals=("Bearer",)
             ),
             RedactorPattern(
                 name="token_field",
                 pattern=r'(?i)(token|access_token|refresh_token)["\']?\s*[:=]\s*["\']?[a-zA-Z0-9._-]+',
                 category=PatternCategory.TECHNICAL,
                 description="令牌字段",
-                priority=95
+                priority=95,
+                literals=("token",)
             ),
             RedactorPattern(
                 name="database_url",
                 pattern=r"(?i)(mysql|postgresql|mongodb)://[^@]+:[^@]+@[^/]+",
                 category=PatternCategory.TECHNICAL,
                 description="数据库连接字符串",
-                priority=90
+                priority=90,
+                literals=("://",)
             ),
             RedactorPattern(
                 name="url_credentials",
                 pattern=r"https?://[^:]+:[^@]+@[^/]+",
                 category=PatternCategory.TECHNICAL,
                 description="URL中的用户名密码",
-                priority=90
+                priority=90,
+                literals=("://",)
             ),
             RedactorPattern(
                 name="ip_address",
                 pattern=r"(?<!\d)(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)(?:\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)){3}(?!\d)",
                 category=PatternCategory.TECHNICAL,
                 description="IP地址",
-                priority=80
+                priority=80,
+                literals=(".",),
+                needs_digit=True
             ),
             
             RedactorPattern(
@@ -201,7 +290,8 @@ class Redactor:
                 pattern=r"[\u4e00-\u9fff]{2,}(?:省|市|区|县|镇|街道|路|号|室|栋|楼|层|单元)",
                 category=PatternCategory.CHINESE,
                 description="中文地址",
-                priority=60
+                priority=60,
+                literals=("省", "市", "区", "县", "镇", "街道", "路", "号", "室", "栋", "楼", "层", "单元")
             ),
         ]
 
@@ -211,7 +301,7 @@ class Redactor:
             # 添加Unicode标志以确保正确处理Unicode字符
             flags = redactor_pattern.flags | re.UNICODE
             compiled_pattern = re.compile(redactor_pattern.pattern, flags)
-            self._patterns.append((compiled_pattern, redactor_pattern))
+            self._default_patterns.append((compiled_pattern, redactor_pattern))
         except re.error as e:
             print(f"警告: 无效的正则表达式模式 '{redactor_pattern.name}': {e}")
 
@@ -236,7 +326,7 @@ class Redactor:
         all_patterns = []
         
         # 添加默认模式
-        for pattern, redactor_pattern in self._patterns:
+        for pattern, redactor_pattern in self._default_patterns:
             all_patterns.append((pattern, redactor_pattern))
         
         # 添加自定义模式
@@ -248,6 +338,184 @@ class Redactor:
         
         # 更新模式列表
         self._patterns = all_patterns
+        
+        # 预先计算合并所需的分组源码和预过滤标记
+        self._scoped_sources = [self._scoped_source(pattern) for pattern, _ in all_patterns]
+        self._mergeable = all(source is not None for source in self._scoped_sources)
+        self._requirements = [_build_requirement(pattern, redactor_pattern) for pattern, redactor_pattern in all_patterns]
+        self._invalidate_caches()
+
+    def _invalidate_caches(self) -> None:
+        """模式或替换字符串变化后清空合并正则和结果缓存"""
+        self._combined = {}
+        self._cached_redact.cache_clear()
+
+    @staticmethod
+    def _categories_key(categories: Optional[List[PatternCategory]]) -> Optional[FrozenSet[PatternCategory]]:
+        """将分类过滤条件转换为可哈希的缓存键"""
+        return frozenset(categories) if categories else None
+
+    @staticmethod
+    def _scoped_source(compiled_pattern: Pattern) -> Optional[str]:
+        """把单个模式改写为带局部标志的分组，无法安全合并时返回None"""
+        source = compiled_pattern.pattern
+        if _GROUP_REFERENCE.search(source):
+            return None
+        
+        # 全局内联标志已体现在 compiled_pattern.flags 中，改为分组内的局部标志
+        source = _LEADING_INLINE_FLAGS.sub("", source, count=1)
+        letters = "".join(
+            letter for flag, letter in _SCOPED_FLAGS if compiled_pattern.flags & flag
+        )
+        if compiled_pattern.flags & re.VERBOSE:
+            # 防止末尾的注释吞掉分组的右括号
+            source += "\n"
+        return f"(?{letters}:{source})"
+
+    def _candidate_indices(self, text: str, categories_key: Optional[FrozenSet[PatternCategory]]) -> Tuple[int, ...]:
+        """返回可能在文本中命中的模式下标（已按优先级排序）"""
+        is_ascii = text.isascii()
+        lowered: Optional[str] = None
+        if is_ascii:
+            has_digit = not _ASCII_DIGITS.isdisjoint(text)
+        else:
+            has_digit = _DIGIT.search(text) is not None
+        
+        indices = []
+        for index, (requirement, (_, redactor_pattern)) in enumerate(zip(self._requirements, self._patterns)):
+            if categories_key and redactor_pattern.category not in categories_key:
+                continue
+            if requirement.needs_digit and not has_digit:
+                continue
+            if requirement.literals:
+                if not requirement.folded:
+                    if not any(literal in text for literal in requirement.literals):
+                        continue
+                elif is_ascii:
+                    # 非ASCII文本的大小写折叠规则较复杂，不按忽略大小写的字面量过滤
+                    if lowered is None:
+                        lowered = text.lower()
+                    if not any(literal in lowered for literal in requirement.literals):
+                        continue
+            indices.append(index)
+        return tuple(indices)
+
+    def _get_combined(self, indices: Tuple[int, ...]) -> Optional[_CombinedPattern]:
+        """获取（按模式组合缓存的）合并正则，编译失败时返回None"""
+        if indices in self._combined:
+            return self._combined[indices]
+        
+        if len(self._combined) >= _MAX_COMBINED_CACHE:
+            self._combined = {}
+        
+        alternatives = [f"(?P<_p{index}>{self._scoped_sources[index]})" for index in indices]
+        groups = {f"_p{index}": index for index in indices}
+        combined: Optional[_CombinedPattern]
+        try:
+            combined = (re.compile("|".join(alternatives)) if alternatives else None, groups)
+        except re.error:
+            # 例如不同模式中存在同名分组
+            combined = None
+        
+        self._combined[indices] = combined
+        return combined
+
+    def _replace_match(self, match: re.Match, groups: Dict[str, int]) -> str:
+        """根据命中的分组返回替换内容"""
+        pattern, redactor_pattern = self._patterns[groups[match.lastgroup]]
+        replacement = redactor_pattern.replacement or self.replacement
+        if "\\" not in replacement:
+            return replacement
+        
+        # 替换字符串引用了分组，在相同位置用原模式重新匹配以展开
+        inner_match = pattern.match(match.string, match.start())
+        return inner_match.expand(replacement) if inner_match else replacement
+
+    def _overlaps_higher_priority(
+        self,
+        text: str,
+        matches: List[re.Match],
+        groups: Dict[str, int],
+        indices: Tuple[int, ...],
+    ) -> bool:
+        """是否有匹配吞掉了更高优先级模式匹配的开头
+        
+        更高优先级的匹配从某个替换范围内部开始、在范围之外结束时，
+        合并扫描会把它的剩余部分原样留下（例如Bearer令牌吞掉紧随其后的
+        password关键字），此时需要按优先级逐个模式替换。
+        每个模式的下一个匹配位置会被复用，整体只需从左到右查找一遍。
+        """
+        next_matches: Dict[int, Any] = {}
+        for match in matches:
+            start, end = match.span()
+            for index in indices:
+                if index >= groups[match.lastgroup]:
+                    break
+                pattern = self._patterns[index][0]
+                other = next_matches.get(index, _UNSEARCHED)
+                if other is _UNSEARCHED or (other is not None and other.start() <= start):
+                    other = pattern.search(text, start + 1)
+                while other is not None and other.start() < end:
+                    if other.end() > end:
+                        return True
+                    other = pattern.search(text, other.start() + 1)
+                next_matches[index] = other
+        return False
+
+    def _redact_text(self, text: str, categories_key: Optional[FrozenSet[PatternCategory]]) -> str:
+        """对文本执行脱敏（不经过结果缓存）"""
+        if not self._mergeable:
+            return self._redact_sequential(text, categories_key)
+        
+        indices = self._candidate_indices(text, categories_key)
+        combined = self._get_combined(indices)
+        if combined is None:
+            return self._redact_sequential(text, categories_key)
+        
+        combined_pattern, groups = combined
+        if combined_pattern is None:
+            return text
+        
+        matches = list(combined_pattern.finditer(text))
+        if not matches:
+            return text
+        if self._overlaps_higher_priority(text, matches, groups, indices):
+            return self._redact_sequential(text, categories_key)
+        
+        parts = []
+        position = 0
+        for match in matches:
+            parts.append(text[position:match.start()])
+            parts.append(self._replace_match(match, groups))
+            position = match.end()
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def _redact_sequential(self, text: str, categories_key: Optional[FrozenSet[PatternCategory]]) -> str:
+        """逐个模式依次替换（无法合并模式时的回退路径）"""
+        result = text
+        
+        for pattern, redactor_pattern in self._patterns:
+            # 检查分类过滤
+            if categories_key and redactor_pattern.category not in categories_key:
+                continue
+                
+            # 使用模式特定的替换字符串或默认替换字符串
+            replacement = redactor_pattern.replacement or self.replacement
+            result = pattern.sub(replacement, result)
+
+        return result
+
+    def get_cache_info(self) -> Dict[str, Any]:
+        """获取脱敏结果缓存的统计信息"""
+        info = self._cached_redact.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "combined_patterns": len(self._combined),
+        }
 
     def remove_pattern(self, name: str) -> bool:
         """移除自定义模式
@@ -280,19 +548,12 @@ class Redactor:
         if level == LogLevel.DEBUG:
             return text
 
-        result = text
-
-        # 应用模式
-        for pattern, redactor_pattern in self._patterns:
-            # 检查分类过滤
-            if categories and redactor_pattern.category not in categories:
-                continue
-                
-            # 使用模式特定的替换字符串或默认替换字符串
-            replacement = redactor_pattern.replacement or self.replacement
-            result = pattern.sub(replacement, result)
-
-        return result
+        categories_key = self._categories_key(categories)
+        
+        # 重复出现的短字符串直接命中缓存
+        if len(text) <= self.cache_max_length:
+            return self._cached_redact(text, categories_key)
+        return self._redact_text(text, categories_key)
 
     def redact_dict(
         self,
@@ -405,6 +666,12 @@ class Redactor:
         Returns:
             是否包含敏感信息
         """
+        if self._mergeable:
+            combined = self._get_combined(self._candidate_indices(text, self._categories_key(categories)))
+            if combined is not None:
+                combined_pattern, _ = combined
+                return combined_pattern is not None and combined_pattern.search(text) is not None
+        
         for pattern, redactor_pattern in self._patterns:
             # 检查分类过滤
             if categories and redactor_pattern.category not in categories:
@@ -476,6 +743,7 @@ class Redactor:
             replacement: 替换字符串
         """
         self.replacement = replacement
+        self._invalidate_caches()
 
     def clear_patterns(self) -> None:
         """清除所有自定义模式"""
@@ -488,7 +756,7 @@ class Redactor:
         Args:
             patterns: 新的默认模式列表（可选）
         """
-        self._patterns.clear()
+        self._default_patterns.clear()
         self._custom_patterns.clear()
 
         # 重新初始化默认模式
@@ -497,6 +765,7 @@ class Redactor:
 
         for redactor_pattern in default_patterns:
             self._compile_pattern(redactor_pattern)
+        self._reorder_patterns()
 
     def validate_unicode_text(self, text: str) -> Dict[str, Any]:
         """验证文本的Unicode特性
@@ -3,18 +3,23 @@
 实现Thread检查点的数据持久化，遵循仓储模式。
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime
+import copy
 import json
 import asyncio
 from abc import ABC, abstractmethod
 
 from src.interfaces.dependency_injection import get_logger
+from src.core.threads.checkpoints.chain import CheckpointChainCodec
 from src.core.threads.checkpoints.models import ThreadCheckpoint, CheckpointStatistics, CheckpointStatus
 
 
 logger = get_logger(__name__)
 
+# 从链式信封中取父检查点ID的SQL表达式，查询时须与索引定义完全一致才能使用索引
+_PARENT_ID_EXPR = "json_extract(state_data, '$.parent_id')"
+
 
 class ThreadCheckpointRepository:
     """Thread检查点仓储实现
@@ -162,10 +167,10 @@ class ThreadCheckpointRepository:
             archived_checkpoints = sum(1 for cp in checkpoints if cp.status == CheckpointStatus.ARCHIVED)
             
             # 大小统计
-            total_size_bytes = sum(cp.size_bytes for cp in checkpoints)
+            total_size_bytes = sum(cp.get_size_bytes() for cp in checkpoints)
             average_size_bytes = total_size_bytes / total_checkpoints if total_checkpoints > 0 else 0
-            largest_checkpoint_bytes = max(cp.size_bytes for cp in checkpoints) if checkpoints else 0
-            smallest_checkpoint_bytes = min(cp.size_bytes for cp in checkpoints) if checkpoints else 0
+            largest_checkpoint_bytes = max(cp.get_size_bytes() for cp in checkpoints) if checkpoints else 0
+            smallest_checkpoint_bytes = min(cp.get_size_bytes() for cp in checkpoints) if checkpoints else 0
             
             # 恢复统计
             total_restores = sum(cp.restore_count for cp in checkpoints)
@@ -204,20 +209,70 @@ class DatabaseThreadCheckpointRepository:
     """基于数据库的Thread检查点仓储实现
     
     这是一个示例实现，可以根据具体的数据库进行调整。
+    
+    state_data 列以链式格式存储：每个线程周期性写入全量基准快照，
+    其余检查点只存储相对前一个检查点的压缩增量，恢复时从最近的基准快照重放。
+    未编码的旧数据按全量快照读取。
     """
     
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, chain_codec: Optional[CheckpointChainCodec] = None):
         """初始化数据库仓储
         
         Args:
             db_connection: 数据库连接
+            chain_codec: 检查点链式编解码器
         """
         self._db = db_connection
+        self._codec = chain_codec or CheckpointChainCodec()
+        # 每个线程链末端的缓存：thread_id -> (检查点ID, 完整状态, 链深度)
+        self._chain_heads: Dict[str, Tuple[str, Dict[str, Any], int]] = {}
+        self._indexes_ready = False
         logger.info("DatabaseThreadCheckpointRepository initialized")
     
+    async def ensure_indexes(self) -> None:
+        """创建支撑按线程有序查询、过期范围查询和按父检查点查找后继的索引
+        
+        仓储在首次操作时自动调用，也可以在启动时显式调用。
+        """
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_thread_checkpoints_thread_created "
+            "ON thread_checkpoints (thread_id, created_at)"
+        )
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_thread_checkpoints_expires_at "
+            "ON thread_checkpoints (expires_at)"
+        )
+        # 父检查点ID保存在 state_data 信封中，使用表达式索引，无需修改表结构
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_thread_checkpoints_parent "
+            f"ON thread_checkpoints ({_PARENT_ID_EXPR})"
+        )
+        await self._db.commit()
+        self._indexes_ready = True
+    
+    async def _ensure_indexes_once(self) -> None:
+        """首次操作前创建索引"""
+        if not self._indexes_ready:
+            await self.ensure_indexes()
+    
     async def save(self, checkpoint: ThreadCheckpoint) -> bool:
-        """保存检查点到数据库"""
+        """保存检查点到数据库
+        
+        新检查点以相对链末端的增量写入；重复保存已存在的检查点时写入基准快照，
+        并先将其直接后继改写为基准快照，避免增量的父链指回自身形成环。
+        """
         try:
+            await self._ensure_indexes_once()
+            existing = await self._fetch_row(checkpoint.id)
+            head = await self._get_chain_head(checkpoint.thread_id)
+            if existing is None and head is not None:
+                envelope = self._codec.encode(checkpoint.state_data, head[0], head[1], head[2])
+            else:
+                if existing is not None:
+                    await self._rebase_successors(checkpoint.id, existing[1])
+                envelope = self._codec.encode(checkpoint.state_data)
+            checkpoint.size_bytes = self._codec.payload_size(envelope)
+            
             query = """
                 INSERT OR REPLACE INTO thread_checkpoints 
                 (id, thread_id, state_data, metadata, status, checkpoint_type, 
@@ -228,7 +283,7 @@ class DatabaseThreadCheckpointRepository:
             await self._db.execute(query, (
                 checkpoint.id,
                 checkpoint.thread_id,
-                json.dumps(checkpoint.state_data),
+                json.dumps(envelope),
                 json.dumps(checkpoint.metadata),
                 checkpoint.status.value,
                 checkpoint.checkpoint_type.value,
@@ -241,7 +296,12 @@ class DatabaseThreadCheckpointRepository:
             ))
             
             await self._db.commit()
-            logger.debug(f"Saved checkpoint {checkpoint.id} to database")
+            if existing is None or head is None or head[0] == checkpoint.id:
+                # 缓存状态副本，调用方之后原地修改 state_data 不会影响下一次增量计算
+                self._chain_heads[checkpoint.thread_id] = (
+                    checkpoint.id, copy.deepcopy(checkpoint.state_data), envelope["depth"]
+                )
+            logger.debug(f"Saved checkpoint {checkpoint.id} to database ({envelope['encoding']})")
             return True
             
         except Exception as e:
@@ -251,12 +311,12 @@ class DatabaseThreadCheckpointRepository:
     async def find_by_id(self, checkpoint_id: str) -> Optional[ThreadCheckpoint]:
         """从数据库查找检查点"""
         try:
-            query = "SELECT * FROM thread_checkpoints WHERE id = ?"
-            cursor = await self._db.execute(query, (checkpoint_id,))
-            row = await cursor.fetchone()
+            await self._ensure_indexes_once()
+            row = await self._fetch_row(checkpoint_id)
             
             if row:
-                return self._row_to_checkpoint(row)
+                checkpoints = await self._rows_to_checkpoints([row])
+                return checkpoints[0]
             return None
             
         except Exception as e:
@@ -266,6 +326,7 @@ class DatabaseThreadCheckpointRepository:
     async def find_by_thread(self, thread_id: str) -> List[ThreadCheckpoint]:
         """从数据库查找线程的检查点"""
         try:
+            await self._ensure_indexes_once()
             query = """
                 SELECT * FROM thread_checkpoints 
                 WHERE thread_id = ? 
@@ -274,7 +335,7 @@ class DatabaseThreadCheckpointRepository:
             cursor = await self._db.execute(query, (thread_id,))
             rows = await cursor.fetchall()
             
-            return [self._row_to_checkpoint(row) for row in rows]
+            return await self._rows_to_checkpoints(rows)
             
         except Exception as e:
             logger.error(f"Failed to find checkpoints for thread {thread_id} in database: {e}")
@@ -283,6 +344,7 @@ class DatabaseThreadCheckpointRepository:
     async def find_expired(self) -> List[ThreadCheckpoint]:
         """从数据库查找过期的检查点"""
         try:
+            await self._ensure_indexes_once()
             query = """
                 SELECT * FROM thread_checkpoints 
                 WHERE expires_at IS NOT NULL AND expires_at < ?
@@ -290,25 +352,50 @@ class DatabaseThreadCheckpointRepository:
             cursor = await self._db.execute(query, (datetime.now().isoformat(),))
             rows = await cursor.fetchall()
             
-            return [self._row_to_checkpoint(row) for row in rows]
+            return await self._rows_to_checkpoints(rows)
             
         except Exception as e:
             logger.error(f"Failed to find expired checkpoints in database: {e}")
             return []
     
     async def update(self, checkpoint: ThreadCheckpoint) -> bool:
-        """更新数据库中的检查点"""
+        """更新数据库中的检查点
+        
+        状态未变化时只更新元数据列，保留原有的链式编码；
+        状态被修改时将该检查点改写为基准快照，并先将其直接后继改写为基准快照，
+        保证后续增量仍可正确重放。
+        """
         try:
+            await self._ensure_indexes_once()
+            row = await self._fetch_row(checkpoint.id)
+            state_changed = False
+            if row is not None:
+                stored_state = await self._resolve_state(checkpoint.id, {checkpoint.id: row}, {})
+                state_changed = stored_state != checkpoint.state_data
+            
+            if state_changed:
+                await self._rebase_successors(checkpoint.id, checkpoint.thread_id)
+                envelope = self._codec.encode(checkpoint.state_data)
+                checkpoint.size_bytes = self._codec.payload_size(envelope)
+                await self._db.execute(
+                    "UPDATE thread_checkpoints SET state_data = ?, size_bytes = ? WHERE id = ?",
+                    (json.dumps(envelope), checkpoint.size_bytes, checkpoint.id)
+                )
+                head = self._chain_heads.get(checkpoint.thread_id)
+                if head is not None and head[0] == checkpoint.id:
+                    self._chain_heads[checkpoint.thread_id] = (
+                        checkpoint.id, copy.deepcopy(checkpoint.state_data), 0
+                    )
+            
             query = """
                 UPDATE thread_checkpoints SET
-                state_data = ?, metadata = ?, status = ?, checkpoint_type = ?,
+                metadata = ?, status = ?, checkpoint_type = ?,
                 updated_at = ?, expires_at = ?, size_bytes = ?, 
                 restore_count = ?, last_restored_at = ?
                 WHERE id = ?
             """
             
             await self._db.execute(query, (
-                json.dumps(checkpoint.state_data),
                 json.dumps(checkpoint.metadata),
                 checkpoint.status.value,
                 checkpoint.checkpoint_type.value,
@@ -329,8 +416,19 @@ class DatabaseThreadCheckpointRepository:
             return False
     
     async def delete(self, checkpoint_id: str) -> bool:
-        """从数据库删除检查点"""
+        """从数据库删除检查点
+        
+        删除前将直接后继改写为基准快照，避免链断裂。
+        """
         try:
+            await self._ensure_indexes_once()
+            row = await self._fetch_row(checkpoint_id)
+            if row is not None:
+                await self._rebase_successors(checkpoint_id, row[1])
+                head = self._chain_heads.get(row[1])
+                if head is not None and head[0] == checkpoint_id:
+                    del self._chain_heads[row[1]]
+            
             query = "DELETE FROM thread_checkpoints WHERE id = ?"
             cursor = await self._db.execute(query, (checkpoint_id,))
             await self._db.commit()
@@ -349,6 +447,7 @@ class DatabaseThreadCheckpointRepository:
     async def count_by_thread(self, thread_id: str) -> int:
         """统计线程的检查点数量"""
         try:
+            await self._ensure_indexes_once()
             query = "SELECT COUNT(*) FROM thread_checkpoints WHERE thread_id = ?"
             cursor = await self._db.execute(query, (thread_id,))
             row = await cursor.fetchone()
@@ -362,6 +461,7 @@ class DatabaseThreadCheckpointRepository:
     async def get_statistics(self, thread_id: Optional[str] = None) -> CheckpointStatistics:
         """从数据库获取统计信息"""
         try:
+            await self._ensure_indexes_once()
             if thread_id:
                 where_clause = "WHERE thread_id = ?"
                 params = (thread_id,)
@@ -426,12 +526,132 @@ class DatabaseThreadCheckpointRepository:
             logger.error(f"Failed to get statistics from database: {e}")
             return CheckpointStatistics()
     
-    def _row_to_checkpoint(self, row) -> ThreadCheckpoint:
+    async def _fetch_row(self, checkpoint_id: str) -> Optional[Any]:
+        """按ID读取一行原始数据"""
+        cursor = await self._db.execute(
+            "SELECT * FROM thread_checkpoints WHERE id = ?", (checkpoint_id,)
+        )
+        return await cursor.fetchone()
+    
+    async def _get_chain_head(self, thread_id: str) -> Optional[Tuple[str, Dict[str, Any], int]]:
+        """获取线程链末端（最新检查点）的ID、完整状态和链深度"""
+        head = self._chain_heads.get(thread_id)
+        if head is not None:
+            return head
+        
+        query = """
+            SELECT * FROM thread_checkpoints 
+            WHERE thread_id = ? 
+            ORDER BY created_at DESC LIMIT 1
+        """
+        cursor = await self._db.execute(query, (thread_id,))
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+        
+        state = await self._resolve_state(row[0], {row[0]: row}, {})
+        data = json.loads(row[2])
+        depth = data["depth"] if self._codec.is_envelope(data) else 0
+        head = (row[0], state, depth)
+        self._chain_heads[thread_id] = head
+        return head
+    
+    async def _resolve_state(
+        self,
+        checkpoint_id: str,
+        rows_by_id: Dict[str, Any],
+        states: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """解码检查点的完整状态
+        
+        沿父链向上收集信封，直到遇到基准快照、旧格式全量数据或已解码的检查点，
+        再自上而下重放增量。已解码的状态写入 states 供同批次其他行复用。
+        父链指回已经过的检查点时视为数据损坏，抛出异常而不是无限循环。
+        
+        Args:
+            checkpoint_id: 检查点ID
+            rows_by_id: 已读取的原始行，缺失的父检查点会按需读取并补充
+            states: 已解码状态缓存
+            
+        Returns:
+            完整状态
+            
+        Raises:
+            ValueError: 父链断裂或存在环
+        """
+        chain: List[Tuple[str, Dict[str, Any]]] = []
+        visited: Set[str] = set()
+        current_id = checkpoint_id
+        while current_id not in states:
+            if current_id in visited:
+                raise ValueError(f"Checkpoint chain has a cycle at {current_id}")
+            visited.add(current_id)
+            row = rows_by_id.get(current_id)
+            if row is None:
+                row = await self._fetch_row(current_id)
+                if row is None:
+                    raise ValueError(f"Checkpoint chain is broken: {current_id} not found")
+                rows_by_id[current_id] = row
+            
+            data = json.loads(row[2])
+            if not self._codec.is_envelope(data):
+                # 旧格式：直接存储的全量状态
+                states[current_id] = data
+                break
+            
+            chain.append((current_id, data))
+            if data["encoding"] == CheckpointChainCodec.ENCODING_BASE:
+                break
+            current_id = data["parent_id"]
+        
+        for chain_id, envelope in reversed(chain):
+            parent_state = states.get(envelope["parent_id"]) if envelope["parent_id"] else None
+            states[chain_id] = self._codec.decode(envelope, parent_state)
+        
+        return states[checkpoint_id]
+    
+    async def _rebase_successors(self, checkpoint_id: str, thread_id: str) -> None:
+        """将以指定检查点为父的增量检查点改写为基准快照
+        
+        通过父检查点ID的表达式索引只读取直接后继，不扫描整个线程。
+        """
+        cursor = await self._db.execute(
+            f"SELECT * FROM thread_checkpoints WHERE {_PARENT_ID_EXPR} = ? AND thread_id = ?",
+            (checkpoint_id, thread_id)
+        )
+        rows = await cursor.fetchall()
+        rows_by_id = {row[0]: row for row in rows}
+        states: Dict[str, Dict[str, Any]] = {}
+        
+        for row in rows:
+            data = json.loads(row[2])
+            if not (self._codec.is_envelope(data) and data["parent_id"] == checkpoint_id):
+                continue
+            state = await self._resolve_state(row[0], rows_by_id, states)
+            envelope = self._codec.encode(state)
+            await self._db.execute(
+                "UPDATE thread_checkpoints SET state_data = ?, size_bytes = ? WHERE id = ?",
+                (json.dumps(envelope), self._codec.payload_size(envelope), row[0])
+            )
+            head = self._chain_heads.get(thread_id)
+            if head is not None and head[0] == row[0]:
+                self._chain_heads[thread_id] = (row[0], state, 0)
+    
+    async def _rows_to_checkpoints(self, rows: List[Any]) -> List[ThreadCheckpoint]:
+        """批量将数据库行转换为检查点对象，同批次共享已解码的父状态"""
+        rows_by_id = {row[0]: row for row in rows}
+        states: Dict[str, Dict[str, Any]] = {}
+        # 按创建时间升序解码，使父检查点先于子检查点被缓存
+        for row in sorted(rows, key=lambda r: r[6]):
+            await self._resolve_state(row[0], rows_by_id, states)
+        return [self._row_to_checkpoint(row, states[row[0]]) for row in rows]
+    
+    def _row_to_checkpoint(self, row, state_data: Dict[str, Any]) -> ThreadCheckpoint:
         """将数据库行转换为检查点对象"""
         return ThreadCheckpoint(
             id=row[0],
             thread_id=row[1],
-            state_data=json.loads(row[2]),
+            state_data=state_data,
             metadata=json.loads(row[3]),
             status=CheckpointStatus(row[4]),
             checkpoint_type=row[5],  # 假设数据库中存储的是枚举值
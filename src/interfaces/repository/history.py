@@ -10,7 +10,7 @@ from datetime import datetime
 if TYPE_CHECKING:
     from src.core.history.entities import (
         BaseHistoryRecord, WorkflowTokenStatistics,
-        RecordType, HistoryQuery
+        RecordType, HistoryQuery, RollupGranularity
     )
 
 
@@ -156,6 +156,59 @@ class IHistoryRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    async def update_token_rollups(
+        self,
+        delta: 'WorkflowTokenStatistics'
+    ) -> bool:
+        """将一次Token使用增量累加到小时和天两级时间桶统计
+        
+        时间桶统计只追加：删除或清理历史记录不会从中扣除，
+        需要与现存记录保持一致时调用 rebuild_token_rollups 重建。
+        
+        Args:
+            delta: 增量统计，period_start 为发生时间
+            
+        Returns:
+            bool: 更新是否成功
+        """
+        pass
+    
+    @abstractmethod
+    async def get_token_rollups(
+        self,
+        granularity: 'RollupGranularity',
+        workflow_id: Optional[str] = None,
+        model: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List['WorkflowTokenStatistics']:
+        """一次查询获取时间范围内的时间桶统计
+        
+        Args:
+            granularity: 时间桶粒度
+            workflow_id: 工作流ID过滤，None表示所有工作流
+            model: 模型名称过滤
+            start_time: 开始时间，包含其所在的时间桶
+            end_time: 结束时间
+            
+        Returns:
+            List[WorkflowTokenStatistics]: 按时间桶排序的统计列表，
+                每项对应一个（时间桶, 工作流, 模型），period_start/period_end 为桶边界
+        """
+        pass
+    
+    @abstractmethod
+    async def rebuild_token_rollups(self) -> int:
+        """按现存的Token使用和成本记录重建时间桶统计
+        
+        丢弃已有的时间桶统计，只计入仍保存着的记录，用于删除或清理记录之后。
+        
+        Returns:
+            int: 计入时间桶的记录数
+        """
+        pass
+    
     @abstractmethod
     async def get_storage_statistics(self) -> Dict[str, Any]:
         """获取存储统计信息
@@ -7,6 +7,15 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 
 
+# 范围过滤操作符，与存储提供者的 {"op": ..., "value": ...} 过滤格式一致
+_RANGE_OPERATORS = {
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+}
+
+
 class IStorageBackend(ABC):
     """存储后端接口
     
@@ -80,4 +89,61 @@ class IStorageBackend(ABC):
         Returns:
             bool: 是否清空成功
         """
-        pass
\ No newline at end of file
+        pass
+    
+    async def query_impl(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """带排序、数量限制和偏移量的查询
+        
+        过滤值可以是普通值（等值匹配），也可以是 {"op": ">"|"<"|">="|"<=", "value": ...}
+        形式的范围条件；范围条件字段为None的记录不会被返回。
+        时间字段按ISO格式字符串存储，因此可以直接按字符串比较和排序。
+        
+        默认实现基于 list_impl 在内存中过滤和排序。支持索引的后端应覆盖此方法，
+        将排序、限制和偏移量下推为 ORDER BY ... LIMIT ... OFFSET 查询。
+        
+        Args:
+            filters: 过滤条件
+            order_by: 排序字段，None表示不排序
+            descending: 是否降序
+            limit: 结果数量限制
+            offset: 跳过的记录数
+            
+        Returns:
+            List[Dict[str, Any]]: 数据列表
+        """
+        equality_filters: Dict[str, Any] = {}
+        range_filters: List[tuple] = []
+        for key, value in (filters or {}).items():
+            if isinstance(value, dict) and value.get("op") in _RANGE_OPERATORS:
+                range_filters.append((key, _RANGE_OPERATORS[value["op"]], value["value"]))
+            else:
+                equality_filters[key] = value
+        
+        results = await self.list_impl(equality_filters)
+        if range_filters:
+            results = [
+                item for item in results
+                if all(
+                    item.get(key) is not None and compare(item[key], bound)
+                    for key, compare, bound in range_filters
+                )
+            ]
+        
+        if order_by is not None:
+            # 排序字段为None的记录排在最后
+            ordered = [item for item in results if item.get(order_by) is not None]
+            ordered.sort(key=lambda item: item[order_by], reverse=descending)
+            results = ordered + [item for item in results if item.get(order_by) is None]
+        
+        if offset:
+            results = results[offset:]
+        if limit is not None:
+            results = results[:limit]
+        return results
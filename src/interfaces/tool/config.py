@@ -23,6 +23,8 @@ class ToolConfig:
     tool_type: str  # "native", "rest", "mcp"
     enabled: bool = True
     timeout: int = 30
+    cacheable: bool = False  # 幂等工具可缓存执行结果
+    cache_ttl: Optional[float] = None  # 结果缓存有效期（秒），None表示使用执行器默认值
     metadata: Optional[Dict[str, Any]] = field(default_factory=dict)
 
 
@@ -35,6 +37,8 @@ class ToolConfig:
             'tool_type': self.tool_type,
             'enabled': self.enabled,
             'timeout': self.timeout,
+            'cacheable': self.cacheable,
+            'cache_ttl': self.cache_ttl,
             'metadata': self.metadata,
         }
 
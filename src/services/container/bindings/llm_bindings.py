@@ -94,6 +94,38 @@ class LLMServiceBindings:
             lifetime=ServiceLifetime.SINGLETON
         )
         
+        # 注册客户端工厂
+        def client_factory_factory():
+            from src.services.llm.factory.client_factory import ClientFactory
+            from src.core.llm.factory import LLMFactory
+            
+            llm_factory = container.get(LLMFactory)
+            return ClientFactory(llm_factory)
+        
+        from src.interfaces.llm.factory import IClientFactory
+        container.register_factory(
+            IClientFactory,
+            client_factory_factory,
+            lifetime=ServiceLifetime.SINGLETON
+        )
+        
+        # 注册轮询池管理器
+        def polling_pool_manager_factory():
+            from src.services.llm.scheduling.polling_pool import PollingPoolManager
+            from src.services.llm.scheduling.task_group_manager import TaskGroupManager
+            from src.interfaces.llm.factory import IClientFactory
+            
+            task_group_manager = container.get(TaskGroupManager)
+            client_factory = container.get(IClientFactory)
+            return PollingPoolManager(task_group_manager, client_factory)
+        
+        from src.interfaces.llm.polling import IPollingPoolManager
+        container.register_factory(
+            IPollingPoolManager,
+            polling_pool_manager_factory,
+            lifetime=ServiceLifetime.SINGLETON
+        )
+        
         # 注册LLM管理器
         def llm_manager_factory():
             from src.services.llm.manager import LLMManager
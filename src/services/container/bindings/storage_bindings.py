@@ -33,7 +33,27 @@ class StorageServiceBindings:
             from src.core.threads.checkpoints.storage.repository import ThreadCheckpointRepository
             from src.interfaces.storage.backend import IStorageBackend
             
-            storage_backend = container.get(IStorageBackend)
+            storage_config = config.get("storage", {})
+            checkpoint_config = storage_config.get("repositories", {}).get("checkpoint", {})
+            if checkpoint_config.get("backend_type") == "sqlite":
+                # SQLite后端在首次使用时建表并创建检查点索引，查询排序和分页在SQL中执行
+                from src.adapters.storage.backends.impl.sqlite_table_backend import SQLiteTableBackend
+                from src.adapters.storage.backends.providers.sqlite_provider import SQLiteProvider
+                from src.core.threads.checkpoints.storage.repository import (
+                    THREAD_CHECKPOINT_TABLE,
+                    THREAD_CHECKPOINT_TABLE_SCHEMA,
+                )
+                
+                sqlite_config = storage_config.get("backends", {}).get("sqlite", {})
+                provider = SQLiteProvider(
+                    db_path=sqlite_config.get("db_path", "./data/storage.db"),
+                    timeout=float(sqlite_config.get("timeout", 30.0))
+                )
+                storage_backend = SQLiteTableBackend(
+                    provider, THREAD_CHECKPOINT_TABLE, THREAD_CHECKPOINT_TABLE_SCHEMA
+                )
+            else:
+                storage_backend = container.get(IStorageBackend)
             return ThreadCheckpointRepository(storage_backend)
         
         from src.core.threads.checkpoints.storage.repository import IThreadCheckpointRepository
@@ -5,7 +5,7 @@
 
 import asyncio
 from src.interfaces.dependency_injection import get_logger
-from typing import Dict, Any, Optional, Sequence, List, TYPE_CHECKING
+from typing import Dict, Any, Optional, Sequence, List, Tuple, TYPE_CHECKING
 from datetime import datetime
 
 from src.interfaces.llm import ILLMCallHook, LLMResponse
@@ -51,6 +51,8 @@ class HistoryRecordingHook(ILLMCallHook):
         self.cost_calculator = cost_calculator
         self.workflow_context = workflow_context or {}
         self.pending_requests: Dict[str, LLMRequestRecord] = {}
+        # 每个会话和模型上一次计数的消息及token总数: {(会话ID, 模型类型, 模型名称): (消息, token数)}
+        self._message_token_counts: Dict[tuple, Tuple[Tuple["IBaseMessage", ...], int]] = {}
         self._logger = get_logger(self.__class__.__name__)
     
     def before_call(
@@ -85,9 +87,8 @@ class HistoryRecordingHook(ILLMCallHook):
             
             # 使用LLM模块的精确token计算，不进行估算
             # 类型转换：IBaseMessage -> BaseMessage（运行时兼容）
-            estimated_tokens = self.token_service.calculate_messages_tokens(
-                messages,
-                model_type, model_name
+            estimated_tokens = self._count_messages_tokens(
+                messages, session_id, model_type, model_name
             )
             
             # 创建请求记录
@@ -265,6 +266,42 @@ class HistoryRecordingHook(ILLMCallHook):
             self._logger.error(f"记录LLM错误失败: {e}")
             return None
     
+    def _count_messages_tokens(
+        self,
+        messages: Sequence["IBaseMessage"],
+        session_id: str,
+        model_type: str,
+        model_name: str
+    ) -> int:
+        """计算请求消息的token数量
+        
+        同一会话每轮调用通常只在上一轮的消息之后追加新消息。上一轮的消息
+        按对象身份仍是本轮的前缀时，只对追加的消息计数，否则全量计算。
+        
+        Args:
+            messages: 消息列表
+            session_id: 会话ID
+            model_type: 模型类型
+            model_name: 模型名称
+            
+        Returns:
+            int: token数量
+        """
+        key = (session_id, model_type, model_name)
+        previous_messages, previous_total = self._message_token_counts.get(key, ((), 0))
+        
+        if previous_messages and len(previous_messages) <= len(messages) and all(
+            old is new for old, new in zip(previous_messages, messages)
+        ):
+            total = self.token_service.calculate_messages_tokens_incremental(
+                messages, len(previous_messages), previous_total, model_type, model_name
+            )
+        else:
+            total = self.token_service.calculate_messages_tokens(messages, model_type, model_name)
+        
+        self._message_token_counts[key] = (tuple(messages), total)
+        return total
+    
     async def _record_llm_request(self, request_record: LLMRequestRecord) -> None:
         """异步记录LLM请求"""
         try:
@@ -375,6 +412,7 @@ class HistoryRecordingHook(ILLMCallHook):
             context: 新的上下文信息
         """
         self.workflow_context = context.copy()
+        self._message_token_counts.clear()
         self._logger.debug(f"设置工作流上下文: {list(context.keys())}")
     
     def get_pending_request_count(self) -> int:
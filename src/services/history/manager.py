@@ -118,6 +118,8 @@ class HistoryManager(BaseHistoryManager, IHistoryManager):
             else:
                 await self.save_record(record)
             
+            await self._update_token_rollups(record)
+            
             if self._logger:
                 self._logger.debug(f"记录Token使用: {record.record_id}")
         except Exception as e:
@@ -133,6 +135,8 @@ class HistoryManager(BaseHistoryManager, IHistoryManager):
             else:
                 await self.save_record(record)
             
+            await self._update_token_rollups(record)
+            
             if self._logger:
                 self._logger.debug(f"记录成本: {record.record_id}")
         except Exception as e:
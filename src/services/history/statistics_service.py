@@ -11,7 +11,7 @@ from src.interfaces.repository.history import IHistoryRepository
 from src.interfaces.logger import ILogger
 from src.core.history.entities import (
     WorkflowTokenStatistics, WorkflowTokenSummary, TokenUsageRecord,
-    CostRecord, RecordType
+    CostRecord, RecordType, RollupGranularity
 )
 from src.interfaces.history.exceptions import StatisticsError
 from src.interfaces.container.exceptions import ValidationError
@@ -454,6 +454,54 @@ class HistoryStatisticsService:
                 self._logger.error(f"获取效率指标失败: {e}")
             raise StatisticsError(f"获取效率指标失败: {e}", workflow_id=workflow_id)
     
+    async def get_token_rollup_series(
+        self,
+        workflow_id: str,
+        granularity: RollupGranularity,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[datetime, WorkflowTokenSummary]:
+        """
+        一次查询获取按时间桶汇总的Token统计
+        
+        Args:
+            workflow_id: 工作流ID
+            granularity: 时间桶粒度
+            start_time: 开始时间，包含其所在的时间桶
+            end_time: 结束时间
+            
+        Returns:
+            Dict[datetime, WorkflowTokenSummary]: 按时间排序的桶起始时间到汇总统计的映射，
+                没有数据的时间桶为空汇总
+        """
+        try:
+            if not workflow_id:
+                raise ValidationError("工作流ID不能为空")
+            
+            rollups: List[WorkflowTokenStatistics] = []
+            if self._storage is not None:
+                rollups = await self._storage.get_token_rollups(
+                    granularity, workflow_id=workflow_id,
+                    start_time=start_time, end_time=end_time
+                )
+            summaries = WorkflowTokenSummary.group_by_period(workflow_id, rollups)
+            
+            return {
+                bucket: summaries.get(bucket) or WorkflowTokenSummary(
+                    workflow_id=workflow_id,
+                    period_start=bucket,
+                    period_end=bucket + granularity.bucket_size
+                )
+                for bucket in granularity.iter_buckets(start_time, end_time)
+            }
+            
+        except Exception as e:
+            if isinstance(e, ValidationError):
+                raise
+            if self._logger:
+                self._logger.error(f"获取时间桶统计失败: {e}")
+            raise StatisticsError(f"获取时间桶统计失败: {e}", workflow_id=workflow_id)
+    
     async def _get_daily_trends(
         self,
         workflow_id: str,
@@ -461,18 +509,12 @@ class HistoryStatisticsService:
         end_time: datetime
     ) -> Dict[str, Any]:
         """获取每日趋势"""
-        daily_stats = {}
-        current_date = start_time.date()
+        series = await self.get_token_rollup_series(
+            workflow_id, RollupGranularity.DAY, start_time, end_time
+        )
         
-        while current_date <= end_time.date():
-            day_start = datetime.combine(current_date, datetime.min.time())
-            day_end = datetime.combine(current_date, datetime.max.time())
-            
-            day_summary = await self.get_workflow_token_summary(
-                workflow_id, day_start, day_end
-            )
-            
-            daily_stats[current_date.isoformat()] = {
+        return {
+            bucket.date().isoformat(): {
                 "total_tokens": day_summary.total_tokens,
                 "total_cost": day_summary.total_cost,
                 "total_requests": day_summary.total_requests,
@@ -486,10 +528,8 @@ class HistoryStatisticsService:
                     for model, stats in day_summary.model_breakdown.items()
                 }
             }
-            
-            current_date += timedelta(days=1)
-        
-        return daily_stats
+            for bucket, day_summary in series.items()
+        }
     
     async def _get_hourly_trends(
         self,
@@ -498,26 +538,19 @@ class HistoryStatisticsService:
         end_time: datetime
     ) -> Dict[str, Any]:
         """获取每小时趋势"""
-        hourly_stats = {}
-        current_time = start_time.replace(minute=0, second=0, microsecond=0)
+        series = await self.get_token_rollup_series(
+            workflow_id, RollupGranularity.HOUR, start_time, end_time
+        )
         
-        while current_time <= end_time:
-            hour_end = current_time + timedelta(hours=1) - timedelta(microseconds=1)
-            
-            hour_summary = await self.get_workflow_token_summary(
-                workflow_id, current_time, hour_end
-            )
-            
-            hourly_stats[current_time.isoformat()] = {
+        return {
+            bucket.isoformat(): {
                 "total_tokens": hour_summary.total_tokens,
                 "total_cost": hour_summary.total_cost,
                 "total_requests": hour_summary.total_requests,
                 "models_used": hour_summary.models_used
             }
-            
-            current_time += timedelta(hours=1)
-        
-        return hourly_stats
+            for bucket, hour_summary in series.items()
+        }
     
     async def _get_model_trends(
         self,
@@ -12,7 +12,7 @@ from src.core.history.interfaces import ITokenTracker
 from src.interfaces.repository.history import IHistoryRepository
 from src.core.history.entities import (
     TokenUsageRecord, WorkflowTokenStatistics, WorkflowTokenSummary,
-    TokenSource
+    TokenSource, RollupGranularity
 )
 from src.core.history.base import BaseTokenTracker
 from src.services.llm.token_calculation_service import TokenCalculationService
@@ -355,20 +355,22 @@ class WorkflowTokenTracker(BaseTokenTracker):
         try:
             end_time = datetime.now()
             start_time = end_time - timedelta(days=days)
+            granularity = RollupGranularity.DAY
+            
+            # 一次查询获取整个范围的按天统计
+            rollups: List[WorkflowTokenStatistics] = []
+            if self._storage is not None:
+                rollups = await self._storage.get_token_rollups(
+                    granularity, workflow_id=workflow_id,
+                    start_time=start_time, end_time=end_time
+                )
+            summaries = WorkflowTokenSummary.group_by_period(workflow_id, rollups)
             
-            # 按天分组获取统计
             daily_stats = {}
-            current_date = start_time.date()
-            
-            while current_date <= end_time.date():
-                day_start = datetime.combine(current_date, datetime.min.time())
-                day_end = datetime.combine(current_date, datetime.max.time())
+            for bucket in granularity.iter_buckets(start_time, end_time):
+                day_summary = summaries.get(bucket) or WorkflowTokenSummary(workflow_id=workflow_id)
                 
-                day_summary = await self.get_workflow_summary(
-                    workflow_id, day_start, day_end
-                )
-                
-                daily_stats[current_date.isoformat()] = {
+                daily_stats[bucket.date().isoformat()] = {
                     "total_tokens": day_summary.total_tokens,
                     "total_cost": day_summary.total_cost,
                     "total_requests": day_summary.total_requests,
@@ -383,8 +385,6 @@ class WorkflowTokenTracker(BaseTokenTracker):
                         for model, stats in day_summary.model_breakdown.items()
                     }
                 }
-                
-                current_date += timedelta(days=1)
             
             return daily_stats  # type: ignore
             
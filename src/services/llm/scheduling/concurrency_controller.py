@@ -3,13 +3,18 @@
 import asyncio
 import time
 import threading
-from typing import Dict, Any, Optional, List
+from collections import deque
+from typing import Deque, Dict, Any, Optional, List
 from dataclasses import dataclass, field
 from enum import Enum
 from src.interfaces.dependency_injection import get_logger
+from src.infrastructure.llm.monitoring.stats_collector import Histogram, HistogramBucket
 
 logger = get_logger(__name__)
 
+# 排队等待时间直方图的桶上界（秒）
+WAIT_TIME_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0]
+
 
 class ConcurrencyLevel(Enum):
     """并发级别"""
@@ -19,33 +24,150 @@ class ConcurrencyLevel(Enum):
     NODE = "node"
 
 
+class WaitTimeStats:
+    """排队等待时间统计
+    
+    直方图记录全部样本，百分位数基于最近的样本窗口计算。
+    """
+    
+    def __init__(self, name: str, window_size: int = 1000):
+        self.histogram = Histogram(
+            name=name,
+            buckets=[HistogramBucket(upper_bound) for upper_bound in WAIT_TIME_BUCKETS]
+        )
+        self._recent: Deque[float] = deque(maxlen=window_size)
+    
+    def observe(self, wait_time: float) -> None:
+        """记录一次等待时间（秒）"""
+        self.histogram.observe(wait_time)
+        self._recent.append(wait_time)
+    
+    def percentile(self, percentile: float) -> float:
+        """获取最近样本的百分位数（秒）"""
+        if not self._recent:
+            return 0.0
+        samples = sorted(self._recent)
+        index = min(int(percentile / 100 * len(samples)), len(samples) - 1)
+        return samples[index]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计信息"""
+        count = self.histogram.count
+        return {
+            "count": count,
+            "avg": self.histogram.sum / count if count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": self.histogram.get_buckets()
+        }
+
+
 @dataclass
 class ConcurrencyLimit:
-    """并发限制配置"""
+    """并发限制配置
+    
+    许可满额时，等待者按FIFO顺序排队；释放许可时直接移交给队首等待者，
+    每次释放只唤醒一个等待者。等待者与释放方需运行在同一个事件循环中。
+    """
     limit: int
     queue_size: int
     current_count: int = 0
-    waiting_queue: List = field(default_factory=list)
+    waiting_queue: Deque[asyncio.Future] = field(default_factory=deque)
     lock: threading.Lock = field(default_factory=threading.Lock)
+    wait_stats: WaitTimeStats = field(default_factory=lambda: WaitTimeStats("queue_wait_seconds"))
+    rejected_count: int = 0
+    timeout_count: int = 0
     
     def can_acquire(self) -> bool:
         """检查是否可以获取并发许可"""
-        return self.current_count < self.limit
+        return self.current_count < self.limit and not self.waiting_queue
     
     def acquire(self) -> bool:
-        """获取并发许可"""
+        """获取并发许可（不等待）"""
         with self.lock:
             if self.can_acquire():
                 self.current_count += 1
                 return True
             return False
     
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """
+        获取并发许可，满额时排队等待
+        
+        Args:
+            timeout: 超时时间（秒），None表示一直等待
+            
+        Returns:
+            是否获取成功；队列已满或超时返回False
+        """
+        start_time = time.monotonic()
+        
+        with self.lock:
+            if self.can_acquire():
+                self.current_count += 1
+                self.wait_stats.observe(0.0)
+                return True
+            
+            if len(self.waiting_queue) >= self.queue_size:
+                self.rejected_count += 1
+                return False
+            
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiting_queue.append(waiter)
+        
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self.lock:
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    try:
+                        self.waiting_queue.remove(waiter)
+                    except ValueError:
+                        pass
+            # 许可已移交但等待方已放弃，转交给下一个等待者
+            if granted:
+                self.release()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            with self.lock:
+                self.timeout_count += 1
+            return False
+        
+        with self.lock:
+            self.wait_stats.observe(time.monotonic() - start_time)
+        return True
+    
     def release(self) -> None:
-        """释放并发许可"""
+        """释放并发许可，有等待者时直接移交给队首等待者"""
         with self.lock:
+            while self.waiting_queue:
+                waiter = self.waiting_queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+            
             if self.current_count > 0:
                 self.current_count -= 1
     
+    def resize(self, limit: int, queue_size: int) -> None:
+        """
+        调整并发限制，限制增大时按FIFO顺序唤醒等待者
+        
+        Args:
+            limit: 并发限制
+            queue_size: 队列大小
+        """
+        with self.lock:
+            self.limit = limit
+            self.queue_size = queue_size
+            while self.current_count < self.limit and self.waiting_queue:
+                waiter = self.waiting_queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    self.current_count += 1
+    
     def get_status(self) -> Dict[str, Any]:
         """获取状态"""
         with self.lock:
@@ -53,7 +175,11 @@ class ConcurrencyLimit:
                 "limit": self.limit,
                 "current": self.current_count,
                 "available": self.limit - self.current_count,
-                "queue_size": len(self.waiting_queue)
+                "queue_size": len(self.waiting_queue),
+                "max_queue_size": self.queue_size,
+                "rejected": self.rejected_count,
+                "timeouts": self.timeout_count,
+                "wait_time": self.wait_stats.to_dict()
             }
 
 
@@ -127,16 +253,7 @@ class ConcurrencyController:
         if not limit:
             return True
         
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            if limit.acquire():
-                return True
-            
-            # 等待一段时间后重试
-            await asyncio.sleep(0.1)
-        
-        return False
+        return await limit.acquire_async(timeout)
     
     def release_permission(self, level: ConcurrencyLevel, identifier: str) -> None:
         """
@@ -178,6 +295,12 @@ class ConcurrencyController:
             queue_size: 队列大小
         """
         limit_key = f"{level.value}_{identifier}"
+        existing = self.limits.get(limit_key)
+        if existing:
+            # 原地调整，保留已排队的等待者
+            existing.resize(limit, queue_size)
+            return
+        
         self.limits[limit_key] = ConcurrencyLimit(
             limit=limit,
             queue_size=queue_size
@@ -210,6 +333,9 @@ class RateLimiter:
         """
         self.enabled = config.get("enabled", True)
         self.algorithm = config.get("algorithm", "token_bucket")
+        self.wait_stats = WaitTimeStats("rate_limit_wait_seconds")
+        # 异步等待者按FIFO顺序排队，只有队首等待者计时等待下一个许可
+        self._acquire_lock: Optional[asyncio.Lock] = None
         
         if self.enabled:
             if self.algorithm == "token_bucket":
@@ -222,7 +348,7 @@ class RateLimiter:
         self.bucket_size = config.get("bucket_size", 1000)
         self.refill_rate = config.get("refill_rate", 16.67)  # 1000/60
         self.tokens = self.bucket_size
-        self.last_refill = time.time()
+        self.last_refill = time.monotonic()
         self.lock = threading.Lock()
     
     def _init_sliding_window(self, config: Dict[str, Any]) -> None:
@@ -293,9 +419,79 @@ class RateLimiter:
                 return True
             return False
     
+    def time_until_available(self) -> float:
+        """
+        计算距离下一个许可可用的精确等待时间
+        
+        Returns:
+            等待秒数，0表示当前即可获取
+        """
+        if not self.enabled:
+            return 0.0
+        
+        if self.algorithm == "token_bucket":
+            with self.lock:
+                self._refill_tokens()
+                if self.tokens >= 1:
+                    return 0.0
+                if self.refill_rate <= 0:
+                    return float("inf")
+                return (1 - self.tokens) / self.refill_rate
+        elif self.algorithm == "sliding_window":
+            with self.lock:
+                now = time.time()
+                self.requests = [req_time for req_time in self.requests 
+                               if now - req_time < self.window_size]
+                if len(self.requests) < self.max_requests:
+                    return 0.0
+                # 最早的请求移出窗口时释放一个许可
+                return self.requests[0] + self.window_size - now
+        
+        return 0.0
+    
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        异步获取一个许可，按计算出的精确时间等待
+        
+        Args:
+            timeout: 超时时间（秒），None表示一直等待
+            
+        Returns:
+            是否获取成功；在超时前不可能获得许可时立即返回False
+        """
+        if not self.enabled:
+            return True
+        
+        start_time = time.monotonic()
+        deadline = None if timeout is None else start_time + timeout
+        
+        if self._acquire_lock is None:
+            self._acquire_lock = asyncio.Lock()
+        acquire_lock = self._acquire_lock
+        
+        try:
+            if timeout is None or not acquire_lock.locked():
+                await acquire_lock.acquire()
+            else:
+                await asyncio.wait_for(acquire_lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        
+        try:
+            while not self.consume():
+                wait_time = self.time_until_available()
+                if deadline is not None and time.monotonic() + wait_time > deadline:
+                    return False
+                await asyncio.sleep(wait_time)
+        finally:
+            acquire_lock.release()
+        
+        self.wait_stats.observe(time.monotonic() - start_time)
+        return True
+    
     def _refill_tokens(self) -> None:
         """填充令牌"""
-        now = time.time()
+        now = time.monotonic()
         elapsed = now - self.last_refill
         tokens_to_add = elapsed * self.refill_rate
         
@@ -309,7 +505,8 @@ class RateLimiter:
         
         status = {
             "enabled": True,
-            "algorithm": self.algorithm
+            "algorithm": self.algorithm,
+            "wait_time": self.wait_stats.to_dict()
         }
         
         if self.algorithm == "token_bucket":
@@ -362,15 +559,9 @@ class ConcurrencyAndRateLimitManager:
         Returns:
             是否获取成功
         """
-        # 检查速率限制
-        if not self.rate_limiter.can_proceed():
-            return False
-        
-        # 检查并发限制
-        if not self.concurrency_controller.can_execute(concurrency_level, identifier):
-            return False
+        deadline = time.monotonic() + timeout
         
-        # 获取并发许可
+        # 获取并发许可（满额时排队等待）
         concurrency_acquired = await self.concurrency_controller.acquire_permission(
             concurrency_level, identifier, timeout
         )
@@ -378,8 +569,14 @@ class ConcurrencyAndRateLimitManager:
         if not concurrency_acquired:
             return False
         
-        # 消费速率限制许可
-        rate_limit_acquired = self.rate_limiter.consume()
+        # 在剩余时间内获取速率限制许可
+        try:
+            rate_limit_acquired = await self.rate_limiter.acquire(
+                max(0.0, deadline - time.monotonic())
+            )
+        except asyncio.CancelledError:
+            self.concurrency_controller.release_permission(concurrency_level, identifier)
+            raise
         
         if not rate_limit_acquired:
             # 释放并发许可
@@ -2,8 +2,9 @@
 
 import asyncio
 import time
+from collections import deque
 from src.interfaces.dependency_injection import get_logger
-from typing import Dict, Any, Optional, List, Callable
+from typing import Deque, Dict, Any, Optional, List, Callable, Sequence, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
@@ -11,7 +12,7 @@ import random
 
 from .concurrency_controller import ConcurrencyAndRateLimitManager, ConcurrencyLevel
 from .task_group_manager import TaskGroupManager
-from src.interfaces.llm import IPollingPoolManager
+from src.interfaces.llm import IPollingPoolManager, IClientFactory
 from src.interfaces.llm import ILLMClient
 from src.interfaces.llm.exceptions import LLMError
 
@@ -32,6 +33,7 @@ class RotationStrategy(Enum):
     ROUND_ROBIN = "round_robin"
     LEAST_RECENTLY_USED = "least_recently_used"
     WEIGHTED = "weighted"
+    POWER_OF_TWO_CHOICES = "power_of_two_choices"
 
 
 @dataclass
@@ -51,6 +53,13 @@ class LLMInstance:
     max_concurrency: int = 10
     weight: float = 1.0
     last_used: Optional[datetime] = None
+    ewma_response_time: float = 0.0
+    consecutive_failures: int = 0
+    last_failure: Optional[datetime] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+    
+    # EWMA响应时间的平滑系数，越大越偏重最近的请求
+    EWMA_ALPHA = 0.3
     
     def is_available(self) -> bool:
         """检查实例是否可用"""
@@ -65,6 +74,7 @@ class LLMInstance:
         """更新性能指标"""
         if success:
             self.success_count += 1
+            self.consecutive_failures = 0
             # 更新平均响应时间
             total_requests = self.success_count + self.failure_count
             if total_requests == 1:
@@ -73,8 +83,15 @@ class LLMInstance:
                 self.avg_response_time = (
                     (self.avg_response_time * (total_requests - 1) + response_time) / total_requests
                 )
+            # 更新EWMA响应时间
+            if self.ewma_response_time == 0.0:
+                self.ewma_response_time = response_time
+            else:
+                self.ewma_response_time += self.EWMA_ALPHA * (response_time - self.ewma_response_time)
         else:
             self.failure_count += 1
+            self.consecutive_failures += 1
+            self.last_failure = datetime.now()
         
         self.last_used = datetime.now()
 
@@ -124,10 +141,38 @@ class LeastRecentlyUsedScheduler(Scheduler):
 
 
 class WeightedScheduler(Scheduler):
-    """加权调度器"""
+    """加权调度器
+    
+    实例的基础权重（配置权重×性能×成功率）只在其请求统计变化后重新计算，
+    每次选择只需乘上实时负载系数。
+    """
+    
+    def __init__(self):
+        # instance_id -> ((成功次数, 失败次数, 配置权重), 基础权重)
+        self._base_weights: Dict[str, Tuple[Tuple[int, int, float], float]] = {}
     
     def calculate_weight(self, instance: LLMInstance) -> float:
         """计算实例权重"""
+        base_weight = self._get_base_weight(instance)
+        
+        # 根据当前负载调整权重
+        load_weight = 1.0 - (instance.current_load / instance.max_concurrency)
+        
+        return max(base_weight * load_weight, 0.1)  # 最小权重
+    
+    def _get_base_weight(self, instance: LLMInstance) -> float:
+        """获取不含负载系数的基础权重，统计未变化时复用缓存"""
+        version = (instance.success_count, instance.failure_count, instance.weight)
+        cached = self._base_weights.get(instance.instance_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        base_weight = self._calculate_base_weight(instance)
+        self._base_weights[instance.instance_id] = (version, base_weight)
+        return base_weight
+    
+    def _calculate_base_weight(self, instance: LLMInstance) -> float:
+        """计算基础权重"""
         base_weight = instance.weight
         
         # 根据性能调整权重
@@ -144,13 +189,7 @@ class WeightedScheduler(Scheduler):
         else:
             reliability_weight = 1.0
         
-        # 根据当前负载调整权重
-        load_weight = 1.0 - (instance.current_load / instance.max_concurrency)
-        
-        # 综合权重
-        final_weight = base_weight * performance_weight * reliability_weight * load_weight
-        
-        return max(final_weight, 0.1)  # 最小权重
+        return base_weight * performance_weight * reliability_weight
     
     def select_instance(self, instances: List[LLMInstance]) -> Optional[LLMInstance]:
         """根据权重选择实例"""
@@ -178,11 +217,56 @@ class WeightedScheduler(Scheduler):
         return available_instances[-1]
 
 
-class HealthChecker:
-    """健康检查器"""
+class PowerOfTwoChoicesScheduler(Scheduler):
+    """两次随机选择调度器
+    
+    每次随机抽取两个可接受请求的实例，选择代价更低者。代价为EWMA响应时间
+    乘以（在途请求数+1）再除以配置权重，既偏向更快的实例，又避免所有请求
+    同时涌向当前最快的实例。尚无响应时间样本的实例代价按0计，会被优先探测。
+    """
     
-    def __init__(self, check_interval: int = 30):
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._random = rng or random.Random()
+    
+    @staticmethod
+    def calculate_cost(instance: LLMInstance) -> float:
+        """计算实例代价"""
+        return instance.ewma_response_time * (instance.current_load + 1) / max(instance.weight, 0.01)
+    
+    def select_instance(self, instances: List[LLMInstance]) -> Optional[LLMInstance]:
+        """选择两个随机实例中代价更低者"""
+        available_instances = [inst for inst in instances if inst.can_accept_request()]
+        
+        if not available_instances:
+            return None
+        if len(available_instances) == 1:
+            return available_instances[0]
+        
+        first, second = self._random.sample(available_instances, 2)
+        if self.calculate_cost(second) < self.calculate_cost(first):
+            return second
+        return first
+
+
+class HealthChecker:
+    """健康检查器
+    
+    默认基于请求结果进行被动检查：连续失败达到阈值视为不健康，
+    失败状态的实例在恢复时间过后进入恢复状态、再次检查通过后恢复健康。
+    可通过 health_check_func 提供主动探测逻辑。
+    """
+    
+    def __init__(
+        self,
+        check_interval: int = 30,
+        failure_threshold: int = 3,
+        recovery_time: float = 60,
+        health_check_func: Optional[Callable[[LLMInstance], Any]] = None
+    ):
         self.check_interval = check_interval
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.health_check_func = health_check_func
         self.running = False
     
     async def start(self, instances: List[LLMInstance], 
@@ -214,14 +298,16 @@ class HealthChecker:
             if is_healthy:
                 if instance.status == InstanceStatus.FAILED:
                     instance.status = InstanceStatus.RECOVERING
-                elif instance.status == InstanceStatus.RECOVERING:
+                    # 恢复期重新累计连续失败
+                    instance.consecutive_failures = 0
+                elif instance.status in (InstanceStatus.RECOVERING, InstanceStatus.DEGRADED):
                     instance.status = InstanceStatus.HEALTHY
                 
                 instance.failure_count = 0
             else:
                 instance.failure_count += 1
                 
-                if instance.failure_count >= 3:
+                if instance.failure_count >= self.failure_threshold:
                     instance.status = InstanceStatus.FAILED
                 elif instance.status == InstanceStatus.HEALTHY:
                     instance.status = InstanceStatus.DEGRADED
@@ -235,17 +321,27 @@ class HealthChecker:
         except Exception as e:
             logger.error(f"健康检查失败 {instance.instance_id}: {e}")
             instance.failure_count += 1
-            if instance.failure_count >= 3:
+            if instance.failure_count >= self.failure_threshold:
                 instance.status = InstanceStatus.FAILED
     
     async def _perform_health_check(self, instance: LLMInstance) -> bool:
         """执行具体的健康检查"""
         try:
-            # 发送简单的ping请求
-            # 这里可以实现具体的健康检查逻辑
-            await asyncio.sleep(0.1)  # 模拟网络延迟
-            return True
-        except:
+            if self.health_check_func:
+                result = self.health_check_func(instance)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                return bool(result)
+            
+            # 失败的实例在恢复时间过后才允许重新探测
+            if instance.status == InstanceStatus.FAILED:
+                if instance.last_failure is None:
+                    return True
+                elapsed = (datetime.now() - instance.last_failure).total_seconds()
+                return elapsed >= self.recovery_time
+            
+            return instance.consecutive_failures < self.failure_threshold
+        except Exception:
             return False
 
 
@@ -255,7 +351,8 @@ class PollingPool:
     def __init__(self, 
                  name: str,
                  config: Dict[str, Any],
-                 task_group_manager: TaskGroupManager):
+                 task_group_manager: TaskGroupManager,
+                 client_factory: Optional[IClientFactory] = None):
         """
         初始化轮询池
         
@@ -263,20 +360,31 @@ class PollingPool:
             name: 轮询池名称
             config: 轮询池配置
             task_group_manager: 任务组管理器
+            client_factory: LLM客户端工厂，用于为实例创建客户端
         """
         self.name = name
         self.config = config
         self.task_group_manager = task_group_manager
+        self.client_factory = client_factory
         self.instances: List[LLMInstance] = []
         self.scheduler = self._create_scheduler()
-        self.health_checker = HealthChecker(config.get("health_check_interval", 30))
+        self.failure_threshold = config.get("failure_threshold", 3)
+        self.health_checker = HealthChecker(
+            config.get("health_check_interval", 30),
+            failure_threshold=self.failure_threshold,
+            recovery_time=config.get("recovery_time", 60)
+        )
         self.concurrency_manager = self._create_concurrency_manager()
+        self._health_check_task: Optional[asyncio.Task] = None
+        # 所有可用实例都满载时，等待实例释放的请求按FIFO顺序排队
+        self._capacity_waiters: Deque[asyncio.Future] = deque()
         
         # 统计信息
         self.stats = {
             "total_requests": 0,
             "successful_requests": 0,
             "failed_requests": 0,
+            "rejected_requests": 0,
             "avg_response_time": 0.0
         }
     
@@ -290,6 +398,8 @@ class PollingPool:
             return LeastRecentlyUsedScheduler()
         elif strategy == RotationStrategy.WEIGHTED:
             return WeightedScheduler()
+        elif strategy == RotationStrategy.POWER_OF_TWO_CHOICES:
+            return PowerOfTwoChoicesScheduler()
         else:
             raise ValueError(f"不支持的调度策略: {strategy}")
     
@@ -309,47 +419,159 @@ class PollingPool:
             await self._create_instances_from_task_group(task_group_ref)
         
         # 启动健康检查
-        asyncio.create_task(self.health_checker.start(self.instances))
+        self._health_check_task = asyncio.create_task(
+            self.health_checker.start(self.instances, self._on_health_checked)
+        )
         
         logger.info(f"轮询池 {self.name} 初始化完成，共 {len(self.instances)} 个实例")
     
     async def _create_instances_from_task_group(self, task_group_ref: str) -> None:
         """从任务组创建实例"""
         try:
+            group_name, echelon = self.task_group_manager.parse_group_reference(task_group_ref)
+            echelon_config = (
+                self.task_group_manager.get_echelon_config(group_name, echelon) if echelon else None
+            ) or {}
             models = self.task_group_manager.get_models_for_group(task_group_ref)
             
             for model_name in models:
-                # TODO: 这里应该根据模型名称创建实际的LLM客户端
-                # 暂时创建模拟实例
                 instance = LLMInstance(
                     instance_id=f"{task_group_ref}_{model_name}",
                     model_name=model_name,
-                    group_name=task_group_ref.split(".")[0],
-                    echelon=task_group_ref.split(".")[1] if "." in task_group_ref else "default",
-                    client=None
+                    group_name=group_name,
+                    echelon=echelon or "default",
+                    max_concurrency=echelon_config.get(
+                        "concurrency_limit", self.config.get("instance_max_concurrency", 10)
+                    ),
+                    weight=self.config.get("instance_weights", {}).get(model_name, 1.0),
+                    config=echelon_config
                 )
+                instance.client = self._create_client(instance)
                 self.instances.append(instance)
                 
         except Exception as e:
             logger.error(f"从任务组 {task_group_ref} 创建实例失败: {e}")
     
-    async def get_instance(self) -> Optional[LLMInstance]:
-        """获取可用实例"""
-        # 检查并发和速率限制
-        # 这里应该根据具体的并发级别进行检查
-        # 暂时简化实现
+    def _create_client(self, instance: LLMInstance) -> Optional[ILLMClient]:
+        """为实例创建LLM客户端，失败时返回None（调用时再重试创建）"""
+        if not self.client_factory:
+            return None
+        
+        try:
+            return self.client_factory.create_client(instance.model_name)
+        except Exception as e:
+            logger.warning(f"为实例 {instance.instance_id} 创建LLM客户端失败: {e}")
+            return None
+    
+    async def get_instance(self, timeout: Optional[float] = None) -> Optional[LLMInstance]:
+        """
+        获取可用实例
+        
+        由调度器选出实例后，再获取该模型的并发许可和轮询池的速率限制许可。
+        所有可用实例都满载时，在超时时间内排队等待实例释放。
+        
+        Args:
+            timeout: 等待实例和许可的超时时间（秒），默认取配置 acquire_timeout
+            
+        Returns:
+            获取到的实例；没有可用实例、等待或许可获取超时返回None
+        """
+        if timeout is None:
+            timeout = self.config.get("acquire_timeout", 30.0)
+        deadline = time.monotonic() + timeout
+        
+        selected_instance = await self._select_instance(deadline)
         
-        selected_instance = self.scheduler.select_instance(self.instances)
+        if not selected_instance:
+            if any(inst.is_available() for inst in self.instances):
+                self.stats["rejected_requests"] += 1
+            return None
         
-        if selected_instance:
-            selected_instance.current_load += 1
+        # 先占用实例的在途名额，避免等待许可期间被其他请求超额选中
+        selected_instance.current_load += 1
+        try:
+            acquired = await self.concurrency_manager.check_and_acquire(
+                ConcurrencyLevel.MODEL,
+                selected_instance.model_name,
+                max(0.0, deadline - time.monotonic())
+            )
+        except BaseException:
+            selected_instance.current_load -= 1
+            self._notify_capacity()
+            raise
+        
+        if not acquired:
+            selected_instance.current_load -= 1
+            self._notify_capacity()
+            self.stats["rejected_requests"] += 1
+            return None
         
         return selected_instance
     
+    async def _select_instance(self, deadline: float) -> Optional[LLMInstance]:
+        """
+        由调度器选择实例，可用实例都满载时排队等待释放
+        
+        Args:
+            deadline: 等待截止时间（time.monotonic）
+            
+        Returns:
+            选中的实例；没有可用实例或等待超时返回None
+        """
+        requeue = False
+        while True:
+            selected_instance = self.scheduler.select_instance(self.instances)
+            if selected_instance:
+                return selected_instance
+            
+            # 没有健康或降级的实例时等待无意义，立即返回
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not any(inst.is_available() for inst in self.instances):
+                return None
+            
+            waiter = asyncio.get_running_loop().create_future()
+            # 被唤醒后仍未选到实例的等待者回到队首，保持FIFO顺序
+            if requeue:
+                self._capacity_waiters.appendleft(waiter)
+            else:
+                self._capacity_waiters.append(waiter)
+            
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if waiter.done() and not waiter.cancelled():
+                    # 唤醒已送达但等待方已放弃，转交给下一个等待者
+                    self._notify_capacity()
+                else:
+                    try:
+                        self._capacity_waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                return None
+            
+            requeue = True
+    
+    def _notify_capacity(self) -> None:
+        """有实例空出名额时唤醒队首的等待者"""
+        while self._capacity_waiters:
+            waiter = self._capacity_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+    
+    def _on_health_checked(self, instance: LLMInstance) -> None:
+        """健康检查回调，实例恢复可接受请求时唤醒等待者"""
+        if instance.can_accept_request():
+            self._notify_capacity()
+    
     def release_instance(self, instance: LLMInstance) -> None:
         """释放实例"""
         if instance.current_load > 0:
             instance.current_load -= 1
+            self.concurrency_manager.release(ConcurrencyLevel.MODEL, instance.model_name)
+            self._notify_capacity()
     
     async def call_llm(self, prompt: str, **kwargs) -> Any:
         """调用LLM"""
@@ -358,11 +580,8 @@ class PollingPool:
         if not instance:
             raise LLMError("没有可用的LLM实例")
         
+        start_time = time.time()
         try:
-            start_time = time.time()
-            
-            # 调用LLM
-            # TODO: 实现实际的LLM调用
             result = await self._call_instance(instance, prompt, **kwargs)
             
             end_time = time.time()
@@ -385,18 +604,40 @@ class PollingPool:
             self.stats["total_requests"] += 1
             self.stats["failed_requests"] += 1
             
-            # 更新实例性能
-            instance.update_performance(0, False)
+            # 更新实例性能，连续失败达到阈值时立即摘除，等待健康检查恢复
+            instance.update_performance(time.time() - start_time, False)
+            if instance.consecutive_failures >= self.failure_threshold:
+                instance.status = InstanceStatus.FAILED
+                logger.warning(f"实例 {instance.instance_id} 连续失败 {instance.consecutive_failures} 次，暂停调度")
             
             raise e
         finally:
             self.release_instance(instance)
     
     async def _call_instance(self, instance: LLMInstance, prompt: str, **kwargs) -> Any:
-        """调用具体实例"""
-        # TODO: 实现实际的LLM调用逻辑
-        await asyncio.sleep(0.1)  # 模拟调用延迟
-        return f"模拟响应: {prompt[:50]}..."
+        """
+        调用具体实例
+        
+        Args:
+            instance: LLM实例
+            prompt: 提示词，未提供messages参数时转换为单条用户消息
+            **kwargs: messages、parameters及透传给客户端的其他参数
+            
+        Returns:
+            客户端的生成结果
+        """
+        if instance.client is None:
+            instance.client = self._create_client(instance)
+        if instance.client is None:
+            raise LLMError(f"实例 {instance.instance_id} 没有可用的LLM客户端")
+        
+        messages: Optional[Sequence[Any]] = kwargs.pop("messages", None)
+        if messages is None:
+            from src.infrastructure.messages.types import HumanMessage
+            messages = [HumanMessage(content=prompt)]
+        parameters = kwargs.pop("parameters", None)
+        
+        return await instance.client.generate(messages, parameters, **kwargs)
     
     def get_status(self) -> Dict[str, Any]:
         """获取轮询池状态"""
@@ -406,6 +647,16 @@ class PollingPool:
             "healthy_instances": len([inst for inst in self.instances if inst.status == InstanceStatus.HEALTHY]),
             "degraded_instances": len([inst for inst in self.instances if inst.status == InstanceStatus.DEGRADED]),
             "failed_instances": len([inst for inst in self.instances if inst.status == InstanceStatus.FAILED]),
+            "instances": {
+                inst.instance_id: {
+                    "status": inst.status.value,
+                    "current_load": inst.current_load,
+                    "max_concurrency": inst.max_concurrency,
+                    "ewma_response_time": inst.ewma_response_time,
+                    "consecutive_failures": inst.consecutive_failures
+                }
+                for inst in self.instances
+            },
             "stats": self.stats,
             "concurrency_status": self.concurrency_manager.get_status()
         }
@@ -413,25 +664,34 @@ class PollingPool:
     async def shutdown(self) -> None:
         """关闭轮询池"""
         self.health_checker.stop()
+        if self._health_check_task and not self._health_check_task.done():
+            self._health_check_task.cancel()
+            try:
+                await self._health_check_task
+            except asyncio.CancelledError:
+                pass
+        self._health_check_task = None
         logger.info(f"轮询池 {self.name} 已关闭")
 
 
 class PollingPoolManager(IPollingPoolManager):
     """轮询池管理器"""
     
-    def __init__(self, task_group_manager: TaskGroupManager):
+    def __init__(self, task_group_manager: TaskGroupManager, client_factory: Optional[IClientFactory] = None):
         """
         初始化轮询池管理器
         
         Args:
             task_group_manager: 任务组管理器
+            client_factory: LLM客户端工厂
         """
         self.task_group_manager = task_group_manager
+        self.client_factory = client_factory
         self.pools: Dict[str, PollingPool] = {}
     
     async def create_pool(self, name: str, config: Dict[str, Any]) -> PollingPool:
         """创建轮询池"""
-        pool = PollingPool(name, config, self.task_group_manager)
+        pool = PollingPool(name, config, self.task_group_manager, self.client_factory)
         await pool.initialize()
         self.pools[name] = pool
         return pool
@@ -113,6 +113,31 @@ class TokenCalculationDecorator:
         # 使用基础服务计算
         return self._base_service.calculate_messages_tokens(messages, model_type, model_name)
     
+    def calculate_messages_tokens_incremental(
+        self,
+        messages: Sequence[BaseMessage],
+        previous_count: int,
+        previous_total: int,
+        model_type: str,
+        model_name: str
+    ) -> int:
+        """
+        增量计算消息列表的token数量
+        
+        Args:
+            messages: 完整消息列表
+            previous_count: 上一次计算时的消息条数
+            previous_total: 上一次计算得到的token数量
+            model_type: 模型类型
+            model_name: 模型名称
+            
+        Returns:
+            int: token数量
+        """
+        return self._base_service.calculate_messages_tokens_incremental(
+            messages, previous_count, previous_total, model_type, model_name
+        )
+    
     def parse_token_usage_from_response(self, response: Dict[str, Any], model_type: str) -> Optional[TokenUsage]:
         """
         从API响应中解析token使用情况
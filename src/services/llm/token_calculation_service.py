@@ -64,6 +64,37 @@ class TokenCalculationService:
         result = calculator.count_messages_tokens(messages)
         return result if result is not None else 0
     
+    def calculate_messages_tokens_incremental(
+        self,
+        messages: Sequence["IBaseMessage"],
+        previous_count: int,
+        previous_total: int,
+        model_type: str,
+        model_name: str
+    ) -> int:
+        """
+        增量计算消息列表的token数量
+        
+        messages的前previous_count条与上一次计算时相同，其token总数为previous_total，
+        只对追加的后缀进行编码；计算器不支持增量计算时回退到全量计算。
+        
+        Args:
+            messages: 完整消息列表
+            previous_count: 上一次计算时的消息条数
+            previous_total: 上一次计算得到的token数量
+            model_type: 模型类型
+            model_name: 模型名称
+        
+        Returns:
+            int: token数量
+        """
+        calculator = self._factory.get_calculator(model_type, model_name)
+        if 0 <= previous_count <= len(messages) and hasattr(calculator, 'count_appended_messages_tokens'):
+            result = calculator.count_appended_messages_tokens(previous_total, messages[previous_count:])
+        else:
+            result = calculator.count_messages_tokens(messages)
+        return result if result is not None else 0
+    
     def parse_token_usage_from_response(self, response: Dict[str, Any], model_type: str) -> Optional[TokenUsage]:
         """
         从API响应中解析token使用情况
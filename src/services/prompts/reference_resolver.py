@@ -3,9 +3,11 @@
 提供更强大的提示词引用解析功能，支持多种引用格式和高级特性。
 """
 
+import os
 import re
 import asyncio
-from typing import Dict, List, Set, Optional, Any, Tuple, Union
+from collections import OrderedDict
+from typing import Awaitable, Dict, List, Set, Optional, Any, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 from src.interfaces.dependency_injection import get_logger
@@ -16,9 +18,14 @@ from src.interfaces.prompts.exceptions import (
     PromptNotFoundError,
     PromptCircularReferenceError
 )
+from .template_compiler import CompiledTemplate, SegmentType, TemplateCompiler, TemplateSegment, content_hash
 
 logger = get_logger(__name__)
 
+# 渲染循环中频繁比较的片段类型
+_LITERAL = SegmentType.LITERAL
+_VARIABLE = SegmentType.VARIABLE
+
 
 @dataclass
 class ReferenceConfig:
@@ -29,6 +36,8 @@ class ReferenceConfig:
     enable_template_variables: bool = True
     enable_file_references: bool = True
     prompts_directory: str = "configs/prompts"
+    template_cache_size: int = 256  # 编译后模板的缓存容量
+    file_cache_size: int = 128  # 被引用文件编译结果的缓存容量
 
 
 @dataclass
@@ -68,10 +77,23 @@ class PromptReferenceResolver:
         # 解析缓存
         self._resolution_cache: Dict[str, ResolvedReference] = {}
         
+        # 编译后的模板：按 (提示词ID, 内容哈希) 缓存
+        self._compiler = TemplateCompiler(
+            enable_conditional_references=self._config.enable_conditional_references,
+            enable_template_variables=self._config.enable_template_variables,
+            enable_file_references=self._config.enable_file_references
+        )
+        self._template_cache: "OrderedDict[Tuple[str, str], CompiledTemplate]" = OrderedDict()
+        self._template_cache_hits = 0
+        self._template_cache_misses = 0
+        
+        # 文件引用：按路径缓存编译结果，文件修改时间或大小变化时失效
+        self._file_cache: "OrderedDict[str, Tuple[Tuple[int, int], CompiledTemplate]]" = OrderedDict()
+        
         logger.debug("增强提示词引用解析器初始化完成")
     
     def _compile_patterns(self):
-        """编译正则表达式模式"""
+        """编译用于提取引用的正则表达式模式（解析渲染使用编译后的模板）"""
         # 基础引用模式
         self._reference_pattern = re.compile(
             r'\{\{\s*ref\s*:\s*([^}]+)\s*\}\}',
@@ -89,30 +111,6 @@ class PromptReferenceResolver:
             r'\{\{\s*var\s*:\s*([^}]+)\s*\}\}',
             re.IGNORECASE
         )
-        
-        # 环境变量模式
-        self._env_pattern = re.compile(
-            r'\{\{\s*env\s*:\s*([^}]+)\s*\}\}',
-            re.IGNORECASE
-        )
-        
-        # 配置引用模式
-        self._config_pattern = re.compile(
-            r'\{\{\s*config\s*:\s*([^}]+)\s*\}\}',
-            re.IGNORECASE
-        )
-        
-        # 条件引用模式
-        self._conditional_pattern = re.compile(
-            r'\{\{\s*if\s+ref\s*:\s*([^}]+)\s*\}\}(.*?)\{\{\s*endif\s*\}\}',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        # 循环模式
-        self._loop_pattern = re.compile(
-            r'\{\{\s*for\s+(\w+)\s+in\s+(\w+)\s*\}\}(.*?)\{\{\s*endfor\s*\}\}',
-            re.IGNORECASE | re.DOTALL
-        )
     
     async def resolve_references(
         self,
@@ -200,6 +198,20 @@ class PromptReferenceResolver:
         Returns:
             解析后的内容和依赖列表
         """
+        visited, depth = self._enter_scope(prompt_id, visited, depth)
+        
+        try:
+            template = self._get_compiled_template(prompt_id, content)
+            if template.is_literal:
+                return content, set()
+            return await self._render_segments(template.segments, context, visited, depth)
+            
+        except Exception as e:
+            logger.error(f"解析内容失败: {prompt_id}, 错误: {e}")
+            raise
+    
+    def _enter_scope(self, prompt_id: str, visited: Set[str], depth: int) -> Tuple[Set[str], int]:
+        """检查深度限制和循环引用，返回进入下一层后的已访问集合和深度"""
         # 检查深度限制
         if depth >= self._config.max_reference_depth:
             raise PromptReferenceError(
@@ -214,288 +226,279 @@ class PromptReferenceResolver:
         # 添加到已访问集合
         visited = visited.copy()
         visited.add(prompt_id)
-        depth += 1
+        return visited, depth + 1
+    
+    def _get_compiled_template(self, prompt_id: str, content: str) -> CompiledTemplate:
+        """获取编译后的模板，按提示词ID和内容哈希缓存"""
+        cache_key = (prompt_id, content_hash(content))
+        template = self._template_cache.get(cache_key)
+        if template is not None:
+            self._template_cache.move_to_end(cache_key)
+            self._template_cache_hits += 1
+            return template
+        
+        self._template_cache_misses += 1
+        template = self._compiler.compile(content)
+        self._template_cache[cache_key] = template
+        while len(self._template_cache) > self._config.template_cache_size:
+            self._template_cache.popitem(last=False)
+        return template
+    
+    async def _render_segments(
+        self,
+        segments: List[TemplateSegment],
+        context: Dict[str, Any],
+        visited: Set[str],
+        depth: int
+    ) -> Tuple[str, Set[str]]:
+        """单次遍历渲染模板片段
         
-        dependencies = set()
+        同步占位符就地替换；提示词引用、文件引用、条件块和循环块并发解析后回填。
+        """
+        parts: List[str] = []
+        append = parts.append
+        dependencies: Set[str] = set()
+        pending: List[Tuple[int, Awaitable[Tuple[str, Set[str]]]]] = []
+        
+        for segment in segments:
+            segment_type = segment.type
+            if segment_type is _LITERAL:
+                append(segment.value)
+            elif segment_type is _VARIABLE:
+                append(self._render_variable(segment, context))
+            elif segment_type is SegmentType.ENV:
+                append(self._render_environment_variable(segment))
+            elif segment_type is SegmentType.CONFIG:
+                append(self._render_config_reference(segment, context))
+            else:
+                if segment_type is SegmentType.REFERENCE:
+                    task = self._render_prompt_reference(segment, context, visited, depth)
+                elif segment_type is SegmentType.FILE:
+                    task = self._render_file_reference(segment, context, visited, depth)
+                elif segment_type is SegmentType.CONDITIONAL:
+                    task = self._render_conditional_reference(segment, context, visited, depth)
+                else:
+                    task = self._render_loop(segment, context, visited, depth)
+                pending.append((len(parts), task))
+                append("")
+        
+        if pending:
+            if len(pending) == 1:
+                # 只有一个异步片段时直接等待，省去创建任务的开销
+                results = [await pending[0][1]]
+            else:
+                results = await asyncio.gather(*(task for _, task in pending))
+            for (index, _), (text, deps) in zip(pending, results):
+                parts[index] = text
+                dependencies.update(deps)
+        
+        return "".join(parts), dependencies
+    
+    async def _render_prompt_reference(
+        self,
+        segment: TemplateSegment,
+        context: Dict[str, Any],
+        visited: Set[str],
+        depth: int
+    ) -> Tuple[str, Set[str]]:
+        """渲染提示词引用"""
+        ref_spec = segment.value
         
         try:
-            # 1. 解析条件引用
-            if self._config.enable_conditional_references:
-                content = await self._resolve_conditional_references(
-                    content, context, visited, depth
-                )
+            # 解析引用规范
+            ref_info = self._parse_reference_spec(ref_spec)
             
-            # 2. 解析循环
-            content = await self._resolve_loops(content, context)
+            # 获取引用的提示词
+            referenced_prompt = await self._registry.get(
+                ref_info["ref_id"],
+                ref_info.get("version")
+            )
             
-            # 3. 解析文件引用
-            if self._config.enable_file_references:
-                content, file_deps = await self._resolve_file_references(content, context)
-                dependencies.update(file_deps)
+            # 递归解析引用的提示词
+            resolved_content, ref_deps = await self._resolve_content(
+                referenced_prompt.content,
+                ref_info["ref_id"],
+                context,
+                visited,
+                depth
+            )
             
-            # 4. 解析环境变量
-            content = self._resolve_environment_variables(content)
+            return resolved_content, {ref_info["ref_id"], *ref_deps}
             
-            # 5. 解析配置引用
-            content = self._resolve_config_references(content, context)
+        except PromptNotFoundError:
+            logger.warning(f"引用的提示词未找到: {ref_spec}")
+            return segment.raw, set()
+        except Exception as e:
+            logger.warning(f"解析引用失败: {ref_spec}, 错误: {e}")
+            return segment.raw, set()
+    
+    async def _render_conditional_reference(
+        self,
+        segment: TemplateSegment,
+        context: Dict[str, Any],
+        visited: Set[str],
+        depth: int
+    ) -> Tuple[str, Set[str]]:
+        """渲染条件引用"""
+        ref_spec = segment.value
+        
+        try:
+            ref_info = self._parse_reference_spec(ref_spec)
             
-            # 6. 解析变量
-            if self._config.enable_template_variables:
-                content = self._resolve_variables(content, context)
+            # 检查引用的提示词是否存在
+            await self._registry.get(ref_info["ref_id"], ref_info.get("version"))
             
-            # 7. 解析提示词引用
-            content, ref_deps = await self._resolve_prompt_references(
-                content, context, visited, depth
+            # 引用存在，解析条件内容
+            conditional_visited, conditional_depth = self._enter_scope(
+                f"conditional:{ref_info['ref_id']}", visited, depth
+            )
+            resolved_content, _ = await self._render_segments(
+                segment.children, context, conditional_visited, conditional_depth
             )
-            dependencies.update(ref_deps)
             
-            return content, dependencies
+            return resolved_content, set()
             
+        except PromptNotFoundError:
+            # 引用不存在，返回空字符串
+            return "", set()
         except Exception as e:
-            logger.error(f"解析内容失败: {prompt_id}, 错误: {e}")
-            raise
+            logger.warning(f"解析条件引用失败: {ref_spec}, 错误: {e}")
+            return segment.raw, set()
     
-    async def _resolve_prompt_references(
+    async def _render_file_reference(
         self,
-        content: str,
+        segment: TemplateSegment,
         context: Dict[str, Any],
         visited: Set[str],
         depth: int
     ) -> Tuple[str, Set[str]]:
-        """解析提示词引用"""
-        dependencies = set()
+        """渲染文件引用"""
+        file_path = segment.value
         
-        async def replace_reference(match):
-            ref_spec = match.group(1).strip()
+        try:
+            # 被引用的文件与提示词一样计入深度，并检查文件之间的循环引用
+            file_visited, file_depth = self._enter_scope(f"file:{file_path}", visited, depth)
             
-            try:
-                # 解析引用规范
-                ref_info = self._parse_reference_spec(ref_spec)
-                
-                # 获取引用的提示词
-                referenced_prompt = await self._registry.get(
-                    ref_info["ref_id"],
-                    ref_info.get("version")
-                )
-                
-                # 递归解析引用的提示词
-                resolved_content, ref_deps = await self._resolve_content(
-                    referenced_prompt.content,
-                    ref_info["ref_id"],
-                    context,
-                    visited,
-                    depth
-                )
-                
-                dependencies.add(ref_info["ref_id"])
-                dependencies.update(ref_deps)
-                
-                return resolved_content
-                
-            except PromptNotFoundError:
-                logger.warning(f"引用的提示词未找到: {ref_spec}")
-                return match.group(0)
-            except Exception as e:
-                logger.warning(f"解析引用失败: {ref_spec}, 错误: {e}")
-                return match.group(0)
-        
-        # 替换所有引用
-        tasks = []
-        for match in self._reference_pattern.finditer(content):
-            tasks.append(replace_reference(match))
-        
-        if tasks:
-            replacements = await asyncio.gather(*tasks)
-            result = content
-            for i, match in enumerate(self._reference_pattern.finditer(content)):
-                result = result.replace(match.group(0), replacements[i], 1)
-            return result, dependencies
+            # 构建完整文件路径
+            full_path = Path(self._config.prompts_directory) / file_path
+            
+            template = await self._load_file_template(full_path)
+            if template is None:
+                logger.warning(f"引用的文件不存在: {full_path}")
+                return segment.raw, set()
+            
+            # 处理文件内容中的占位符
+            file_content, dependencies = await self._render_segments(
+                template.segments, context, file_visited, file_depth
+            )
+            
+            dependencies.add(f"file:{file_path}")
+            return file_content, dependencies
+            
+        except Exception as e:
+            logger.warning(f"解析文件引用失败: {file_path}, 错误: {e}")
+            return segment.raw, set()
+    
+    async def _load_file_template(self, full_path: Path) -> Optional[CompiledTemplate]:
+        """读取并编译被引用的文件，文件未变化时直接返回缓存的编译结果
         
-        return content, dependencies
+        Returns:
+            编译后的模板，文件不存在时返回None
+        """
+        cache_key = str(full_path)
+        try:
+            stat = full_path.stat()
+        except FileNotFoundError:
+            self._file_cache.pop(cache_key, None)
+            return None
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_cache.get(cache_key)
+        if cached is not None and cached[0] == signature:
+            self._file_cache.move_to_end(cache_key)
+            return cached[1]
+        
+        # 在线程中读取文件，避免阻塞事件循环
+        file_content = await asyncio.to_thread(full_path.read_text, encoding='utf-8')
+        template = self._compiler.compile(file_content)
+        self._file_cache[cache_key] = (signature, template)
+        self._file_cache.move_to_end(cache_key)
+        while len(self._file_cache) > self._config.file_cache_size:
+            self._file_cache.popitem(last=False)
+        return template
     
-    async def _resolve_conditional_references(
+    async def _render_loop(
         self,
-        content: str,
+        segment: TemplateSegment,
         context: Dict[str, Any],
         visited: Set[str],
         depth: int
-    ) -> str:
-        """解析条件引用"""
-        async def replace_conditional(match):
-            ref_spec = match.group(1).strip()
-            conditional_content = match.group(2)
-            
-            try:
-                ref_info = self._parse_reference_spec(ref_spec)
-                
-                # 检查引用的提示词是否存在
-                await self._registry.get(ref_info["ref_id"], ref_info.get("version"))
-                
-                # 引用存在，解析条件内容
-                resolved_content, _ = await self._resolve_content(
-                    conditional_content,
-                    f"conditional:{ref_info['ref_id']}",
-                    context,
-                    visited,
-                    depth
-                )
-                
-                return resolved_content
-                
-            except PromptNotFoundError:
-                # 引用不存在，返回空字符串
-                return ""
-            except Exception as e:
-                logger.warning(f"解析条件引用失败: {ref_spec}, 错误: {e}")
-                return match.group(0)
-        
-        # 替换所有条件引用
-        tasks = []
-        for match in self._conditional_pattern.finditer(content):
-            tasks.append(replace_conditional(match))
-        
-        if tasks:
-            replacements = await asyncio.gather(*tasks)
-            result = content
-            for i, match in enumerate(self._conditional_pattern.finditer(content)):
-                result = result.replace(match.group(0), replacements[i], 1)
-            return result
-        
-        return content
-    
-    async def _resolve_file_references(
-        self,
-        content: str,
-        context: Dict[str, Any]
     ) -> Tuple[str, Set[str]]:
-        """解析文件引用"""
-        dependencies = set()
+        """渲染循环"""
+        var_name = segment.loop_variable
+        collection_name = segment.value
         
-        async def replace_file(match):
-            file_path = match.group(1).strip()
+        try:
+            # 获取集合
+            collection = context.get(collection_name, [])
+            if not isinstance(collection, (list, tuple)):
+                logger.warning(f"循环集合不是列表类型: {collection_name}")
+                return segment.raw, set()
             
-            try:
-                # 构建完整文件路径
-                full_path = Path(self._config.prompts_directory) / file_path
-                
-                # 检查文件是否存在
-                if not full_path.exists():
-                    logger.warning(f"引用的文件不存在: {full_path}")
-                    return match.group(0)
+            # 生成循环内容
+            result_parts = []
+            dependencies: Set[str] = set()
+            for item in collection:
+                loop_context = context.copy()
+                loop_context[var_name] = item
                 
-                # 读取文件内容
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    file_content = f.read()
-                
-                # 处理文件内容中的变量
-                if self._config.enable_template_variables:
-                    file_content = self._resolve_variables(file_content, context)
-                
-                dependencies.add(f"file:{file_path}")
-                return file_content
-                
-            except Exception as e:
-                logger.warning(f"解析文件引用失败: {file_path}, 错误: {e}")
-                return match.group(0)
-        
-        # 替换所有文件引用
-        tasks = []
-        for match in self._file_pattern.finditer(content):
-            tasks.append(replace_file(match))
-        
-        if tasks:
-            replacements = await asyncio.gather(*tasks)
-            result = content
-            for i, match in enumerate(self._file_pattern.finditer(content)):
-                result = result.replace(match.group(0), replacements[i], 1)
-            return result, dependencies
-        
-        return content, dependencies
-    
-    async def _resolve_loops(self, content: str, context: Dict[str, Any]) -> str:
-        """解析循环"""
-        def replace_loop(match):
-            var_name = match.group(1)
-            collection_name = match.group(2)
-            loop_content = match.group(3)
+                processed_content, item_deps = await self._render_segments(
+                    segment.children, loop_context, visited, depth
+                )
+                result_parts.append(processed_content)
+                dependencies.update(item_deps)
             
-            try:
-                # 获取集合
-                collection = context.get(collection_name, [])
-                if not isinstance(collection, (list, tuple)):
-                    logger.warning(f"循环集合不是列表类型: {collection_name}")
-                    return match.group(0)
-                
-                # 生成循环内容
-                result_parts = []
-                for item in collection:
-                    loop_context = context.copy()
-                    loop_context[var_name] = item
-                    
-                    # 处理循环内容中的变量
-                    processed_content = self._resolve_variables(loop_content, loop_context)
-                    result_parts.append(processed_content)
-                
-                return "\n".join(result_parts)
-                
-            except Exception as e:
-                logger.warning(f"解析循环失败: {var_name} in {collection_name}, 错误: {e}")
-                return match.group(0)
-        
-        # 替换所有循环
-        result = content
-        for match in self._loop_pattern.finditer(content):
-            result = result.replace(match.group(0), replace_loop(match), 1)
-        
-        return result
+            return "\n".join(result_parts), dependencies
+            
+        except Exception as e:
+            logger.warning(f"解析循环失败: {var_name} in {collection_name}, 错误: {e}")
+            return segment.raw, set()
     
-    def _resolve_environment_variables(self, content: str) -> str:
-        """解析环境变量"""
-        import os
-        
-        def replace_env(match):
-            env_name = match.group(1).strip()
-            return os.getenv(env_name, "")
-        
-        return self._env_pattern.sub(replace_env, content)
+    def _render_environment_variable(self, segment: TemplateSegment) -> str:
+        """渲染环境变量"""
+        return os.getenv(segment.value, "")
     
-    def _resolve_config_references(self, content: str, context: Dict[str, Any]) -> str:
-        """解析配置引用"""
-        def replace_config(match):
-            config_path = match.group(1).strip()
-            
-            try:
-                # 从上下文中获取配置值
-                keys = config_path.split('.')
-                value = context
-                
-                for key in keys:
-                    if isinstance(value, dict) and key in value:
-                        value = value[key]
-                    else:
-                        logger.warning(f"配置路径不存在: {config_path}")
-                        return match.group(0)
-                
-                return str(value) if value is not None else ""
-                
-            except Exception as e:
-                logger.warning(f"解析配置引用失败: {config_path}, 错误: {e}")
-                return match.group(0)
+    def _render_config_reference(self, segment: TemplateSegment, context: Dict[str, Any]) -> str:
+        """渲染配置引用"""
+        config_path = segment.value
         
-        return self._config_pattern.sub(replace_config, content)
-    
-    def _resolve_variables(self, content: str, context: Dict[str, Any]) -> str:
-        """解析变量"""
-        def replace_variable(match):
-            var_name = match.group(1).strip()
+        try:
+            # 从上下文中获取配置值
+            keys = config_path.split('.')
+            value = context
+            
+            for key in keys:
+                if isinstance(value, dict) and key in value:
+                    value = value[key]
+                else:
+                    logger.warning(f"配置路径不存在: {config_path}")
+                    return segment.raw
             
-            if var_name in context:
-                value = context[var_name]
-                return str(value) if value is not None else ""
+            return str(value) if value is not None else ""
             
-            return match.group(0)
+        except Exception as e:
+            logger.warning(f"解析配置引用失败: {config_path}, 错误: {e}")
+            return segment.raw
+    
+    def _render_variable(self, segment: TemplateSegment, context: Dict[str, Any]) -> str:
+        """渲染变量"""
+        var_name = segment.value
+        
+        if var_name in context:
+            value = context[var_name]
+            return str(value) if value is not None else ""
         
-        return self._variable_pattern.sub(replace_variable, content)
+        return segment.raw
     
     def _parse_reference_spec(self, spec: str) -> Dict[str, Any]:
         """解析引用规范"""
@@ -652,12 +655,18 @@ class PromptReferenceResolver:
     def clear_cache(self) -> None:
         """清理解析缓存"""
         self._resolution_cache.clear()
+        self._template_cache.clear()
+        self._file_cache.clear()
         logger.debug("引用解析缓存已清理")
     
     def get_cache_statistics(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         return {
             "cache_size": len(self._resolution_cache),
+            "template_cache_size": len(self._template_cache),
+            "template_cache_hits": self._template_cache_hits,
+            "template_cache_misses": self._template_cache_misses,
+            "file_cache_size": len(self._file_cache),
             "max_reference_depth": self._config.max_reference_depth,
             "enable_reference_resolution": self._config.enable_reference_resolution,
             "enable_conditional_references": self._config.enable_conditional_references,
@@ -0,0 +1,188 @@
+"""提示词模板编译器
+
+把提示词内容一次性解析为由字面片段和类型化占位符组成的编译结果，
+供引用解析器单次遍历渲染，避免每次解析都对全文重复执行多轮正则替换。
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Optional, Tuple
+
+
+class SegmentType(Enum):
+    """模板片段类型"""
+    LITERAL = "literal"          # 字面文本
+    REFERENCE = "ref"            # 提示词引用 {{ref:prompt_id}}
+    FILE = "file"                # 文件引用 {{file:path}}
+    VARIABLE = "var"             # 变量引用 {{var:name}}
+    ENV = "env"                  # 环境变量 {{env:NAME}}
+    CONFIG = "config"            # 配置引用 {{config:a.b}}
+    CONDITIONAL = "conditional"  # 条件引用 {{if ref:prompt_id}}...{{endif}}
+    LOOP = "loop"                # 循环 {{for item in items}}...{{endfor}}
+
+
+@dataclass
+class TemplateSegment:
+    """模板片段"""
+    type: SegmentType
+    value: str  # 字面文本、占位符参数、条件引用规范或循环集合名
+    raw: str = ""  # 原始占位符文本，无法解析时原样输出
+    loop_variable: str = ""  # 循环变量名
+    children: List["TemplateSegment"] = field(default_factory=list)  # 条件/循环块的内容
+
+
+@dataclass
+class CompiledTemplate:
+    """编译后的模板"""
+    segments: List[TemplateSegment]
+    content_hash: str
+    is_literal: bool = False  # 是否不含任何占位符（可直接返回原内容）
+
+
+# 所有模板标记的统一扫描模式
+_TAG_PATTERN = re.compile(
+    r'\{\{\s*(?:'
+    r'if\s+ref\s*:\s*(?P<if_ref>[^}]+?)'
+    r'|(?P<endif>endif)'
+    r'|for\s+(?P<loop_variable>\w+)\s+in\s+(?P<loop_collection>\w+)'
+    r'|(?P<endfor>endfor)'
+    r'|(?P<kind>ref|file|var|env|config)\s*:\s*(?P<argument>[^}]+?)'
+    r')\s*\}\}',
+    re.IGNORECASE
+)
+
+_PLACEHOLDER_TYPES = {
+    "ref": SegmentType.REFERENCE,
+    "file": SegmentType.FILE,
+    "var": SegmentType.VARIABLE,
+    "env": SegmentType.ENV,
+    "config": SegmentType.CONFIG,
+}
+
+
+def content_hash(content: str) -> str:
+    """计算模板内容的哈希值"""
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+class TemplateCompiler:
+    """提示词模板编译器
+    
+    条件块和循环块按嵌套关系配对；未配对的块标记以及被禁用的标记保留为字面文本。
+    """
+    
+    def __init__(
+        self,
+        enable_conditional_references: bool = True,
+        enable_template_variables: bool = True,
+        enable_file_references: bool = True
+    ):
+        self._enable_conditionals = enable_conditional_references
+        self._enable_variables = enable_template_variables
+        self._enable_files = enable_file_references
+    
+    def compile(self, content: str) -> CompiledTemplate:
+        """编译模板内容
+        
+        Args:
+            content: 模板内容
+        
+        Returns:
+            编译后的模板
+        """
+        root: List[TemplateSegment] = []
+        current = root
+        # 打开的块：(块片段, 父片段列表, 起始位置, 打开标记文本)
+        stack: List[Tuple[TemplateSegment, List[TemplateSegment], int, str]] = []
+        position = 0
+        
+        for match in _TAG_PATTERN.finditer(content):
+            if match.start() > position:
+                self._append_literal(current, content[position:match.start()])
+            position = match.end()
+            tag = match.group(0)
+            
+            block = self._open_block(match)
+            if block is not None:
+                stack.append((block, current, match.start(), tag))
+                current = block.children
+                continue
+            
+            end_type = self._end_block_type(match)
+            if end_type is not None:
+                if stack and stack[-1][0].type is end_type:
+                    block, parent, start, _ = stack.pop()
+                    block.raw = content[start:match.end()]
+                    parent.append(block)
+                    current = parent
+                else:
+                    self._append_literal(current, tag)
+                continue
+            
+            placeholder = self._placeholder(match)
+            if placeholder is not None:
+                current.append(placeholder)
+            else:
+                self._append_literal(current, tag)
+        
+        if position < len(content):
+            self._append_literal(current, content[position:])
+        
+        # 未闭合的块退化为字面打开标记加其内容
+        while stack:
+            block, parent, _, open_tag = stack.pop()
+            self._append_literal(parent, open_tag)
+            for child in block.children:
+                if child.type is SegmentType.LITERAL:
+                    self._append_literal(parent, child.value)
+                else:
+                    parent.append(child)
+        
+        return CompiledTemplate(
+            segments=root,
+            content_hash=content_hash(content),
+            is_literal=all(segment.type is SegmentType.LITERAL for segment in root)
+        )
+    
+    def _open_block(self, match: re.Match) -> Optional[TemplateSegment]:
+        """识别条件块或循环块的打开标记"""
+        if match.group("if_ref") is not None and self._enable_conditionals:
+            return TemplateSegment(type=SegmentType.CONDITIONAL, value=match.group("if_ref").strip())
+        if match.group("loop_variable") is not None:
+            return TemplateSegment(
+                type=SegmentType.LOOP,
+                value=match.group("loop_collection"),
+                loop_variable=match.group("loop_variable")
+            )
+        return None
+    
+    def _end_block_type(self, match: re.Match) -> Optional[SegmentType]:
+        """识别块的结束标记"""
+        if match.group("endif") is not None and self._enable_conditionals:
+            return SegmentType.CONDITIONAL
+        if match.group("endfor") is not None:
+            return SegmentType.LOOP
+        return None
+    
+    def _placeholder(self, match: re.Match) -> Optional[TemplateSegment]:
+        """识别占位符标记，被禁用的类型返回None"""
+        kind = match.group("kind")
+        if kind is None:
+            return None
+        
+        segment_type = _PLACEHOLDER_TYPES[kind.lower()]
+        if segment_type is SegmentType.FILE and not self._enable_files:
+            return None
+        if segment_type is SegmentType.VARIABLE and not self._enable_variables:
+            return None
+        return TemplateSegment(type=segment_type, value=match.group("argument").strip(), raw=match.group(0))
+    
+    @staticmethod
+    def _append_literal(segments: List[TemplateSegment], text: str) -> None:
+        """追加字面文本，与相邻的字面片段合并"""
+        if segments and segments[-1].type is SegmentType.LITERAL:
+            segments[-1].value += text
+        else:
+            segments.append(TemplateSegment(type=SegmentType.LITERAL, value=text))
@@ -358,6 +358,7 @@ class StorageMigrationService(IStorageMigration):
             # 分批处理
             for i in range(0, len(history_entries), batch_size):
                 batch = history_entries[i:i + batch_size]
+                entry_dicts: List[Dict[str, Any]] = []
                 
                 for entry_data in batch:
                     try:
@@ -368,27 +369,16 @@ class StorageMigrationService(IStorageMigration):
                         # 转换数据格式
                         converted_entry = self._convert_history_entry(entry_data)
                         
-                        # 生成存储键
-                        entry_key = entry_data.get("history_id", f"history_{task.processed_items}")
-                        
-                        # 保存到目标适配器 - 转换为字典格式
+                        # 转换为字典格式，整批写入目标适配器
                         entry_dict = converted_entry.to_dict() if hasattr(converted_entry, 'to_dict') else entry_data
-                        try:
-                            returned_id = await task.target_backend.save(entry_dict)
-                            success = bool(returned_id)
-                        except Exception as e:
-                            logger.error(f"Failed to save entry to target backend: {e}")
-                            success = False
-                        
-                        if success:
-                            task.processed_items += 1
-                        else:
-                            task.failed_items += 1
+                        entry_dicts.append(entry_dict)
                         
                     except Exception as e:
                         logger.error(f"Failed to migrate history entry: {e}")
                         task.failed_items += 1
                 
+                await self._save_batch(task, entry_dicts)
+                
                 # 更新进度
                 task.progress = (task.processed_items + task.failed_items) / task.total_items * 100
                 
@@ -426,6 +416,7 @@ class StorageMigrationService(IStorageMigration):
             # 分批处理
             for i in range(0, len(snapshots), batch_size):
                 batch = snapshots[i:i + batch_size]
+                snapshot_dicts: List[Dict[str, Any]] = []
                 
                 for snapshot_data in batch:
                     try:
@@ -436,27 +427,16 @@ class StorageMigrationService(IStorageMigration):
                         # 转换数据格式
                         converted_snapshot = self._convert_snapshot(snapshot_data)
                         
-                        # 生成存储键
-                        snapshot_key = snapshot_data.get("snapshot_id", f"snapshot_{task.processed_items}")
-                        
-                        # 保存到目标适配器 - 转换为字典格式
+                        # 转换为字典格式，整批写入目标适配器
                         snapshot_dict = converted_snapshot.to_dict() if hasattr(converted_snapshot, 'to_dict') else snapshot_data
-                        try:
-                            returned_id = await task.target_backend.save(snapshot_dict)
-                            success = bool(returned_id)
-                        except Exception as e:
-                            logger.error(f"Failed to save snapshot to target backend: {e}")
-                            success = False
-                        
-                        if success:
-                            task.processed_items += 1
-                        else:
-                            task.failed_items += 1
+                        snapshot_dicts.append(snapshot_dict)
                         
                     except Exception as e:
                         logger.error(f"Failed to migrate snapshot: {e}")
                         task.failed_items += 1
                 
+                await self._save_batch(task, snapshot_dicts)
+                
                 # 更新进度
                 task.progress = (task.processed_items + task.failed_items) / task.total_items * 100
                 
@@ -471,6 +451,41 @@ class StorageMigrationService(IStorageMigration):
             logger.error(f"Failed to migrate snapshots: {e}")
             raise
     
+    async def _save_batch(self, task: MigrationTask, items: List[Dict[str, Any]]) -> None:
+        """将一批数据写入目标适配器并更新任务计数
+        
+        优先使用目标适配器的批量写入（单事务）；批量写入失败时逐条重试，
+        以便准确统计成功和失败的条目。
+        
+        Args:
+            task: 迁移任务
+            items: 待写入的数据列表
+        """
+        if not items:
+            return
+        
+        try:
+            returned_ids = await task.target_backend.batch_save(items)
+            succeeded = sum(1 for returned_id in returned_ids if returned_id)
+            task.processed_items += succeeded
+            task.failed_items += len(items) - succeeded
+            return
+        except Exception as e:
+            logger.warning(f"Batch save to target backend failed, retrying item by item: {e}")
+        
+        for item in items:
+            try:
+                returned_id = await task.target_backend.save(item)
+                success = bool(returned_id)
+            except Exception as e:
+                logger.error(f"Failed to save item to target backend: {e}")
+                success = False
+            
+            if success:
+                task.processed_items += 1
+            else:
+                task.failed_items += 1
+    
     def _validate_history_entry(self, entry_data: Dict[str, Any]) -> None:
         """验证历史记录条目
         
@@ -0,0 +1,183 @@
+"""历史数据访问对象测试
+
+测试基于偏移量索引的分页、时间范围与记录类型过滤，以及索引的增量补齐和重建。
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.adapters.api.data_access.history_dao import HistoryDAO
+from src.adapters.api.data_access.history_index import SessionHistoryIndex
+
+START = datetime(2026, 1, 1)
+RECORD_TYPES = ["message", "tool_call", "error"]
+
+
+@pytest.fixture
+def records():
+    rng = random.Random(7)
+    return [
+        {
+            "record_type": rng.choice(RECORD_TYPES),
+            "timestamp": (START + timedelta(seconds=i)).isoformat(),
+            "index": i,
+        }
+        for i in range(500)
+    ]
+
+
+@pytest.fixture(params=[None, 1], ids=["read", "mmap"])
+def dao(request, tmp_path, records):
+    dao = HistoryDAO(tmp_path, mmap_threshold=request.param)
+    for record in records:
+        assert dao.store_record("session", record)
+    return dao
+
+
+def _expected(records, start_time=None, end_time=None, record_types=None, limit=1000, offset=0):
+    selected = [
+        record for record in records
+        if (start_time is None or datetime.fromisoformat(record["timestamp"]) >= start_time)
+        and (end_time is None or datetime.fromisoformat(record["timestamp"]) <= end_time)
+        and (not record_types or record["record_type"] in record_types)
+    ]
+    return selected[offset:offset + limit]
+
+
+class TestHistoryDAO:
+    """历史数据访问对象测试类"""
+    
+    def test_pagination(self, dao, records):
+        """测试按偏移量分页"""
+        assert dao.get_session_records("session", limit=20, offset=470) == records[470:490]
+        assert dao.get_session_records("session", limit=20, offset=495) == records[495:]
+        assert dao.get_session_records("session", offset=600) == []
+    
+    @pytest.mark.parametrize("query", [
+        {"start_time": START + timedelta(seconds=100), "end_time": START + timedelta(seconds=150)},
+        {"start_time": START + timedelta(seconds=100), "limit": 10, "offset": 5},
+        {"record_types": ["error"], "limit": 15, "offset": 20},
+        {"end_time": START + timedelta(seconds=300), "record_types": ["message", "tool_call"], "offset": 100},
+    ])
+    def test_filters(self, dao, records, query):
+        """测试时间范围和记录类型过滤后再分页"""
+        assert dao.get_session_records("session", **query) == _expected(records, **query)
+    
+    def test_index_catches_up_with_external_writes(self, tmp_path):
+        """测试没有索引的旧文件、外部追加和乱序时间戳"""
+        dao = HistoryDAO(tmp_path)
+        session_file = dao._get_session_file("legacy")
+        lines = [
+            json.dumps({"record_type": "message", "timestamp": "2026-01-01T00:00:05"}),
+            "",
+            "not json",
+            json.dumps({"record_type": "message", "timestamp": "2026-01-01T00:00:01"}),
+        ]
+        session_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        
+        assert len(dao.get_session_records("legacy")) == 2
+        
+        with open(session_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"record_type": "error", "timestamp": "2026-01-01T00:00:09"}) + "\n")
+        dao.store_record("legacy", {"record_type": "tool_call", "timestamp": "2026-01-01T00:00:10"})
+        
+        records = dao.get_session_records("legacy", start_time=datetime(2026, 1, 1, 0, 0, 3))
+        assert [record["record_type"] for record in records] == ["message", "error", "tool_call"]
+    
+    def test_tail_line_without_newline_is_indexed(self, tmp_path):
+        """测试缺少结尾换行的旧文件末行被索引，之后追加的记录不会与其连成一行"""
+        dao = HistoryDAO(tmp_path)
+        session_file = dao._get_session_file("legacy")
+        session_file.write_bytes(b'{"i":0}\n{"i":1}')
+        
+        assert dao.get_session_records("legacy") == [{"i": 0}, {"i": 1}]
+        
+        dao.store_record("legacy", {"i": 2})
+        
+        assert dao.get_session_records("legacy") == [{"i": 0}, {"i": 1}, {"i": 2}]
+        assert session_file.read_bytes().count(b"\n") == 3
+    
+    def test_incomplete_tail_line_waits_for_writer(self, tmp_path):
+        """测试末尾写了一半的行暂不索引，写完后补齐"""
+        dao = HistoryDAO(tmp_path)
+        session_file = dao._get_session_file("partial")
+        session_file.write_bytes(b'{"i":0}\n{"i":')
+        
+        assert dao.get_session_records("partial") == [{"i": 0}]
+        
+        with open(session_file, "ab") as f:
+            f.write(b'1}\n')
+        
+        assert dao.get_session_records("partial") == [{"i": 0}, {"i": 1}]
+    
+    def test_open_view_closes_file_on_invalid_header(self, tmp_path, monkeypatch):
+        """测试索引文件头无效时关闭已打开的文件"""
+        index = SessionHistoryIndex(tmp_path / "broken.jsonl")
+        index.index_file.write_bytes(b"XXXX" + bytes(12))
+        opened = []
+        real_open = open
+        
+        def tracking_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            opened.append(f)
+            return f
+        
+        monkeypatch.setattr("builtins.open", tracking_open)
+        with pytest.raises(ValueError):
+            with index.open_view():
+                pass
+        
+        assert opened and all(f.closed for f in opened)
+    
+    def test_cleanup_rebuilds_index(self, dao, records):
+        """测试清理旧记录后索引失效并重建"""
+        cleaned = dao.cleanup_old_records(START + timedelta(seconds=400))
+        
+        assert cleaned == 400
+        assert dao.get_session_records("session", limit=10) == records[400:410]
+
+
+class TestHistoryDAOScanFallback:
+    """索引不可用时逐行扫描的测试类"""
+    
+    @pytest.fixture
+    def scan_dao(self, dao, monkeypatch):
+        def broken_index(session_file):
+            raise OSError("index unavailable")
+        
+        monkeypatch.setattr(dao, "_get_index", broken_index)
+        return dao
+    
+    @pytest.mark.parametrize("query", [
+        {"limit": 20, "offset": 470},
+        {"limit": 20, "offset": 495},
+        {"offset": 600},
+        {"start_time": START + timedelta(seconds=100), "end_time": START + timedelta(seconds=150)},
+        {"start_time": START + timedelta(seconds=100), "limit": 10, "offset": 5},
+        {"record_types": ["error"], "limit": 15, "offset": 20},
+        {"end_time": START + timedelta(seconds=300), "record_types": ["message", "tool_call"], "offset": 100},
+    ])
+    def test_matches_index_path(self, scan_dao, records, query):
+        """测试逐行扫描先过滤再分页，结果与索引路径一致"""
+        assert scan_dao.get_session_records("session", **query) == _expected(records, **query)
+    
+    def test_skips_unparsable_timestamps(self, tmp_path, monkeypatch):
+        """测试按时间过滤时跳过时间戳缺失或无法解析的记录"""
+        dao = HistoryDAO(tmp_path)
+        monkeypatch.setattr(dao, "_get_index", lambda session_file: 1 / 0)
+        session_file = dao._get_session_file("legacy")
+        lines = [
+            json.dumps({"index": 0, "timestamp": "2026-01-01T00:00:05"}),
+            json.dumps({"index": 1, "timestamp": "yesterday"}),
+            json.dumps({"index": 2}),
+            json.dumps({"index": 3, "timestamp": "2026-01-01T00:00:07"}),
+        ]
+        session_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        
+        records = dao.get_session_records("legacy", start_time=datetime(2026, 1, 1), offset=1)
+        
+        assert [record["index"] for record in records] == [3]
+        assert len(dao.get_session_records("legacy")) == 4
@@ -0,0 +1,81 @@
+"""基础存储混入类单元测试
+
+测试批量保存通过提供者的 bulk_save 整批写入。
+"""
+
+import pytest
+
+from src.adapters.storage.backends.core.exceptions import StorageBackendError
+from src.adapters.storage.backends.core.mixins.session_mixin import SessionStorageMixin
+from src.adapters.storage.backends.providers.memory_provider import MemoryProvider
+
+
+class RecordingProvider(MemoryProvider):
+    """记录 save 与 bulk_save 调用次数的内存提供者"""
+
+    def __init__(self, **config):
+        super().__init__(**config)
+        self.save_calls = 0
+        self.bulk_calls = []
+
+    async def save(self, table, data):
+        self.save_calls += 1
+        return await super().save(table, data)
+
+    async def bulk_save(self, table, data_list, atomic=False):
+        self.bulk_calls.append((table, len(data_list), atomic))
+        return await super().bulk_save(table, data_list, atomic)
+
+
+class TestBaseStorageMixinBatchSave:
+    """测试基础存储混入类的批量保存"""
+
+    @pytest.mark.asyncio
+    async def test_batch_save_uses_bulk_save(self):
+        """测试批量保存只调用一次 bulk_save，不逐行保存"""
+        provider = RecordingProvider()
+        mixin = SessionStorageMixin(provider)
+
+        ids = await mixin.batch_save([
+            {"id": f"s-{index}", "status": "active"} for index in range(5)
+        ])
+
+        assert ids == [f"s-{index}" for index in range(5)]
+        assert provider.bulk_calls == [("sessions", 5, True)]
+        assert provider.save_calls == 0
+        assert (await mixin.load("s-3"))["status"] == "active"
+
+    @pytest.mark.asyncio
+    async def test_invalid_item_writes_nothing(self):
+        """测试任一条数据校验失败时整批不写入"""
+        provider = RecordingProvider()
+        mixin = SessionStorageMixin(provider)
+
+        with pytest.raises(StorageBackendError):
+            await mixin.batch_save([
+                {"id": "s-0", "status": "active"},
+                {"id": "s-1", "status": "unknown"},
+            ])
+
+        assert provider.bulk_calls == []
+        assert await mixin.load("s-0") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_bulk_save_raises(self):
+        """测试提供者整批写入失败时抛出异常且不留下部分数据"""
+        provider = RecordingProvider(max_memory_usage=1)
+        mixin = SessionStorageMixin(provider)
+
+        with pytest.raises(StorageBackendError):
+            await mixin.batch_save([{"id": "s-0", "status": "active"}])
+
+        assert await mixin.load("s-0") is None
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        """测试空列表不访问提供者"""
+        provider = RecordingProvider()
+        mixin = SessionStorageMixin(provider)
+
+        assert await mixin.batch_save([]) == []
+        assert provider.bulk_calls == []
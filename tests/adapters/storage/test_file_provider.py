@@ -0,0 +1,102 @@
+"""文件存储提供者单元测试
+
+测试批量写入与单条操作共用文件锁，以及原子批量写入在替换失败时的回滚。
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from src.adapters.storage.backends.providers import file_provider as file_provider_module
+from src.adapters.storage.backends.providers.file_provider import FileProvider
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestFileProviderBulkSave:
+    """测试文件提供者的批量写入"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_save_waits_for_file_lock(self, tmp_path):
+        """测试批量写入等待目标文件的文件锁"""
+        provider = FileProvider(base_path=str(tmp_path))
+        lock = provider._get_file_lock(provider._get_file_path("items", "b"))
+
+        async with lock:
+            task = asyncio.ensure_future(
+                provider.bulk_save("items", [{"id": "a"}, {"id": "b"}], atomic=True)
+            )
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            assert not (tmp_path / "items" / "a.json").exists()
+
+        results = await task
+        assert [result["success"] for result in results] == [True, True]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_batches_do_not_deadlock(self, tmp_path):
+        """测试按路径排序加锁，键顺序相反的并发批次不会死锁"""
+        provider = FileProvider(base_path=str(tmp_path))
+        forward = [{"id": f"k{index}", "v": 1} for index in range(5)]
+        backward = [{"id": f"k{index}", "v": 2} for index in reversed(range(5))]
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                provider.bulk_save("items", forward, atomic=True),
+                provider.bulk_save("items", backward, atomic=True),
+            ),
+            timeout=5,
+        )
+
+        assert all(result["success"] for batch in results for result in batch)
+        values = {_read(tmp_path / "items" / f"k{index}.json")["v"] for index in range(5)}
+        assert len(values) == 1
+
+    @pytest.mark.asyncio
+    async def test_atomic_replace_failure_rolls_back(self, tmp_path, monkeypatch):
+        """测试原子模式替换阶段失败时恢复已替换的文件"""
+        provider = FileProvider(base_path=str(tmp_path))
+        await provider.bulk_save("items", [{"id": "a", "v": "old"}])
+
+        original_replace = os.replace
+
+        def failing_replace(src, dst):
+            if str(dst).endswith("c.json"):
+                raise OSError("disk full")
+            return original_replace(src, dst)
+
+        monkeypatch.setattr(file_provider_module.os, "replace", failing_replace)
+        results = await provider.bulk_save(
+            "items",
+            [{"id": "a", "v": "new"}, {"id": "b", "v": "new"}, {"id": "c", "v": "new"}],
+            atomic=True,
+        )
+        monkeypatch.setattr(file_provider_module.os, "replace", original_replace)
+
+        assert [result["success"] for result in results] == [False, False, False]
+        assert "disk full" in results[0]["error"]
+        assert _read(tmp_path / "items" / "a.json") == {"id": "a", "v": "old"}
+        assert sorted(os.listdir(tmp_path / "items")) == ["a.json"]
+
+    @pytest.mark.asyncio
+    async def test_non_atomic_replace_failure_is_per_record(self, tmp_path, monkeypatch):
+        """测试非原子模式替换失败只影响对应记录"""
+        provider = FileProvider(base_path=str(tmp_path))
+        original_replace = os.replace
+
+        def failing_replace(src, dst):
+            if str(dst).endswith("b.json"):
+                raise OSError("disk full")
+            return original_replace(src, dst)
+
+        monkeypatch.setattr(file_provider_module.os, "replace", failing_replace)
+        results = await provider.bulk_save("items", [{"id": "a"}, {"id": "b"}])
+        monkeypatch.setattr(file_provider_module.os, "replace", original_replace)
+
+        assert [result["success"] for result in results] == [True, False]
+        assert sorted(os.listdir(tmp_path / "items")) == ["a.json"]
@@ -0,0 +1,163 @@
+"""内存存储大小估算测试
+
+测试递归估算器在典型对象上的结果、采样外推和深度上限，以及内存提供者基于估算值的用量记账。
+"""
+
+import sys
+
+import pytest
+
+from src.adapters.storage.backends.providers.memory_provider import MemoryProvider
+from src.adapters.storage.backends.core.exceptions import ProviderError
+from src.adapters.storage.utils.memory_utils import (
+    PickleSizeEstimator,
+    RecursiveSizeEstimator,
+    create_size_estimator,
+)
+from src.interfaces.storage.exceptions import StorageError
+
+
+def _exact_size(value):
+    """不采样、不限深度的参考实现"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(_exact_size(k) + _exact_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(_exact_size(item) for item in value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return size + _exact_size(vars(value))
+    return size
+
+
+class _Message:
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+
+
+def _conversation_state(turns):
+    return {
+        "id": "session-1",
+        "messages": [
+            {"role": "user" if i % 2 else "assistant", "content": f"message {i} " * 20, "tokens": 40 + i}
+            for i in range(turns)
+        ],
+        "metadata": {"model": "gpt", "temperature": 0.7, "tags": ["a", "b"]},
+        "step": turns,
+    }
+
+
+class TestRecursiveSizeEstimator:
+    """测试递归大小估算"""
+
+    @pytest.mark.parametrize("value", [42, 3.14, True, "text", "中文内容" * 10, b"bytes", None])
+    def test_scalars_use_getsizeof(self, value):
+        """测试标量直接使用 sys.getsizeof"""
+        assert RecursiveSizeEstimator().estimate(value) == sys.getsizeof(value)
+
+    @pytest.mark.parametrize("value", [
+        {},
+        [],
+        {"id": "a", "count": 3, "ratio": 0.5},
+        {"nested": {"list": [1, 2, 3], "tuple": ("x", "y")}, "set": {1, 2}},
+        [_Message("user", "hi"), _Message("assistant", "hello")],
+        _conversation_state(10),
+    ])
+    def test_small_values_are_exact(self, value):
+        """测试未超过采样数量和深度上限的值与完整递归结果一致"""
+        assert RecursiveSizeEstimator().estimate(value) == _exact_size(value)
+
+    def test_large_container_is_extrapolated(self):
+        """测试超过采样数量的同构容器按元素数量外推，误差很小"""
+        state = _conversation_state(2000)
+        estimate = RecursiveSizeEstimator(sample_size=64).estimate(state)
+        exact = _exact_size(state)
+
+        assert abs(estimate - exact) / exact < 0.05
+
+    def test_depth_limit_bounds_nesting(self):
+        """测试超过深度上限的嵌套只计算自身大小"""
+        value = leaf = {}
+        for _ in range(20):
+            leaf["child"] = {}
+            leaf = leaf["child"]
+
+        shallow = RecursiveSizeEstimator(max_depth=2).estimate(value)
+
+        assert shallow < RecursiveSizeEstimator(max_depth=30).estimate(value)
+        assert shallow == (
+            sys.getsizeof(value)
+            + sys.getsizeof("child") + sys.getsizeof(value["child"])
+            + sys.getsizeof("child") + sys.getsizeof(value["child"]["child"])
+        )
+
+    def test_estimate_grows_with_content(self):
+        """测试估算值随内容增长单调增加"""
+        estimator = RecursiveSizeEstimator()
+        sizes = [estimator.estimate(_conversation_state(turns)) for turns in (1, 10, 100, 1000)]
+
+        assert sizes == sorted(sizes)
+        assert sizes[-1] > 50 * sizes[0]
+
+
+class TestCreateSizeEstimator:
+    """测试估算器创建"""
+
+    def test_strategies(self):
+        """测试按名称创建估算器，实例原样返回"""
+        assert isinstance(create_size_estimator(), RecursiveSizeEstimator)
+        assert isinstance(create_size_estimator("pickle"), PickleSizeEstimator)
+        assert create_size_estimator("recursive", sample_size=8).sample_size == 8
+
+        estimator = PickleSizeEstimator()
+        assert create_size_estimator(estimator) is estimator
+
+    def test_unknown_strategy_raises(self):
+        """测试未知策略抛出 StorageError"""
+        with pytest.raises(StorageError):
+            create_size_estimator("unknown")
+
+    def test_pickle_estimator_falls_back_for_unpicklable(self):
+        """测试无法序列化的值按字符串长度粗略估算"""
+        value = {"callback": lambda: None}
+
+        assert PickleSizeEstimator().estimate(value) == len(str(value)) * 2
+
+
+class TestMemoryProviderAccounting:
+    """测试内存提供者的用量记账"""
+
+    @pytest.mark.asyncio
+    async def test_usage_tracks_save_update_delete(self):
+        """测试保存、更新和删除后总用量与各表用量一致，删除后归零"""
+        provider = MemoryProvider()
+        estimator = RecursiveSizeEstimator()
+        first = {"id": "a", "payload": "x" * 100}
+        second = {"id": "b", "payload": ["y"] * 50}
+
+        await provider.save("items", dict(first))
+        await provider.save("items", dict(second))
+        stats = provider.get_memory_stats()
+        assert stats["current_memory_usage"] == estimator.estimate(first) + estimator.estimate(second)
+        assert stats["tables"]["items"] == {"records": 2, "memory_usage": stats["current_memory_usage"]}
+
+        await provider.update("items", "a", {"payload": "z" * 1000})
+        stored = await provider.load("items", "a")
+        assert provider._get_record_size("items", "a") == estimator.estimate(stored)
+
+        await provider.delete("items", "a")
+        await provider.delete("items", "b")
+        stats = provider.get_memory_stats()
+        assert stats["current_memory_usage"] == 0
+        assert stats["tables"] == {}
+
+    @pytest.mark.asyncio
+    async def test_memory_limit_uses_estimate(self):
+        """测试超过内存上限的写入被拒绝且不改变用量"""
+        record = {"id": "big", "payload": "x" * 10000}
+        provider = MemoryProvider(max_memory_usage=RecursiveSizeEstimator().estimate(record) - 1)
+
+        with pytest.raises(ProviderError):
+            await provider.save("items", record)
+
+        assert provider.get_memory_stats()["current_memory_usage"] == 0
@@ -0,0 +1,142 @@
+"""SQLite存储提供者单元测试
+
+测试连接池在并发下的读连接借还、写操作串行化，以及内存数据库和关闭后的行为。
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.adapters.storage.backends.providers.sqlite_provider import (
+    SQLiteConnectionPool,
+    SQLiteProvider,
+)
+
+
+class _Tracker:
+    """记录同时持有的连接"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = set()
+        self.seen = set()
+        self.max_active = 0
+
+    def __call__(self, conn):
+        with self._lock:
+            assert id(conn) not in self.active, "同一连接被两个操作同时使用"
+            self.active.add(id(conn))
+            self.seen.add(id(conn))
+            self.max_active = max(self.max_active, len(self.active))
+        try:
+            time.sleep(0.01)
+            return conn.execute("SELECT 1").fetchone()[0]
+        finally:
+            with self._lock:
+                self.active.discard(id(conn))
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"), read_pool_size=3)
+    yield pool
+    pool.close()
+
+
+class TestSQLiteConnectionPool:
+    """测试SQLite连接池"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_check_out_distinct_connections(self, pool):
+        """测试并发读操作各自独占一个读连接，且不超过池大小"""
+        tracker = _Tracker()
+
+        results = await asyncio.gather(*(pool.read(tracker) for _ in range(30)))
+
+        assert results == [1] * 30
+        assert tracker.max_active <= 3
+        assert len(tracker.seen) == 3
+        assert pool.get_stats()["idle_readers"] == 3
+        assert pool.get_stats()["reads"] == 30
+
+    @pytest.mark.asyncio
+    async def test_failed_read_returns_connection(self, pool):
+        """测试读操作抛出异常后连接仍归还到池中"""
+        def failing(conn):
+            raise RuntimeError("boom")
+
+        for _ in range(5):
+            with pytest.raises(RuntimeError):
+                await pool.read(failing)
+
+        assert pool.get_stats()["idle_readers"] == 3
+        assert await pool.read(lambda conn: conn.execute("SELECT 2").fetchone()[0]) == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_are_serialized(self, pool):
+        """测试写操作在单个写连接上串行执行"""
+        tracker = _Tracker()
+
+        await asyncio.gather(*(pool.write(tracker) for _ in range(10)))
+
+        assert tracker.max_active == 1
+        assert len(tracker.seen) == 1
+
+    @pytest.mark.asyncio
+    async def test_readers_are_read_only_and_see_writes(self, pool):
+        """测试读连接只读，且能读到已提交的写入"""
+        await pool.write(lambda conn: conn.execute("CREATE TABLE items (id TEXT)"))
+        await pool.write(lambda conn: conn.execute("INSERT INTO items VALUES ('a')"))
+
+        assert await pool.read(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]) == 1
+        with pytest.raises(sqlite3.OperationalError):
+            await pool.read(lambda conn: conn.execute("INSERT INTO items VALUES ('b')"))
+
+    @pytest.mark.asyncio
+    async def test_memory_database_reads_use_writer(self):
+        """测试内存数据库的读操作走写连接"""
+        pool = SQLiteConnectionPool(":memory:", read_pool_size=4)
+        try:
+            await pool.write(lambda conn: conn.execute("CREATE TABLE items (id TEXT)"))
+
+            assert await pool.read(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]) == 0
+            assert pool.get_stats()["reader_connections"] == 0
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_reopen_after_close(self, pool):
+        """测试关闭后再次使用时重新打开连接池"""
+        await pool.read(lambda conn: None)
+        pool.close()
+
+        assert not pool.is_open
+        assert await pool.read(lambda conn: conn.execute("SELECT 3").fetchone()[0]) == 3
+        assert pool.get_stats()["idle_readers"] == 3
+
+
+class TestSQLiteProviderConcurrency:
+    """测试SQLite提供者的并发读写"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_saves_and_loads(self, tmp_path):
+        """测试并发保存与读取互不干扰，结束后连接全部归还"""
+        provider = SQLiteProvider(db_path=str(tmp_path / "provider.db"), read_pool_size=2)
+        await provider.create_table("items", {"columns": {
+            "id": {"type": "TEXT", "constraints": "PRIMARY KEY"},
+            "value": {"type": "INTEGER"},
+        }})
+        try:
+            await asyncio.gather(*(
+                provider.save("items", {"id": f"item-{index}", "value": index}) for index in range(20)
+            ))
+            loaded = await asyncio.gather(*(provider.load("items", f"item-{index}") for index in range(20)))
+
+            assert [row["value"] for row in loaded] == list(range(20))
+            assert await provider.count("items", {}) == 20
+            assert provider._pool.get_stats()["idle_readers"] == 2
+        finally:
+            await provider.disconnect()
@@ -0,0 +1,142 @@
+"""SQLite单表存储后端单元测试
+
+测试排序、数量限制和偏移量下推到SQL，以及检查点表索引的创建和使用。
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.adapters.storage.backends.impl.sqlite_table_backend import SQLiteTableBackend
+from src.adapters.storage.backends.providers.sqlite_provider import SQLiteProvider
+from src.core.threads.checkpoints.storage.models import ThreadCheckpoint
+from src.core.threads.checkpoints.storage.repository import (
+    THREAD_CHECKPOINT_TABLE,
+    THREAD_CHECKPOINT_TABLE_SCHEMA,
+    ThreadCheckpointRepository,
+)
+
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+async def backend(tmp_path):
+    provider = SQLiteProvider(db_path=str(tmp_path / "storage.db"))
+    backend = SQLiteTableBackend(provider, THREAD_CHECKPOINT_TABLE, THREAD_CHECKPOINT_TABLE_SCHEMA)
+    yield backend
+    await backend.disconnect()
+
+
+async def _save(backend, checkpoint_id, minutes, thread_id="thread-1", expires_in=None):
+    created_at = BASE_TIME + timedelta(minutes=minutes)
+    await backend.save_impl({
+        "id": checkpoint_id,
+        "type": "thread_checkpoint",
+        "thread_id": thread_id,
+        "state_data": {"step": minutes},
+        "metadata": {},
+        "status": "active",
+        "checkpoint_type": "auto",
+        "created_at": created_at.isoformat(),
+        "updated_at": created_at.isoformat(),
+        "expires_at": (created_at + expires_in).isoformat() if expires_in else None,
+        "size_bytes": 0,
+        "restore_count": 0,
+        "last_restored_at": None,
+    })
+
+
+class TestSQLiteTableBackend:
+    """测试SQLite单表存储后端"""
+
+    @pytest.mark.asyncio
+    async def test_first_use_creates_table_and_indexes(self, backend):
+        """测试首次使用时创建表和检查点索引"""
+        await _save(backend, "cp-0", 0)
+
+        rows = await backend._provider.query(
+            THREAD_CHECKPOINT_TABLE,
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = '{table}'",
+            {},
+        )
+        names = {row["name"] for row in rows}
+        assert "idx_thread_checkpoints_thread_created" in names
+        assert "idx_thread_checkpoints_expires_at" in names
+
+    @pytest.mark.asyncio
+    async def test_query_order_limit_offset(self, backend):
+        """测试排序、数量限制和偏移量"""
+        for minutes in (3, 1, 4, 2, 0):
+            await _save(backend, f"cp-{minutes}", minutes)
+        await _save(backend, "other", 10, thread_id="thread-2")
+
+        filters = {"thread_id": "thread-1"}
+        newest = await backend.query_impl(filters, order_by="created_at", descending=True)
+        assert [row["id"] for row in newest] == ["cp-4", "cp-3", "cp-2", "cp-1", "cp-0"]
+
+        page = await backend.query_impl(filters, order_by="created_at", limit=2, offset=1)
+        assert [row["id"] for row in page] == ["cp-1", "cp-2"]
+
+        tail = await backend.query_impl(filters, order_by="created_at", offset=3)
+        assert [row["id"] for row in tail] == ["cp-3", "cp-4"]
+
+        assert page[0]["state_data"] == {"step": 1}
+
+    @pytest.mark.asyncio
+    async def test_range_filter_and_nulls_last(self, backend):
+        """测试范围条件，以及排序字段为NULL的记录排在最后"""
+        await _save(backend, "never", 0)
+        await _save(backend, "soon", 1, expires_in=timedelta(minutes=5))
+        await _save(backend, "later", 2, expires_in=timedelta(hours=1))
+
+        ordered = await backend.query_impl(order_by="expires_at")
+        assert [row["id"] for row in ordered] == ["soon", "later", "never"]
+
+        cutoff = (BASE_TIME + timedelta(minutes=30)).isoformat()
+        expired = await backend.query_impl({"expires_at": {"op": "<", "value": cutoff}})
+        assert [row["id"] for row in expired] == ["soon"]
+
+    @pytest.mark.asyncio
+    async def test_latest_lookup_uses_index(self, backend):
+        """测试最新检查点查询使用复合索引而不是全表扫描后排序"""
+        await _save(backend, "cp-0", 0)
+
+        plan = await backend._provider.query(
+            THREAD_CHECKPOINT_TABLE,
+            "EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE thread_id = :thread_id "
+            "ORDER BY created_at DESC NULLS LAST LIMIT 1",
+            {"thread_id": "thread-1"},
+        )
+        details = " ".join(row["detail"] for row in plan)
+        assert "idx_thread_checkpoints_thread_created" in details
+
+    @pytest.mark.asyncio
+    async def test_invalid_order_by_rejected(self, backend):
+        """测试非法的排序字段被拒绝"""
+        with pytest.raises(Exception):
+            await backend.query_impl(order_by="created_at; DROP TABLE thread_checkpoints")
+
+
+class TestThreadCheckpointRepositoryWithSQLite:
+    """测试检查点仓储通过SQLite后端的有序查询"""
+
+    @pytest.mark.asyncio
+    async def test_latest_oldest_and_expired(self, backend):
+        repository = ThreadCheckpointRepository(backend)
+        for minutes in (1, 0, 2):
+            checkpoint = ThreadCheckpoint(
+                id=f"cp-{minutes}",
+                thread_id="thread-1",
+                state_data={"step": minutes},
+                created_at=BASE_TIME + timedelta(minutes=minutes),
+                updated_at=BASE_TIME + timedelta(minutes=minutes),
+                expires_at=datetime.now() + timedelta(hours=1),
+            )
+            await repository.save(checkpoint)
+
+        assert (await repository.find_latest_by_thread("thread-1")).id == "cp-2"
+        assert (await repository.find_oldest_by_thread("thread-1")).id == "cp-0"
+        assert [cp.id for cp in await repository.find_by_thread("thread-1")] == ["cp-2", "cp-1", "cp-0"]
+        assert await repository.find_expired() == []
+        assert len(await repository.find_expired(datetime.now() + timedelta(days=1))) == 3
@@ -0,0 +1,87 @@
+"""检查点链式编解码单元测试
+
+测试基准快照与增量的编码、解码和链重放。
+"""
+
+import pytest
+
+from src.core.threads.checkpoints.chain import CheckpointChainCodec
+
+
+@pytest.fixture
+def codec():
+    return CheckpointChainCodec(base_interval=3)
+
+
+class TestCheckpointChainCodec:
+    """测试检查点链式编解码器"""
+
+    def test_base_roundtrip(self, codec):
+        """测试基准快照编码后可还原"""
+        state = {"messages": [{"role": "user", "content": "你好"}], "step": 1}
+        envelope = codec.encode(state)
+
+        assert codec.is_envelope(envelope)
+        assert envelope["encoding"] == CheckpointChainCodec.ENCODING_BASE
+        assert envelope["parent_id"] is None
+        assert codec.decode(envelope) == state
+
+    def test_delta_roundtrip(self, codec):
+        """测试增量覆盖新增、删除、修改和列表追加"""
+        old = {"messages": ["m1"], "step": 1, "obsolete": True}
+        new = {"messages": ["m1", "m2"], "step": 2, "added": "x"}
+        envelope = codec.encode(new, "cp-1", old, 0)
+
+        assert envelope["encoding"] == CheckpointChainCodec.ENCODING_DELTA
+        assert envelope["parent_id"] == "cp-1"
+        assert envelope["depth"] == 1
+        assert codec.decode(envelope, old) == new
+
+    def test_append_only_list_stored_as_tail(self):
+        """测试只在末尾追加的列表只记录追加部分"""
+        delta = CheckpointChainCodec.compute_delta(
+            {"messages": ["m1", "m2"]}, {"messages": ["m1", "m2", "m3"]}
+        )
+
+        assert delta["extended"] == {"messages": ["m3"]}
+        assert delta["modified"] == {}
+
+    def test_rewritten_list_stored_as_new_value(self):
+        """测试非追加的列表修改记录完整新值"""
+        delta = CheckpointChainCodec.compute_delta(
+            {"messages": ["m1", "m2"]}, {"messages": ["m2"]}
+        )
+
+        assert delta["modified"] == {"messages": {"new": ["m2"]}}
+        assert delta["extended"] == {}
+
+    def test_delta_requires_parent_state(self, codec):
+        """测试增量缺少父状态时报错"""
+        envelope = codec.encode({"a": 2}, "cp-1", {"a": 1}, 0)
+
+        with pytest.raises(ValueError):
+            codec.decode(envelope)
+
+    def test_base_interval_forces_snapshot(self, codec):
+        """测试链深度达到基准间隔时写入基准快照"""
+        assert codec.encode({"a": 2}, "cp-1", {"a": 1}, 1)["depth"] == 2
+        forced = codec.encode({"a": 3}, "cp-2", {"a": 2}, 2)
+
+        assert forced["encoding"] == CheckpointChainCodec.ENCODING_BASE
+        assert forced["depth"] == 0
+
+    def test_decode_chain(self, codec):
+        """测试从基准快照重放增量链"""
+        states = [{"messages": ["m1"]}, {"messages": ["m1", "m2"]}, {"messages": ["m1", "m2"], "done": True}]
+        envelopes = [codec.encode(states[0])]
+        for index in range(1, len(states)):
+            envelopes.append(codec.encode(states[index], f"cp-{index - 1}", states[index - 1], index - 1))
+
+        assert codec.decode_chain(envelopes) == states[-1]
+        with pytest.raises(ValueError):
+            codec.decode_chain(envelopes[1:])
+
+    def test_invalid_base_interval(self):
+        """测试非法的基准间隔"""
+        with pytest.raises(ValueError):
+            CheckpointChainCodec(base_interval=0)
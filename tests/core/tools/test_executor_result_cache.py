@@ -0,0 +1,104 @@
+"""工具结果缓存测试
+
+测试AsyncToolExecutor对可缓存工具的结果缓存、并发去重和TTL过期。
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from src.core.tools.executor import AsyncToolExecutor, ToolResultCache
+from src.interfaces.tool.base import ToolCall, ToolResult
+
+
+class CountingTool:
+    """记录调用次数的异步工具"""
+    
+    def __init__(self, name: str, cacheable: bool, cache_ttl=None):
+        self.name = name
+        self.config = Mock(cacheable=cacheable, cache_ttl=cache_ttl)
+        self.calls = 0
+    
+    def validate_parameters(self, parameters):
+        return True
+    
+    async def execute_async(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return kwargs
+
+
+class ToolManager:
+    """按名称返回工具的管理器"""
+    
+    def __init__(self, *tools):
+        self._tools = {tool.name: tool for tool in tools}
+    
+    def get_tool(self, name):
+        return self._tools.get(name)
+
+
+@pytest.fixture
+def tools():
+    return CountingTool("fetch", cacheable=True, cache_ttl=60), CountingTool("weather", cacheable=False)
+
+
+@pytest.fixture
+def executor(tools):
+    return AsyncToolExecutor(ToolManager(*tools), Mock())
+
+
+class TestToolResultCache:
+    """工具结果缓存测试类"""
+    
+    async def test_repeated_call_hits_cache(self, executor, tools):
+        """测试相同参数（顺序不同）的重复调用命中缓存"""
+        first = await executor.execute_async(ToolCall("fetch", {"url": "a", "raw": False}))
+        second = await executor.execute_async(ToolCall("fetch", {"raw": False, "url": "a"}))
+        
+        assert tools[0].calls == 1
+        assert first.metadata["cache_hit"] is False
+        assert second.metadata["cache_hit"] is True
+        assert second.output == first.output
+    
+    async def test_concurrent_calls_are_deduplicated(self, executor, tools):
+        """测试并发的相同调用只执行一次"""
+        results = await asyncio.gather(*[
+            executor.execute_async(ToolCall("fetch", {"url": "a"})) for _ in range(5)
+        ])
+        
+        assert tools[0].calls == 1
+        assert sum(result.metadata["cache_shared"] for result in results) == 4
+        assert executor.get_cache_stats()["shared"] == 4
+    
+    async def test_non_cacheable_tool_always_executes(self, executor, tools):
+        """测试未声明可缓存的工具不使用缓存"""
+        await executor.execute_async(ToolCall("weather", {"city": "x"}))
+        result = await executor.execute_async(ToolCall("weather", {"city": "x"}))
+        
+        assert tools[1].calls == 2
+        assert not (result.metadata or {}).get("cache_hit")
+    
+    def test_lru_eviction(self):
+        """测试按容量淘汰最久未使用的条目"""
+        cache = ToolResultCache(max_size=2)
+        cache.put("a", ToolResult(success=True), ttl=60)
+        cache.put("b", ToolResult(success=True), ttl=60)
+        cache.get("a")
+        cache.put("c", ToolResult(success=True), ttl=60)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+    
+    async def test_expired_entry_is_reexecuted(self, tools):
+        """测试缓存过期后重新执行"""
+        tools[0].config.cache_ttl = 0.05
+        executor = AsyncToolExecutor(ToolManager(*tools), Mock())
+        
+        await executor.execute_async(ToolCall("fetch", {"url": "a"}))
+        await asyncio.sleep(0.1)
+        result = await executor.execute_async(ToolCall("fetch", {"url": "a"}))
+        
+        assert tools[0].calls == 2
+        assert result.metadata["cache_hit"] is False
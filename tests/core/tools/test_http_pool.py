@@ -0,0 +1,80 @@
+"""工具HTTP连接池测试
+
+使用本地 aiohttp 服务器测试共享会话的连接复用、响应体大小上限和统计信息。
+"""
+
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+
+from src.core.tools.http_pool import ResponseTooLargeError, ToolHTTPPoolConfig, ToolHTTPSessionPool
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    async def small(request):
+        return web.Response(text="你好", content_type="text/html", charset="utf-8")
+    
+    async def large(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for _ in range(64):
+            await response.write(b"x" * 1024)
+        return response
+    
+    app = web.Application()
+    app.router.add_get("/small", small)
+    app.router.add_get("/large", large)
+    
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    
+    yield f"http://127.0.0.1:{port}"
+    
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def pool():
+    pool = ToolHTTPSessionPool(ToolHTTPPoolConfig(limit_per_host=2, max_response_size=16 * 1024))
+    yield pool
+    pool.shutdown()
+
+
+async def _get(pool, url, max_size=None):
+    async with pool.request("GET", url, timeout=5) as response:
+        return await pool.read_text(response, max_size)
+
+
+class TestToolHTTPSessionPool:
+    """工具HTTP会话池测试类"""
+    
+    def test_sync_callers_reuse_connections(self, pool, server_url):
+        """测试多次同步调用复用同一会话和keep-alive连接"""
+        results = [pool.run_sync(_get(pool, f"{server_url}/small")) for _ in range(10)]
+        stats = pool.get_stats()
+        
+        assert results == ["你好"] * 10
+        assert stats["sessions_created"] == 1
+        assert stats["connections_created"] == 1
+        assert stats["connections_reused"] == 9
+        assert stats["requests_by_host"] == {"127.0.0.1": 10}
+    
+    def test_response_size_cap(self, pool, server_url):
+        """测试响应体超过上限时中止读取"""
+        with pytest.raises(ResponseTooLargeError):
+            pool.run_sync(_get(pool, f"{server_url}/large"))
+        
+        assert len(pool.run_sync(_get(pool, f"{server_url}/large", max_size=1024 * 1024))) == 64 * 1024
+        assert pool.get_stats()["oversized_responses"] == 1
@@ -0,0 +1,77 @@
+"""缓存同步接口微基准
+
+测量 ConfigCache、LLMCache、GraphCache 同步 get/put 的单次操作耗时，
+并与逐次 asyncio.run 调用异步接口的旧路径对比。
+
+运行方式：
+    python -m tests.infrastructure.common.benchmark_cache [--ops N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Callable, Dict
+
+from src.infrastructure.common.cache import (
+    BaseCache,
+    ConfigCache,
+    LLMCache,
+    GraphCache,
+)
+
+
+def _per_op_us(func: Callable[[int], None], ops: int) -> float:
+    """执行 ops 次操作，返回单次操作的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for i in range(ops):
+        func(i)
+    return (time.perf_counter() - start) / ops * 1_000_000
+
+
+def bench_cache(cache: BaseCache, ops: int, key_space: int = 1000) -> Dict[str, float]:
+    """测量同步接口与旧的 asyncio.run 路径的单次操作耗时
+
+    Args:
+        cache: 被测缓存
+        ops: 操作次数
+        key_space: 键空间大小
+
+    Returns:
+        各操作的单次耗时（微秒）
+    """
+    manager = cache._manager
+    name = cache._cache_name
+    value = {"payload": "x" * 64}
+
+    results = {
+        "put": _per_op_us(lambda i: cache.put(f"k{i % key_space}", value), ops),
+        "get_hit": _per_op_us(lambda i: cache.get(f"k{i % key_space}"), ops),
+        "get_miss": _per_op_us(lambda i: cache.get(f"missing{i}"), ops),
+    }
+
+    # 旧路径：每次操作都创建事件循环运行协程
+    legacy_ops = max(1, ops // 20)
+    results["legacy_put"] = _per_op_us(
+        lambda i: asyncio.run(manager.set(f"k{i % key_space}", value, None, name)), legacy_ops
+    )
+    results["legacy_get_hit"] = _per_op_us(
+        lambda i: asyncio.run(manager.get(f"k{i % key_space}", name)), legacy_ops
+    )
+
+    cache.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BaseCache 同步接口微基准")
+    parser.add_argument("--ops", type=int, default=100_000, help="每项操作的执行次数")
+    args = parser.parse_args()
+
+    print(f"{'cache':<12}{'op':<16}{'us/op':>10}")
+    for cache in (ConfigCache(), LLMCache(), GraphCache()):
+        for op, cost in bench_cache(cache, args.ops).items():
+            print(f"{cache._cache_name:<12}{op:<16}{cost:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -284,6 +284,21 @@ class TestCacheManager:
         assert value1 == "value1"
         assert value2 == "value2"
 
+    def test_sync_core_matches_async_api(self, cache_manager):
+        """测试同步核心接口"""
+        cache_manager.set_sync("key1", "value1")
+        assert cache_manager.get_sync("key1") == "value1"
+        assert cache_manager.exists_sync("key1") is True
+        assert asyncio.run(cache_manager.get("key1")) == "value1"
+
+        assert cache_manager.delete_sync("key1") is True
+        assert cache_manager.get_sync("key1") is None
+        assert cache_manager.delete_sync("key1") is False
+
+        cache_manager.set_sync("key2", "value2", ttl=10)
+        cache_manager.clear_sync()
+        assert cache_manager.get_sync("key2") is None
+
     @pytest.mark.asyncio
     async def test_cache_eviction(self, cache_manager):
         """测试缓存淘汰（LRU）"""
@@ -327,30 +342,49 @@ class TestBaseCache:
     def test_base_cache_get_put(self):
         """测试基础缓存的同步获取和设置"""
         cache = BaseCache(cache_name="test", default_ttl=60)
-        # 模拟异步管理器
-        with patch.object(cache._manager, 'get') as mock_get:
+        # 模拟管理器的同步核心
+        with patch.object(cache._manager, 'get_sync') as mock_get:
             mock_get.return_value = "cached_value"
             value = cache.get("key1")
             assert value == "cached_value"
             mock_get.assert_called_once_with("key1", "test")
 
-        with patch.object(cache._manager, 'set') as mock_set:
+        with patch.object(cache._manager, 'set_sync') as mock_set:
             cache.put("key1", "value1")
             mock_set.assert_called_once_with("key1", "value1", 60, "test")
 
     def test_base_cache_remove_clear(self):
         """测试基础缓存的删除和清空"""
         cache = BaseCache(cache_name="test", default_ttl=60)
-        with patch.object(cache._manager, 'delete') as mock_delete:
+        with patch.object(cache._manager, 'delete_sync') as mock_delete:
             mock_delete.return_value = True
             result = cache.remove("key1")
             assert result is True
             mock_delete.assert_called_once_with("key1", "test")
 
-        with patch.object(cache._manager, 'clear') as mock_clear:
+        with patch.object(cache._manager, 'clear_sync') as mock_clear:
             cache.clear()
             mock_clear.assert_called_once_with("test")
 
+    def test_base_cache_roundtrip(self):
+        """测试基础缓存的同步读写（无需事件循环）"""
+        cache = BaseCache(cache_name="test_roundtrip", default_ttl=60)
+        cache.put("key1", {"a": 1})
+        assert cache.get("key1") == {"a": 1}
+        assert cache.remove("key1") is True
+        assert cache.get("key1") is None
+
+    @pytest.mark.asyncio
+    async def test_base_cache_inside_running_loop(self):
+        """测试在运行中的事件循环内使用同步接口"""
+        cache = BaseCache(cache_name="test_in_loop", default_ttl=60)
+        cache.put("key1", "value1")
+        assert cache.get("key1") == "value1"
+        # 同步接口与异步接口共享同一存储
+        assert await cache._manager.get("key1", "test_in_loop") == "value1"
+        cache.clear()
+        assert cache.get("key1") is None
+
 
 class TestSpecializedCaches:
     """测试专用缓存类"""
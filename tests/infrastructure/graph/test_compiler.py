@@ -0,0 +1,123 @@
+"""图编译器单元测试
+
+测试编译后的后继表和条件边路由。
+"""
+
+import pytest
+
+from src.infrastructure.graph.engine.compiler import CompiledGraph, ConditionalRouter
+from src.infrastructure.graph.execution.engine import ExecutionEngine
+from src.infrastructure.graph.types import END
+
+
+def _node(name):
+    async def node(state, config):
+        return {"visited": state["visited"] + [name]}
+    return node
+
+
+def _build_graph(edges, nodes=("check", "yes", "no")):
+    return CompiledGraph(
+        graph_id="test",
+        nodes={name: {"name": name, "func": _node(name), "executor": None} for name in nodes},
+        edges=edges,
+        entry_point="check",
+        state_schema=None,
+    )
+
+
+def _route(state):
+    return "ok" if state["flag"] else "fail"
+
+
+class TestConditionalRouter:
+    """测试条件边路由"""
+
+    def test_path_map_resolves_route_key(self):
+        """测试路由键通过路径映射解析为目标节点"""
+        graph = _build_graph([
+            {"start": "check", "path": _route, "path_map": {"ok": "yes", "fail": "no"}, "type": "conditional"},
+        ])
+
+        assert graph.get_next_nodes("check", {"flag": True}) == ["yes"]
+        assert graph.get_next_nodes("check", {"flag": False}) == ["no"]
+
+    def test_simple_and_conditional_edges_combine(self):
+        """测试简单边在条件边目标之前返回"""
+        graph = _build_graph([
+            {"start": "check", "end": "no", "type": "simple"},
+            {"start": "check", "path": lambda state: ["a", "b"], "path_map": {"a": "yes", "b": END}, "type": "conditional"},
+        ])
+
+        assert graph.get_next_nodes("check", {}) == ["no", "yes", END]
+
+    def test_without_path_map_uses_route_key(self):
+        """测试未提供路径映射时路由键即为节点名称"""
+        router = ConditionalRouter("check", lambda state: "yes")
+
+        assert router.route({}) == ["yes"]
+        assert ConditionalRouter("check", lambda state: None).route({}) == []
+
+    def test_list_path_map_maps_names_to_themselves(self):
+        """测试列表形式的路径映射按节点名映射到自身"""
+        router = ConditionalRouter("check", lambda state: state["next"], ["yes", "no"])
+
+        assert router.path_map == {"yes": "yes", "no": "no"}
+        assert router.route({"next": "no"}) == ["no"]
+        with pytest.raises(ValueError):
+            router.route({"next": "other"})
+
+    def test_unknown_route_key_raises(self):
+        """测试路由键不在路径映射中时报错"""
+        router = ConditionalRouter("check", _route, {"ok": "yes"})
+
+        with pytest.raises(ValueError):
+            router.route({"flag": False})
+
+    def test_async_path_function_rejected(self):
+        """测试异步路径函数在编译时被拒绝"""
+        async def route(state):
+            return "yes"
+
+        with pytest.raises(TypeError):
+            ConditionalRouter("check", route)
+        with pytest.raises(TypeError):
+            _build_graph([{"start": "check", "path": route, "path_map": None, "type": "conditional"}])
+
+    def test_awaitable_route_result_rejected(self):
+        """测试路径函数返回可等待对象时报错"""
+        async def route(state):
+            return "yes"
+
+        router = ConditionalRouter("check", lambda state: route(state))
+
+        with pytest.raises(TypeError):
+            router.route({})
+
+    def test_invalid_path_map_type_rejected(self):
+        """测试字符串等非法路径映射被拒绝"""
+        with pytest.raises(TypeError):
+            ConditionalRouter("check", _route, "yes")
+
+
+class TestConditionalRouting:
+    """测试执行引擎按条件边路由"""
+
+    @pytest.mark.parametrize("mode", ["sequential", "superstep"])
+    @pytest.mark.asyncio
+    async def test_engine_follows_path_map(self, mode):
+        """测试两种执行模式都只执行路由选中的分支"""
+        graph = _build_graph([
+            {"start": "check", "path": _route, "path_map": {"ok": "yes", "fail": "no"}, "type": "conditional"},
+            {"start": "yes", "end": END, "type": "simple"},
+            {"start": "no", "end": END, "type": "simple"},
+        ])
+        engine = ExecutionEngine(graph, execution_mode=mode)
+        try:
+            passed = await engine.invoke({"flag": True, "visited": []})
+            failed = await engine.invoke({"flag": False, "visited": []})
+        finally:
+            engine.shutdown()
+
+        assert passed["visited"] == ["check", "yes"]
+        assert failed["visited"] == ["check", "no"]
@@ -0,0 +1,124 @@
+"""节点执行器单元测试
+
+测试同步节点的执行策略、执行池的关闭，以及执行器在引擎和调度器之间的传递。
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from src.infrastructure.graph.execution.engine import ExecutionEngine
+from src.infrastructure.graph.execution.node_executor import (
+    ExecutorPolicy,
+    NodeExecutor,
+    NodeExecutorConfig,
+)
+from src.infrastructure.graph.execution.scheduler import TaskScheduler
+
+
+def _current_thread(*args):
+    return threading.current_thread()
+
+
+class TestNodeExecutor:
+    """测试节点执行器"""
+
+    def test_default_policy_is_inline(self):
+        """测试默认策略为内联执行，保持既有同步节点的语义"""
+        assert NodeExecutorConfig().default_policy is ExecutorPolicy.INLINE
+        assert NodeExecutorConfig.from_dict({}).default_policy is ExecutorPolicy.INLINE
+
+    @pytest.mark.asyncio
+    async def test_inline_runs_on_loop_thread(self):
+        """测试内联策略在事件循环线程中执行"""
+        executor = NodeExecutor()
+
+        assert await executor.run(_current_thread) is threading.current_thread()
+        assert executor._thread_pool is None
+
+    @pytest.mark.asyncio
+    async def test_thread_policy_is_opt_in(self):
+        """测试显式指定线程策略时提交到线程池"""
+        executor = NodeExecutor()
+        try:
+            thread = await executor.run(_current_thread, policy="thread")
+            assert thread is not threading.current_thread()
+            assert thread.name.startswith("graph-node")
+            assert executor.get_metrics()["policies"]["thread"]["calls"] == 1
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_async_function_awaited_directly(self):
+        """测试异步节点函数直接等待"""
+        async def node(value):
+            return value * 2
+
+        assert await NodeExecutor().run(node, 21, policy="thread") == 42
+
+    @pytest.mark.asyncio
+    async def test_shutdown_releases_pool(self):
+        """测试关闭后释放线程池，再次使用时重新创建"""
+        executor = NodeExecutor()
+        await executor.run(_current_thread, policy="thread")
+        pool = executor._thread_pool
+
+        executor.shutdown()
+
+        assert executor._thread_pool is None
+        assert pool._shutdown
+        await executor.run(_current_thread, policy="thread")
+        assert executor._thread_pool is not pool
+        executor.shutdown()
+
+
+class TestExecutionEngineExecutor:
+    """测试执行引擎对节点执行器的管理"""
+
+    @pytest.fixture
+    def engine(self):
+        graph = Mock()
+        graph.state_schema = None
+        engine = ExecutionEngine(graph)
+        yield engine
+        engine.shutdown()
+
+    def test_scheduler_shares_engine_executor(self, engine):
+        """测试调度器默认使用引擎的执行器"""
+        assert engine.task_scheduler.node_executor is engine.node_executor
+
+    def test_set_node_executor_propagates_to_scheduler(self, engine):
+        """测试设置执行器时同时传递给调度器"""
+        executor = NodeExecutor(NodeExecutorConfig(default_policy="thread"))
+
+        engine.set_node_executor(executor)
+
+        assert engine.node_executor is executor
+        assert engine.task_scheduler.node_executor is executor
+        executor.shutdown()
+
+    def test_set_task_scheduler_uses_engine_executor(self, engine):
+        """测试设置调度器时改用引擎的执行器"""
+        scheduler = TaskScheduler()
+
+        engine.set_task_scheduler(scheduler)
+
+        assert scheduler.node_executor is engine.node_executor
+
+    @pytest.mark.asyncio
+    async def test_shutdown_closes_owned_executor_only(self, engine):
+        """测试引擎只关闭自行创建的执行器"""
+        owned = engine.node_executor
+        await owned.run(_current_thread, policy="thread")
+        owned_pool = owned._thread_pool
+
+        external = NodeExecutor()
+        await external.run(_current_thread, policy="thread")
+        engine.set_node_executor(external)
+
+        assert owned_pool._shutdown
+
+        engine.shutdown()
+        assert external._thread_pool is not None
+        external.shutdown()
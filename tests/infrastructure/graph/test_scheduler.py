@@ -0,0 +1,128 @@
+"""任务调度器单元测试
+
+测试基于依赖计数的事件驱动调度：扇入、失败级联和依赖环检测。
+"""
+
+import asyncio
+from collections import deque
+
+import pytest
+
+from src.infrastructure.graph.execution.node_executor import (
+    NodeExecutor,
+    NodeExecutorConfig,
+)
+from src.infrastructure.graph.execution.scheduler import TaskScheduler
+from src.infrastructure.graph.types import ExecutableTask
+
+
+def _make_task(task_id, proc):
+    """创建测试任务"""
+    return ExecutableTask(
+        name=task_id,
+        input={},
+        proc=proc,
+        writes=deque(),
+        config={},
+        triggers=(),
+        retry_policy=(),
+        cache_key=None,
+        id=task_id,
+        path=(task_id,),
+    )
+
+
+@pytest.fixture
+def scheduler():
+    """使用内联执行器的调度器"""
+    scheduler = TaskScheduler(NodeExecutor(NodeExecutorConfig(default_policy="inline")))
+    yield scheduler
+    scheduler.node_executor.shutdown()
+
+
+class TestTaskScheduler:
+    """测试任务调度器"""
+
+    @pytest.mark.asyncio
+    async def test_fan_in_waits_for_all_dependencies(self, scheduler):
+        """测试扇入任务在所有依赖完成后才执行"""
+        order = []
+
+        def record(task_id):
+            def proc(state, config):
+                order.append(task_id)
+                return task_id
+            return proc
+
+        async def slow(state, config):
+            await asyncio.sleep(0.01)
+            order.append("b")
+            return "b"
+
+        scheduler.add_tasks([
+            _make_task("a", record("a")),
+            _make_task("b", slow),
+            _make_task("c", record("c")),
+            _make_task("join", record("join")),
+        ])
+        scheduler.set_task_dependencies("join", ["a", "b", "c"])
+
+        results = await scheduler.schedule_tasks()
+
+        assert len(results) == 4
+        assert all(r["status"] == "completed" for r in results)
+        assert order[-1] == "join"
+        assert set(order[:3]) == {"a", "b", "c"}
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_skips_dependents(self, scheduler):
+        """测试依赖失败时后继任务被跳过"""
+        def fail(state, config):
+            raise RuntimeError("boom")
+
+        scheduler.add_tasks([
+            _make_task("a", fail),
+            _make_task("b", lambda state, config: "b"),
+        ])
+        scheduler.set_task_dependencies("b", ["a"])
+
+        results = {r["task_id"]: r for r in await scheduler.schedule_tasks()}
+
+        assert results["a"]["status"] == "failed"
+        assert results["b"]["status"] == "skipped"
+
+    @pytest.mark.asyncio
+    async def test_dependency_cycle_raises(self, scheduler):
+        """测试依赖环在调度前被检出，而不是无限等待"""
+        calls = []
+        scheduler.add_tasks([
+            _make_task("root", lambda state, config: calls.append("root")),
+            _make_task("a", lambda state, config: calls.append("a")),
+            _make_task("b", lambda state, config: calls.append("b")),
+        ])
+        scheduler.set_task_dependencies("a", ["root", "b"])
+        scheduler.set_task_dependencies("b", ["a"])
+
+        with pytest.raises(ValueError, match="环"):
+            await asyncio.wait_for(scheduler.schedule_tasks(), timeout=1.0)
+
+        assert calls == []
+        assert len(scheduler.task_queue) == 3
+
+    @pytest.mark.asyncio
+    async def test_self_dependency_raises(self, scheduler):
+        """测试任务依赖自身被视为环"""
+        scheduler.add_task(_make_task("a", lambda state, config: "a"))
+        scheduler.set_task_dependencies("a", ["a"])
+
+        with pytest.raises(ValueError):
+            await asyncio.wait_for(scheduler.schedule_tasks(), timeout=1.0)
+
+    @pytest.mark.asyncio
+    async def test_unknown_dependency_raises(self, scheduler):
+        """测试依赖不存在的任务时报错"""
+        scheduler.add_task(_make_task("a", lambda state, config: "a"))
+        scheduler.set_task_dependencies("a", ["missing"])
+
+        with pytest.raises(ValueError, match="missing"):
+            await scheduler.schedule_tasks()
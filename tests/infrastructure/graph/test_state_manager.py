@@ -0,0 +1,131 @@
+"""状态管理器单元测试
+
+测试状态字典更新，以及基于持久化映射的历史版本、回滚和差异计算。
+"""
+
+import json
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+
+from src.infrastructure.graph.channels import Topic
+from src.infrastructure.graph.execution.persistent_map import PersistentMap
+from src.infrastructure.graph.execution.state_manager import StateManager
+
+
+class _ChannelState(TypedDict):
+    events: Annotated[list, Topic(str, accumulate=True)]
+    log: Annotated[list, operator.iadd]
+
+
+@pytest.fixture
+def manager():
+    return StateManager(None)
+
+
+class TestStateManager:
+    """测试状态管理器"""
+
+    @pytest.mark.asyncio
+    async def test_update_returns_new_dict(self, manager):
+        """测试更新返回新的状态字典，旧状态保持不变"""
+        initial = await manager.initialize_state({"a": 1, "b": 2})
+        updated = await manager.update_state(initial, {"b": 3, "c": 4})
+
+        assert type(updated) is dict
+        assert updated is manager.get_current_state()
+        assert updated == {"a": 1, "b": 3, "c": 4}
+        assert initial == {"a": 1, "b": 2}
+        assert json.loads(json.dumps(updated)) == updated
+
+    @pytest.mark.asyncio
+    async def test_update_shares_unmodified_entries(self, manager):
+        """测试更新只复制被修改的路径，未修改的子树与上一版本共享"""
+        await manager.initialize_state({f"key_{i}": i for i in range(1000)})
+        initial = manager._current_version
+        await manager.update_state(manager.get_current_state(), {"key_0": -1})
+        updated = manager._current_version
+
+        assert isinstance(updated, PersistentMap)
+        shared = set(map(id, initial._root.entries)) & set(map(id, updated._root.entries))
+        assert len(shared) == len(initial._root.entries) - 1
+
+    @pytest.mark.asyncio
+    async def test_empty_update_keeps_version(self, manager):
+        """测试空更新不产生新版本"""
+        initial = await manager.initialize_state({"a": 1})
+
+        assert await manager.update_state(initial, None) is initial
+        assert len(manager.get_state_history()) == 2
+
+    @pytest.mark.asyncio
+    async def test_in_place_changes_are_recorded(self, manager):
+        """测试节点原地修改状态字典后，修改并入下一个版本"""
+        state = await manager.initialize_state({"a": 1, "b": 2})
+        state["a"] = 10
+        del state["b"]
+        state = await manager.update_state(state, {"c": 3})
+
+        assert state == {"a": 10, "c": 3}
+        assert manager.get_state_history()[-1] == {"a": 10, "c": 3}
+        assert manager.get_state_history()[0] == {"a": 1, "b": 2}
+
+    @pytest.mark.asyncio
+    async def test_update_from_foreign_dict(self, manager):
+        """测试传入非上一次返回的状态时从该状态重建"""
+        await manager.initialize_state({"a": 1})
+        updated = await manager.update_state({"x": 1}, {"y": 2})
+
+        assert updated == {"x": 1, "y": 2}
+        assert manager.get_state_delta(1) == {"x": 1, "y": 2}
+
+    @pytest.mark.asyncio
+    async def test_history_rollback_and_diff(self, manager):
+        """测试历史版本、回滚和差异"""
+        state = await manager.initialize_state({"a": 1})
+        state = await manager.update_state(state, {"a": 2})
+        state = await manager.update_state(state, {"b": 1})
+
+        assert manager.get_state_history() == [{"a": 1}, {"a": 2}, {"a": 2, "b": 1}]
+        assert manager.get_state_diff(0, 2) == {
+            "a": {"from": 1, "to": 2},
+            "b": {"from": None, "to": 1},
+        }
+
+        rolled_back = manager.rollback_to_state(1)
+        assert rolled_back == {"a": 2}
+        assert len(manager.get_state_history()) == 2
+
+        state = await manager.update_state(rolled_back, {"c": 3})
+        assert state == {"a": 2, "c": 3}
+
+
+class TestStateManagerChannels:
+    """测试按通道合并写入时历史版本不被原地修改"""
+
+    @pytest.mark.asyncio
+    async def test_topic_write_keeps_previous_version(self):
+        """测试Topic通道追加写入后，上一版本的列表保持不变"""
+        manager = StateManager(_ChannelState)
+        state = await manager.initialize_state({"events": ["a"], "log": []})
+        state = await manager.apply_writes(state, [{"events": "b"}])
+        previous = manager.get_state_history()[-1]["events"]
+
+        state = await manager.apply_writes(state, [{"events": "c"}, {"events": "d"}])
+
+        assert state["events"] == ["a", "b", "c", "d"]
+        assert previous == ["a", "b"]
+        assert manager.get_state_history()[1]["events"] == ["a", "b"]
+        assert manager.get_state_history()[0]["events"] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_in_place_reducer_keeps_previous_version(self):
+        """测试原地归约函数（iadd）合并后，上一版本的列表保持不变"""
+        manager = StateManager(_ChannelState)
+        state = await manager.initialize_state({"events": [], "log": [1]})
+
+        state = await manager.apply_writes(state, [{"log": [2]}, {"log": [3]}])
+
+        assert state["log"] == [1, 2, 3]
+        assert manager.get_state_history()[0]["log"] == [1]
@@ -0,0 +1,144 @@
+"""超步执行引擎单元测试
+
+测试超步模式下的并发扇出、通过通道合并更新，以及步数上限。
+"""
+
+import asyncio
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+
+from src.infrastructure.graph.engine.compiler import CompiledGraph
+from src.infrastructure.graph.execution.engine import ExecutionEngine
+from src.infrastructure.graph.types import END, START, GraphRecursionError, InvalidUpdateError
+
+
+class _State(TypedDict):
+    items: Annotated[list, operator.add]
+    value: int
+
+
+def _build_engine(nodes, edges, state_schema=_State):
+    graph = CompiledGraph(
+        graph_id="test",
+        nodes={name: {"name": name, "func": func, "executor": None} for name, func in nodes.items()},
+        edges=[{"start": start, "end": end, "type": "simple"} for start, end in edges],
+        entry_point=START,
+        state_schema=state_schema,
+    )
+    return ExecutionEngine(graph, execution_mode="superstep")
+
+
+@pytest.fixture
+def engines():
+    created = []
+    yield created
+    for engine in created:
+        engine.shutdown()
+
+
+class TestSuperstepEngine:
+    """测试超步执行"""
+
+    @pytest.mark.asyncio
+    async def test_fan_out_runs_ready_nodes_concurrently(self, engines):
+        """测试同一前沿的节点并发执行，并读取同一份步前状态"""
+        released = asyncio.Event()
+        seen = {}
+
+        async def left(state, config):
+            seen["left"] = dict(state)
+            await asyncio.wait_for(released.wait(), timeout=1)
+            return {"items": ["left"]}
+
+        async def right(state, config):
+            seen["right"] = dict(state)
+            released.set()
+            return {"items": ["right"]}
+
+        engine = _build_engine(
+            {"left": left, "right": right},
+            [(START, "left"), (START, "right"), ("left", END), ("right", END)],
+        )
+        engines.append(engine)
+
+        result = await engine.invoke({"items": [], "value": 0})
+
+        assert result["items"] == ["left", "right"]
+        assert seen["left"] == seen["right"] == {"items": [], "value": 0}
+
+    @pytest.mark.asyncio
+    async def test_fan_in_merges_through_reducer(self, engines):
+        """测试扇入节点只调度一次，并看到归约合并后的状态"""
+        joined = []
+
+        def branch(name):
+            async def node(state, config):
+                return {"items": [name]}
+            return node
+
+        async def join(state, config):
+            joined.append(list(state["items"]))
+            return {"value": len(state["items"])}
+
+        engine = _build_engine(
+            {"a": branch("a"), "b": branch("b"), "c": branch("c"), "join": join},
+            [
+                (START, "a"), (START, "b"), (START, "c"),
+                ("a", "join"), ("b", "join"), ("c", "join"), ("join", END),
+            ],
+        )
+        engines.append(engine)
+
+        result = await engine.invoke({"items": ["start"], "value": 0})
+
+        assert joined == [["start", "a", "b", "c"]]
+        assert result == {"items": ["start", "a", "b", "c"], "value": 4}
+
+    @pytest.mark.asyncio
+    async def test_conflicting_last_value_writes_raise(self, engines):
+        """测试同一步内两个节点写入同一个无归约函数的键时报错"""
+        async def writer(state, config):
+            return {"value": 1}
+
+        engine = _build_engine(
+            {"a": writer, "b": writer},
+            [(START, "a"), (START, "b"), ("a", END), ("b", END)],
+        )
+        engines.append(engine)
+
+        with pytest.raises(InvalidUpdateError):
+            await engine.invoke({"items": [], "value": 0})
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_json_compatible_state(self, engines):
+        """测试流式输出的状态是普通字典"""
+        async def node(state, config):
+            return {"items": ["x"]}
+
+        engine = _build_engine({"node": node}, [(START, "node"), ("node", END)])
+        engines.append(engine)
+
+        events = [event async for event in engine.stream({"items": [], "value": 0})]
+
+        assert [event["node"] for event in events] == ["node"]
+        assert type(events[-1]["state"]) is dict
+        assert events[-1]["state"] == {"items": ["x"], "value": 0}
+
+    @pytest.mark.asyncio
+    async def test_cycle_hits_recursion_limit(self, engines):
+        """测试环路在达到步数上限时抛出GraphRecursionError"""
+        calls = []
+
+        async def loop(state, config):
+            calls.append(state["value"])
+            return {"value": state["value"] + 1}
+
+        engine = _build_engine({"loop": loop}, [(START, "loop"), ("loop", "loop")])
+        engines.append(engine)
+
+        with pytest.raises(GraphRecursionError):
+            await engine.invoke({"items": [], "value": 0}, {"recursion_limit": 3})
+
+        assert calls == [0, 1, 2]
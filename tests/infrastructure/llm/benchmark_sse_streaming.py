@@ -0,0 +1,156 @@
+"""SSE流式响应解析基准
+
+启动本地桩服务器，以任意大小的分块（事件会跨越分块边界、一个分块包含多个事件）
+推送 OpenAI 格式的 SSE token 流，对比：
+- 旧路径：stream_post 按 aiter_text 分块、假设每块恰好一行 "data: "
+- 新路径：stream_sse 基于 aiter_bytes 的按行增量解码
+
+输出每种路径实际收到的 token 数、首 token 延迟和 token 吞吐量。
+
+运行方式：
+    python -m tests.infrastructure.llm.benchmark_sse_streaming [--tokens N] [--runs N]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.infrastructure.llm.http_client.base_http_client import BaseHttpClient
+
+
+def _build_payload(tokens: int) -> bytes:
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": f"tok{i} "}}]}) + "\n\n"
+        for i in range(tokens)
+    ]
+    events.append("data: [DONE]\n\n")
+    return "".join(events).encode("utf-8")
+
+
+def _split_randomly(payload: bytes, seed: int = 7, min_size: int = 16, max_size: int = 512) -> List[bytes]:
+    """把负载切成随机大小的网络分块"""
+    rng = random.Random(seed)
+    chunks = []
+    position = 0
+    while position < len(payload):
+        size = rng.randint(min_size, max_size)
+        chunks.append(payload[position:position + size])
+        position += size
+    return chunks
+
+
+async def _start_stub_server(chunks: List[bytes]) -> asyncio.AbstractServer:
+    """启动返回分块编码SSE响应的桩服务器"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                # 读取请求头和请求体
+                header = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in header.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: text/event-stream\r\n"
+                    b"Transfer-Encoding: chunked\r\n\r\n"
+                )
+                for chunk in chunks:
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _extract(data: Dict[str, Any]) -> Optional[str]:
+    choices = data.get("choices") or []
+    if not choices:
+        return None
+    return choices[0].get("delta", {}).get("content")
+
+
+async def _legacy_stream(client: BaseHttpClient) -> AsyncIterator[str]:
+    """旧实现：假设每个文本分块恰好是一行 data"""
+    async for chunk in client.stream_post("chat/completions", {"stream": True}):
+        if chunk.startswith("data: "):
+            data_str = chunk[6:]
+            if data_str.strip() == "[DONE]":
+                break
+            try:
+                content = _extract(json.loads(data_str))
+            except json.JSONDecodeError:
+                continue
+            if content:
+                yield content
+
+
+async def _sse_stream(client: BaseHttpClient) -> AsyncIterator[str]:
+    """新实现：按SSE事件解析"""
+    async for event in client.stream_sse("chat/completions", {"stream": True}):
+        if event.data == "[DONE]":
+            break
+        try:
+            content = _extract(json.loads(event.data))
+        except json.JSONDecodeError:
+            continue
+        if content:
+            yield content
+
+
+async def _measure(client: BaseHttpClient, stream: Callable[[BaseHttpClient], AsyncIterator[str]]) -> Dict[str, float]:
+    start = time.perf_counter()
+    first_token: Optional[float] = None
+    received = 0
+    async for _ in stream(client):
+        if first_token is None:
+            first_token = time.perf_counter()
+        received += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "received": received,
+        "ttft_ms": ((first_token or start) - start) * 1000,
+        "tokens_per_s": received / elapsed if elapsed else 0.0,
+    }
+
+
+async def run(tokens: int, runs: int) -> None:
+    server = await _start_stub_server(_split_randomly(_build_payload(tokens)))
+    port = server.sockets[0].getsockname()[1]
+    client = BaseHttpClient(base_url=f"http://127.0.0.1:{port}", timeout=60.0)
+
+    try:
+        print(f"{'path':<10}{'received':>10}{'ttft ms':>10}{'tokens/s':>12}   (sent {tokens})")
+        for name, stream in (("legacy", _legacy_stream), ("sse", _sse_stream)):
+            results = [await _measure(client, stream) for _ in range(runs)]
+            best = max(results, key=lambda result: result["tokens_per_s"])
+            ttft = min(result["ttft_ms"] for result in results)
+            print(f"{name:<10}{best['received']:>10}{ttft:>10.2f}{best['tokens_per_s']:>12.0f}")
+    finally:
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SSE流式响应解析基准")
+    parser.add_argument("--tokens", type=int, default=20_000, help="每次响应推送的token数")
+    parser.add_argument("--runs", type=int, default=3, help="每种路径的运行次数")
+    args = parser.parse_args()
+    asyncio.run(run(args.tokens, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ from unittest.mock import Mock, patch, AsyncMock
 from typing import cast, AsyncGenerator
 from httpx import Response
 
-from src.infrastructure.llm.http_client import create_http_client
+from src.infrastructure.llm.http_client import create_http_client, aiter_sse_events
 from src.infrastructure.llm.models import LLMResponse, TokenUsage
 from src.infrastructure.messages import HumanMessage, AIMessage
 
@@ -197,26 +197,27 @@ class TestHttpClientIntegration:
     @pytest.mark.asyncio
     async def test_openai_streaming_integration(self):
         """测试OpenAI流式响应集成"""
-        # 模拟流式响应数据
+        # 模拟流式响应数据：按固定字节数分块，事件会跨越分块边界
         async def stream_generator():
-            """生成流式响应的异步生成器"""
-            stream_chunks = [
-                'data: {"choices": [{"delta": {"content": "Hello"}}]}\n',
-                'data: {"choices": [{"delta": {"content": "!"}}]}\n',
-                'data: {"choices": [{"delta": {"content": " How"}}]}\n',
-                'data: {"choices": [{"delta": {"content": " can"}}]}\n',
-                'data: {"choices": [{"delta": {"content": " I"}}]}\n',
-                'data: {"choices": [{"delta": {"content": " help"}}]}\n',
-                'data: {"choices": [{"delta": {"content": " you"}}]}\n',
-                'data: {"choices": [{"delta": {"content": "?"}}]}\n',
-                'data: [DONE]\n'
+            """生成流式响应字节块的异步生成器"""
+            stream_events = [
+                'data: {"choices": [{"delta": {"content": "Hello"}}]}\n\n',
+                'data: {"choices": [{"delta": {"content": "!"}}]}\n\n',
+                'data: {"choices": [{"delta": {"content": " How"}}]}\n\n',
+                'data: {"choices": [{"delta": {"content": " can"}}]}\n\n',
+                'data: {"choices": [{"delta": {"content": " I"}}]}\n\n',
+                'data: {"choices": [{"delta": {"content": " help"}}]}\n\n',
+                'data: {"choices": [{"delta": {"content": " you"}}]}\n\n',
+                'data: {"choices": [{"delta": {"content": "?"}}]}\n\n',
+                'data: [DONE]\n\n'
             ]
-            for chunk in stream_chunks:
-                yield chunk
+            payload = "".join(stream_events).encode("utf-8")
+            for i in range(0, len(payload), 7):
+                yield payload[i:i + 7]
         
         # 创建客户端
-        with patch('src.infrastructure.llm.http_client.openai_http_client.OpenAIHttpClient.stream_post') as mock_stream:
-            mock_stream.return_value = stream_generator()
+        with patch('src.infrastructure.llm.http_client.openai_http_client.OpenAIHttpClient.stream_sse') as mock_stream:
+            mock_stream.return_value = aiter_sse_events(stream_generator())
             
             client = create_http_client(
                 provider="openai",
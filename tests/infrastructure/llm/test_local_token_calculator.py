@@ -0,0 +1,278 @@
+"""通用Token计算器单元测试
+
+使用按空白切分的确定性编码器替代tiktoken，测试单条消息缓存、增量计数
+以及批量计数和批量缓存。
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.infrastructure.llm.token_calculators import LocalTokenCalculator, TiktokenConfig, TokenCache
+from src.infrastructure.messages.types import AIMessage, HumanMessage, SystemMessage
+from src.services.llm.token_calculation_service import TokenCalculationService
+
+
+class WhitespaceEncoding:
+    """按空白切分计数的编码器，记录逐条和批量编码的文本"""
+
+    name = "whitespace"
+
+    def __init__(self):
+        self.encoded = []
+        self.batches = []
+
+    def encode(self, text):
+        self.encoded.append(text)
+        return text.split()
+
+    def encode_batch(self, texts, num_threads=8):
+        self.batches.append(list(texts))
+        return [text.split() for text in texts]
+
+
+def _make_calculator(enable_cache=True):
+    calculator = LocalTokenCalculator(
+        tiktoken_config=TiktokenConfig(enable_fallback=False),
+        enable_cache=enable_cache
+    )
+    calculator._encoding = WhitespaceEncoding()
+    return calculator
+
+
+def _conversation(turns):
+    messages = [SystemMessage(content="you are a helpful assistant")]
+    for index in range(turns):
+        messages.append(HumanMessage(content=f"question number {index} please"))
+        messages.append(AIMessage(content=f"answer {index}"))
+    return messages
+
+
+@pytest.fixture
+def calculator():
+    return _make_calculator()
+
+
+class TestIncrementalCounting:
+    """测试增量计数"""
+
+    def test_incremental_equals_full_count(self, calculator):
+        """测试逐轮增量计数与全量计数一致"""
+        messages = _conversation(4)
+        total = calculator.count_messages_tokens(messages[:1])
+        count = 1
+        for end in (3, 4, 7, len(messages)):
+            total = calculator.count_appended_messages_tokens(total, messages[count:end])
+            count = end
+            assert total == _make_calculator().count_messages_tokens(messages[:end])
+
+    def test_incremental_from_empty_prefix(self, calculator):
+        """测试空前缀的增量计数包含回复开销"""
+        messages = _conversation(1)
+
+        assert calculator.count_appended_messages_tokens(0, messages) == calculator.count_messages_tokens(messages)
+
+    def test_incremental_encodes_only_appended(self, calculator):
+        """测试增量计数只编码追加的消息"""
+        messages = _conversation(2)
+        total = calculator.count_messages_tokens(messages[:3])
+        calculator._encoding.encoded.clear()
+
+        calculator.count_appended_messages_tokens(total, messages[3:])
+
+        assert calculator._encoding.encoded == [message.content for message in messages[3:]]
+
+    def test_message_name_counted(self, calculator):
+        """测试带名称的消息计入名称开销"""
+        named = HumanMessage(content="hello there", name="alice")
+        plain = HumanMessage(content="hello there")
+
+        difference = calculator.count_messages_tokens([named]) - calculator.count_messages_tokens([plain])
+        assert difference == calculator.tokens_per_name + 1
+
+
+class TestMessageTokenCache:
+    """测试单条消息token缓存"""
+
+    def test_cache_hit_skips_encoding(self, calculator):
+        """测试重复计数命中缓存且不重新编码"""
+        messages = _conversation(2)
+        first = calculator.count_messages_tokens(messages)
+        misses = calculator._stats.cache_misses
+        calculator._encoding.encoded.clear()
+
+        assert calculator.count_messages_tokens(messages) == first
+        assert calculator._encoding.encoded == []
+        assert calculator._stats.cache_misses == misses
+        assert calculator._stats.cache_hits >= len(messages)
+
+    def test_changed_content_misses(self, calculator):
+        """测试内容变化的消息未命中缓存"""
+        calculator.count_messages_tokens([HumanMessage(content="one two")])
+        calculator._encoding.encoded.clear()
+
+        assert calculator.count_messages_tokens([HumanMessage(content="one two three")]) == (
+            calculator.tokens_per_message + 3 + calculator.reply_tokens
+        )
+        assert calculator._encoding.encoded == ["one two three"]
+
+    def test_cache_bounded(self):
+        """测试缓存容量受配置限制"""
+        calculator = LocalTokenCalculator(
+            tiktoken_config=TiktokenConfig(enable_fallback=False, message_cache_max_size=2)
+        )
+        calculator._encoding = WhitespaceEncoding()
+
+        calculator.count_messages_tokens([HumanMessage(content=f"m {i}") for i in range(5)])
+
+        assert len(calculator._message_tokens) == 2
+
+    def test_cache_disabled(self):
+        """测试禁用缓存时每次都编码且不写入缓存"""
+        calculator = _make_calculator(enable_cache=False)
+        messages = _conversation(1)
+
+        first = calculator.count_messages_tokens(messages)
+        calculator._encoding.encoded.clear()
+
+        assert calculator.count_messages_tokens(messages) == first
+        assert calculator._encoding.encoded == [message.content for message in messages]
+        assert len(calculator._message_tokens) == 0
+        assert calculator._stats.cache_hits == 0
+
+
+class TestTokenCalculationServiceMessages:
+    """测试Token计算服务的增量计数"""
+
+    @pytest.fixture
+    def service(self, calculator):
+        service = TokenCalculationService("openai")
+        with patch.object(service._factory, "get_calculator", return_value=calculator):
+            yield service
+
+    def test_incremental_matches_full(self, service):
+        """测试服务增量计数与全量计数一致"""
+        messages = _conversation(3)
+        previous_total = service.calculate_messages_tokens(messages[:3], "openai", "gpt-4")
+
+        assert service.calculate_messages_tokens_incremental(
+            messages, 3, previous_total, "openai", "gpt-4"
+        ) == service.calculate_messages_tokens(messages, "openai", "gpt-4")
+
+    def test_incremental_invalid_prefix_falls_back(self, service):
+        """测试前缀条数超出消息数时回退到全量计数"""
+        messages = _conversation(1)
+
+        assert service.calculate_messages_tokens_incremental(
+            messages, 10, 999, "openai", "gpt-4"
+        ) == service.calculate_messages_tokens(messages, "openai", "gpt-4")
+
+
+BATCH_TEXTS = [
+    "alpha beta gamma",
+    "",
+    "上下文 工作流 节点",
+    "alpha beta gamma",
+    "one",
+    "token " * 40,
+    "one",
+]
+
+
+class TestBatchCounting:
+    """测试批量计数"""
+
+    @pytest.mark.parametrize("batch_min_size", [1, 100])
+    def test_batch_matches_single(self, batch_min_size):
+        """测试批量计数与逐条计数一致（批量编码和逐条编码两条路径）"""
+        batch_calculator = LocalTokenCalculator(
+            tiktoken_config=TiktokenConfig(enable_fallback=False, batch_min_size=batch_min_size)
+        )
+        batch_calculator._encoding = WhitespaceEncoding()
+        single_calculator = _make_calculator()
+
+        assert batch_calculator.count_tokens_batch(BATCH_TEXTS) == [
+            single_calculator.count_tokens(text) for text in BATCH_TEXTS
+        ]
+        assert bool(batch_calculator._encoding.batches) == (batch_min_size == 1)
+
+    def test_duplicates_encoded_once(self):
+        """测试同一批中的重复文本只编码一次"""
+        calculator = LocalTokenCalculator(
+            tiktoken_config=TiktokenConfig(enable_fallback=False, batch_min_size=1)
+        )
+        calculator._encoding = WhitespaceEncoding()
+
+        calculator.count_tokens_batch(BATCH_TEXTS)
+
+        assert calculator._encoding.batches == [
+            ["alpha beta gamma", "上下文 工作流 节点", "one", "token " * 40]
+        ]
+
+    def test_second_batch_served_from_cache(self, calculator):
+        """测试重复批量计数全部命中缓存，不再编码"""
+        first = calculator.count_tokens_batch(BATCH_TEXTS)
+        calculator._encoding.encoded.clear()
+        calculator._encoding.batches.clear()
+
+        assert calculator.count_tokens_batch(BATCH_TEXTS) == first
+        assert calculator._encoding.encoded == []
+        assert calculator._encoding.batches == []
+        assert calculator.cache.get_stats().hits >= len(BATCH_TEXTS) - 1
+
+    def test_batch_and_single_share_cache(self, calculator):
+        """测试批量计数与单条计数共用缓存"""
+        calculator.count_tokens("one two")
+        calculator._encoding.encoded.clear()
+
+        assert calculator.count_tokens_batch(["one two", "three"]) == [2, 1]
+        assert calculator._encoding.encoded == ["three"]
+
+        calculator._encoding.encoded.clear()
+        assert calculator.count_tokens("three") == 1
+        assert calculator._encoding.encoded == []
+
+    def test_batch_without_cache(self):
+        """测试禁用缓存时批量计数仍去重且结果正确"""
+        calculator = _make_calculator(enable_cache=False)
+
+        assert calculator.count_tokens_batch(["a b", "a b", "c"]) == [2, 2, 1]
+        assert calculator._encoding.encoded == ["a b", "c"]
+
+    def test_batch_without_encoding(self):
+        """测试编码器不可用时未缓存的文本返回None"""
+        calculator = LocalTokenCalculator(tiktoken_config=TiktokenConfig(enable_fallback=False))
+
+        assert calculator.count_tokens_batch(["a b", ""]) == [None, 0]
+
+
+class TestTokenCacheBatch:
+    """测试Token缓存的批量读写"""
+
+    def test_put_batch_then_get(self):
+        """测试批量写入后可逐条和批量读取"""
+        cache = TokenCache()
+        cache.put_batch([("a", "m", 1, None, None), ("b", "m", 2, None, None)])
+
+        assert cache.get("a", "m") == 1
+        assert cache.get_batch([("a", "m", None), ("b", "m", None), ("c", "m", None)]) == [1, 2, None]
+
+    def test_batch_keys_match_single_keys(self):
+        """测试批量与逐条读写使用相同的键"""
+        cache = TokenCache()
+        cache.put("a", "m", 5)
+        cache.put_batch([("b", "other", 7, None, None)])
+
+        assert cache.get_batch([("a", "m", None)]) == [5]
+        assert cache.get("b", "other") == 7
+        assert cache.get("b", "m") is None
+
+    def test_get_batch_stats(self):
+        """测试批量读取计入命中和未命中统计"""
+        cache = TokenCache()
+        cache.put_batch([("a", "m", 1, None, None)])
+
+        cache.get_batch([("a", "m", None), ("a", "m", None), ("x", "m", None)])
+
+        stats = cache.get_stats()
+        assert (stats.hits, stats.misses) == (2, 1)
@@ -0,0 +1,76 @@
+"""SSE解码器测试
+
+测试SSEDecoder对分块边界、多事件分块和各种行结束符的处理。
+"""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.llm.http_client.sse_decoder import SSEDecoder, aiter_sse_events
+
+
+def _decode(chunks):
+    decoder = SSEDecoder()
+    events = []
+    for chunk in chunks:
+        events.extend(decoder.feed(chunk))
+    events.extend(decoder.flush())
+    return events
+
+
+class TestSSEDecoder:
+    """SSE解码器测试类"""
+    
+    def test_multiple_events_in_one_chunk(self):
+        """测试一个分块包含多个事件"""
+        events = _decode([b'data: {"a": 1}\n\ndata: {"a": 2}\n\ndata: [DONE]\n\n'])
+        
+        assert [event.data for event in events] == ['{"a": 1}', '{"a": 2}', "[DONE]"]
+        assert all(event.event == "message" for event in events)
+    
+    def test_event_split_across_chunks(self):
+        """测试事件跨越分块边界（逐字节输入）"""
+        payload = "event: content_block_delta\ndata: {\"text\": \"你好\"}\n\n".encode("utf-8")
+        events = _decode([payload[i:i + 1] for i in range(len(payload))])
+        
+        assert len(events) == 1
+        assert events[0].event == "content_block_delta"
+        assert events[0].data == '{"text": "你好"}'
+    
+    @pytest.mark.parametrize("newline", [b"\n", b"\r\n", b"\r"])
+    def test_line_endings(self, newline):
+        """测试LF、CRLF和CR行结束符"""
+        payload = newline.join([b"id: 7", b"data: first", b"data: second", b"", b""])
+        # 在每个位置拆分，覆盖CRLF被拆开的情况
+        for split in range(len(payload) + 1):
+            events = _decode([payload[:split], payload[split:]])
+            
+            assert len(events) == 1
+            assert events[0].data == "first\nsecond"
+            assert events[0].id == "7"
+    
+    def test_comments_and_unknown_fields_are_ignored(self):
+        """测试注释行和未知字段"""
+        events = _decode([b": keep-alive\n\nfoo: bar\ndata:no-space\nretry: 3000\n\n"])
+        
+        assert len(events) == 1
+        assert events[0].data == "no-space"
+        assert events[0].retry == 3000
+    
+    def test_flush_dispatches_unterminated_event(self):
+        """测试流结束时分发未以空行结束的事件"""
+        events = _decode([b'data: {"done": true}'])
+        
+        assert [event.data for event in events] == ['{"done": true}']
+    
+    def test_aiter_sse_events(self):
+        """测试从异步字节流解码事件"""
+        async def byte_stream():
+            for chunk in (b"data: a\n", b"\ndata: ", b"b\n\n"):
+                yield chunk
+        
+        async def collect():
+            return [event.data async for event in aiter_sse_events(byte_stream())]
+        
+        assert asyncio.run(collect()) == ["a", "b"]
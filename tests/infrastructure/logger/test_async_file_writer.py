@@ -0,0 +1,85 @@
+"""异步批量日志写入器测试
+
+测试批量写入、flush屏障、写线程内的日志轮转和队列满时的处理策略。
+"""
+
+import os
+import threading
+
+from src.infrastructure.logger.core.async_file_writer import AsyncLogFileWriter, OverflowPolicy
+
+
+class TestAsyncLogFileWriter:
+    """异步批量日志写入器测试类"""
+    
+    def test_concurrent_writes_are_all_flushed(self, tmp_path):
+        """测试多线程写入的记录在flush后全部落盘且保持每个线程内的顺序"""
+        filename = str(tmp_path / "app.log")
+        writer = AsyncLogFileWriter(filename, batch_size=64, flush_interval=10)
+        
+        def work(worker_id):
+            for i in range(500):
+                writer.write(f"{worker_id}:{i}")
+        
+        threads = [threading.Thread(target=work, args=(worker_id,)) for worker_id in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert writer.flush(timeout=5)
+        with open(filename, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        writer.close()
+        
+        assert len(lines) == 2000
+        for worker_id in range(4):
+            indexes = [int(line.split(":")[1]) for line in lines if line.startswith(f"{worker_id}:")]
+            assert indexes == list(range(500))
+        assert writer.get_stats()["batches"] < 2000
+    
+    def test_rotation_in_writer_thread(self, tmp_path):
+        """测试写线程按max_bytes轮转并保留指定数量的备份"""
+        filename = str(tmp_path / "rotate.log")
+        writer = AsyncLogFileWriter(filename, max_bytes=1000, backup_count=2)
+        for _ in range(300):
+            writer.write("x" * 20)
+        writer.close()
+        
+        assert sorted(os.listdir(tmp_path)) == ["rotate.log", "rotate.log.1", "rotate.log.2"]
+        assert os.path.getsize(filename) <= 1000
+        assert writer.get_stats()["rotations"] > 0
+    
+    def test_drop_new_when_queue_full(self, tmp_path):
+        """测试DROP_NEW策略在队列满时丢弃新记录"""
+        writer = AsyncLogFileWriter(
+            str(tmp_path / "drop.log"),
+            queue_size=5,
+            overflow_policy=OverflowPolicy.DROP_NEW
+        )
+        # 持有条件变量阻止写线程取走记录，模拟写线程跟不上
+        with writer._condition:
+            results = [writer.write(str(i)) for i in range(10)]
+        writer.close()
+        
+        assert results == [True] * 5 + [False] * 5
+        assert writer.get_stats()["dropped"] == 5
+    
+    def test_block_policy_applies_backpressure(self, tmp_path):
+        """测试BLOCK策略等待写线程腾出空间而不丢弃记录"""
+        filename = str(tmp_path / "block.log")
+        writer = AsyncLogFileWriter(filename, queue_size=5, batch_size=2)
+        for i in range(100):
+            assert writer.write(str(i))
+        writer.close()
+        
+        with open(filename, encoding="utf-8") as f:
+            assert f.read().split() == [str(i) for i in range(100)]
+        assert writer.get_stats()["dropped"] == 0
+    
+    def test_write_after_close_is_rejected(self, tmp_path):
+        """测试关闭后不再接受记录"""
+        writer = AsyncLogFileWriter(str(tmp_path / "closed.log"))
+        writer.close()
+        
+        assert writer.write("late") is False
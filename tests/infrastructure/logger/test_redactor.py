@@ -0,0 +1,91 @@
+"""日志脱敏器单元测试
+
+测试日志脱敏通过合并扫描完成、结果与逐个模式替换一致，以及模式变化和哈希替换时的处理。
+"""
+
+import pytest
+
+from src.infrastructure.logger.core.log_level import LogLevel
+from src.infrastructure.logger.core.redactor import CustomLogRedactor, LogRedactor
+
+
+class TestLogRedactor:
+    """日志脱敏器测试类"""
+
+    @pytest.mark.parametrize("text", [
+        "request finished",
+        "contact john.doe@example.com for details",
+        "call 13812345678 now",
+        'password: "hunter2", user=admin',
+        '{"api_key": "abcdefghijklmnop1234", "token": "' + "t" * 24 + '"}',
+        "Authorization: Bearer " + "x" * 32,
+        "key sk-" + "a" * 30,
+        "jwt eyJhbGciOi.eyJzdWIiOi.c2lnbmF0dXJl",
+    ])
+    def test_matches_sequential_substitution(self, text):
+        """测试合并扫描结果与逐个模式替换一致"""
+        redactor = LogRedactor()
+
+        assert redactor.redact(text) == redactor._redact_sequential(text)
+        assert redactor._get_scanner() is not None
+
+    def test_single_scan(self):
+        """测试每条日志只执行一次合并正则替换，不再逐个模式替换"""
+        redactor = LogRedactor()
+        calls = []
+        original = redactor._redact_sequential
+        redactor._redact_sequential = lambda text: calls.append(text) or original(text)
+
+        assert redactor.redact("password=hunter2 mail a@b.com") == "password=***PASSWORD*** mail ***@***.***"
+        assert calls == []
+
+    def test_leftmost_match_wins(self):
+        """测试最靠左的匹配优先：身份证号整体脱敏，而不是先被手机号模式截取一段"""
+        redactor = LogRedactor()
+
+        assert redactor.redact("身份证 110101199003071234") == "身份证 ***************"
+
+    def test_debug_not_redacted(self):
+        """测试DEBUG级别不脱敏"""
+        assert LogRedactor().redact("password=hunter2", LogLevel.DEBUG) == "password=hunter2"
+
+    def test_add_and_remove_pattern(self):
+        """测试添加和移除模式后合并扫描随之更新"""
+        redactor = LogRedactor()
+        redactor.add_pattern(r"order-\d+", "order-***")
+
+        assert redactor.redact("paid order-42") == "paid order-***"
+
+        assert redactor.remove_pattern(r"order-\d+")
+        assert redactor.redact("shipped order-43") == "shipped order-43"
+
+    def test_clear_patterns(self):
+        """测试清除所有模式后原样返回"""
+        redactor = LogRedactor()
+        redactor.clear_patterns()
+
+        assert redactor.redact("password=hunter2") == "password=hunter2"
+
+    def test_hash_sensitive_falls_back(self):
+        """测试需要哈希替换时回退为逐个模式替换"""
+        redactor = LogRedactor(hash_sensitive=True)
+        redactor.add_pattern(r"user-[a-z]{12}")
+
+        redacted = redactor.redact("login user-abcdefghijkl")
+
+        assert redactor._get_scanner() is None
+        assert redacted.startswith("login use")
+        assert redacted.endswith("jkl")
+        assert "abcdefghi" not in redacted
+
+    def test_custom_config(self):
+        """测试从配置加载的模式使用合并扫描"""
+        redactor = CustomLogRedactor({
+            "patterns": [
+                {"pattern": r"(user=)\w+", "replacement": r"\1<user>"},
+                {"pattern": r"\d{4}-\d{4}", "replacement": "####"},
+            ]
+        })
+
+        assert redactor.redact("user=alice card 1234-5678") == "user=<user> card ####"
+        assert redactor._get_scanner() is not None
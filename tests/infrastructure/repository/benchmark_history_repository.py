@@ -0,0 +1,117 @@
+"""SQLite History Repository连接复用基准
+
+对比每次操作新建连接（旧实现）与按数据库路径复用长连接（读连接池 + 串行写连接、
+WAL、语句缓存）两种方式下，SQLiteHistoryRepository 的写入、按ID读取和条件查询吞吐量。
+
+运行方式：
+    python -m tests.infrastructure.repository.benchmark_history_repository [--ops N]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from src.core.history.entities import TokenUsageRecord
+from src.infrastructure.repository.history.sqlite_repository import SQLiteHistoryRepository
+from src.infrastructure.repository.utils import sqlite_utils
+from src.infrastructure.repository.utils.sqlite_utils import SQLiteUtils
+
+
+class _PerCallConnectionManager:
+    """模拟旧实现：每次操作都新建连接"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _run(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            result = func(conn)
+            conn.commit()
+            return result
+
+    write = _run
+    read = _run
+
+    def close(self) -> None:
+        pass
+
+
+def _make_record(i: int) -> TokenUsageRecord:
+    return TokenUsageRecord(
+        record_id=f"bench-{i}",
+        session_id=f"session-{i % 20}",
+        workflow_id=f"workflow-{i % 5}",
+        timestamp=datetime.now(),
+        model="gpt-4o-mini",
+        provider="openai",
+        prompt_tokens=100 + i % 50,
+        completion_tokens=20 + i % 10,
+        total_tokens=120 + i % 60,
+    )
+
+
+async def _ops_per_sec(func: Callable[[int], Any], ops: int) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        await func(i)
+    return ops / (time.perf_counter() - start)
+
+
+async def bench_repository(db_path: str, ops: int, pooled: bool) -> Dict[str, float]:
+    """测量History Repository各操作的吞吐量
+
+    Args:
+        db_path: 数据库文件路径
+        ops: 每项操作的执行次数
+        pooled: 是否使用复用的长连接
+
+    Returns:
+        各操作的每秒操作数
+    """
+    SQLiteUtils.close_connections(db_path)
+    if not pooled:
+        sqlite_utils._managers[sqlite_utils._manager_key(db_path)] = _PerCallConnectionManager(db_path)
+
+    repository = SQLiteHistoryRepository({"db_path": db_path})
+    try:
+        return {
+            "save_record": await _ops_per_sec(
+                lambda i: repository.save_record(_make_record(i)), ops
+            ),
+            "get_record_by_id": await _ops_per_sec(
+                lambda i: repository.get_record_by_id(f"bench-{i}"), ops
+            ),
+            "get_records": await _ops_per_sec(
+                lambda i: repository.get_records(session_id=f"session-{i % 20}", limit=20), ops
+            ),
+        }
+    finally:
+        SQLiteUtils.close_connections(db_path)
+
+
+async def run(ops: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        before = await bench_repository(os.path.join(tmp_dir, "before.db"), ops, pooled=False)
+        after = await bench_repository(os.path.join(tmp_dir, "after.db"), ops, pooled=True)
+
+    print(f"{'op':<20}{'before ops/s':>14}{'after ops/s':>14}{'speedup':>10}")
+    for op, before_rate in before.items():
+        after_rate = after[op]
+        print(f"{op:<20}{before_rate:>14.0f}{after_rate:>14.0f}{after_rate / before_rate:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite History Repository连接复用基准")
+    parser.add_argument("--ops", type=int, default=2000, help="每项操作的执行次数")
+    args = parser.parse_args()
+    asyncio.run(run(args.ops))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""History Repository批量保存单元测试
+
+测试批量保存返回的逐条结果、失败记录的隔离以及内存实现的容量清理。
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.history.entities import TokenUsageRecord
+from src.infrastructure.repository.history.memory_repository import MemoryHistoryRepository
+from src.infrastructure.repository.history.sqlite_repository import SQLiteHistoryRepository
+from src.infrastructure.repository.utils.sqlite_utils import SQLiteUtils
+from src.interfaces.repository import RepositoryError
+
+
+BASE_TIME = datetime(2025, 3, 1)
+
+
+class _UnserializableRecord(TokenUsageRecord):
+    """序列化时抛出异常的记录"""
+
+    def to_dict(self):
+        raise ValueError("无法序列化")
+
+
+def _token_record(index, record_class=TokenUsageRecord):
+    return record_class(
+        record_id=f"record-{index}",
+        session_id="session-1",
+        workflow_id="wf-1",
+        timestamp=BASE_TIME + timedelta(minutes=index),
+        model="gpt-4",
+        provider="openai",
+        prompt_tokens=20,
+        completion_tokens=10,
+        total_tokens=30,
+    )
+
+
+def _stored_ids(repository):
+    if isinstance(repository, MemoryHistoryRepository):
+        return set(repository._storage)
+    rows = SQLiteUtils.execute_query(repository.db_path, "SELECT record_id FROM history_records")
+    return {row[0] for row in rows}
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    yield db_path
+    SQLiteUtils.close_connections(db_path)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, sqlite_path):
+    if request.param == "memory":
+        return MemoryHistoryRepository({})
+    return SQLiteHistoryRepository({"db_path": sqlite_path})
+
+
+class TestSaveRecordsResults:
+    """测试批量保存的逐条结果"""
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self, repository):
+        """测试空批次返回空结果"""
+        assert await repository.save_records([]) == []
+
+    @pytest.mark.asyncio
+    async def test_results_follow_input_order(self, repository):
+        """测试结果与输入顺序一一对应，失败的记录不影响其余记录"""
+        records = [
+            _token_record(0),
+            _token_record(1, _UnserializableRecord),
+            _token_record(2),
+        ]
+
+        results = await repository.save_records(records)
+
+        assert results == [True, False, True]
+        assert _stored_ids(repository) == {"record-0", "record-2"}
+
+    @pytest.mark.asyncio
+    async def test_all_records_fail(self, repository):
+        """测试全部记录失败时逐条返回False"""
+        records = [_token_record(i, _UnserializableRecord) for i in range(3)]
+
+        assert await repository.save_records(records) == [False, False, False]
+        assert _stored_ids(repository) == set()
+
+
+class TestSQLiteSaveRecords:
+    """测试SQLite实现的批量写入失败"""
+
+    @pytest.mark.asyncio
+    async def test_write_failure_rolls_back_batch(self, sqlite_path, monkeypatch):
+        """测试写入失败时整批回滚并抛出RepositoryError"""
+        repository = SQLiteHistoryRepository({"db_path": sqlite_path})
+        original = SQLiteUtils.insert_or_replace_many
+
+        def _fail_after_write(db_path, table, rows):
+            def _write(conn):
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {table} (record_id, timestamp, data) VALUES (?, ?, ?)",
+                    ("partial", BASE_TIME.isoformat(), "{}"),
+                )
+                raise RuntimeError("写入中断")
+            return SQLiteUtils.get_connection_manager(db_path).write(_write)
+
+        monkeypatch.setattr(SQLiteUtils, "insert_or_replace_many", staticmethod(_fail_after_write))
+        with pytest.raises(RepositoryError):
+            await repository.save_records([_token_record(0), _token_record(1)])
+        monkeypatch.setattr(SQLiteUtils, "insert_or_replace_many", staticmethod(original))
+
+        assert _stored_ids(repository) == set()
+
+
+class TestMemorySaveRecords:
+    """测试内存实现批量保存时的统计和容量清理"""
+
+    @pytest.mark.asyncio
+    async def test_failed_records_excluded_from_statistics(self):
+        """测试失败的记录不计入工作流统计"""
+        repository = MemoryHistoryRepository({})
+        records = [_token_record(0), _token_record(1, _UnserializableRecord)]
+
+        await repository.save_records(records)
+        stats = await repository.get_workflow_token_stats("wf-1")
+
+        assert sum(item.total_tokens for item in stats) == 30
+        assert sum(item.request_count for item in stats) == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_matches_sequential_saves(self):
+        """测试批量保存与逐条保存清理掉相同的记录"""
+        records = [_token_record(i) for i in range(25)]
+        batched = MemoryHistoryRepository({"max_records": 10})
+        sequential = MemoryHistoryRepository({"max_records": 10})
+
+        results = await batched.save_records(records)
+        for record in records:
+            await sequential.save_record(record)
+
+        assert results == [True] * 25
+        assert set(batched._storage) == set(sequential._storage)
+        assert len(batched._storage) <= 11
@@ -0,0 +1,337 @@
+"""History Repository时间桶统计单元测试
+
+测试小时/天时间桶划分、累加写入、成本记录计入、已有历史数据的回填以及由现存记录重建。
+"""
+
+import logging
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pytest
+
+from src.core.history.entities import (
+    CostRecord, RollupGranularity, TokenUsageRecord, WorkflowTokenStatistics
+)
+from src.infrastructure.repository.history.memory_repository import MemoryHistoryRepository
+from src.infrastructure.repository.history.sqlite_repository import SQLiteHistoryRepository
+from src.infrastructure.repository.utils.sqlite_utils import SQLiteUtils
+from src.services.history.manager import HistoryManager
+from src.services.history.statistics_service import HistoryStatisticsService
+
+
+DAY_START = datetime(2025, 3, 1)
+
+
+def _token_record(record_id, timestamp, total_tokens=30, workflow_id="wf-1", model="gpt-4"):
+    return TokenUsageRecord(
+        record_id=record_id,
+        session_id="session-1",
+        workflow_id=workflow_id,
+        timestamp=timestamp,
+        model=model,
+        provider="openai",
+        prompt_tokens=total_tokens - 10,
+        completion_tokens=10,
+        total_tokens=total_tokens,
+    )
+
+
+def _cost_record(record_id, timestamp, total_cost, workflow_id="wf-1", model="gpt-4"):
+    return CostRecord(
+        record_id=record_id,
+        session_id="session-1",
+        workflow_id=workflow_id,
+        timestamp=timestamp,
+        model=model,
+        provider="openai",
+        prompt_tokens=20,
+        completion_tokens=10,
+        total_tokens=30,
+        total_cost=total_cost,
+    )
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    yield db_path
+    SQLiteUtils.close_connections(db_path)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, sqlite_path):
+    if request.param == "memory":
+        return MemoryHistoryRepository({})
+    return SQLiteHistoryRepository({"db_path": sqlite_path})
+
+
+class TestRollupGranularity:
+    """测试时间桶粒度"""
+
+    def test_bucket_start(self):
+        """测试小时和天时间桶的起始时间"""
+        timestamp = datetime(2025, 3, 1, 13, 45, 12, 500)
+
+        assert RollupGranularity.HOUR.bucket_start(timestamp) == datetime(2025, 3, 1, 13)
+        assert RollupGranularity.DAY.bucket_start(timestamp) == datetime(2025, 3, 1)
+
+    def test_iter_buckets(self):
+        """测试时间范围内的时间桶按顺序生成且包含首尾"""
+        buckets = list(RollupGranularity.HOUR.iter_buckets(
+            datetime(2025, 3, 1, 22, 30), datetime(2025, 3, 2, 1, 0)
+        ))
+
+        assert buckets == [
+            datetime(2025, 3, 1, 22), datetime(2025, 3, 1, 23),
+            datetime(2025, 3, 2, 0), datetime(2025, 3, 2, 1),
+        ]
+
+
+class TestWorkflowTokenStatisticsFromRecord:
+    """测试由单条记录创建增量统计"""
+
+    def test_token_record_counts_tokens_and_request(self):
+        """测试Token使用记录计入token数量和请求数"""
+        delta = WorkflowTokenStatistics.from_record(_token_record("t-1", DAY_START, total_tokens=50))
+
+        assert (delta.total_tokens, delta.request_count, delta.total_cost) == (50, 1, 0.0)
+        assert delta.period_start == DAY_START
+
+    def test_cost_record_counts_cost_only(self):
+        """测试成本记录只计入成本"""
+        delta = WorkflowTokenStatistics.from_record(_cost_record("c-1", DAY_START, 0.25))
+
+        assert (delta.total_tokens, delta.request_count, delta.total_cost) == (0, 0, 0.25)
+        assert delta.period_start == DAY_START
+
+    def test_record_without_workflow(self):
+        """测试缺少工作流ID的记录不产生增量"""
+        assert WorkflowTokenStatistics.from_record(_token_record("t-1", DAY_START, workflow_id=None)) is None
+
+    def test_from_record_data_matches_from_record(self):
+        """测试由序列化的记录数据创建的增量与由记录创建的一致"""
+        for record in (_token_record("t-1", DAY_START, total_tokens=50), _cost_record("c-1", DAY_START, 0.25)):
+            delta = WorkflowTokenStatistics.from_record_data(record.to_dict())
+            expected = WorkflowTokenStatistics.from_record(record)
+
+            assert (delta.total_tokens, delta.request_count, delta.total_cost) == (
+                expected.total_tokens, expected.request_count, expected.total_cost
+            )
+            assert delta.period_start == DAY_START
+
+    def test_from_record_data_invalid_timestamp(self):
+        """测试记录数据的时间戳无法解析时抛出ValueError"""
+        data = _token_record("t-1", DAY_START).to_dict()
+        data.pop("_timestamp", None)
+        data["timestamp"] = None
+
+        with pytest.raises(ValueError):
+            WorkflowTokenStatistics.from_record_data(data)
+
+
+class TestTokenRollups:
+    """测试时间桶统计的写入和查询"""
+
+    @pytest.mark.asyncio
+    async def test_hour_and_day_buckets(self, repository):
+        """测试同一增量同时写入所在的小时桶和天桶"""
+        for record_id, hour in (("t-1", 9), ("t-2", 9), ("t-3", 15)):
+            timestamp = DAY_START.replace(hour=hour, minute=20)
+            await repository.update_token_rollups(
+                WorkflowTokenStatistics.from_record(_token_record(record_id, timestamp))
+            )
+
+        hourly = await repository.get_token_rollups(RollupGranularity.HOUR, workflow_id="wf-1")
+        assert [(r.period_start, r.total_tokens, r.request_count) for r in hourly] == [
+            (DAY_START.replace(hour=9), 60, 2),
+            (DAY_START.replace(hour=15), 30, 1),
+        ]
+        assert hourly[0].period_end == DAY_START.replace(hour=10)
+
+        daily = await repository.get_token_rollups(RollupGranularity.DAY, workflow_id="wf-1")
+        assert [(r.period_start, r.total_tokens, r.request_count) for r in daily] == [(DAY_START, 90, 3)]
+
+    @pytest.mark.asyncio
+    async def test_upsert_accumulates_per_model(self, repository):
+        """测试相同桶的增量累加，不同模型分别统计"""
+        timestamp = DAY_START.replace(hour=10)
+        await repository.update_token_rollups(
+            WorkflowTokenStatistics.from_record(_token_record("t-1", timestamp, total_tokens=40))
+        )
+        await repository.update_token_rollups(
+            WorkflowTokenStatistics.from_record(_token_record("t-2", timestamp, total_tokens=60))
+        )
+        await repository.update_token_rollups(
+            WorkflowTokenStatistics.from_record(_token_record("t-3", timestamp, model="claude"))
+        )
+        await repository.update_token_rollups(
+            WorkflowTokenStatistics.from_record(_cost_record("c-1", timestamp, 0.5))
+        )
+
+        rollups = await repository.get_token_rollups(RollupGranularity.HOUR, model="gpt-4")
+        assert len(rollups) == 1
+        assert rollups[0].total_tokens == 100
+        assert rollups[0].total_prompt_tokens == 80
+        assert rollups[0].request_count == 2
+        assert rollups[0].total_cost == pytest.approx(0.5)
+
+        assert len(await repository.get_token_rollups(RollupGranularity.HOUR)) == 2
+
+    @pytest.mark.asyncio
+    async def test_time_range_filter(self, repository):
+        """测试按时间范围查询，起始时间按所在桶对齐"""
+        for day in (1, 2, 3):
+            await repository.update_token_rollups(
+                WorkflowTokenStatistics.from_record(_token_record(f"t-{day}", datetime(2025, 3, day, 12)))
+            )
+
+        rollups = await repository.get_token_rollups(
+            RollupGranularity.DAY,
+            start_time=datetime(2025, 3, 2, 18),
+            end_time=datetime(2025, 3, 3, 6)
+        )
+        assert [r.period_start for r in rollups] == [datetime(2025, 3, 2), datetime(2025, 3, 3)]
+
+    @pytest.mark.asyncio
+    async def test_history_manager_feeds_cost(self, repository):
+        """测试通过历史管理器记录的Token使用和成本都进入时间桶"""
+        manager = HistoryManager(
+            repository, enable_async_batching=False, logger=logging.getLogger(__name__)
+        )
+        timestamp = DAY_START.replace(hour=8)
+
+        await manager.record_token_usage(_token_record("t-1", timestamp))
+        await manager.record_cost(_cost_record("c-1", timestamp, 0.125))
+
+        rollups = await repository.get_token_rollups(RollupGranularity.DAY, workflow_id="wf-1")
+        assert len(rollups) == 1
+        assert rollups[0].total_tokens == 30
+        assert rollups[0].request_count == 1
+        assert rollups[0].total_cost == pytest.approx(0.125)
+
+
+class TestTokenRollupBackfill:
+    """测试SQLite时间桶统计的回填"""
+
+    @pytest.mark.asyncio
+    async def test_backfill_existing_history(self, sqlite_path):
+        """测试时间桶表为空时由已有的Token使用和成本记录回填"""
+        repository = SQLiteHistoryRepository({"db_path": sqlite_path})
+        await repository.save_records([
+            _token_record("t-1", DAY_START.replace(hour=9)),
+            _token_record("t-2", DAY_START.replace(hour=11), total_tokens=70),
+            _cost_record("c-1", DAY_START.replace(hour=9), 0.5),
+            _token_record("t-3", DAY_START.replace(hour=9), workflow_id=None),
+        ])
+        assert await repository.get_token_rollups(RollupGranularity.DAY) == []
+
+        reopened = SQLiteHistoryRepository({"db_path": sqlite_path})
+
+        daily = await reopened.get_token_rollups(RollupGranularity.DAY, workflow_id="wf-1")
+        assert [(r.total_tokens, r.request_count) for r in daily] == [(100, 2)]
+        assert daily[0].total_cost == pytest.approx(0.5)
+
+        hourly = await reopened.get_token_rollups(RollupGranularity.HOUR, workflow_id="wf-1")
+        assert [r.period_start.hour for r in hourly] == [9, 11]
+
+    @pytest.mark.asyncio
+    async def test_backfill_runs_only_when_empty(self, sqlite_path):
+        """测试时间桶表已有数据时不重复回填"""
+        repository = SQLiteHistoryRepository({"db_path": sqlite_path})
+        await repository.save_record(_token_record("t-1", DAY_START))
+        SQLiteHistoryRepository({"db_path": sqlite_path})
+        SQLiteHistoryRepository({"db_path": sqlite_path})
+
+        daily = await repository.get_token_rollups(RollupGranularity.DAY)
+        assert [r.request_count for r in daily] == [1]
+
+    @pytest.mark.asyncio
+    async def test_backfill_skips_unparsable_rows(self, sqlite_path):
+        """测试无法解析的历史行被跳过"""
+        repository = SQLiteHistoryRepository({"db_path": sqlite_path})
+        await repository.save_record(_token_record("t-1", DAY_START))
+        SQLiteUtils.close_connections(sqlite_path)
+        with closing(sqlite3.connect(sqlite_path)) as conn:
+            conn.execute(
+                "INSERT INTO history_records (record_id, workflow_id, record_type, timestamp, model, data) "
+                "VALUES ('bad', 'wf-1', 'token_usage', 'not-a-time', 'gpt-4', '{}')"
+            )
+            conn.commit()
+
+        reopened = SQLiteHistoryRepository({"db_path": sqlite_path})
+
+        daily = await reopened.get_token_rollups(RollupGranularity.DAY)
+        assert [r.request_count for r in daily] == [1]
+
+
+class TestTokenRollupRebuild:
+    """测试由现存记录重建时间桶统计"""
+
+    @pytest.mark.asyncio
+    async def test_rebuild_discards_stale_rollups(self, repository):
+        """测试重建只计入现存的记录，丢弃没有对应记录的统计"""
+        await repository.save_records([
+            _token_record("t-1", DAY_START.replace(hour=9)),
+            _token_record("t-2", DAY_START.replace(hour=11), total_tokens=70),
+            _cost_record("c-1", DAY_START.replace(hour=9), 0.5),
+        ])
+        await repository.update_token_rollups(
+            WorkflowTokenStatistics.from_record(_token_record("gone", datetime(2025, 2, 1)))
+        )
+
+        assert await repository.rebuild_token_rollups() == 3
+
+        daily = await repository.get_token_rollups(RollupGranularity.DAY, workflow_id="wf-1")
+        assert [(r.period_start, r.total_tokens, r.request_count) for r in daily] == [(DAY_START, 100, 2)]
+        assert daily[0].total_cost == pytest.approx(0.5)
+        hourly = await repository.get_token_rollups(RollupGranularity.HOUR, workflow_id="wf-1")
+        assert [r.period_start.hour for r in hourly] == [9, 11]
+
+    @pytest.mark.asyncio
+    async def test_delete_keeps_rollups_until_rebuild(self, sqlite_path):
+        """测试删除记录不扣减时间桶统计，重建后与现存记录一致"""
+        repository = SQLiteHistoryRepository({"db_path": sqlite_path})
+        manager = HistoryManager(
+            repository, enable_async_batching=False, logger=logging.getLogger(__name__)
+        )
+        await manager.record_token_usage(_token_record("t-1", DAY_START.replace(hour=9)))
+        await manager.record_token_usage(_token_record("t-2", DAY_START.replace(hour=15)))
+
+        await repository.delete_records(older_than=DAY_START.replace(hour=12))
+        daily = await repository.get_token_rollups(RollupGranularity.DAY)
+        assert [r.request_count for r in daily] == [2]
+
+        assert await repository.rebuild_token_rollups() == 1
+        daily = await repository.get_token_rollups(RollupGranularity.DAY)
+        assert [(r.total_tokens, r.request_count) for r in daily] == [(30, 1)]
+
+
+class TestTokenRollupSeries:
+    """测试统计服务的时间桶序列"""
+
+    @pytest.mark.asyncio
+    async def test_series_fills_empty_buckets(self, repository):
+        """测试没有数据的时间桶为空汇总"""
+        await repository.update_token_rollups(
+            WorkflowTokenStatistics.from_record(_token_record("t-1", DAY_START.replace(hour=1)))
+        )
+        service = HistoryStatisticsService(repository)
+
+        series = await service.get_token_rollup_series(
+            "wf-1", RollupGranularity.HOUR, DAY_START, DAY_START.replace(hour=2)
+        )
+
+        assert [summary.total_tokens for summary in series.values()] == [0, 30, 0]
+
+    @pytest.mark.asyncio
+    async def test_series_without_storage(self):
+        """测试未配置存储时返回全部为空的时间桶"""
+        service = HistoryStatisticsService(None)
+
+        series = await service.get_token_rollup_series(
+            "wf-1", RollupGranularity.DAY, DAY_START, DAY_START.replace(day=2)
+        )
+
+        assert list(series) == [DAY_START, DAY_START.replace(day=2)]
+        assert all(summary.total_tokens == 0 for summary in series.values())
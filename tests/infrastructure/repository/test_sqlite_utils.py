@@ -0,0 +1,158 @@
+"""SQLite工具类单元测试
+
+测试按数据库路径复用长连接、读连接池的借还、写操作的提交与回滚，以及批量写入的事务性。
+"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.infrastructure.repository.utils.sqlite_utils import (
+    SQLiteConnectionManager,
+    SQLiteUtils,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "utils.db")
+    SQLiteUtils.init_database(path, "CREATE TABLE items (id TEXT PRIMARY KEY, value INTEGER)")
+    yield path
+    SQLiteUtils.close_connections(path)
+
+
+class TestSQLiteConnectionManager:
+    """测试单个数据库的连接管理器"""
+
+    def test_manager_and_writer_are_reused(self, db_path, tmp_path):
+        """测试同一路径（含相对写法）共享管理器，多次写入复用同一写连接"""
+        manager = SQLiteUtils.get_connection_manager(db_path)
+        alias = str(tmp_path / "." / "utils.db")
+
+        assert SQLiteUtils.get_connection_manager(alias) is manager
+
+        writers = {manager.write(lambda conn: id(conn)) for _ in range(5)}
+        assert len(writers) == 1
+        assert manager.write(lambda conn: conn.execute("PRAGMA journal_mode").fetchone()[0]) == "wal"
+
+    def test_reader_pool_grows_lazily_and_is_bounded(self, tmp_path):
+        """测试读连接按需创建，并发读不超过池大小，结束后全部归还"""
+        manager = SQLiteConnectionManager(str(tmp_path / "pool.db"), read_pool_size=3)
+        manager.write(lambda conn: conn.execute("CREATE TABLE t (x)"))
+        lock = threading.Lock()
+        active = set()
+        peak = []
+
+        def read(conn):
+            with lock:
+                assert id(conn) not in active
+                active.add(id(conn))
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.discard(id(conn))
+            return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+        try:
+            assert manager.get_stats()["open_readers"] == 0
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: manager.read(read), range(40)))
+
+            assert results == [0] * 40
+            assert max(peak) <= 3
+            stats = manager.get_stats()
+            assert stats["open_readers"] == 3
+            assert stats["idle_readers"] == 3
+            assert stats["reads"] == 40
+        finally:
+            manager.close()
+
+    def test_failed_read_returns_connection(self, tmp_path):
+        """测试读操作异常后连接仍归还"""
+        manager = SQLiteConnectionManager(str(tmp_path / "pool.db"), read_pool_size=1)
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                manager.read(lambda conn: conn.execute("SELECT * FROM missing"))
+
+            assert manager.get_stats()["idle_readers"] == 1
+            assert manager.read(lambda conn: conn.execute("SELECT 1").fetchone()[0]) == 1
+        finally:
+            manager.close()
+
+    def test_readers_are_read_only(self, db_path):
+        """测试读连接处于只读模式"""
+        manager = SQLiteUtils.get_connection_manager(db_path)
+
+        with pytest.raises(sqlite3.OperationalError):
+            manager.read(lambda conn: conn.execute("INSERT INTO items VALUES ('a', 1)"))
+
+    def test_failed_write_rolls_back(self, db_path):
+        """测试写操作失败时回滚本次事务"""
+        manager = SQLiteUtils.get_connection_manager(db_path)
+
+        def write(conn):
+            conn.execute("INSERT INTO items VALUES ('a', 1)")
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            manager.write(write)
+
+        assert SQLiteUtils.count_records(db_path, "items") == 0
+
+    def test_memory_database_reads_use_writer(self):
+        """测试内存数据库读写共用写连接"""
+        manager = SQLiteConnectionManager(":memory:")
+        try:
+            manager.write(lambda conn: conn.execute("CREATE TABLE t (x)"))
+
+            assert manager.read(lambda conn: conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]) == 0
+            assert manager.get_stats()["open_readers"] == 0
+        finally:
+            manager.close()
+
+    def test_closed_manager_rejects_operations(self, tmp_path):
+        """测试关闭后的管理器拒绝继续使用"""
+        manager = SQLiteConnectionManager(str(tmp_path / "pool.db"))
+        manager.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            manager.write(lambda conn: None)
+        with pytest.raises(sqlite3.ProgrammingError):
+            manager.read(lambda conn: None)
+
+
+class TestSQLiteUtils:
+    """测试SQLite工具方法"""
+
+    def test_insert_find_and_delete(self, db_path):
+        """测试插入、按ID查找和删除"""
+        SQLiteUtils.insert_or_replace(db_path, "items", {"id": "a", "value": 1})
+        SQLiteUtils.insert_or_replace(db_path, "items", {"id": "a", "value": 2})
+
+        assert SQLiteUtils.find_by_id(db_path, "items", "id", "a") == ("a", 2)
+        assert SQLiteUtils.delete_by_id(db_path, "items", "id", "a")
+        assert SQLiteUtils.find_by_id(db_path, "items", "id", "a") is None
+
+    def test_insert_many_is_transactional(self, db_path):
+        """测试批量写入任一行失败时整批回滚"""
+        rows = [{"id": "a", "value": 1}, {"id": "b", "value": 2}]
+        assert SQLiteUtils.insert_or_replace_many(db_path, "items", rows) == 2
+
+        with pytest.raises(sqlite3.Error):
+            SQLiteUtils.insert_or_replace_many(
+                db_path, "items", [{"id": "c", "value": 3}, {"id": "d", "missing": 4}]
+            )
+
+        assert SQLiteUtils.count_records(db_path, "items") == 2
+
+    def test_close_connections_drops_manager(self, db_path):
+        """测试关闭连接后再次获取会创建新的管理器"""
+        manager = SQLiteUtils.get_connection_manager(db_path)
+
+        SQLiteUtils.close_connections(db_path)
+
+        assert SQLiteUtils.get_connection_manager(db_path) is not manager
+        assert SQLiteUtils.count_records(db_path, "items") == 0
@@ -0,0 +1,197 @@
+"""数据库检查点仓储单元测试
+
+基于内存SQLite测试链式存储的保存、读取、重复保存和损坏链检测。
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import aiosqlite
+import pytest
+
+from src.core.threads.checkpoints.chain import CheckpointChainCodec
+from src.core.threads.checkpoints.models import ThreadCheckpoint
+from src.infrastructure.threads.checkpoint_repository import DatabaseThreadCheckpointRepository
+
+
+CREATE_TABLE = """
+    CREATE TABLE thread_checkpoints (
+        id TEXT PRIMARY KEY,
+        thread_id TEXT NOT NULL,
+        state_data TEXT NOT NULL,
+        metadata TEXT,
+        status TEXT,
+        checkpoint_type TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        expires_at TEXT,
+        size_bytes INTEGER,
+        restore_count INTEGER,
+        last_restored_at TEXT
+    )
+"""
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+async def db():
+    connection = await aiosqlite.connect(":memory:")
+    await connection.execute(CREATE_TABLE)
+    yield connection
+    await connection.close()
+
+
+@pytest.fixture
+def repository(db):
+    return DatabaseThreadCheckpointRepository(db, CheckpointChainCodec(base_interval=10))
+
+
+def _checkpoint(checkpoint_id, state, minutes, thread_id="thread-1"):
+    return ThreadCheckpoint(
+        id=checkpoint_id,
+        thread_id=thread_id,
+        state_data=state,
+        created_at=BASE_TIME + timedelta(minutes=minutes),
+        updated_at=BASE_TIME + timedelta(minutes=minutes),
+    )
+
+
+async def _encoding(db, checkpoint_id):
+    cursor = await db.execute("SELECT state_data FROM thread_checkpoints WHERE id = ?", (checkpoint_id,))
+    row = await cursor.fetchone()
+    return json.loads(row[0])
+
+
+class TestDatabaseThreadCheckpointRepository:
+    """测试数据库检查点仓储"""
+
+    @pytest.mark.asyncio
+    async def test_save_and_load_chain(self, repository, db):
+        """测试后续检查点以增量保存，并可完整读回"""
+        states = [{"messages": ["m1"]}, {"messages": ["m1", "m2"]}, {"messages": ["m1", "m2", "m3"]}]
+        for index, state in enumerate(states):
+            assert await repository.save(_checkpoint(f"cp-{index}", state, index))
+
+        assert (await _encoding(db, "cp-0"))["encoding"] == "base"
+        assert (await _encoding(db, "cp-2"))["encoding"] == "delta"
+
+        for index, state in enumerate(states):
+            assert (await repository.find_by_id(f"cp-{index}")).state_data == state
+
+        loaded = await repository.find_by_thread("thread-1")
+        assert [cp.state_data for cp in loaded] == list(reversed(states))
+
+    @pytest.mark.asyncio
+    async def test_load_with_fresh_repository(self, repository, db):
+        """测试新的仓储实例从数据库恢复链末端后继续写增量"""
+        await repository.save(_checkpoint("cp-0", {"step": 0}, 0))
+        await repository.save(_checkpoint("cp-1", {"step": 1}, 1))
+
+        reopened = DatabaseThreadCheckpointRepository(db)
+        await reopened.save(_checkpoint("cp-2", {"step": 2}, 2))
+
+        assert (await _encoding(db, "cp-2"))["parent_id"] == "cp-1"
+        assert (await reopened.find_by_id("cp-2")).state_data == {"step": 2}
+
+    @pytest.mark.asyncio
+    async def test_caller_mutation_does_not_corrupt_next_delta(self, repository):
+        """测试保存后原地修改状态不影响下一次增量"""
+        state = {"messages": ["m1"]}
+        await repository.save(_checkpoint("cp-0", state, 0))
+
+        state["messages"].append("m2")
+        await repository.save(_checkpoint("cp-1", state, 1))
+
+        assert (await repository.find_by_id("cp-0")).state_data == {"messages": ["m1"]}
+        assert (await repository.find_by_id("cp-1")).state_data == {"messages": ["m1", "m2"]}
+
+    @pytest.mark.asyncio
+    async def test_resave_non_head_writes_base(self, repository, db):
+        """测试重复保存非链末端的检查点不会形成环"""
+        await repository.save(_checkpoint("cp-0", {"step": 0}, 0))
+        await repository.save(_checkpoint("cp-1", {"step": 1}, 1))
+        await repository.save(_checkpoint("cp-2", {"step": 2}, 2))
+
+        assert await repository.save(_checkpoint("cp-1", {"step": 1, "edited": True}, 1))
+
+        assert (await _encoding(db, "cp-1"))["encoding"] == "base"
+        assert (await _encoding(db, "cp-2"))["encoding"] == "base"
+        assert (await repository.find_by_id("cp-1")).state_data == {"step": 1, "edited": True}
+        assert (await repository.find_by_id("cp-2")).state_data == {"step": 2}
+
+        await repository.save(_checkpoint("cp-3", {"step": 3}, 3))
+        assert (await _encoding(db, "cp-3"))["parent_id"] == "cp-2"
+        assert (await repository.find_by_id("cp-3")).state_data == {"step": 3}
+
+    @pytest.mark.asyncio
+    async def test_cyclic_chain_is_detected(self, repository, db):
+        """测试损坏的环形父链被检出而不是无限循环"""
+        codec = CheckpointChainCodec()
+        await repository.save(_checkpoint("cp-0", {"step": 0}, 0))
+        await repository.save(_checkpoint("cp-1", {"step": 1}, 1))
+        envelope = codec.encode({"step": 0}, "cp-1", {"step": 1}, 1)
+        await db.execute(
+            "UPDATE thread_checkpoints SET state_data = ? WHERE id = ?",
+            (json.dumps(envelope), "cp-0"),
+        )
+        await db.commit()
+
+        with pytest.raises(ValueError, match="cycle"):
+            await repository._resolve_state("cp-1", {}, {})
+        assert await repository.find_by_id("cp-1") is None
+
+    @pytest.mark.asyncio
+    async def test_delete_rebases_successor(self, repository):
+        """测试删除中间检查点后其后继仍可读取"""
+        await repository.save(_checkpoint("cp-0", {"step": 0}, 0))
+        await repository.save(_checkpoint("cp-1", {"step": 1}, 1))
+        await repository.save(_checkpoint("cp-2", {"step": 2}, 2))
+
+        assert await repository.delete("cp-1")
+
+        assert (await repository.find_by_id("cp-2")).state_data == {"step": 2}
+
+    @pytest.mark.asyncio
+    async def test_legacy_plain_json_rows(self, repository, db):
+        """测试未编码的旧数据按全量快照读取"""
+        await repository.save(_checkpoint("cp-0", {"step": 0}, 0))
+        await db.execute(
+            "UPDATE thread_checkpoints SET state_data = ? WHERE id = ?",
+            (json.dumps({"legacy": True}), "cp-0"),
+        )
+        await db.commit()
+
+        assert (await repository.find_by_id("cp-0")).state_data == {"legacy": True}
+
+    @pytest.mark.asyncio
+    async def test_indexes_created_on_first_use(self, repository, db):
+        """测试首次操作时创建按线程、过期时间和父检查点查询的索引"""
+        await repository.find_by_thread("thread-1")
+
+        cursor = await db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'thread_checkpoints'"
+        )
+        names = {row[0] for row in await cursor.fetchall()}
+        assert "idx_thread_checkpoints_thread_created" in names
+        assert "idx_thread_checkpoints_expires_at" in names
+        assert "idx_thread_checkpoints_parent" in names
+
+    @pytest.mark.asyncio
+    async def test_rebase_reads_only_direct_successors(self, repository, db):
+        """测试改写后继时按父检查点索引查询，只读取直接后继"""
+        for index in range(5):
+            await repository.save(_checkpoint(f"cp-{index}", {"step": index}, index))
+        statements = []
+        await db.set_trace_callback(statements.append)
+
+        await repository._rebase_successors("cp-2", "thread-1")
+
+        await db.set_trace_callback(None)
+        select = next(sql for sql in statements if "json_extract" in sql)
+        cursor = await db.execute("EXPLAIN QUERY PLAN " + select)
+        plan = " ".join(row[-1] for row in await cursor.fetchall())
+        assert "idx_thread_checkpoints_parent" in plan
+        assert (await _encoding(db, "cp-3"))["encoding"] == "base"
+        assert (await _encoding(db, "cp-4"))["encoding"] == "delta"
+        assert (await repository.find_by_id("cp-4")).state_data == {"step": 4}
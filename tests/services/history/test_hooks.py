@@ -0,0 +1,90 @@
+"""历史记录钩子单元测试
+
+测试调用前按会话增量计算请求消息的token数量。
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.infrastructure.messages.types import AIMessage, HumanMessage, SystemMessage
+from src.services.history.hooks import HistoryRecordingHook
+from src.services.llm.token_calculation_service import TokenCalculationService
+
+
+MODEL_INFO = {"name": "gpt-4", "type": "openai"}
+
+
+@pytest.fixture
+def token_service():
+    service = Mock(spec=TokenCalculationService)
+    service.calculate_messages_tokens.return_value = 10
+    service.calculate_messages_tokens_incremental.return_value = 15
+    return service
+
+
+@pytest.fixture
+def hook(token_service):
+    return HistoryRecordingHook(
+        history_manager=Mock(record_llm_request=AsyncMock()),
+        token_calculation_service=token_service,
+        cost_calculator=Mock(),
+        workflow_context={"workflow_id": "wf-1"},
+    )
+
+
+def _estimated_tokens(hook, request_id):
+    return hook.pending_requests[request_id].estimated_tokens
+
+
+class TestHistoryRecordingHookTokens:
+    """测试调用前的token计数"""
+
+    @pytest.mark.asyncio
+    async def test_appended_messages_counted_incrementally(self, hook, token_service):
+        """测试同一会话追加消息后只对新消息计数"""
+        messages = [SystemMessage(content="system"), HumanMessage(content="hi")]
+        hook.before_call(messages, session_id="s-1", model_info=MODEL_INFO, request_id="r-1")
+
+        messages = messages + [AIMessage(content="hello"), HumanMessage(content="again")]
+        hook.before_call(messages, session_id="s-1", model_info=MODEL_INFO, request_id="r-2")
+
+        token_service.calculate_messages_tokens.assert_called_once()
+        token_service.calculate_messages_tokens_incremental.assert_called_once_with(
+            messages, 2, 10, "openai", "gpt-4"
+        )
+        assert _estimated_tokens(hook, "r-1") == 10
+        assert _estimated_tokens(hook, "r-2") == 15
+
+    @pytest.mark.asyncio
+    async def test_changed_prefix_counted_in_full(self, hook, token_service):
+        """测试上一轮的消息不再是前缀时全量计数"""
+        hook.before_call([HumanMessage(content="hi")], session_id="s-1", model_info=MODEL_INFO)
+        hook.before_call(
+            [HumanMessage(content="hi"), AIMessage(content="hello")],
+            session_id="s-1", model_info=MODEL_INFO
+        )
+
+        assert token_service.calculate_messages_tokens.call_count == 2
+        token_service.calculate_messages_tokens_incremental.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_counts_are_kept_per_session(self, hook, token_service):
+        """测试不同会话之间不复用计数"""
+        messages = [HumanMessage(content="hi")]
+        hook.before_call(messages, session_id="s-1", model_info=MODEL_INFO)
+        hook.before_call(messages, session_id="s-2", model_info=MODEL_INFO)
+
+        assert token_service.calculate_messages_tokens.call_count == 2
+        token_service.calculate_messages_tokens_incremental.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_set_workflow_context_resets_counts(self, hook, token_service):
+        """测试重新设置工作流上下文后全量计数"""
+        messages = [HumanMessage(content="hi")]
+        hook.before_call(messages, session_id="s-1", model_info=MODEL_INFO)
+        hook.set_workflow_context({"workflow_id": "wf-2"})
+        hook.before_call(messages, session_id="s-1", model_info=MODEL_INFO)
+
+        assert token_service.calculate_messages_tokens.call_count == 2
+        token_service.calculate_messages_tokens_incremental.assert_not_called()
@@ -0,0 +1,120 @@
+"""并发控制器饱和基准
+
+在并发许可满额的情况下启动大量任务，对比旧的 100ms 轮询获取与 FIFO 等待者移交
+两种方式的总耗时和排队等待时间的 p50/p99；同时测量令牌桶限速下相邻许可的实际间隔
+与理论间隔的偏差。
+
+运行方式：
+    python -m tests.services.llm.scheduling.benchmark_concurrency_controller [--tasks N] [--limit N] [--hold-ms N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from src.services.llm.scheduling.concurrency_controller import ConcurrencyLimit, RateLimiter
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(percentile / 100 * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+async def _legacy_acquire(limit: ConcurrencyLimit, timeout: float) -> bool:
+    """旧实现：获取失败后固定休眠100ms再重试"""
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        if limit.acquire():
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+async def _saturate(
+    acquire: Callable[[ConcurrencyLimit, float], Awaitable[bool]],
+    tasks: int,
+    limit_size: int,
+    hold: float
+) -> Dict[str, float]:
+    """启动 tasks 个任务争用 limit_size 个许可，每个任务持有许可 hold 秒"""
+    limit = ConcurrencyLimit(limit=limit_size, queue_size=tasks)
+    waits: List[float] = []
+
+    async def worker() -> None:
+        start = time.monotonic()
+        if not await acquire(limit, 60.0):
+            raise RuntimeError("acquire timed out during benchmark")
+        waits.append(time.monotonic() - start)
+        try:
+            await asyncio.sleep(hold)
+        finally:
+            limit.release()
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(tasks)))
+    total = time.monotonic() - start
+    assert limit.current_count == 0, "permits leaked during benchmark"
+
+    return {
+        "total_ms": total * 1000,
+        "p50_ms": _percentile(waits, 50) * 1000,
+        "p99_ms": _percentile(waits, 99) * 1000,
+    }
+
+
+async def bench_saturation(tasks: int, limit_size: int, hold: float) -> None:
+    """对比轮询与FIFO移交在饱和负载下的表现"""
+    before = await _saturate(_legacy_acquire, tasks, limit_size, hold)
+    after = await _saturate(
+        lambda limit, timeout: limit.acquire_async(timeout), tasks, limit_size, hold
+    )
+
+    ideal_ms = -(-tasks // limit_size) * hold * 1000
+    print(f"saturation: {tasks} tasks, limit {limit_size}, hold {hold * 1000:.0f}ms, ideal {ideal_ms:.0f}ms")
+    print(f"{'metric':<16}{'before':>12}{'after':>12}")
+    for key in ("total_ms", "p50_ms", "p99_ms"):
+        print(f"{key:<16}{before[key]:>12.1f}{after[key]:>12.1f}")
+
+
+async def bench_rate_limit(permits: int, refill_rate: float) -> None:
+    """测量令牌桶限速下相邻两次获取许可的实际间隔与理论间隔的偏差"""
+    limiter = RateLimiter({"token_bucket": {"bucket_size": 1, "refill_rate": refill_rate}})
+    limiter.consume()
+    granted_at: List[float] = []
+
+    async def worker() -> None:
+        if not await limiter.acquire(timeout=60.0):
+            raise RuntimeError("rate limit acquire timed out during benchmark")
+        granted_at.append(time.monotonic())
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(permits)))
+
+    # 每次等待相对理论间隔的偏差（桶容量为1时超出的等待不会累积为令牌）
+    granted_at = [start] + sorted(granted_at)
+    errors = [
+        abs((granted_at[index] - granted_at[index - 1]) - 1 / refill_rate) * 1000
+        for index in range(1, len(granted_at))
+    ]
+    print(f"rate_limit: {permits} permits at {refill_rate:g}/s, interval {1000 / refill_rate:.2f}ms")
+    print(f"{'error p50 ms':<16}{_percentile(errors, 50):>12.2f}")
+    print(f"{'error p99 ms':<16}{_percentile(errors, 99):>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="并发控制器饱和基准")
+    parser.add_argument("--tasks", type=int, default=500, help="并发任务数")
+    parser.add_argument("--limit", type=int, default=10, help="并发许可数")
+    parser.add_argument("--hold-ms", type=float, default=20.0, help="每个任务持有许可的时间（毫秒）")
+    parser.add_argument("--permits", type=int, default=100, help="限速基准获取的许可数")
+    parser.add_argument("--refill-rate", type=float, default=200.0, help="令牌补充速率（个/秒）")
+    args = parser.parse_args()
+
+    asyncio.run(bench_saturation(args.tasks, args.limit, args.hold_ms / 1000))
+    asyncio.run(bench_rate_limit(args.permits, args.refill_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""并发控制器单元测试
+
+测试并发许可的FIFO排队、超时和取消不泄漏许可，以及速率限制器的精确等待时间。
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.services.llm.scheduling.concurrency_controller import (
+    ConcurrencyAndRateLimitManager,
+    ConcurrencyController,
+    ConcurrencyLevel,
+    ConcurrencyLimit,
+    RateLimiter,
+)
+
+
+async def _settle():
+    """让已就绪的任务运行到下一个等待点"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+class TestConcurrencyLimit:
+    """测试并发许可的排队与移交"""
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_fifo(self):
+        """测试许可按排队顺序移交给等待者"""
+        limit = ConcurrencyLimit(limit=1, queue_size=10)
+        assert limit.acquire()
+        order = []
+
+        async def worker(index):
+            assert await limit.acquire_async(timeout=1.0)
+            order.append(index)
+            limit.release()
+
+        tasks = []
+        for index in range(5):
+            tasks.append(asyncio.create_task(worker(index)))
+            await _settle()
+
+        limit.release()
+        await asyncio.gather(*tasks)
+
+        assert order == [0, 1, 2, 3, 4]
+        assert limit.current_count == 0
+
+    @pytest.mark.asyncio
+    async def test_new_caller_does_not_jump_queue(self):
+        """测试有等待者时新的调用方不能直接获取许可"""
+        limit = ConcurrencyLimit(limit=1, queue_size=10)
+        assert limit.acquire()
+        waiter = asyncio.create_task(limit.acquire_async(timeout=1.0))
+        await _settle()
+
+        limit.release()
+
+        assert not limit.acquire()
+        assert await waiter
+        assert limit.current_count == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_full_rejected(self):
+        """测试等待队列已满时立即拒绝"""
+        limit = ConcurrencyLimit(limit=1, queue_size=1)
+        assert limit.acquire()
+        waiter = asyncio.create_task(limit.acquire_async(timeout=1.0))
+        await _settle()
+
+        assert not await limit.acquire_async(timeout=1.0)
+        assert limit.rejected_count == 1
+
+        limit.release()
+        assert await waiter
+
+    @pytest.mark.asyncio
+    async def test_timeout_does_not_leak_slot(self):
+        """测试等待超时后移出队列，许可计数不变"""
+        limit = ConcurrencyLimit(limit=1, queue_size=10)
+        assert limit.acquire()
+
+        assert not await limit.acquire_async(timeout=0.01)
+
+        assert len(limit.waiting_queue) == 0
+        assert limit.timeout_count == 1
+        limit.release()
+        assert limit.current_count == 0
+        assert limit.acquire()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """测试排队中被取消的等待者移出队列"""
+        limit = ConcurrencyLimit(limit=1, queue_size=10)
+        assert limit.acquire()
+        waiter = asyncio.create_task(limit.acquire_async(timeout=1.0))
+        await _settle()
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert len(limit.waiting_queue) == 0
+        limit.release()
+        assert limit.current_count == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_after_grant_passes_slot_on(self):
+        """测试许可移交后等待者被取消时，许可仍转交给下一个等待者"""
+        limit = ConcurrencyLimit(limit=1, queue_size=10)
+        assert limit.acquire()
+        first = asyncio.create_task(limit.acquire_async(timeout=1.0))
+        await _settle()
+        second = asyncio.create_task(limit.acquire_async(timeout=1.0))
+        await _settle()
+
+        limit.release()
+        first.cancel()
+
+        # 部分Python版本的wait_for在此竞态下返回结果而不是抛出取消，两种情况都不能泄漏许可
+        first_result = (await asyncio.gather(first, return_exceptions=True))[0]
+        if first_result is True:
+            limit.release()
+        else:
+            assert isinstance(first_result, asyncio.CancelledError)
+        assert await second
+        assert limit.current_count == 1
+
+        limit.release()
+        assert limit.current_count == 0
+
+    @pytest.mark.asyncio
+    async def test_resize_wakes_waiters(self):
+        """测试增大并发限制时按顺序唤醒等待者"""
+        limit = ConcurrencyLimit(limit=1, queue_size=10)
+        assert limit.acquire()
+        waiters = [asyncio.create_task(limit.acquire_async(timeout=1.0)) for _ in range(2)]
+        await _settle()
+
+        limit.resize(3, 10)
+
+        assert await asyncio.gather(*waiters) == [True, True]
+        assert limit.current_count == 3
+
+    @pytest.mark.asyncio
+    async def test_wait_time_recorded(self):
+        """测试排队等待时间计入直方图"""
+        limit = ConcurrencyLimit(limit=1, queue_size=10)
+        assert await limit.acquire_async(timeout=1.0)
+        waiter = asyncio.create_task(limit.acquire_async(timeout=1.0))
+        await asyncio.sleep(0.02)
+
+        limit.release()
+        assert await waiter
+
+        wait_time = limit.get_status()["wait_time"]
+        assert wait_time["count"] == 2
+        assert wait_time["p99"] >= 0.02
+
+
+class TestConcurrencyController:
+    """测试并发控制器"""
+
+    @pytest.mark.asyncio
+    async def test_update_limit_keeps_waiters(self):
+        """测试原地更新并发限制时保留已排队的等待者"""
+        controller = ConcurrencyController({"levels": []})
+        controller.update_limit(ConcurrencyLevel.MODEL, "gpt-4", 1, 10)
+        assert await controller.acquire_permission(ConcurrencyLevel.MODEL, "gpt-4", timeout=1.0)
+        waiter = asyncio.create_task(
+            controller.acquire_permission(ConcurrencyLevel.MODEL, "gpt-4", timeout=1.0)
+        )
+        await _settle()
+
+        controller.update_limit(ConcurrencyLevel.MODEL, "gpt-4", 2, 10)
+
+        assert await waiter
+        assert controller.get_status()["limits"]["model_gpt-4"]["current"] == 2
+
+
+class TestRateLimiter:
+    """测试速率限制器的等待时间"""
+
+    def test_token_bucket_time_until_available(self):
+        """测试令牌桶耗尽后的等待时间由补充速率决定"""
+        limiter = RateLimiter({"token_bucket": {"bucket_size": 1, "refill_rate": 10}})
+        assert limiter.time_until_available() == 0.0
+        assert limiter.consume()
+
+        assert limiter.time_until_available() == pytest.approx(0.1, abs=0.01)
+
+    def test_sliding_window_time_until_available(self):
+        """测试滑动窗口满额时等待最早的请求移出窗口"""
+        limiter = RateLimiter({
+            "algorithm": "sliding_window",
+            "sliding_window": {"window_size": 2, "max_requests": 1}
+        })
+        assert limiter.consume()
+
+        assert limiter.time_until_available() == pytest.approx(2.0, abs=0.05)
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_wait_accuracy(self):
+        """测试异步获取按计算出的时间等待，不按固定间隔轮询"""
+        limiter = RateLimiter({"token_bucket": {"bucket_size": 1, "refill_rate": 20}})
+        assert limiter.consume()
+
+        start = time.monotonic()
+        assert await limiter.acquire(timeout=1.0)
+        elapsed = time.monotonic() - start
+
+        assert 0.045 <= elapsed < 0.09
+
+    @pytest.mark.asyncio
+    async def test_waiters_paced_by_refill_rate(self):
+        """测试多个等待者按补充速率依次获得许可"""
+        limiter = RateLimiter({"token_bucket": {"bucket_size": 1, "refill_rate": 50}})
+        assert limiter.consume()
+        granted_at = []
+
+        async def worker():
+            assert await limiter.acquire(timeout=1.0)
+            granted_at.append(time.monotonic())
+
+        start = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(3)))
+
+        offsets = [at - start for at in granted_at]
+        for index, offset in enumerate(offsets, start=1):
+            assert offset == pytest.approx(index * 0.02, abs=0.015)
+
+    @pytest.mark.asyncio
+    async def test_fails_fast_when_deadline_too_close(self):
+        """测试超时前不可能获得许可时立即返回失败"""
+        limiter = RateLimiter({"token_bucket": {"bucket_size": 1, "refill_rate": 1}})
+        assert limiter.consume()
+
+        start = time.monotonic()
+        assert not await limiter.acquire(timeout=0.5)
+
+        assert time.monotonic() - start < 0.05
+
+
+class TestConcurrencyAndRateLimitManager:
+    """测试并发和速率限制管理器"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_failure_releases_concurrency(self):
+        """测试速率限制许可获取失败时归还并发许可"""
+        manager = ConcurrencyAndRateLimitManager(
+            {"levels": [{"model_gpt-4": {"limit": 1, "queue_size": 10}}]},
+            {"token_bucket": {"bucket_size": 1, "refill_rate": 1}}
+        )
+        assert manager.rate_limiter.consume()
+
+        assert not await manager.check_and_acquire(ConcurrencyLevel.MODEL, "gpt-4", timeout=0.1)
+
+        limit = manager.concurrency_controller.get_limit(ConcurrencyLevel.MODEL, "gpt-4")
+        assert limit.current_count == 0
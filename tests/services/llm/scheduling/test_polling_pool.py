@@ -0,0 +1,311 @@
+"""LLM轮询池单元测试
+
+测试两次随机选择调度、EWMA响应时间更新，以及实例满载时的排队等待。
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from src.interfaces.llm.exceptions import LLMError
+from src.services.llm.scheduling.polling_pool import (
+    InstanceStatus,
+    LLMInstance,
+    PollingPool,
+    PollingPoolManager,
+    PowerOfTwoChoicesScheduler,
+)
+
+
+class FakeTaskGroupManager:
+    """按固定模型列表返回任务组的任务组管理器"""
+
+    def __init__(self, models):
+        self.models = models
+
+    def parse_group_reference(self, reference):
+        group_name, _, echelon = reference.partition(".")
+        return group_name, echelon or None
+
+    def get_echelon_config(self, group_name, echelon):
+        return {"concurrency_limit": 2}
+
+    def get_models_for_group(self, reference):
+        return self.models
+
+
+class FakeClient:
+    """记录调用并可控制完成时机的LLM客户端"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.calls = 0
+        self.release = None
+
+    async def generate(self, messages, parameters=None, **kwargs):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        return f"{self.model_name}:{messages[-1].content}"
+
+
+class FakeClientFactory:
+    """为每个模型创建 FakeClient 的客户端工厂"""
+
+    def __init__(self):
+        self.created = []
+
+    def create_client(self, model_name):
+        self.created.append(model_name)
+        return FakeClient(model_name)
+
+    def get_available_models(self):
+        return []
+
+
+def _instance(instance_id, ewma=0.0, load=0, max_concurrency=10, weight=1.0):
+    return LLMInstance(
+        instance_id=instance_id,
+        model_name=instance_id,
+        group_name="group",
+        echelon="echelon1",
+        ewma_response_time=ewma,
+        current_load=load,
+        max_concurrency=max_concurrency,
+        weight=weight,
+    )
+
+
+def _pool(instances, **config):
+    config.setdefault("rotation_strategy", "round_robin")
+    pool = PollingPool("pool", config, FakeTaskGroupManager([]))
+    pool.instances.extend(instances)
+    return pool
+
+
+async def _settle():
+    """让已就绪的任务运行到下一个等待点"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+class TestPowerOfTwoChoicesScheduler:
+    """测试两次随机选择调度器"""
+
+    def test_cost(self):
+        """测试代价随EWMA响应时间和在途请求数增大，随权重减小"""
+        assert PowerOfTwoChoicesScheduler.calculate_cost(_instance("a", ewma=0.5, load=3)) == 2.0
+        assert PowerOfTwoChoicesScheduler.calculate_cost(_instance("a", ewma=0.5, load=3, weight=2.0)) == 1.0
+
+    def test_picks_cheaper_of_two(self):
+        """测试两个实例时总是选择代价更低者"""
+        scheduler = PowerOfTwoChoicesScheduler(random.Random(0))
+        fast, slow = _instance("fast", ewma=0.1), _instance("slow", ewma=1.0)
+
+        assert {scheduler.select_instance([slow, fast]).instance_id for _ in range(20)} == {"fast"}
+
+    def test_load_shifts_choice(self):
+        """测试更快的实例在途请求过多时让给较慢的实例"""
+        scheduler = PowerOfTwoChoicesScheduler(random.Random(0))
+        busy_fast, idle_slow = _instance("fast", ewma=0.1, load=9), _instance("slow", ewma=0.3)
+
+        assert scheduler.select_instance([busy_fast, idle_slow]) is idle_slow
+
+    def test_unmeasured_instance_probed(self):
+        """测试尚无响应时间样本的实例优先被探测"""
+        scheduler = PowerOfTwoChoicesScheduler(random.Random(0))
+        measured, fresh = _instance("measured", ewma=0.2), _instance("fresh")
+
+        assert scheduler.select_instance([measured, fresh]) is fresh
+
+    def test_never_selects_worst_of_many(self):
+        """测试多个实例时从不选择代价最高的实例，且负载分散"""
+        scheduler = PowerOfTwoChoicesScheduler(random.Random(1))
+        instances = [_instance(f"i{index}", ewma=0.1 * (index + 1)) for index in range(4)]
+
+        selected = [scheduler.select_instance(instances).instance_id for _ in range(200)]
+
+        assert "i3" not in selected
+        assert len(set(selected)) == 3
+
+    def test_skips_unavailable(self):
+        """测试跳过满载和失败的实例"""
+        scheduler = PowerOfTwoChoicesScheduler(random.Random(0))
+        full = _instance("full", max_concurrency=1, load=1)
+        failed = _instance("failed")
+        failed.status = InstanceStatus.FAILED
+        slow = _instance("slow", ewma=5.0)
+
+        assert scheduler.select_instance([full, failed, slow]) is slow
+        assert scheduler.select_instance([full, failed]) is None
+
+
+class TestEWMAResponseTime:
+    """测试实例EWMA响应时间更新"""
+
+    def test_first_sample_initializes(self):
+        """测试首个样本直接作为EWMA值"""
+        instance = _instance("a")
+        instance.update_performance(0.8, True)
+
+        assert instance.ewma_response_time == 0.8
+
+    def test_smoothing(self):
+        """测试后续样本按平滑系数更新"""
+        instance = _instance("a")
+        instance.update_performance(1.0, True)
+        instance.update_performance(2.0, True)
+
+        assert instance.ewma_response_time == pytest.approx(1.0 + LLMInstance.EWMA_ALPHA * 1.0)
+
+        instance.update_performance(2.0, True)
+        assert instance.ewma_response_time == pytest.approx(1.3 + LLMInstance.EWMA_ALPHA * 0.7)
+
+    def test_failures_do_not_change_ewma(self):
+        """测试失败请求不计入EWMA，只累计连续失败次数"""
+        instance = _instance("a")
+        instance.update_performance(1.0, True)
+        instance.update_performance(10.0, False)
+        instance.update_performance(10.0, False)
+
+        assert instance.ewma_response_time == 1.0
+        assert instance.consecutive_failures == 2
+
+        instance.update_performance(1.0, True)
+        assert instance.consecutive_failures == 0
+
+
+class TestPollingPoolSaturation:
+    """测试实例满载时获取实例"""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_released_instance(self):
+        """测试实例满载时等待释放而不是立即失败"""
+        instance = _instance("a", max_concurrency=1)
+        pool = _pool([instance])
+        assert await pool.get_instance(timeout=1.0) is instance
+
+        waiter = asyncio.create_task(pool.get_instance(timeout=1.0))
+        await _settle()
+        assert not waiter.done()
+
+        pool.release_instance(instance)
+
+        assert await waiter is instance
+        assert instance.current_load == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_fifo(self):
+        """测试等待者按排队顺序获得实例"""
+        instance = _instance("a", max_concurrency=1)
+        pool = _pool([instance])
+        await pool.get_instance(timeout=1.0)
+        order = []
+
+        async def worker(index):
+            assert await pool.get_instance(timeout=1.0) is instance
+            order.append(index)
+            pool.release_instance(instance)
+
+        tasks = []
+        for index in range(4):
+            tasks.append(asyncio.create_task(worker(index)))
+            await _settle()
+
+        pool.release_instance(instance)
+        await asyncio.gather(*tasks)
+
+        assert order == [0, 1, 2, 3]
+        assert instance.current_load == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_none(self):
+        """测试等待超时返回None并计入拒绝次数"""
+        instance = _instance("a", max_concurrency=1)
+        pool = _pool([instance])
+        await pool.get_instance(timeout=1.0)
+
+        assert await pool.get_instance(timeout=0.02) is None
+
+        assert pool.stats["rejected_requests"] == 1
+        assert len(pool._capacity_waiters) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_passes_wakeup_on(self):
+        """测试已被唤醒的等待者取消后，唤醒转交给下一个等待者"""
+        instance = _instance("a", max_concurrency=1)
+        pool = _pool([instance])
+        await pool.get_instance(timeout=1.0)
+        first = asyncio.create_task(pool.get_instance(timeout=1.0))
+        await _settle()
+        second = asyncio.create_task(pool.get_instance(timeout=1.0))
+        await _settle()
+
+        pool.release_instance(instance)
+        first.cancel()
+
+        # 部分Python版本的wait_for在此竞态下返回结果而不是抛出取消
+        first_result = (await asyncio.gather(first, return_exceptions=True))[0]
+        if first_result is instance:
+            pool.release_instance(instance)
+        else:
+            assert isinstance(first_result, asyncio.CancelledError)
+        assert await second is instance
+        assert instance.current_load == 1
+
+    @pytest.mark.asyncio
+    async def test_no_available_instance_fails_fast(self):
+        """测试没有健康实例时不等待"""
+        instance = _instance("a")
+        instance.status = InstanceStatus.FAILED
+        pool = _pool([instance])
+
+        assert await asyncio.wait_for(pool.get_instance(timeout=5.0), 0.5) is None
+
+    @pytest.mark.asyncio
+    async def test_call_llm_waits_for_capacity(self):
+        """测试满载时调用LLM排队等待，而不是抛出没有可用实例"""
+        instance = _instance("a", max_concurrency=1)
+        instance.client = FakeClient("a")
+        instance.client.release = asyncio.Event()
+        pool = _pool([instance], acquire_timeout=1.0)
+
+        first = asyncio.create_task(pool.call_llm("one"))
+        second = asyncio.create_task(pool.call_llm("two"))
+        await _settle()
+        assert instance.client.calls == 1
+
+        instance.client.release.set()
+
+        assert await asyncio.gather(first, second) == ["a:one", "a:two"]
+        assert pool.stats["successful_requests"] == 2
+        assert instance.current_load == 0
+
+    @pytest.mark.asyncio
+    async def test_call_llm_times_out(self):
+        """测试等待超时后调用LLM抛出没有可用实例"""
+        instance = _instance("a", max_concurrency=1)
+        pool = _pool([instance], acquire_timeout=0.02)
+        await pool.get_instance()
+
+        with pytest.raises(LLMError):
+            await pool.call_llm("hello")
+
+
+class TestPollingPoolManager:
+    """测试轮询池管理器"""
+
+    @pytest.mark.asyncio
+    async def test_client_factory_passed_to_pools(self):
+        """测试管理器创建的轮询池使用客户端工厂为实例创建客户端"""
+        factory = FakeClientFactory()
+        manager = PollingPoolManager(FakeTaskGroupManager(["m1", "m2"]), factory)
+
+        pool = await manager.create_pool("pool", {"task_groups": ["group.echelon1"]})
+        try:
+            assert factory.created == ["m1", "m2"]
+            assert [inst.max_concurrency for inst in pool.instances] == [2, 2]
+            assert await pool.call_llm("hello") in ("m1:hello", "m2:hello")
+        finally:
+            await manager.shutdown_all()
@@ -114,6 +114,15 @@ class TestTokenCalculationDecorator:
             assert result == 5
             mock_calculate.assert_called_once_with(messages, "openai", "gpt-4")
     
+    def test_calculate_messages_tokens_incremental_delegates_to_base_service(self, decorator, base_service):
+        """测试增量消息Token计算委托给基础服务"""
+        messages = [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi"}]
+        with patch.object(base_service, 'calculate_messages_tokens_incremental', return_value=12) as mock_calculate:
+            result = decorator.calculate_messages_tokens_incremental(messages, 1, 8, "openai", "gpt-4")
+
+            assert result == 12
+            mock_calculate.assert_called_once_with(messages, 1, 8, "openai", "gpt-4")
+
     def test_parse_token_usage_delegates_to_base_service(self, decorator, base_service):
         """测试Token使用解析委托给基础服务"""
         response = {"usage": {"total_tokens": 15}}
@@ -0,0 +1,177 @@
+"""提示词引用解析器测试
+
+测试模板编译、单次渲染、编译结果缓存、文件引用按修改时间失效以及文件循环引用检测。
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from src.interfaces.prompts.exceptions import PromptCircularReferenceError, PromptNotFoundError
+from src.services.prompts.reference_resolver import PromptReferenceResolver, ReferenceConfig
+from src.services.prompts.template_compiler import SegmentType, TemplateCompiler
+
+
+class _FakeRegistry:
+    """内存提示词注册表"""
+    
+    def __init__(self, prompts):
+        self._prompts = prompts
+    
+    async def get(self, prompt_id, version=None):
+        if prompt_id not in self._prompts:
+            raise PromptNotFoundError(f"提示词不存在: {prompt_id}", prompt_id=prompt_id)
+        return SimpleNamespace(id=prompt_id, content=self._prompts[prompt_id])
+
+
+def _resolve(resolver, content, context, prompt_id="prompt"):
+    prompt = SimpleNamespace(id=prompt_id, content=content)
+    return asyncio.run(resolver.resolve_references(prompt, context))
+
+
+class TestTemplateCompiler:
+    """模板编译器测试类"""
+    
+    def test_segments_and_nested_blocks(self):
+        """测试字面片段、占位符和嵌套块的解析"""
+        template = TemplateCompiler().compile(
+            "Hi {{var:name}}{{if ref:a}}{{for x in xs}}[{{var:x}}]{{endfor}}{{endif}} {{env:HOME}}"
+        )
+        
+        assert [segment.type for segment in template.segments] == [
+            SegmentType.LITERAL, SegmentType.VARIABLE, SegmentType.CONDITIONAL,
+            SegmentType.LITERAL, SegmentType.ENV,
+        ]
+        loop = template.segments[2].children[0]
+        assert loop.type is SegmentType.LOOP
+        assert (loop.loop_variable, loop.value) == ("x", "xs")
+        assert not template.is_literal
+    
+    def test_unmatched_and_disabled_tags_stay_literal(self):
+        """测试未配对的块标记和被禁用的占位符保留为字面文本"""
+        content = "{{endif}} {{file:a.md}} {{for x in xs}} open"
+        template = TemplateCompiler(enable_file_references=False).compile(content)
+        
+        assert template.is_literal
+        assert template.segments[0].value == content
+
+
+class TestPromptReferenceResolver:
+    """提示词引用解析器测试类"""
+    
+    def test_resolves_all_placeholder_types(self):
+        """测试各类占位符在单次渲染中解析"""
+        resolver = PromptReferenceResolver(_FakeRegistry({"footer": "-- {{var:name}} --"}))
+        result = _resolve(
+            resolver,
+            "{{var:name}} {{config:llm.model}} {{ref:footer}} {{ref:missing}}"
+            "{{if ref:footer}} yes{{endif}}{{if ref:missing}} no{{endif}}\n"
+            "{{for item in items}}- {{var:item}}{{endfor}}",
+            {"name": "Ann", "llm": {"model": "gpt"}, "items": ["a", "b"]},
+        )
+        
+        assert result.content == "Ann gpt -- Ann -- {{ref:missing}} yes\n- a\n- b"
+        assert result.dependencies == ["footer"]
+    
+    def test_variable_values_are_not_rescanned(self):
+        """测试变量值中的占位符不会被再次解析"""
+        resolver = PromptReferenceResolver(_FakeRegistry({"footer": "secret"}))
+        result = _resolve(resolver, "{{var:text}}", {"text": "{{ref:footer}}"})
+        
+        assert result.content == "{{ref:footer}}"
+    
+    def test_compiled_templates_are_cached(self):
+        """测试编译结果按提示词ID和内容哈希缓存"""
+        resolver = PromptReferenceResolver(_FakeRegistry({}))
+        _resolve(resolver, "Hello {{var:name}}", {"name": "a"})
+        _resolve(resolver, "Hello {{var:name}}", {"name": "b"})
+        _resolve(resolver, "Hello again {{var:name}}", {"name": "c"})
+        
+        stats = resolver.get_cache_statistics()
+        assert stats["template_cache_size"] == 2
+        assert stats["template_cache_hits"] == 1
+        assert stats["template_cache_misses"] == 2
+    
+    def test_file_references_invalidate_on_change(self, tmp_path):
+        """测试文件引用按修改时间和大小失效"""
+        include = tmp_path / "rules.md"
+        include.write_text("v1 {{var:name}}", encoding="utf-8")
+        resolver = PromptReferenceResolver(
+            _FakeRegistry({}), ReferenceConfig(prompts_directory=str(tmp_path))
+        )
+        
+        first = _resolve(resolver, "{{file:rules.md}}", {"name": "Ann"}, prompt_id="a")
+        assert first.content == "v1 Ann"
+        assert first.dependencies == ["file:rules.md"]
+        
+        include.write_text("version 2 {{var:name}}", encoding="utf-8")
+        stat = include.stat()
+        os.utime(include, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = _resolve(resolver, "{{file:rules.md}}", {"name": "Ann"}, prompt_id="b")
+        assert second.content == "version 2 Ann"
+    
+    def test_self_including_file_stops_at_cycle(self, tmp_path):
+        """测试文件包含自身时在循环处停止，保留原引用文本"""
+        (tmp_path / "self.md").write_text("x {{file:self.md}}", encoding="utf-8")
+        resolver = PromptReferenceResolver(
+            _FakeRegistry({}), ReferenceConfig(prompts_directory=str(tmp_path))
+        )
+        
+        result = _resolve(resolver, "{{file:self.md}}", {})
+        
+        assert result.content == "x {{file:self.md}}"
+        assert result.dependencies == ["file:self.md"]
+    
+    def test_mutually_including_files_stop_at_cycle(self, tmp_path):
+        """测试文件之间相互包含时在回到已访问文件处停止"""
+        (tmp_path / "a.md").write_text("a[{{file:b.md}}]", encoding="utf-8")
+        (tmp_path / "b.md").write_text("b[{{file:a.md}}]", encoding="utf-8")
+        resolver = PromptReferenceResolver(
+            _FakeRegistry({}), ReferenceConfig(prompts_directory=str(tmp_path))
+        )
+        
+        result = _resolve(resolver, "{{file:a.md}}", {})
+        
+        assert result.content == "a[b[{{file:a.md}}]]"
+        assert sorted(result.dependencies) == ["file:a.md", "file:b.md"]
+    
+    def test_file_cycle_raises_circular_reference_error(self, tmp_path):
+        """测试重复进入同一文件时抛出循环引用异常"""
+        resolver = PromptReferenceResolver(
+            _FakeRegistry({}), ReferenceConfig(prompts_directory=str(tmp_path))
+        )
+        visited, depth = resolver._enter_scope("file:self.md", set(), 0)
+        
+        with pytest.raises(PromptCircularReferenceError):
+            resolver._enter_scope("file:self.md", visited, depth)
+    
+    def test_nested_files_count_towards_depth(self, tmp_path):
+        """测试嵌套文件引用计入最大引用深度"""
+        for index in range(3):
+            (tmp_path / f"f{index}.md").write_text(f"{index}{{{{file:f{index + 1}.md}}}}", encoding="utf-8")
+        (tmp_path / "f3.md").write_text("end", encoding="utf-8")
+        resolver = PromptReferenceResolver(
+            _FakeRegistry({}),
+            ReferenceConfig(prompts_directory=str(tmp_path), max_reference_depth=3)
+        )
+        
+        result = _resolve(resolver, "{{file:f0.md}}", {})
+        
+        assert result.content == "01{{file:f2.md}}"
+    
+    def test_file_cache_bounded(self, tmp_path):
+        """测试文件编译结果缓存受容量限制，淘汰最久未使用的文件"""
+        for name in ("a", "b", "c"):
+            (tmp_path / f"{name}.md").write_text(name, encoding="utf-8")
+        resolver = PromptReferenceResolver(
+            _FakeRegistry({}), ReferenceConfig(prompts_directory=str(tmp_path), file_cache_size=2)
+        )
+        
+        _resolve(resolver, "{{file:a.md}}{{file:b.md}}", {}, prompt_id="p1")
+        _resolve(resolver, "{{file:a.md}}", {}, prompt_id="p2")
+        _resolve(resolver, "{{file:c.md}}", {}, prompt_id="p3")
+        
+        assert resolver.get_cache_statistics()["file_cache_size"] == 2
+        assert list(resolver._file_cache) == [str(tmp_path / "a.md"), str(tmp_path / "c.md")]